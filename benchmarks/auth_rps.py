@@ -0,0 +1,118 @@
+"""Requests/sec per core for an authenticated no-op Mini App endpoint.
+
+Drives a tiny FastAPI app straight through its ASGI callable (no sockets,
+no server) so the number reflects routing + auth dependency cost only.
+
+Usage:
+    python -m benchmarks.auth_rps [--requests 20000] [--tokens 64]
+
+Compares the cached auth path (``authenticate_bearer``) against a plain
+``jwt.decode`` per request, which is what every request paid before.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Annotated, Any
+
+import jwt
+from fastapi import Depends, FastAPI, Header, HTTPException
+
+from bot.api import auth
+
+
+def _cold_principal(authorization: str | None = Header(default=None)) -> auth.Principal:
+    token = (authorization or "").partition(" ")[2]
+    try:
+        data = jwt.decode(token, auth.JWT_SECRET, algorithms=[auth.JWT_ALGO])
+    except jwt.InvalidTokenError as exc:
+        raise HTTPException(status_code=401, detail="invalid_token") from exc
+    return auth.Principal(user_id=int(data["sub"]), telegram_id=int(data["tg_id"]))
+
+
+def _cached_principal(authorization: str | None = Header(default=None)) -> auth.Principal:
+    return auth.authenticate_bearer(authorization)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/cold")
+    async def cold(p: Annotated[auth.Principal, Depends(_cold_principal)]) -> dict[str, int]:
+        return {"u": p.user_id}
+
+    @app.get("/cached")
+    async def cached(
+        p: Annotated[auth.Principal, Depends(_cached_principal)],
+    ) -> dict[str, int]:
+        return {"u": p.user_id}
+
+    return app
+
+
+async def _call(app: FastAPI, path: str, token: str) -> int:
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    status_code = 0
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = int(message["status"])
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def _run(app: FastAPI, path: str, tokens: list[str], n: int) -> float:
+    for t in tokens:  # warm-up: fills the cache for /cached
+        await _call(app, path, t)
+    started = time.perf_counter()
+    for i in range(n):
+        code = await _call(app, path, tokens[i % len(tokens)])
+        if code != 200:
+            raise RuntimeError(f"{path} returned {code}")
+    return n / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=64, help="distinct users/tokens")
+    args = parser.parse_args()
+
+    if not auth.JWT_SECRET:
+        auth.JWT_SECRET = "bench-secret-" * 3
+    tokens = [
+        auth.issue_jwt(i + 1, auth.TelegramUser(id=100000 + i, first_name=f"u{i}"))
+        for i in range(max(1, args.tokens))
+    ]
+    app = build_app()
+    auth.principal_cache.clear()
+    cold = asyncio.run(_run(app, "/cold", tokens, args.requests))
+    cached = asyncio.run(_run(app, "/cached", tokens, args.requests))
+    print(f"requests={args.requests} tokens={len(tokens)} (single core)")
+    print(f"jwt.decode per request : {cold:10.0f} req/s")
+    print(f"cached principal       : {cached:10.0f} req/s  ({cached / cold:.2f}x)")
+    print(f"cache hits={auth.principal_cache.hits} misses={auth.principal_cache.misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""N clients racing for the same slot through the booking write path.
+
+Needs a migrated Postgres database (``DATABASE_URL``). Creates a throw-away
+master, service and N users, fires ``create_booking`` for one slot from all
+clients concurrently, repeats for ``--rounds`` distinct slots and reports:
+
+    * throughput (booking attempts per second)
+    * correctness: exactly one winner per slot, everyone else ``slot_unavailable``
+
+All rows created by the run are removed afterwards.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.booking_race \\
+        [--clients 50] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete
+
+from bot.app.core.db import get_session
+from bot.app.domain.models import Booking, Master, Service, User
+from bot.app.services.client_services import create_booking
+
+
+async def _setup(clients: int) -> tuple[int, str, list[int]]:
+    tag = uuid.uuid4().hex[:8]
+    async with get_session() as session:
+        master = Master(name=f"bench-{tag}", is_active=True)
+        service = Service(id=f"bench-{tag}", name="bench", price_cents=1000, duration_minutes=60)
+        tg_base = 9_000_000_000 + (int(tag, 16) % 100_000) * 10_000
+        users = [User(telegram_id=tg_base + i, name=f"bench-{i}") for i in range(clients)]
+        session.add_all([master, service, *users])
+        await session.commit()
+        return int(master.id), str(service.id), [int(u.id) for u in users]
+
+
+async def _teardown(master_id: int, service_id: str, user_ids: list[int]) -> None:
+    async with get_session() as session:
+        await session.execute(delete(Booking).where(Booking.master_id == master_id))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.execute(delete(Master).where(Master.id == master_id))
+        await session.execute(delete(Service).where(Service.id == service_id))
+        await session.commit()
+
+
+async def _attempt(user_id: int, master_id: int, service_id: str, slot: datetime) -> str:
+    try:
+        await create_booking(user_id, master_id, service_id, slot, hold_minutes=5)
+        return "ok"
+    except ValueError as exc:
+        return str(exc) or "error"
+    except Exception as exc:  # pragma: no cover - reported, not raised
+        return type(exc).__name__
+
+
+async def run(clients: int, rounds: int) -> int:
+    master_id, service_id, user_ids = await _setup(clients)
+    base = (datetime.now(UTC) + timedelta(days=400)).replace(minute=0, second=0, microsecond=0)
+    outcomes: Counter[str] = Counter()
+    bad_rounds = 0
+    started = time.perf_counter()
+    try:
+        for r in range(rounds):
+            slot = base + timedelta(hours=2 * r)
+            results = await asyncio.gather(
+                *(_attempt(uid, master_id, service_id, slot) for uid in user_ids)
+            )
+            round_counts = Counter(results)
+            outcomes.update(round_counts)
+            losers = round_counts["slot_unavailable"]
+            if round_counts["ok"] != 1 or losers != len(results) - 1:
+                bad_rounds += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        await _teardown(master_id, service_id, user_ids)
+
+    attempts = clients * rounds
+    print(f"clients={clients} rounds={rounds} attempts={attempts}")
+    print(f"throughput      : {attempts / elapsed:10.1f} attempts/s")
+    print(f"outcomes        : {dict(outcomes)}")
+    print(f"correct rounds  : {rounds - bad_rounds}/{rounds}")
+    return 0 if bad_rounds == 0 else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(max(2, args.clients), max(1, args.rounds))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Client search latency over a large ``users`` table.
+
+Needs a migrated Postgres database (``DATABASE_URL``) with ``pg_trgm``
+(migration ``f1c7a9d3b254``). Inserts ``--users`` throw-away clients with
+generated names/usernames in one ``INSERT ... SELECT generate_series``, runs
+``ANALYZE`` and then times ``search_clients`` for a mix of queries:
+
+    * name prefix ("olek"), full name ("iryna koval"), username ("@u1a2")
+    * typo / fuzzy ("oleksnadr"), Telegram id, a query with no match
+
+Reports p50 / p95 / max per query kind (first page and a keyset "next"
+page) and exits non-zero when the overall p95 exceeds ``--max-ms``.
+All rows created by the run are removed afterwards.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.client_search \\
+        [--users 100000] [--repeat 50] [--max-ms 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from bot.app.core.db import get_session
+from bot.app.services.client_search import search_clients
+
+TG_BASE = 8_700_000_000
+_FIRST = ["oleksandr", "iryna", "olha", "andrii", "mariia", "dmytro", "natalia", "yurii"]
+_LAST = ["koval", "shevchenko", "bondarenko", "tkachenko", "kravets", "melnyk", "boyko"]
+
+
+async def _setup(users: int) -> None:
+    async with get_session() as session:
+        await session.execute(text("""
+                INSERT INTO users (telegram_id, name, username, first_name, last_name,
+                                   is_admin, created_at)
+                WITH p AS (SELECT CAST(:first AS text[]) AS f, CAST(:last AS text[]) AS l)
+                SELECT CAST(:base AS bigint) + g,
+                       p.f[1 + g % 8] || ' ' || p.l[1 + (g / 8) % 7] || ' ' || g,
+                       'u' || substr(md5(g::text), 1, 6) || '_' || p.l[1 + g % 7],
+                       p.f[1 + g % 8],
+                       p.l[1 + (g / 8) % 7],
+                       false,
+                       now()
+                FROM p, generate_series(1, :n) AS g
+                """).bindparams(base=TG_BASE, n=users, first=_FIRST, last=_LAST))
+        await session.commit()
+        await session.execute(text("ANALYZE users"))
+        await session.commit()
+
+
+async def _teardown(users: int) -> None:
+    async with get_session() as session:
+        await session.execute(
+            text("DELETE FROM users WHERE telegram_id BETWEEN :lo AND :hi").bindparams(
+                lo=TG_BASE + 1, hi=TG_BASE + users
+            )
+        )
+        await session.commit()
+
+
+def _queries(users: int) -> dict[str, str]:
+    return {
+        "prefix": "olek",
+        "full_name": "iryna koval",
+        "username": "@u1a2",
+        "fuzzy": "oleksnadr bondarenko",
+        "telegram_id": str(TG_BASE + users // 2),
+        "no_match": "zzqxw",
+    }
+
+
+async def _time(query: str, after: str | None = None) -> tuple[float, str | None]:
+    started = time.perf_counter()
+    page = await search_clients(query, limit=10, after=after)
+    return (time.perf_counter() - started) * 1000, page.next_cursor
+
+
+async def run(users: int, repeat: int, max_ms: float) -> int:
+    await _setup(users)
+    samples: dict[str, list[float]] = {}
+    try:
+        for kind, query in _queries(users).items():
+            await _time(query)  # warm the plan / buffers
+            for _ in range(repeat):
+                ms, cursor = await _time(query)
+                samples.setdefault(kind, []).append(ms)
+                if cursor:
+                    ms, _ = await _time(query, after=cursor)
+                    samples.setdefault(f"{kind}+next", []).append(ms)
+    finally:
+        await _teardown(users)
+
+    everything: list[float] = []
+    print(f"users={users} repeat={repeat}")
+    for kind, values in samples.items():
+        everything.extend(values)
+        q = statistics.quantiles(values, n=20)
+        print(
+            f"{kind:<18}: p50 {statistics.median(values):7.2f} ms"
+            f"  p95 {q[18]:7.2f} ms  max {max(values):7.2f} ms"
+        )
+    p95 = statistics.quantiles(everything, n=20)[18]
+    print(f"overall p95     : {p95:7.2f} ms (budget {max_ms} ms)")
+    return 0 if p95 <= max_ms else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--max-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(max(100, args.users), max(2, args.repeat), args.max_ms)))
+
+
+if __name__ == "__main__":
+    main()
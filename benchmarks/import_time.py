@@ -0,0 +1,161 @@
+"""Cold-start import cost of the bot and API processes (``python -X importtime``).
+
+Each target runs in a fresh interpreter (after one warm-up run so ``.pyc``
+compilation is not counted) and the ``-X importtime`` report is parsed into
+per-module self / cumulative microseconds. Two budgets per target:
+
+    * ``forbidden`` - module prefixes that must not be imported at all
+      (the API must not pull aiogram or Telegram UI modules; the bot must
+      not import the lazily loaded admin/master handlers before polling);
+    * ``budget_ms`` - summed *self* time of the project's own modules
+      (``bot.*``). Third-party import time depends on the machine and the
+      installed versions, so it is reported but not budgeted.
+
+``IMPORT_BUDGET_SCALE`` multiplies every time budget (slow CI runners).
+The unit suite enforces the same budgets (``tests_new/test_startup.py``).
+
+Usage:
+    python -m benchmarks.import_time [--target api|bot] [--top 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+OWN_PREFIX = "bot"
+
+
+@dataclass(frozen=True)
+class Target:
+    code: str
+    budget_ms: float
+    forbidden: tuple[str, ...] = ()
+
+
+TARGETS: dict[str, Target] = {
+    "api": Target(
+        code="import bot.api.app",
+        budget_ms=600.0,
+        forbidden=("aiogram", "bot.app.telegram"),
+    ),
+    "bot": Target(
+        code=(
+            "import bot.app.run_bot\n"
+            "from bot.app.telegram.main_router import build_main_router\n"
+            "build_main_router()"
+        ),
+        budget_ms=500.0,
+        forbidden=(
+            "bot.app.telegram.admin.admin_handlers",
+            "bot.app.telegram.master.master_handlers",
+        ),
+    ),
+}
+
+
+@dataclass
+class ImportProfile:
+    # module -> (self_us, cumulative_us), in import order
+    modules: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+    def own_self_ms(self, prefix: str = OWN_PREFIX) -> float:
+        return sum(s for name, (s, _) in self.modules.items() if _is_under(name, prefix)) / 1000
+
+    def total_ms(self) -> float:
+        return sum(s for s, _ in self.modules.values()) / 1000
+
+    def imported(self, prefix: str) -> list[str]:
+        return [name for name in self.modules if _is_under(name, prefix)]
+
+
+def _is_under(name: str, prefix: str) -> bool:
+    return name == prefix or name.startswith(prefix + ".")
+
+
+def parse_importtime(stderr: str) -> ImportProfile:
+    """Parse ``import time: self | cumulative | name`` lines."""
+    profile = ImportProfile()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cum_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        profile.modules[parts[2].strip()] = (self_us, cum_us)
+    return profile
+
+
+def measure(code: str, *, warmup: bool = True) -> ImportProfile:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "LOG_FILE": "",
+        "LAZY_ROUTERS": "1",
+        "BOT_TOKEN": os.environ.get("BOT_TOKEN") or "1:import-time",
+    }
+    cmd = [sys.executable, "-X", "importtime", "-c", code]
+    for _ in range(2 if warmup else 1):
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def budget_scale() -> float:
+    try:
+        return max(0.1, float(os.getenv("IMPORT_BUDGET_SCALE", "1") or 1))
+    except ValueError:
+        return 1.0
+
+
+def check(name: str, profile: ImportProfile) -> list[str]:
+    """Budget violations for ``name`` (empty list = within budget)."""
+    target = TARGETS[name]
+    problems = [
+        f"{name}: imports {mod}" for prefix in target.forbidden for mod in profile.imported(prefix)
+    ]
+    limit = target.budget_ms * budget_scale()
+    own = profile.own_self_ms()
+    if own > limit:
+        problems.append(f"{name}: own modules took {own:.0f} ms (budget {limit:.0f} ms)")
+    return problems
+
+
+def _report(name: str, profile: ImportProfile, top: int) -> None:
+    limit = TARGETS[name].budget_ms * budget_scale()
+    print(
+        f"[{name}] total {profile.total_ms():8.1f} ms, own ({OWN_PREFIX}.*) "
+        f"{profile.own_self_ms():7.1f} ms, budget {limit:.0f} ms"
+    )
+    heaviest = sorted(profile.modules.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+    for mod, (self_us, cum_us) in heaviest:
+        print(f"    {cum_us / 1000:8.1f} ms cumulative {self_us / 1000:7.1f} ms self  {mod}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    failures: list[str] = []
+    for name in args.target or sorted(TARGETS):
+        profile = measure(TARGETS[name].code)
+        _report(name, profile, args.top)
+        failures.extend(check(name, profile))
+    for problem in failures:
+        print(f"OVER BUDGET: {problem}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
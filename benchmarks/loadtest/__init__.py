@@ -0,0 +1,12 @@
+"""Synthetic salon load-test harness for the Mini App API.
+
+Parts:
+    * ``datagen``  - deterministic salon dataset (masters, services, schedules,
+      exceptions, clients and years of bookings) at configurable scale
+    * ``driver``   - asyncio virtual users replaying the booking wizard against
+      ``bot.api.app:app`` in-process
+    * ``report``   - p50/p95/p99 latency and SQL statement counts per endpoint
+    * ``postgres`` - disposable Postgres (docker container or temp cluster)
+
+Run ``python -m benchmarks.loadtest --help``.
+"""
@@ -0,0 +1,158 @@
+"""CLI: provision Postgres, load the synthetic salon, replay wizard flows, report.
+
+Examples:
+    # disposable container (needs docker)
+    python -m benchmarks.loadtest --postgres docker --scale small --users 50
+
+    # temp cluster from local Postgres binaries (initdb/pg_ctl on PATH)
+    python -m benchmarks.loadtest --postgres temp --scale tiny
+
+    # existing empty database (migrations are applied)
+    python -m benchmarks.loadtest --db-url postgresql+asyncpg://u:p@host/db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import time
+from collections.abc import Iterator
+from datetime import date
+from typing import Any
+from unittest import mock
+
+# Auth and settings read the environment at import time: configure first.
+os.environ.setdefault("BOT_TOKEN", "123456:loadtest-token-loadtest-token")
+os.environ.setdefault("TWA_JWT_SECRET", "loadtest-secret-loadtest-secret-loadtest")
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    from benchmarks.loadtest.datagen import SCALES
+
+    p = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__)
+    src = p.add_mutually_exclusive_group()
+    src.add_argument("--postgres", choices=("docker", "temp"), default="docker")
+    src.add_argument("--db-url", help="use an existing, empty database")
+    p.add_argument("--scale", choices=sorted(SCALES), default="small")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--anchor", type=date.fromisoformat, help="pin 'today' (YYYY-MM-DD)")
+    p.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    p.add_argument("--flows", type=int, default=5, help="wizard flows per user")
+    p.add_argument("--json", dest="json_out", help="also write the report as JSON")
+    p.add_argument("--skip-load", action="store_true", help="database is already populated")
+    return p.parse_args(argv)
+
+
+class _NoBot:
+    """Stands in for ``aiogram.Bot``: messages are still built, nothing is sent."""
+
+    def __init__(self, *_a: Any, **_kw: Any) -> None:
+        self.session = self
+
+    async def send_message(self, *_a: Any, **_kw: Any) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+async def _no_notification(*_a: Any, **_kw: Any) -> None:
+    return None
+
+
+@contextlib.contextmanager
+def _no_telegram() -> Iterator[None]:
+    """Keep Telegram delivery out of the API/DB path being measured.
+
+    ``/api/finalize`` calls the helper bound in ``bot.api.app`` with a fresh
+    ``aiogram.Bot(BOT_TOKEN)``, so every binding of the helper is replaced
+    and the bot class is stubbed for the client confirmation.
+    """
+    with contextlib.ExitStack() as stack:
+        # importers first: patching the defining module before they are
+        # imported would make them bind (and later "restore") the stub
+        for module in (
+            "bot.api.app",
+            "bot.app.services.client_services",
+            "bot.app.core.notifications",
+        ):
+            stack.enter_context(mock.patch(f"{module}.send_booking_notification", _no_notification))
+        stack.enter_context(mock.patch("aiogram.Bot", _NoBot))
+        yield
+
+
+async def _run(args: argparse.Namespace, database_url: str) -> dict[str, Any]:
+    os.environ["DATABASE_URL"] = database_url
+
+    from benchmarks.loadtest import datagen
+    from benchmarks.loadtest.driver import run_load
+    from benchmarks.loadtest.report import Recorder
+    from bot.api.app import app
+
+    scale = datagen.SCALES[args.scale]
+    t0 = time.perf_counter()
+    if args.skip_load:
+        data = datagen.build_catalog(scale, args.seed, args.anchor)
+    else:
+        data = await datagen.load(scale, args.seed, args.anchor)
+    load_s = time.perf_counter() - t0
+
+    recorder = Recorder()
+    recorder.install()
+    t1 = time.perf_counter()
+    try:
+        with _no_telegram():
+            outcome = await run_load(
+                app,
+                recorder,
+                bot_token=os.environ["BOT_TOKEN"],
+                client_telegram_ids=data.client_telegram_ids,
+                users=args.users,
+                flows_per_user=args.flows,
+                seed=args.seed,
+            )
+    finally:
+        recorder.uninstall()
+    run_s = time.perf_counter() - t1
+
+    meta = {
+        "scale": args.scale,
+        "seed": args.seed,
+        "users": args.users,
+        "flows_per_user": args.flows,
+        "load_seconds": round(load_s, 1),
+        "run_seconds": round(run_s, 1),
+        **outcome,
+    }
+    print(
+        f"scale={args.scale} users={args.users} flows={outcome['flows']} "
+        f"booked={outcome['booked']} load={load_s:.1f}s run={run_s:.1f}s"
+    )
+    print(recorder.render())
+    if args.json_out:
+        recorder.dump_json(args.json_out, meta)
+    return meta
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    args = _parse_args(argv)
+    from benchmarks.loadtest.postgres import docker_postgres, migrate, temp_cluster
+
+    if args.db_url:
+        provider: Any = contextlib.nullcontext(args.db_url)
+    else:
+        provider = docker_postgres() if args.postgres == "docker" else temp_cluster()
+    with provider as url:
+        if not args.skip_load:
+            migrate(url)
+        asyncio.run(_run(args, url))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""Deterministic synthetic salon dataset.
+
+The same ``(seed, scale)`` always yields the same rows, so runs before and
+after a change are comparable. Rows are bulk-inserted with Core statements in
+batches; ids are assigned here and sequences are bumped afterwards.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import insert, text
+
+from bot.app.core.db import get_session
+from bot.app.domain.models import (
+    Booking,
+    BookingItem,
+    Master,
+    MasterSchedule,
+    MasterScheduleException,
+    MasterService,
+    Service,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+# Telegram ids for synthetic clients start here (well above real user ids)
+CLIENT_TG_BASE = 7_000_000_000
+
+
+@dataclass(frozen=True)
+class Scale:
+    masters: int
+    services: int
+    clients: int
+    years: float
+    # Share of each master's working time that is booked (0..1)
+    occupancy: float = 0.6
+    days_ahead: int = 60
+
+
+SCALES: dict[str, Scale] = {
+    "tiny": Scale(masters=3, services=8, clients=200, years=0.25),
+    "small": Scale(masters=8, services=25, clients=2_000, years=1),
+    "medium": Scale(masters=20, services=60, clients=20_000, years=3),
+    "large": Scale(masters=50, services=120, clients=100_000, years=5),
+}
+
+_CATEGORIES = ("hair", "nails", "brows", "massage", "makeup", "spa")
+_DURATIONS = (30, 45, 60, 60, 90, 120)
+_PAST_STATUSES = ("done",) * 8 + ("cancelled", "no_show")
+_FUTURE_STATUSES = ("confirmed",) * 6 + ("paid", "paid", "reserved", "cancelled")
+
+
+@dataclass
+class Dataset:
+    masters: list[dict[str, Any]]
+    services: list[dict[str, Any]]
+    master_services: list[dict[str, Any]]
+    schedules: list[dict[str, Any]]
+    exceptions: list[dict[str, Any]]
+    users: list[dict[str, Any]]
+
+    @property
+    def client_telegram_ids(self) -> list[int]:
+        return [int(u["telegram_id"]) for u in self.users]
+
+
+def _anchor_dt(anchor: date | None) -> datetime:
+    day = anchor or datetime.now(UTC).date()
+    return datetime.combine(day, time(0), tzinfo=UTC)
+
+
+def build_catalog(scale: Scale, seed: int = 1, anchor: date | None = None) -> Dataset:
+    """Return the static part of the dataset (everything except bookings).
+
+    ``anchor`` pins "today"; pass the same date to reproduce a dataset exactly.
+    """
+    rng = random.Random(seed)
+    now = _anchor_dt(anchor)
+    services = [
+        {
+            "id": f"svc{i:04d}",
+            "name": f"{_CATEGORIES[i % len(_CATEGORIES)].title()} #{i}",
+            "category": _CATEGORIES[i % len(_CATEGORIES)],
+            "price_cents": rng.randrange(300, 4000, 50) * 100,
+            "duration_minutes": rng.choice(_DURATIONS),
+            "created_at": now,
+        }
+        for i in range(scale.services)
+    ]
+    masters = [
+        {
+            "id": i + 1,
+            "telegram_id": 6_000_000_000 + i,
+            "name": f"Master {i + 1}",
+            "is_active": True,
+            "created_at": now,
+        }
+        for i in range(scale.masters)
+    ]
+    master_services: list[dict[str, Any]] = []
+    schedules: list[dict[str, Any]] = []
+    for m in masters:
+        offered = rng.sample(services, k=max(1, min(len(services), rng.randint(4, 15))))
+        for svc in offered:
+            override = rng.choice((None, None, None, svc["duration_minutes"] + 15))
+            master_services.append(
+                {"master_id": m["id"], "service_id": svc["id"], "duration_minutes": override}
+            )
+        days_off = set(rng.sample(range(7), k=rng.choice((1, 2))))
+        start_h = rng.choice((8, 9, 10))
+        for dow in range(7):
+            if dow in days_off:
+                continue
+            schedules.append(
+                {
+                    "master_id": m["id"],
+                    "day_of_week": dow,
+                    "start_time": time(start_h),
+                    "end_time": time(start_h + rng.choice((8, 9, 10))),
+                    "is_day_off": False,
+                    "updated_at": now,
+                }
+            )
+    exceptions = [
+        {
+            "master_id": m["id"],
+            "exception_date": (now + timedelta(days=rng.randint(1, scale.days_ahead))).date(),
+            "start_time": time(0),
+            "end_time": time(23, 59),
+            "reason": "vacation",
+            "updated_at": now,
+        }
+        for m in masters
+        for _ in range(rng.randint(0, 3))
+    ]
+    users = [
+        {
+            "id": i + 1,
+            "telegram_id": CLIENT_TG_BASE + i,
+            "name": f"Client {i + 1}",
+            "username": f"client{i + 1}",
+            "locale": rng.choice(("uk", "uk", "ru", "en")),
+            "created_at": now,
+            "is_admin": False,
+        }
+        for i in range(scale.clients)
+    ]
+    return Dataset(masters, services, master_services, schedules, exceptions, users)
+
+
+def iter_bookings(
+    data: Dataset, scale: Scale, seed: int = 1, anchor: date | None = None
+) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """Yield ``(booking_row, item_rows)`` for every master working day.
+
+    Active (future) bookings never overlap per master or per client, so the
+    rows satisfy the bookings_*_no_overlap exclusion constraints.
+    """
+    rng = random.Random(seed * 7919)
+    today = _anchor_dt(anchor).date()
+    first_day = today - timedelta(days=int(scale.years * 365))
+    last_day = today + timedelta(days=scale.days_ahead)
+    svc_by_id = {s["id"]: s for s in data.services}
+    offered: dict[int, list[tuple[str, int]]] = {}
+    for ms in data.master_services:
+        svc = svc_by_id[ms["service_id"]]
+        dur = ms["duration_minutes"] or svc["duration_minutes"]
+        offered.setdefault(ms["master_id"], []).append((svc["id"], int(dur)))
+    windows: dict[tuple[int, int], tuple[time, time]] = {
+        (s["master_id"], s["day_of_week"]): (s["start_time"], s["end_time"]) for s in data.schedules
+    }
+    client_busy: dict[tuple[int, date], list[tuple[datetime, datetime]]] = {}
+    booking_id = 0
+    day = first_day
+    while day <= last_day:
+        future = day >= today
+        for m in data.masters:
+            win = windows.get((m["id"], day.weekday()))
+            if not win:
+                continue
+            cursor = datetime.combine(day, win[0], tzinfo=UTC)
+            day_end = datetime.combine(day, win[1], tzinfo=UTC)
+            while cursor < day_end:
+                sid, dur = rng.choice(offered[m["id"]])
+                end = cursor + timedelta(minutes=dur)
+                if end > day_end:
+                    break
+                if rng.random() > scale.occupancy:
+                    cursor = end
+                    continue
+                status = rng.choice(_FUTURE_STATUSES if future else _PAST_STATUSES)
+                user = rng.choice(data.users)
+                if future and status != "cancelled":
+                    busy = client_busy.setdefault((user["id"], day), [])
+                    if any(cursor < b_end and end > b_start for b_start, b_end in busy):
+                        cursor = end
+                        continue
+                    busy.append((cursor, end))
+                booking_id += 1
+                price = int(svc_by_id[sid]["price_cents"])
+                yield (
+                    {
+                        "id": booking_id,
+                        "user_id": user["id"],
+                        "master_id": m["id"],
+                        "status": status,
+                        "starts_at": cursor,
+                        "ends_at": end,
+                        "created_at": cursor - timedelta(days=rng.randint(0, 14)),
+                        "original_price_cents": price,
+                        "final_price_cents": price,
+                        "paid_at": cursor if status == "paid" else None,
+                        "remind_24h_sent": not future,
+                        "remind_1h_sent": not future,
+                    },
+                    [
+                        {
+                            "booking_id": booking_id,
+                            "service_id": sid,
+                            "price_cents": price,
+                            "position": 0,
+                        }
+                    ],
+                )
+                cursor = end + timedelta(minutes=rng.choice((0, 0, 15, 30)))
+        day += timedelta(days=1)
+
+
+async def _insert_batches(table: Any, rows: list[dict[str, Any]]) -> None:
+    for i in range(0, len(rows), BATCH_SIZE):
+        chunk = rows[i : i + BATCH_SIZE]
+        async with get_session() as session:
+            await session.execute(insert(table), chunk)
+            await session.commit()
+
+
+async def load(scale: Scale, seed: int = 1, anchor: date | None = None) -> Dataset:
+    """Populate an empty (migrated) database and return the static catalog."""
+    data = build_catalog(scale, seed, anchor)
+    for model, rows in (
+        (Master, data.masters),
+        (Service, data.services),
+        (MasterService, data.master_services),
+        (MasterSchedule, data.schedules),
+        (MasterScheduleException, data.exceptions),
+        (User, data.users),
+    ):
+        await _insert_batches(model.__table__, rows)
+
+    bookings: list[dict[str, Any]] = []
+    items: list[dict[str, Any]] = []
+    total = 0
+    for booking, booking_items in iter_bookings(data, scale, seed, anchor):
+        bookings.append(booking)
+        items.extend(booking_items)
+        if len(bookings) >= BATCH_SIZE:
+            await _insert_batches(Booking.__table__, bookings)
+            await _insert_batches(BookingItem.__table__, items)
+            total += len(bookings)
+            bookings, items = [], []
+    await _insert_batches(Booking.__table__, bookings)
+    await _insert_batches(BookingItem.__table__, items)
+    total += len(bookings)
+
+    async with get_session() as session:
+        for table in ("masters", "users", "bookings", "master_schedules"):
+            await session.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                )
+            )
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+    logger.info(
+        "Loaded dataset: masters=%s services=%s clients=%s bookings=%s",
+        len(data.masters),
+        len(data.services),
+        len(data.users),
+        total,
+    )
+    return data
+
+
+__all__ = ["Scale", "SCALES", "Dataset", "build_catalog", "iter_bookings", "load"]
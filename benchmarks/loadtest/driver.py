@@ -0,0 +1,252 @@
+"""Asyncio virtual users replaying the Mini App booking wizard in-process.
+
+Each virtual user walks the same steps as the WebApp:
+
+    session -> services -> masters_match -> available_days -> slots
+            -> check_slot -> hold -> finalize (cash)
+
+Requests go straight through the ASGI callable of ``bot.api.app:app`` so the
+numbers reflect API + service + database cost, not HTTP stack overhead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+import urllib.parse
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from benchmarks.loadtest.report import Recorder
+
+logger = logging.getLogger(__name__)
+
+# The flow is expected to hit "slot taken" and similar business outcomes;
+# only transport-level failures (5xx) count as errors.
+_OK_STATUSES = range(200, 500)
+
+
+def signed_init_data(bot_token: str, telegram_id: int, first_name: str) -> str:
+    """Build Telegram WebApp ``initData`` signed with ``bot_token``."""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"lt{telegram_id}",
+        "user": json.dumps({"id": telegram_id, "first_name": first_name}, separators=(",", ":")),
+    }
+    check = "\n".join(f"{k}={fields[k]}" for k in sorted(fields))
+    secret = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(fields)
+
+
+class AsgiClient:
+    """Minimal in-process ASGI client (JSON in, JSON out)."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: list[tuple[str, str]] | None = None,
+        body: Any = None,
+        token: str | None = None,
+    ) -> tuple[int, Any]:
+        payload = json.dumps(body).encode() if body is not None else b""
+        headers = [(b"content-type", b"application/json")]
+        if token:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urllib.parse.urlencode(params or []).encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 1),
+            "server": ("loadtest", 80),
+        }
+        status = 0
+        chunks: list[bytes] = []
+        sent = False
+
+        async def receive() -> dict[str, Any]:
+            nonlocal sent
+            if sent:
+                await asyncio.sleep(3600)
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = int(message["status"])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        raw = b"".join(chunks)
+        try:
+            return status, json.loads(raw) if raw else None
+        except ValueError:
+            return status, None
+
+
+class WizardUser:
+    """One virtual client walking through the booking wizard."""
+
+    def __init__(
+        self,
+        client: AsgiClient,
+        recorder: Recorder,
+        bot_token: str,
+        telegram_id: int,
+        rng: random.Random,
+    ) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.bot_token = bot_token
+        self.telegram_id = telegram_id
+        self.rng = rng
+        self.token: str | None = None
+
+    async def _call(self, endpoint: str, method: str, path: str, **kw: Any) -> Any:
+        counter = self.recorder.start_request(endpoint)
+        started = time.perf_counter()
+        status = 0
+        data: Any = None
+        try:
+            status, data = await self.client.request(method, path, token=self.token, **kw)
+        except Exception:
+            logger.exception("loadtest: %s raised", endpoint)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.recorder.record(endpoint, elapsed, counter[0], status in _OK_STATUSES)
+        return data if status in _OK_STATUSES else None
+
+    async def run_flow(self) -> bool:
+        """Walk the wizard once; return True when a booking was finalized."""
+        init_data = signed_init_data(self.bot_token, self.telegram_id, f"lt{self.telegram_id}")
+        sess = await self._call("session", "POST", "/api/session", body={"initData": init_data})
+        if not sess or not sess.get("token"):
+            return False
+        self.token = sess["token"]
+
+        services = await self._call("services", "GET", "/api/services") or []
+        if not services:
+            return False
+        picked = [s["id"] for s in self.rng.sample(services, k=min(len(services), 1))]
+        masters = await self._call(
+            "masters_match", "POST", "/api/masters_match", body={"service_ids": picked}
+        )
+        if not masters:
+            return False
+        master_id = int(self.rng.choice(masters)["id"])
+        sids = [("service_ids[]", sid) for sid in picked]
+
+        target = datetime.now(UTC) + timedelta(days=self.rng.randint(1, 30))
+        days = await self._call(
+            "available_days",
+            "GET",
+            "/api/available_days",
+            params=[
+                ("master_id", str(master_id)),
+                ("year", str(target.year)),
+                ("month", str(target.month)),
+                *sids,
+            ],
+        )
+        day_list = [d for d in (days or {}).get("days", []) if d >= target.day] or (days or {}).get(
+            "days", []
+        )
+        if not day_list:
+            return False
+        day = target.replace(day=int(self.rng.choice(day_list)))
+        date_str = day.strftime("%Y-%m-%d")
+
+        slots = await self._call(
+            "slots",
+            "GET",
+            "/api/slots",
+            params=[
+                ("master_id", str(master_id)),
+                ("date", date_str),
+                ("service_ids", ",".join(picked)),
+            ],
+        )
+        slot_list = (slots or {}).get("slots") or []
+        if not slot_list:
+            return False
+        slot_local = f"{date_str}T{self.rng.choice(slot_list)}:00"
+
+        check = await self._call(
+            "check_slot",
+            "GET",
+            "/api/check_slot",
+            params=[("slot", slot_local), ("master_id", str(master_id)), *sids],
+        )
+        if not check or not check.get("available"):
+            return False
+
+        hold = await self._call(
+            "hold",
+            "POST",
+            "/api/hold",
+            body={
+                "service_ids": picked,
+                "slot": slot_local,
+                "master_id": master_id,
+                "payment_method": "cash",
+            },
+        )
+        if not hold or not hold.get("ok"):
+            return False
+
+        final = await self._call(
+            "finalize",
+            "POST",
+            "/api/finalize",
+            body={"booking_id": hold["booking_id"], "payment_method": "cash"},
+        )
+        return bool(final and final.get("ok"))
+
+
+async def run_load(
+    app: Any,
+    recorder: Recorder,
+    *,
+    bot_token: str,
+    client_telegram_ids: list[int],
+    users: int,
+    flows_per_user: int,
+    seed: int = 1,
+) -> dict[str, int]:
+    """Run ``users`` concurrent virtual users, each walking ``flows_per_user`` flows."""
+    client = AsgiClient(app)
+    rng = random.Random(seed)
+    tg_ids = rng.sample(client_telegram_ids, k=min(users, len(client_telegram_ids)))
+    outcome = {"flows": 0, "booked": 0}
+
+    async def one(tg_id: int, user_seed: int) -> None:
+        user_rng = random.Random(user_seed)
+        for _ in range(flows_per_user):
+            vu = WizardUser(client, recorder, bot_token, tg_id, user_rng)
+            booked = await vu.run_flow()
+            outcome["flows"] += 1
+            outcome["booked"] += int(booked)
+
+    await asyncio.gather(*(one(tg, seed * 100_003 + i) for i, tg in enumerate(tg_ids)))
+    return outcome
+
+
+__all__ = ["AsgiClient", "WizardUser", "run_load", "signed_init_data"]
@@ -0,0 +1,118 @@
+"""Latency / SQL-count collection and the per-endpoint summary table."""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+
+from bot.app.core.db import get_engine
+
+# Endpoint label of the request currently being executed by a virtual user.
+current_endpoint: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "loadtest_endpoint", default=None
+)
+# Mutable per-request statement counter (a one-element list so nested tasks share it).
+_current_counter: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar(
+    "loadtest_sql_counter", default=None
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (``pct`` in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        n = len(self.latencies_ms)
+        return {
+            "count": n,
+            "errors": self.errors,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "max_ms": round(max(self.latencies_ms, default=0.0), 2),
+            "queries_avg": round(sum(self.queries) / n, 2) if n else 0.0,
+            "queries_max": max(self.queries, default=0),
+        }
+
+
+class Recorder:
+    """Collects per-endpoint latencies and SQL statement counts."""
+
+    def __init__(self) -> None:
+        self.stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self._listening = False
+
+    # -- SQL counting -------------------------------------------------------
+    def install(self) -> None:
+        if self._listening:
+            return
+        event.listen(get_engine().sync_engine, "before_cursor_execute", _count_statement)
+        self._listening = True
+
+    def uninstall(self) -> None:
+        if self._listening:
+            event.remove(get_engine().sync_engine, "before_cursor_execute", _count_statement)
+            self._listening = False
+
+    @staticmethod
+    def start_request(endpoint: str) -> list[int]:
+        counter = [0]
+        current_endpoint.set(endpoint)
+        _current_counter.set(counter)
+        return counter
+
+    def record(self, endpoint: str, elapsed_ms: float, queries: int, ok: bool) -> None:
+        st = self.stats[endpoint]
+        st.latencies_ms.append(elapsed_ms)
+        st.queries.append(queries)
+        if not ok:
+            st.errors += 1
+
+    # -- output -------------------------------------------------------------
+    def summary(self) -> dict[str, dict[str, Any]]:
+        return {name: st.summary() for name, st in sorted(self.stats.items())}
+
+    def render(self) -> str:
+        header = (
+            f"{'endpoint':<24}{'count':>7}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'max':>9}{'sql avg':>9}{'sql max':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, s in self.summary().items():
+            lines.append(
+                f"{name:<24}{s['count']:>7}{s['errors']:>5}{s['p50_ms']:>9.1f}"
+                f"{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}"
+                f"{s['queries_avg']:>9.1f}{s['queries_max']:>9}"
+            )
+        lines.append("(latencies in ms; sql = statements executed per request)")
+        return "\n".join(lines)
+
+    def dump_json(self, path: str, meta: dict[str, Any] | None = None) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"meta": meta or {}, "endpoints": self.summary()}, fh, indent=2)
+
+
+def _count_statement(*_args: Any, **_kwargs: Any) -> None:
+    counter = _current_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+__all__ = ["Recorder", "EndpointStats", "percentile", "current_endpoint"]
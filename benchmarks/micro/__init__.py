@@ -0,0 +1 @@
+"""pytest-benchmark suite for the pure (DB-free) helpers on the render path."""
@@ -0,0 +1,72 @@
+"""Run the micro-benchmarks and keep a baseline to compare against.
+
+Usage:
+    python -m benchmarks.micro run                 # just print the table
+    python -m benchmarks.micro save [--name NAME]  # store a new baseline run
+    python -m benchmarks.micro compare [--fail-over 15]
+
+Runs are stored under ``benchmarks/micro/.results`` (pytest-benchmark's
+storage layout: one JSON per run, grouped by machine/interpreter). ``compare``
+re-runs the suite and diffs it against the latest stored run; with
+``--fail-over`` it exits non-zero when any mean regresses by more than that
+percentage. Baselines are machine-specific: save one on the box you compare on.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).resolve().parent
+STORAGE = HERE / ".results"
+
+
+def _base_args(extra: list[str]) -> list[str]:
+    return [
+        str(HERE),
+        "-q",
+        "-p",
+        "no:cacheprovider",
+        # Project addopts enable coverage for the unit suite; tracing skews timings
+        "--no-cov",
+        "--benchmark-only",
+        f"--benchmark-storage=file://{STORAGE}",
+        "--benchmark-sort=name",
+        "--benchmark-columns=min,mean,median,stddev,ops,rounds",
+        *extra,
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.micro")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("run", help="run and print results")
+    p_save = sub.add_parser("save", help="run and store results as a baseline")
+    p_save.add_argument("--name", default="baseline")
+    p_cmp = sub.add_parser("compare", help="run and compare against the latest stored run")
+    p_cmp.add_argument("--against", default=None, help="stored run id/glob (default: latest)")
+    p_cmp.add_argument(
+        "--fail-over", type=float, default=None, help="fail if a mean regresses by more than N%%"
+    )
+    p_cmp.add_argument("-k", dest="select", default=None, help="pytest -k expression")
+    args, passthrough = ap.parse_known_args(argv)
+
+    extra = list(passthrough)
+    if args.cmd == "save":
+        extra.append(f"--benchmark-save={args.name}")
+    elif args.cmd == "compare":
+        extra.append(
+            f"--benchmark-compare={args.against}" if args.against else "--benchmark-compare"
+        )
+        if args.fail_over is not None:
+            extra.append(f"--benchmark-compare-fail=mean:{args.fail_over:g}%")
+        if args.select:
+            extra += ["-k", args.select]
+    return int(pytest.main(_base_args(extra)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
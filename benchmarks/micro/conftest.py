@@ -0,0 +1,87 @@
+"""Shared inputs for the micro-benchmarks.
+
+Inputs mimic what the handlers pass in production: a month of calendar
+states, a day of 15-minute slots, a page of booking rows, a full weekly
+schedule. Everything is built once per session so only the helper under
+test is measured.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from collections.abc import Iterator
+from datetime import UTC, datetime, time, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("BOT_TOKEN", "123456:bench")
+
+# Fixed "now" so calendar states do not drift between runs
+NOW = datetime(2026, 3, 10, 9, 0, tzinfo=UTC)
+
+
+@pytest.fixture(scope="session")
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """Event loop for the async keyboard builders (they never await I/O)."""
+    lp = asyncio.new_event_loop()
+    yield lp
+    lp.close()
+
+
+@pytest.fixture(scope="session")
+def now() -> datetime:
+    return NOW
+
+
+@pytest.fixture(scope="session")
+def day_slots() -> list[datetime]:
+    start = NOW.replace(hour=9, minute=0)
+    return [start + timedelta(minutes=15 * i) for i in range(40)]
+
+
+@pytest.fixture(scope="session")
+def day_slot_times(day_slots: list[datetime]) -> list[time]:
+    return [s.time() for s in day_slots]
+
+
+@pytest.fixture(scope="session")
+def booking_rows() -> list[dict[str, Any]]:
+    statuses = ("confirmed", "paid", "reserved", "done", "cancelled")
+    return [
+        {
+            "id": 1000 + i,
+            "master_id": 700 + i % 4,
+            "master_name": f"Master {i % 4}",
+            "service_id": f"svc_{i % 6}",
+            "service_name": f"Haircut & styling {i % 6}",
+            "status": statuses[i % len(statuses)],
+            "starts_at": NOW + timedelta(days=i // 3, hours=i % 8),
+            "original_price_cents": 45000 + 500 * i,
+            "final_price_cents": 42000 + 500 * i,
+            "client_name": f"Client {i}",
+            "client_username": f"client_{i}",
+            "client_id": 5000 + i,
+        }
+        for i in range(20)
+    ]
+
+
+@pytest.fixture(scope="session")
+def weekly_schedule() -> dict[str, list[list[str]]]:
+    return {
+        "0": [["09:00", "13:00"], ["14:00", "19:00"]],
+        "1": [["09:00", "13:00"], ["14:00", "19:00"]],
+        "2": [["10:00", "18:00"]],
+        "3": [["09:00", "13:00"], ["14:00", "19:00"]],
+        "4": [["09:00", "17:00"]],
+        "5": [["10:00", "15:00"]],
+        "6": [],
+    }
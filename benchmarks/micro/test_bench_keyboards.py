@@ -0,0 +1,136 @@
+"""Inline keyboard builders from ``client_keyboards`` and callback packing.
+
+The async builders never await I/O for these inputs, so each round is a
+``run_until_complete`` on a reused loop; the loop overhead is constant and
+identical across runs being compared.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, time
+from typing import Any
+
+from bot.app.services.client_services import compute_calendar_day_states
+from bot.app.telegram.client.client_keyboards import (
+    _build_week_row_states,
+    build_booking_card_kb,
+    build_bookings_dashboard_kb,
+    build_my_bookings_keyboard,
+    get_calendar_keyboard,
+    get_compact_time_picker_kb,
+    get_time_slots_kb,
+)
+from bot.app.telegram.common.callbacks import (
+    DateCB,
+    NavCB,
+    RescheduleCB,
+    TimeCB,
+    create_callback_data,
+    pack_cb,
+)
+
+
+def _month_states(now: datetime) -> list[list[tuple[int, str]]]:
+    return compute_calendar_day_states(
+        2026,
+        3,
+        today=now,
+        allowed_weekdays=[0, 1, 2, 3, 4, 5],
+        available_days={d for d in range(1, 32) if d % 3},
+    )
+
+
+def test_pack_cb(benchmark: Any) -> None:
+    def run() -> list[str]:
+        return [
+            pack_cb(DateCB, service_id="svc_1", master_id=701, date="2026-03-12"),
+            pack_cb(TimeCB, service_id="svc_1", master_id=701, date="2026-03-12", time="0930"),
+            pack_cb(RescheduleCB, action="time", booking_id=1001, date="2026-03-12", time="0930"),
+            pack_cb(NavCB, act="back"),
+        ]
+
+    assert benchmark(run)[3] == "nav:back"
+
+
+def test_create_callback_data(benchmark: Any) -> None:
+    cls = benchmark(create_callback_data, "bench", service_id=str, master_id=int, page=int | None)
+    assert cls.__prefix__ == "bench"
+
+
+def test_build_week_row_states(benchmark: Any, now: datetime) -> None:
+    weeks = _month_states(now)
+
+    def run() -> list[Any]:
+        return [_build_week_row_states("svc_1", 701, 2026, 3, w) for w in weeks]
+
+    assert len(benchmark(run)) == len(weeks)
+
+
+def test_get_calendar_keyboard(
+    benchmark: Any, loop: asyncio.AbstractEventLoop, now: datetime
+) -> None:
+    states = _month_states(now)
+
+    def run() -> Any:
+        return loop.run_until_complete(
+            get_calendar_keyboard(
+                "svc_1", 701, 2026, 3, allowed_weekdays=[0, 1, 2, 3, 4, 5], day_states=states
+            )
+        )
+
+    assert benchmark(run).inline_keyboard
+
+
+def test_get_time_slots_kb(
+    benchmark: Any, loop: asyncio.AbstractEventLoop, day_slot_times: list[time]
+) -> None:
+    def run() -> Any:
+        return loop.run_until_complete(
+            get_time_slots_kb(
+                day_slot_times,
+                action="booking",
+                date="2026-03-12",
+                lang="uk",
+                service_id="svc_1",
+                master_id=701,
+            )
+        )
+
+    assert benchmark(run).inline_keyboard
+
+
+def test_get_compact_time_picker_kb(benchmark: Any, loop: asyncio.AbstractEventLoop) -> None:
+    def run() -> Any:
+        return loop.run_until_complete(
+            get_compact_time_picker_kb(
+                10, 30, service_id="svc_1", master_id=701, date="2026-03-12", lang="uk"
+            )
+        )
+
+    assert benchmark(run).inline_keyboard
+
+
+def test_build_bookings_dashboard_kb(benchmark: Any) -> None:
+    meta = {"mode": "upcoming", "page": 2, "total_pages": 4, "upcoming": 17, "done": 40}
+    assert benchmark(build_bookings_dashboard_kb, "master", meta, "uk").inline_keyboard
+
+
+def test_build_my_bookings_keyboard(
+    benchmark: Any, loop: asyncio.AbstractEventLoop, booking_rows: list[dict[str, Any]]
+) -> None:
+    rows = [(f"{r['service_name']} · {r['starts_at']:%d.%m %H:%M}", r["id"]) for r in booking_rows]
+
+    def run() -> Any:
+        return loop.run_until_complete(
+            build_my_bookings_keyboard(
+                rows[:5], 12, 30, "upcoming", 2, "uk", total_pages=3, current_page=2
+            )
+        )
+
+    assert benchmark(run).inline_keyboard
+
+
+def test_build_booking_card_kb(benchmark: Any, booking_rows: list[dict[str, Any]]) -> None:
+    row = booking_rows[0]
+    assert benchmark(build_booking_card_kb, row, row["id"], "client", "uk").inline_keyboard
@@ -0,0 +1,129 @@
+"""Formatting and calendar helpers from the service layer."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from bot.app.services.client_services import compute_calendar_day_states
+from bot.app.services.master_services import render_schedule_table
+from bot.app.services.shared_services import (
+    _parse_hm_to_minutes,
+    compute_pagination,
+    format_booking_details_text,
+    format_booking_list_item,
+    format_money_cents,
+    normalize_booking_row,
+)
+
+
+def test_compute_calendar_day_states(benchmark: Any, now: datetime) -> None:
+    available = {d for d in range(1, 32) if d % 3}
+    result = benchmark(
+        compute_calendar_day_states,
+        2026,
+        3,
+        today=now,
+        allowed_weekdays=[0, 1, 2, 3, 4, 5],
+        available_days=available,
+    )
+    assert len(result) >= 4
+
+
+def test_format_money_cents(benchmark: Any) -> None:
+    amounts = [0, 99, 45000, 123456, 9_999_999]
+
+    def run() -> list[str]:
+        return [format_money_cents(a, "UAH") for a in amounts]
+
+    assert all(benchmark(run))
+
+
+def test_parse_hm_to_minutes(benchmark: Any) -> None:
+    inputs = ["09:00", "9:30", "18:45", "0930", "23:59", 600]
+
+    def run() -> list[int]:
+        return [_parse_hm_to_minutes(v) for v in inputs]
+
+    assert benchmark(run)[0] == 540
+
+
+def test_compute_pagination(benchmark: Any) -> None:
+    def run() -> list[tuple[int, int, int, int | None]]:
+        return [compute_pagination(137, p, 5) for p in (None, 1, 7, 28, 99)]
+
+    assert benchmark(run)[2] == (7, 28, 30, 5)
+
+
+def test_normalize_booking_row(benchmark: Any, booking_rows: list[dict[str, Any]]) -> None:
+    def run() -> list[Any]:
+        return [normalize_booking_row(r) for r in booking_rows]
+
+    assert benchmark(run)[0].id == 1000
+
+
+def test_format_booking_list_item(benchmark: Any, booking_rows: list[dict[str, Any]]) -> None:
+    page = booking_rows[:5]
+
+    def run() -> list[tuple[str, int]]:
+        return [format_booking_list_item(r, role="client", lang="uk") for r in page]
+
+    assert benchmark(run)[0][1] == 1000
+
+
+def test_format_booking_details_text(benchmark: Any, booking_rows: list[dict[str, Any]]) -> None:
+    text = benchmark(format_booking_details_text, booking_rows[0], "uk", "master")
+    assert text
+
+
+def test_render_schedule_table(benchmark: Any, weekly_schedule: dict[str, list[list[str]]]) -> None:
+    assert benchmark(render_schedule_table, weekly_schedule, "uk")
+
+
+def test_master_grid_month_fit(benchmark: Any, weekly_schedule: dict[str, list[list[str]]]) -> None:
+    from datetime import date, time, timedelta
+
+    from bot.app.domain.schedule_grid import MasterGrid, fit_starts
+
+    rows = [
+        (int(d), time.fromisoformat(s), time.fromisoformat(e), False)
+        for d, windows in weekly_schedule.items()
+        for s, e in windows
+    ]
+    grid = MasterGrid.from_rows(rows)
+    first = date(2026, 3, 1)
+
+    def run() -> int:
+        return sum(
+            1
+            for _, work in grid.iter_days(first, first + timedelta(days=31))
+            if fit_starts(work, 90)
+        )
+
+    assert benchmark(run) > 20
+
+
+def test_utilization_90_days_20_masters(benchmark: Any, now: datetime) -> None:
+    from datetime import UTC, time, timedelta
+
+    from bot.app.domain.schedule_grid import MasterGrid
+    from bot.app.services.admin_services import utilization_from_grids
+
+    rows = [(d, time(9), time(13), False) for d in range(6)]
+    rows += [(d, time(14), time(19), False) for d in range(6)]
+    grids = {mid: MasterGrid.from_rows(rows) for mid in range(20)}
+    start = now.date() - timedelta(days=90)
+    intervals = {
+        mid: [
+            (
+                datetime.combine(start + timedelta(days=d), time(9 + h * 2)).replace(tzinfo=UTC),
+                datetime.combine(start + timedelta(days=d), time(10 + h * 2)).replace(tzinfo=UTC),
+            )
+            for d in range(90)
+            for h in range(4)
+        ]
+        for mid in grids
+    }
+
+    result = benchmark(utilization_from_grids, grids, intervals, start, now.date(), UTC)
+    assert len(result) == 20
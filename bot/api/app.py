@@ -6,48 +6,54 @@ Expose small REST endpoints for the WebApp UI while relying on existing DB/servi
 
 from __future__ import annotations
 
-import hashlib
-import hmac
-import json
 import logging
 import os
-import urllib.parse
-from datetime import UTC, datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import MAXYEAR, MINYEAR, UTC, datetime, timedelta
 from zoneinfo import ZoneInfo
 from functools import wraps
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any, Annotated, ParamSpec, TypeVar
 from enum import Enum
 
-import jwt
-from aiogram import Bot
 from fastapi import Depends, FastAPI, Header, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 # Centralized business logic helpers (booking, pricing, etc.)
 from bot.app.services import client_services
 
-from bot.app.core.constants import BOT_TOKEN
+from bot.app.core.cache_bus import start_cache_bus, stop_cache_bus
+from bot.app.core.constants import BOT_TOKEN, METRICS_TOKEN
+from bot.app.core.logger import configure_logging, set_log_user, shutdown_logging
+from bot.app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from bot.app.core.metrics import HTTPMetricsMiddleware, render_prometheus
+from bot.api.auth import (
+    Principal,
+    TelegramUser,
+    authenticate_bearer,
+    issue_jwt,
+    validate_init_data,
+)
+from bot.api.idempotency import body_fingerprint, replay_cache
 from bot.app.services.shared_services import (
-    is_online_payments_available,
     get_admin_ids,
+    get_public_config,
     safe_get_locale,
-    get_contact_info,
-    resolve_online_payment_discount_percent,
 )
 from bot.app.services.shared_services import (
     format_slot_label,
     format_date,
 )
 from bot.app.services.shared_services import normalize_error_code
-from bot.app.telegram.common.status import get_status_label
+from bot.app.services.booking_status import get_status_label
 from bot.app.core.db import get_session
 from bot.app.services.admin_services import ServiceRepo
 from bot.app.services.client_services import UserRepo
 from bot.app.services.master_services import MasterRepo
+from bot.app.services.month_availability import get_month_availability
 from bot.app.services.client_services import (
     BookingResult,
     BookingRepo,
@@ -63,18 +69,12 @@ from bot.app.services.client_services import (
     process_booking_details,
 )
 from bot.app.core.notifications import send_booking_notification
-from bot.app.services.admin_services import SettingsRepo
 
 logger = logging.getLogger(__name__)
 
 P = ParamSpec("P")
 T = TypeVar("T")
 
-# JWT settings
-JWT_SECRET = os.getenv("TWA_JWT_SECRET") or BOT_TOKEN
-JWT_ALGO = "HS256"
-JWT_TTL_SECONDS = int(os.getenv("TWA_JWT_TTL_SECONDS", "3600"))
-
 # Allowed origins for Telegram clients; adjust to include your domain
 _raw_origins = [
     "https://web.telegram.org",
@@ -91,13 +91,6 @@ class SessionRequest(BaseModel):
     init_data: str = Field(..., alias="initData")
 
 
-class TelegramUser(BaseModel):
-    id: int
-    first_name: str | None = None
-    last_name: str | None = None
-    username: str | None = None
-
-
 class SessionResponse(BaseModel):
     token: str
     user: TelegramUser
@@ -215,6 +208,24 @@ class AvailableDaysResponse(BaseModel):
     timezone: str | None = None
 
 
+class DayAvailabilityOut(BaseModel):
+    day: int
+    free_starts: int
+    first_start: str | None = None
+    last_start: str | None = None
+    # "HH:MM" of every start (include_starts=true), saves the /api/slots call
+    starts: list[str] | None = None
+
+
+class MonthAvailabilityResponse(BaseModel):
+    year: int
+    month: int
+    duration_minutes: int
+    step_minutes: int
+    days: list[DayAvailabilityOut]
+    timezone: str | None = None
+
+
 class PriceQuoteRequest(BaseModel):
     service_ids: list[str] = Field(..., min_length=1)
 
@@ -245,6 +256,10 @@ class ServiceOut(BaseModel):
 class MasterOut(BaseModel):
     id: int
     name: str
+    # reputation from master_stats (catalog cards and profile header)
+    rating: float | None = None
+    ratings_count: int | None = None
+    completed_orders: int | None = None
 
 
 class MastersMatchRequest(BaseModel):
@@ -254,9 +269,6 @@ class MastersMatchRequest(BaseModel):
 class MasterProfileOut(MasterOut):
     telegram_id: int | None = None
     bio: str | None = None
-    rating: float | None = None
-    ratings_count: int | None = None
-    completed_orders: int | None = None
     title: str | None = None
     experience_years: int | None = None
     specialities: list[str] | None = None
@@ -273,14 +285,6 @@ class MeOut(BaseModel):
     locale: str | None
 
 
-class Principal(BaseModel):
-    user_id: int
-    telegram_id: int
-    username: str | None = None
-    first_name: str | None = None
-    language: str | None = None
-
-
 class RatingRequest(BaseModel):
     booking_id: int
     rating: int = Field(..., ge=1, le=5)
@@ -303,110 +307,6 @@ class InvoiceRequest(BaseModel):
     booking_id: int
 
 
-# ---------------------------------------------------------------------------
-# Security helpers
-# ---------------------------------------------------------------------------
-
-
-def _parse_init_data(init_data: str) -> dict[str, str]:
-    try:
-        parsed = dict(
-            urllib.parse.parse_qsl(init_data, keep_blank_values=True, strict_parsing=True)
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_init_data_format"
-        ) from exc
-    if "hash" not in parsed:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing_hash")
-    return parsed
-
-
-def _calc_expected_hash(data: dict[str, str], token: str) -> str:
-    check_hash = data.get("hash", "")
-    data_to_check = {k: v for k, v in data.items() if k != "hash"}
-    data_check_string = "\n".join(f"{k}={data_to_check[k]}" for k in sorted(data_to_check))
-    secret_key = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
-    computed = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
-    logger.debug("initData data_check_string=%s computed_hash=%s", data_check_string, computed)
-    if not hmac.compare_digest(computed, check_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_init_data_signature"
-        )
-    return computed
-
-
-def validate_init_data(init_data: str) -> TelegramUser:
-    parsed = _parse_init_data(init_data)
-    _calc_expected_hash(parsed, BOT_TOKEN)
-
-    try:
-        user_raw = parsed.get("user")
-        user_payload = json.loads(user_raw) if user_raw else None
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_user_payload"
-        ) from exc
-
-    if not isinstance(user_payload, dict) or "id" not in user_payload:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing_user")
-
-    try:
-        auth_date_raw = parsed.get("auth_date")
-        if auth_date_raw:
-            auth_ts = int(auth_date_raw)
-            if auth_ts < int(datetime.now(UTC).timestamp()) - 86400:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED, detail="stale_init_data"
-                )
-    except HTTPException:
-        raise
-    except Exception:
-        pass
-
-    user_id_raw = user_payload.get("id")
-    if user_id_raw is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing_user_id")
-
-    return TelegramUser(
-        id=int(user_id_raw),
-        first_name=user_payload.get("first_name"),
-        last_name=user_payload.get("last_name"),
-        username=user_payload.get("username"),
-    )
-
-
-def issue_jwt(user_id: int, tg_user: TelegramUser) -> str:
-    payload = {
-        "sub": str(user_id),
-        "tg_id": int(tg_user.id),
-        "username": tg_user.username,
-        "first_name": tg_user.first_name,
-        "exp": datetime.now(UTC) + timedelta(seconds=JWT_TTL_SECONDS),
-    }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGO)
-
-
-def _decode_token(token: str) -> Principal:
-    try:
-        data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
-    except jwt.ExpiredSignatureError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="token_expired"
-        ) from exc
-    except jwt.InvalidTokenError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_token"
-        ) from exc
-
-    return Principal(
-        user_id=int(data.get("sub")),
-        telegram_id=int(data.get("tg_id")),
-        username=data.get("username"),
-        first_name=data.get("first_name"),
-    )
-
-
 async def _safe_service_repo_call(method_name: str, *args: Any, **kwargs: Any) -> Any | None:
     """Call a ServiceRepo method by name safely for type-checker friendliness.
 
@@ -428,17 +328,11 @@ async def get_current_principal(
     accept_language: str | None = Header(default=None, alias="Accept-Language"),
     lang_q: str | None = Query(default=None, alias="lang"),
 ) -> Principal:
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="missing_authorization"
-        )
-    scheme, _, token = authorization.partition(" ")
-    if scheme.lower() != "bearer" or not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_authorization_header"
-        )
-
-    principal = _decode_token(token)
+    # Cached decode; returns a private copy so the language below never leaks
+    # into the shared principal cache.
+    principal = authenticate_bearer(authorization)
+    # Request task context: user_id on the request's log records / per-user debug
+    set_log_user(principal.telegram_id)
 
     # Derive preferred language: header X-TWA-Lang > query param lang > Accept-Language
     lang = None
@@ -461,7 +355,20 @@ async def get_current_principal(
 # FastAPI app
 # ---------------------------------------------------------------------------
 
-app = FastAPI(title="SalonBot TMA API", version="0.1.0")
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    configure_logging("api", log_file="")
+    # every uvicorn worker listens: cache invalidations from the others / the bot
+    await start_cache_bus()
+    try:
+        yield
+    finally:
+        await stop_cache_bus()
+        shutdown_logging()
+
+
+app = FastAPI(title="SalonBot TMA API", version="0.1.0", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"] if ALLOW_ALL_ORIGINS else ALLOWED_ORIGINS,
@@ -469,6 +376,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last = outermost: measures CORS handling too, labels by route template
+app.add_middleware(HTTPMetricsMiddleware)
 
 
 @app.post("/api/session", response_model=SessionResponse)
@@ -482,91 +391,32 @@ async def create_session(payload: SessionRequest) -> SessionResponse:
         username=tg_user.username,
     )
     token = issue_jwt(user_id=int(user.id), tg_user=tg_user)
-    # Provide authoritative runtime settings to the WebApp: currency and locale
-    try:
-        currency = await SettingsRepo.get_currency()
-    except Exception as exc:
-        logger.exception("Failed to get currency setting: %s", exc)
-        currency = None
 
+    # Locale comes back from the upsert; only fall back to the default chain.
     try:
-        locale = await safe_get_locale(int(tg_user.id))
+        locale = getattr(user, "locale", None) or await safe_get_locale(None)
     except Exception as exc:
         logger.exception("Failed to resolve user locale: %s", exc)
         locale = None
 
-    try:
-        online_payments_available = await is_online_payments_available()
-    except Exception as exc:
-        logger.exception("Failed to determine online payment availability: %s", exc)
-        online_payments_available = None
-
-    try:
-        online_discount_percent = await resolve_online_payment_discount_percent()
-    except Exception as exc:
-        logger.exception("Failed to read online payment discount percent: %s", exc)
-        online_discount_percent = None
-
-    # Provide a frontend-friendly alias and a date format setting (best-effort).
-    try:
-        date_format = await SettingsRepo.get_setting("date_format", "YYYY-MM-DD")
-        if not isinstance(date_format, str):
-            date_format = str(date_format) if date_format is not None else "YYYY-MM-DD"
-    except Exception:
-        date_format = "YYYY-MM-DD"
-
-    try:
-        title = await SettingsRepo.get_setting("webapp_title", "Telegram Mini App • Beauty")
-        # If stored as JSON/string, coerce
-        if isinstance(title, str):
-            webapp_title = title
-        else:
-            webapp_title = str(title) if title is not None else None
-    except Exception as exc:
-        logger.exception("Failed to read webapp title setting: %s", exc)
-        webapp_title = "Telegram Mini App • Beauty"
-
-    try:
-        reminder_lead = await SettingsRepo.get_reminder_lead_minutes()
-    except Exception:
-        reminder_lead = None
-
-    # Resolve timezone once from environment/settings for WebApp clients.
-    try:
-        tz_name = os.getenv("BUSINESS_TIMEZONE") or os.getenv("LOCAL_TIMEZONE")
-        if not tz_name:
-            tz_name = getattr(ZoneInfo("UTC"), "key", "UTC")
-    except Exception:
-        tz_name = "UTC"
-
-    # Try to include contact address/title for the WebApp (best-effort)
-    try:
-        contact = await get_contact_info()
-        address_val = contact.get("address") if isinstance(contact, dict) else None
-        webapp_address_val = address_val
-        contact_phone_val = contact.get("phone") if isinstance(contact, dict) else None
-        contact_instagram_val = contact.get("instagram") if isinstance(contact, dict) else None
-    except Exception:
-        address_val = None
-        webapp_address_val = None
-        contact_phone_val = None
-        contact_instagram_val = None
+    # Runtime settings for the WebApp are served from one in-memory snapshot.
+    cfg = await get_public_config()
 
     return SessionResponse(
         token=token,
         user=tg_user,
-        currency=currency,
+        currency=cfg.currency,
         locale=locale,
-        webapp_title=webapp_title,
-        online_payments_available=online_payments_available,
-        online_payment_discount_percent=online_discount_percent,
-        date_format=date_format,
-        reminder_lead_minutes=reminder_lead,
-        address=address_val,
-        webapp_address=webapp_address_val,
-        contact_phone=contact_phone_val,
-        contact_instagram=contact_instagram_val,
-        timezone=tz_name,
+        webapp_title=cfg.webapp_title,
+        online_payments_available=cfg.online_payments_available,
+        online_payment_discount_percent=cfg.online_payment_discount_percent,
+        date_format=cfg.date_format,
+        reminder_lead_minutes=cfg.reminder_lead_minutes,
+        address=cfg.address,
+        webapp_address=cfg.address,
+        contact_phone=cfg.contact_phone,
+        contact_instagram=cfg.contact_instagram,
+        timezone=cfg.timezone,
     )
 
 
@@ -715,43 +565,99 @@ async def available_days(
     return AvailableDaysResponse(days=sorted(days), timezone=tz_name)
 
 
+@app.get("/api/availability/month", response_model=MonthAvailabilityResponse)
+async def availability_month(
+    master_id: int,
+    year: int,
+    month: int,
+    service_ids: Annotated[list[str], Query(..., alias="service_ids[]")],
+    principal: Annotated[Principal, Depends(get_current_principal)],
+    include_starts: bool = False,
+    prefetch: bool = True,
+) -> MonthAvailabilityResponse:
+    """Per-day free-start counts and first/last start for a month (heatmap).
+
+    ``prefetch`` warms the previous / next month in the background so the
+    WebApp can flip months from the cache.
+    """
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="invalid_month")
+    # strict bounds: the neighbouring months are prefetched too
+    if not MINYEAR < year < MAXYEAR:
+        raise HTTPException(status_code=400, detail="invalid_year")
+    # same duration as /api/slots (per-master overrides), or the counts drift from the picker
+    totals = await get_services_duration_and_price(service_ids, master_id=master_id)
+    total_minutes = int(totals.get("total_minutes") or 60)
+    result = await get_month_availability(master_id, year, month, total_minutes, prefetch=prefetch)
+
+    def _hm(minute: int) -> str:
+        return f"{minute // 60:02d}:{minute % 60:02d}"
+
+    days = [
+        DayAvailabilityOut(
+            day=d.day,
+            free_starts=d.free_starts,
+            first_start=d.first_start.strftime("%H:%M") if d.first_start else None,
+            last_start=d.last_start.strftime("%H:%M") if d.last_start else None,
+            starts=[_hm(m) for m in d.starts] if include_starts else None,
+        )
+        for d in result.days
+    ]
+    return MonthAvailabilityResponse(
+        year=result.year,
+        month=result.month,
+        duration_minutes=result.duration,
+        step_minutes=result.step,
+        days=days,
+        timezone=result.timezone,
+    )
+
+
 @app.post("/api/hold", response_model=BookingResponse)
 @booking_error_handler("booking_failed")
 async def create_hold(
     payload: BookingRequest,
     principal: Annotated[Principal, Depends(get_current_principal)],
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> BookingResponse:
     """Create a short-term reservation (hold) for the requested slot.
 
     The booking will be created with a cash hold that expires after
     `SettingsRepo.get_reservation_hold_minutes()` (best-effort). This mirrors
     the bot behaviour and allows the TMA to hold a slot while the user
-    completes payment details.
+    completes payment details. Duplicates with the same `Idempotency-Key`
+    replay the first response instead of competing for the slot.
     """
-    res: BookingResult = await process_booking_hold(
-        principal.user_id,
-        principal.telegram_id,
-        payload.service_ids,
-        payload.slot,
-        master_id=payload.master_id,
-        payment_method=payload.payment_method,
-        client_name=principal.first_name or principal.username,
-        client_username=principal.username,
-    )
-    return BookingResponse(
-        ok=bool(res.get("ok")),
-        booking_id=res.get("booking_id"),
-        status=res.get("status"),
-        starts_at=res.get("starts_at"),
-        cash_hold_expires_at=res.get("cash_hold_expires_at"),
-        original_price_cents=res.get("original_price_cents"),
-        final_price_cents=res.get("final_price_cents"),
-        discount_amount_cents=res.get("discount_amount_cents"),
-        currency=res.get("currency"),
-        duration_minutes=res.get("duration_minutes"),
-        master_id=res.get("master_id"),
-        payment_method=res.get("payment_method"),
-        error=res.get("error"),
+
+    async def _hold() -> BookingResponse:
+        res: BookingResult = await process_booking_hold(
+            principal.user_id,
+            principal.telegram_id,
+            payload.service_ids,
+            payload.slot,
+            master_id=payload.master_id,
+            payment_method=payload.payment_method,
+            client_name=principal.first_name or principal.username,
+            client_username=principal.username,
+        )
+        return BookingResponse(
+            ok=bool(res.get("ok")),
+            booking_id=res.get("booking_id"),
+            status=res.get("status"),
+            starts_at=res.get("starts_at"),
+            cash_hold_expires_at=res.get("cash_hold_expires_at"),
+            original_price_cents=res.get("original_price_cents"),
+            final_price_cents=res.get("final_price_cents"),
+            discount_amount_cents=res.get("discount_amount_cents"),
+            currency=res.get("currency"),
+            duration_minutes=res.get("duration_minutes"),
+            master_id=res.get("master_id"),
+            payment_method=res.get("payment_method"),
+            error=res.get("error"),
+        )
+
+    return await replay_cache.run(
+        "hold", principal.user_id, idempotency_key, body_fingerprint(payload), _hold
     )
 
 
@@ -786,12 +692,32 @@ async def list_services(
         raise HTTPException(status_code=500, detail="services_unavailable") from exc
 
 
+async def _masters_out(masters: list[tuple[int, str]]) -> list[MasterOut]:
+    """Catalog cards with ratings for the whole list from one master_stats lookup."""
+    from bot.app.services.master_stats import get_master_stats_map
+
+    stats = await get_master_stats_map(mid for mid, _name in masters)
+    out: list[MasterOut] = []
+    for mid, name in masters:
+        rep = stats.get(int(mid))
+        out.append(
+            MasterOut(
+                id=mid,
+                name=name,
+                rating=rep.rating_avg if rep else None,
+                ratings_count=rep.rating_count if rep else None,
+                completed_orders=rep.completed_orders if rep else None,
+            )
+        )
+    return out
+
+
 @app.get("/api/masters", response_model=list[MasterOut])
 async def list_masters(
     principal: Annotated[Principal, Depends(get_current_principal)],
 ) -> list[MasterOut]:
     masters: list[tuple[int, str]] = await MasterRepo.get_masters_page(page=1, page_size=200)
-    return [MasterOut(id=m[0], name=m[1]) for m in masters]
+    return await _masters_out(masters)
 
 
 @app.get("/api/service_ranges")
@@ -955,10 +881,12 @@ async def master_profile(
     ratings_count_val = data.get("ratings_count")
     completed_orders_val = data.get("completed_orders")
 
-    # Build schedule lines using MasterRepo to avoid inline SQL here
+    # Schedule lines: loaded together with the profile data (same session)
     schedule_lines: list[str] = []
     try:
-        schedule = await MasterRepo.get_schedule(master_id) or {}
+        schedule = data.get("schedule")
+        if schedule is None:
+            schedule = await MasterRepo.get_schedule(master_id) or {}
         weekdays = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
         for i in range(7):
             windows = schedule.get(str(i)) or []
@@ -997,9 +925,9 @@ async def masters_for_service(
     service_id: str, principal: Annotated[Principal, Depends(get_current_principal)]
 ) -> list[MasterOut]:
     masters = await MasterRepo.get_masters_for_service(service_id)
-    return [
-        MasterOut(id=int(getattr(m, "id", 0)), name=str(getattr(m, "name", ""))) for m in masters
-    ]
+    return await _masters_out(
+        [(int(getattr(m, "id", 0)), str(getattr(m, "name", ""))) for m in masters]
+    )
 
 
 @app.post("/api/price_quote", response_model=PriceQuoteResponse)
@@ -1060,13 +988,33 @@ async def list_bookings(
 
     result: list[BookingItemOut] = []
 
+    # Lookups shared by all items run once per request (constant SQL count
+    # regardless of how many bookings the client has).
+    service_names_map: dict[int, str] = {}
+    master_names: dict[int, str] = {}
+    lock_r: int | None = None
+    lock_c: int | None = None
+    if bookings:
+        service_names_map = await BookingRepo.get_service_names_map(b.id for b in bookings)
+        master_names = await MasterRepo.get_master_names(
+            b.master_id for b in bookings if b.master_id is not None
+        )
+        try:
+            from bot.app.services.admin_services import SettingsRepo
+
+            lock_r = await SettingsRepo.get_client_reschedule_lock_minutes()
+            lock_c = await SettingsRepo.get_client_cancel_lock_minutes()
+        except Exception:
+            logger.exception("list_bookings: failed to resolve lock windows")
+
     for b in bookings:
-        # Delegate rendering/formatting/permissions to shared helper
+        # Delegate rendering/formatting/permissions to shared helper; ownership
+        # is part of the query above, so no per-item owner re-check is needed.
         try:
             from bot.app.services.shared_services import render_booking_item_for_api
 
             rendered = await render_booking_item_for_api(
-                b, user_telegram_id=principal.telegram_id, lang=principal.language
+                b, lang=principal.language, lock_r_minutes=lock_r, lock_c_minutes=lock_c
             )
         except Exception as exc:
             logger.exception(
@@ -1079,37 +1027,9 @@ async def list_bookings(
         if starts_at and starts_at.tzinfo is None:
             starts_at = starts_at.replace(tzinfo=UTC)
 
-        # Resolve service names directly from BookingItem -> Service (preferred)
-        service_names = None
-        try:
-            async with get_session() as session:
-                from sqlalchemy import select
-                from bot.app.domain.models import BookingItem, Service
-
-                rows = await session.execute(
-                    select(Service.name)
-                    .join(BookingItem, BookingItem.service_id == Service.id)
-                    .where(BookingItem.booking_id == int(getattr(b, "id", 0)))
-                    .order_by(BookingItem.position)
-                )
-                names = [r[0] for r in rows.all() if r and r[0]]
-                if names:
-                    service_names = ", ".join([str(n) for n in names])
-        except Exception:
-            service_names = None
-
-        # Master name resolution
+        service_names = service_names_map.get(int(b.id))
         master_id = getattr(b, "master_id", None)
-        master_name_val = None
-        try:
-            master_name_val = getattr(getattr(b, "master", None), "name", None)
-            if not master_name_val and master_id is not None:
-                try:
-                    master_name_val = await MasterRepo.get_master_name(master_id)
-                except Exception:
-                    master_name_val = None
-        except Exception:
-            master_name_val = None
+        master_name_val = master_names.get(int(master_id)) if master_id is not None else None
 
         # Compute formatted date/time for frontend convenience
         try:
@@ -1198,15 +1118,21 @@ async def list_bookings(
 async def cancel_booking(
     payload: CancelRequest,
     principal: Annotated[Principal, Depends(get_current_principal)],
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> BookingResponse:
-    res: BookingResult = await process_booking_cancellation(
-        principal.user_id, principal.telegram_id, payload.booking_id
-    )
-    return BookingResponse(
-        ok=bool(res.get("ok")),
-        booking_id=res.get("booking_id"),
-        status=res.get("status"),
-        error=res.get("error"),
+    async def _cancel() -> BookingResponse:
+        res: BookingResult = await process_booking_cancellation(
+            principal.user_id, principal.telegram_id, payload.booking_id
+        )
+        return BookingResponse(
+            ok=bool(res.get("ok")),
+            booking_id=res.get("booking_id"),
+            status=res.get("status"),
+            error=res.get("error"),
+        )
+
+    return await replay_cache.run(
+        "cancel", principal.user_id, idempotency_key, body_fingerprint(payload), _cancel
     )
 
 
@@ -1215,20 +1141,26 @@ async def cancel_booking(
 async def reschedule_booking(
     payload: RescheduleRequest,
     principal: Annotated[Principal, Depends(get_current_principal)],
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> BookingResponse:
-    res: BookingResult = await process_booking_reschedule(
-        principal.user_id,
-        principal.telegram_id,
-        payload.booking_id,
-        payload.new_slot,
-        language=principal.language,
-        notify_client=False,
-    )
-    return BookingResponse(
-        ok=bool(res.get("ok")),
-        booking_id=res.get("booking_id"),
-        status=res.get("status"),
-        error=res.get("error"),
+    async def _reschedule() -> BookingResponse:
+        res: BookingResult = await process_booking_reschedule(
+            principal.user_id,
+            principal.telegram_id,
+            payload.booking_id,
+            payload.new_slot,
+            language=principal.language,
+            notify_client=False,
+        )
+        return BookingResponse(
+            ok=bool(res.get("ok")),
+            booking_id=res.get("booking_id"),
+            status=res.get("status"),
+            error=res.get("error"),
+        )
+
+    return await replay_cache.run(
+        "reschedule", principal.user_id, idempotency_key, body_fingerprint(payload), _reschedule
     )
 
 
@@ -1337,6 +1269,8 @@ async def create_booking(
         except Exception as exc:
             logger.exception("Failed to fetch admin ids for notifications: %s", exc)
         if recipients:
+            from aiogram import Bot
+
             bot = Bot(BOT_TOKEN)
             event = "paid" if payment_method == "online" else "cash_confirmed"
 
@@ -1417,6 +1351,7 @@ async def create_booking(
 async def finalize_booking(
     payload: dict[str, Any],
     principal: Annotated[Principal, Depends(get_current_principal)],
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> BookingResponse:
     """Finalize an existing draft booking created with a hold.
 
@@ -1428,20 +1363,29 @@ async def finalize_booking(
     except Exception as exc:
         raise ValueError("invalid_payload") from exc
 
-    res: BookingResult = await process_booking_finalization(
-        principal.user_id, principal.telegram_id, booking_id, payment_method
-    )
-    return BookingResponse(
-        ok=bool(res.get("ok")),
-        booking_id=res.get("booking_id"),
-        status=res.get("status"),
-        starts_at=res.get("starts_at"),
-        invoice_url=res.get("invoice_url"),
-        final_price_cents=res.get("final_price_cents"),
-        original_price_cents=res.get("original_price_cents"),
-        discount_amount_cents=res.get("discount_amount_cents"),
-        currency=res.get("currency"),
-        error=res.get("error"),
+    async def _finalize() -> BookingResponse:
+        res: BookingResult = await process_booking_finalization(
+            principal.user_id, principal.telegram_id, booking_id, payment_method
+        )
+        return BookingResponse(
+            ok=bool(res.get("ok")),
+            booking_id=res.get("booking_id"),
+            status=res.get("status"),
+            starts_at=res.get("starts_at"),
+            invoice_url=res.get("invoice_url"),
+            final_price_cents=res.get("final_price_cents"),
+            original_price_cents=res.get("original_price_cents"),
+            discount_amount_cents=res.get("discount_amount_cents"),
+            currency=res.get("currency"),
+            error=res.get("error"),
+        )
+
+    return await replay_cache.run(
+        "finalize",
+        principal.user_id,
+        idempotency_key,
+        body_fingerprint({"booking_id": booking_id, "payment_method": payment_method}),
+        _finalize,
     )
 
 
@@ -1501,6 +1445,14 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str | None = Header(default=None)) -> PlainTextResponse:
+    """Prometheus exposition of per-endpoint latency / SQL counters."""
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="unauthorized")
+    return PlainTextResponse(render_prometheus(), media_type=METRICS_CONTENT_TYPE)
+
+
 def get_app() -> FastAPI:
     """Exported factory for uvicorn or tests."""
     return app
@@ -0,0 +1,266 @@
+"""Authentication helpers for the Telegram Mini App API.
+
+Every Mini App request passes through here, so the helpers avoid repeated work:
+    * the WebApp HMAC secret is derived once per bot token (not per request)
+    * decoded JWT principals are kept in a bounded LRU keyed by token digest
+      until the token's ``exp`` passes
+    * only cache misses pay for ``jwt.decode`` (signature check with a
+      constant-time comparison, then claims)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+
+import jwt
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from bot.app.core.constants import BOT_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# JWT settings
+JWT_SECRET = os.getenv("TWA_JWT_SECRET") or BOT_TOKEN
+JWT_ALGO = "HS256"
+JWT_TTL_SECONDS = int(os.getenv("TWA_JWT_TTL_SECONDS", "3600"))
+
+# Upper bound for cached principals (one entry per live token)
+PRINCIPAL_CACHE_SIZE = int(os.getenv("TWA_PRINCIPAL_CACHE_SIZE", "4096"))
+
+# Telegram considers initData older than a day stale
+INIT_DATA_MAX_AGE_SECONDS = 86400
+
+
+class TelegramUser(BaseModel):
+    id: int
+    first_name: str | None = None
+    last_name: str | None = None
+    username: str | None = None
+
+
+class Principal(BaseModel):
+    user_id: int
+    telegram_id: int
+    username: str | None = None
+    first_name: str | None = None
+    language: str | None = None
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+# ---------------------------------------------------------------------------
+# initData (WebApp) validation
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=8)
+def webapp_secret_key(token: str) -> bytes:
+    """Return the WebApp HMAC secret for a bot token (derived once per token)."""
+    return hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+
+
+def _parse_init_data(init_data: str) -> dict[str, str]:
+    try:
+        parsed = dict(
+            urllib.parse.parse_qsl(init_data, keep_blank_values=True, strict_parsing=True)
+        )
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_init_data_format"
+        ) from exc
+    if "hash" not in parsed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing_hash")
+    return parsed
+
+
+def _calc_expected_hash(data: dict[str, str], token: str) -> str:
+    check_hash = data.get("hash", "")
+    data_check_string = "\n".join(f"{k}={data[k]}" for k in sorted(data) if k != "hash")
+    computed = hmac.new(
+        webapp_secret_key(token), data_check_string.encode(), hashlib.sha256
+    ).hexdigest()
+    logger.debug("initData data_check_string=%s computed_hash=%s", data_check_string, computed)
+    if not hmac.compare_digest(computed, check_hash):
+        raise _unauthorized("invalid_init_data_signature")
+    return computed
+
+
+def validate_init_data(init_data: str) -> TelegramUser:
+    parsed = _parse_init_data(init_data)
+    _calc_expected_hash(parsed, BOT_TOKEN)
+
+    try:
+        user_raw = parsed.get("user")
+        user_payload = json.loads(user_raw) if user_raw else None
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_user_payload"
+        ) from exc
+
+    if not isinstance(user_payload, dict) or "id" not in user_payload:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing_user")
+
+    try:
+        auth_date_raw = parsed.get("auth_date")
+        if auth_date_raw:
+            auth_ts = int(auth_date_raw)
+            if auth_ts < int(time.time()) - INIT_DATA_MAX_AGE_SECONDS:
+                raise _unauthorized("stale_init_data")
+    except HTTPException:
+        raise
+    except Exception:
+        pass
+
+    user_id_raw = user_payload.get("id")
+    if user_id_raw is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing_user_id")
+
+    return TelegramUser(
+        id=int(user_id_raw),
+        first_name=user_payload.get("first_name"),
+        last_name=user_payload.get("last_name"),
+        username=user_payload.get("username"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# JWT issue / decode
+# ---------------------------------------------------------------------------
+
+
+def issue_jwt(user_id: int, tg_user: TelegramUser) -> str:
+    payload = {
+        "sub": str(user_id),
+        "tg_id": int(tg_user.id),
+        "username": tg_user.username,
+        "first_name": tg_user.first_name,
+        "exp": datetime.now(UTC) + timedelta(seconds=JWT_TTL_SECONDS),
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGO)
+
+
+class PrincipalCache:
+    """Bounded LRU of decoded principals keyed by token digest.
+
+    Entries expire together with the token (``exp`` claim), so a cached
+    principal is never served after the JWT itself would be rejected.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self._data: OrderedDict[bytes, tuple[Principal, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes, now: float | None = None) -> Principal | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, exp = entry
+            if exp <= (time.time() if now is None else now):
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, key: bytes, principal: Principal, exp: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (principal, exp)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+principal_cache = PrincipalCache()
+
+
+def _decode_token(token: str) -> Principal:
+    """Return the principal for a bearer token (cached until ``exp``).
+
+    The returned object is shared with the cache: callers that need to attach
+    per-request data must work on a copy.
+    """
+    key = PrincipalCache.key_for(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
+    except jwt.ExpiredSignatureError as exc:
+        raise _unauthorized("token_expired") from exc
+    except jwt.InvalidTokenError as exc:
+        raise _unauthorized("invalid_token") from exc
+
+    try:
+        principal = Principal(
+            user_id=int(data.get("sub")),
+            telegram_id=int(data.get("tg_id")),
+            username=data.get("username"),
+            first_name=data.get("first_name"),
+        )
+    except Exception as exc:
+        raise _unauthorized("invalid_token") from exc
+
+    exp = data.get("exp")
+    if isinstance(exp, (int, float)):
+        principal_cache.put(key, principal, float(exp))
+    return principal
+
+
+def authenticate_bearer(authorization: str | None) -> Principal:
+    """Resolve an ``Authorization: Bearer ...`` header into a fresh Principal."""
+    if not authorization:
+        raise _unauthorized("missing_authorization")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise _unauthorized("invalid_authorization_header")
+    return _decode_token(token).model_copy()
+
+
+__all__ = [
+    "JWT_SECRET",
+    "JWT_ALGO",
+    "JWT_TTL_SECONDS",
+    "TelegramUser",
+    "Principal",
+    "PrincipalCache",
+    "principal_cache",
+    "webapp_secret_key",
+    "validate_init_data",
+    "issue_jwt",
+    "authenticate_bearer",
+]
@@ -0,0 +1,175 @@
+"""``Idempotency-Key`` replay cache for the Mini App booking writes.
+
+Double taps and mobile retries used to run ``process_booking_hold`` (advisory
+locks, conflict scans) once per copy, and every copy after the first failed
+with ``slot_unavailable`` against the client's own hold. Write endpoints now
+accept an ``Idempotency-Key`` header:
+
+    * the first request with a key runs; its response is kept for
+      ``IDEMPOTENCY_TTL_SECONDS`` keyed by (endpoint, user, key)
+    * duplicates arriving while it runs wait on the same future
+    * later duplicates get the stored response back without touching the DB
+    * reusing a key with a different body is rejected (422
+      ``idempotency_key_reused``)
+
+Only completed responses are stored; an exception is propagated to the
+waiters and forgotten so the client may retry with the same key. Requests
+without the header run as before. The cache is per process: with several
+API workers a duplicate landing on another worker still hits the regular
+booking locks, it just is not deduplicated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["IdempotencyCache", "body_fingerprint", "replay_cache"]
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "120"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "4096"))
+_MAX_KEY_LENGTH = 128
+
+_Key = tuple[str, int, str]
+
+
+def body_fingerprint(body: Any) -> str:
+    """Stable digest of a request body (pydantic model or plain JSON-like value)."""
+    if isinstance(body, BaseModel):
+        raw = body.model_dump_json()
+    else:
+        raw = json.dumps(body, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _copy[T](value: T) -> T:
+    # replayed responses must not share a mutable model with the first caller
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)
+    return value
+
+
+class IdempotencyCache:
+    """Bounded TTL store of finished responses plus in-flight futures."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._done: OrderedDict[_Key, tuple[float, str, Any]] = OrderedDict()
+        self._inflight: dict[_Key, tuple[str, asyncio.Future[Any]]] = {}
+        self.hits = 0
+        self.joins = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def clear(self) -> None:
+        self._done.clear()
+        self._inflight.clear()
+
+    def _lookup(self, key: _Key) -> tuple[str, Any] | None:
+        entry = self._done.get(key)
+        if entry is None:
+            return None
+        expires, fingerprint, value = entry
+        if expires <= time.monotonic():
+            self._done.pop(key, None)
+            return None
+        return fingerprint, value
+
+    def _store(self, key: _Key, fingerprint: str, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._done[key] = (time.monotonic() + self.ttl_seconds, fingerprint, value)
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    @staticmethod
+    def _check(stored: str, fingerprint: str) -> None:
+        if stored != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="idempotency_key_reused",
+            )
+
+    async def run[T](
+        self,
+        scope: str,
+        user_id: int,
+        idempotency_key: str | None,
+        fingerprint: str,
+        call: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Run ``call`` once per (scope, user, key); replay or join duplicates."""
+        if not idempotency_key:
+            return await call()
+        if len(idempotency_key) > _MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_idempotency_key"
+            )
+        key: _Key = (scope, int(user_id), idempotency_key)
+
+        done = self._lookup(key)
+        if done is not None:
+            self._check(done[0], fingerprint)
+            self.hits += 1
+            logger.debug("idempotent replay: %s user=%s", scope, user_id)
+            # the scope is the endpoint, so a stored value is always that endpoint's T
+            return _copy(cast(T, done[1]))
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._check(pending[0], fingerprint)
+            self.joins += 1
+            # asyncio.wait: a disconnecting duplicate must not cancel the original
+            await asyncio.wait({pending[1]})
+            if pending[1].cancelled():
+                return await self.run(scope, user_id, idempotency_key, fingerprint, call)
+            return _copy(cast(T, pending[1].result()))
+
+        self.misses += 1
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        try:
+            result = await call()
+        except BaseException as exc:
+            if not future.done():
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+                    future.exception()  # retrieved: no "never retrieved" warning
+            raise
+        else:
+            self._store(key, fingerprint, result)
+            if not future.done():
+                future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key, (None, None))[1] is future:
+                self._inflight.pop(key, None)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "entries": len(self._done),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "joins": self.joins,
+            "misses": self.misses,
+        }
+
+
+replay_cache = IdempotencyCache(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_CACHE_SIZE)
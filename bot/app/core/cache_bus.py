@@ -0,0 +1,329 @@
+"""Cross-process cache invalidation over Postgres ``LISTEN`` / ``NOTIFY``.
+
+Every in-memory cache (services catalog, masters, settings snapshot, public
+config, month availability) lives in a module global, one copy per process.
+With ``uvicorn --workers N``, API replicas, the bot and the workers process
+side by side, an edit made in one process has to reach the others::
+
+    publish(Topic.CATALOG)               # after the write is committed
+    publish(Topic.AVAILABILITY, "42")    # key: master id
+
+``publish`` runs the local subscribers right away and, while the bus runs,
+sends ``pg_notify('salon_cache', '{"t": ..., "k": ..., "o": origin}')`` on a
+pooled connection. ``CacheBus`` keeps one dedicated connection in ``LISTEN``
+and dispatches what other processes publish (its own notifications are
+skipped by origin). A dropped connection is retried with backoff; after
+every (re)connect the local caches get a full refresh (``Topic.ALL``)
+because notifications sent while disconnected are lost.
+
+Subscribers are ``handler(key)``; ``key`` is ``None`` for "drop everything"
+(topic-wide invalidation and full refresh). They must only clear local
+state, never publish. On non-Postgres databases (local SQLite) the bus is
+not started and ``publish`` is purely local.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import json
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+from typing import Any, overload
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CHANNEL",
+    "CacheBus",
+    "Topic",
+    "cache_bus",
+    "decode_message",
+    "dispatch",
+    "encode_message",
+    "publish",
+    "start_cache_bus",
+    "stop_cache_bus",
+    "subscribe",
+]
+
+CHANNEL = "salon_cache"
+# identifies this process in payloads so it skips its own notifications
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Topic(StrEnum):
+    CATALOG = "catalog"  # services (names, durations, prices)
+    SETTINGS = "settings"  # runtime settings snapshot, public config
+    ROLES = "roles"  # masters list, telegram id -> master id resolution
+    AVAILABILITY = "availability"  # month availability, key = master id
+    ALL = "*"  # full refresh of every cache
+
+
+Handler = Callable[[str | None], Awaitable[None] | None]
+
+_subscribers: dict[Topic, list[Handler]] = {}
+_handler_tasks: set[asyncio.Task[Any]] = set()
+
+
+@overload
+def subscribe[H: Handler](topic: Topic, handler: H) -> H: ...
+
+
+@overload
+def subscribe[H: Handler](topic: Topic, handler: None = None) -> Callable[[H], H]: ...
+
+
+def subscribe(topic: Topic, handler: Handler | None = None) -> Any:
+    """Register ``handler(key)`` for ``topic``; without ``handler`` acts as a decorator."""
+    if handler is None:
+        return lambda fn: subscribe(topic, fn)
+    handlers = _subscribers.setdefault(Topic(topic), [])
+    if handler not in handlers:
+        handlers.append(handler)
+    return handler
+
+
+def dispatch(topic: Topic, key: str | None = None) -> None:
+    """Run local subscribers of ``topic`` (``Topic.ALL``: every subscriber, key None)."""
+    targets: list[tuple[Handler, str | None]]
+    if topic is Topic.ALL:
+        targets = [(h, None) for hs in list(_subscribers.values()) for h in list(hs)]
+    else:
+        targets = [(h, key) for h in list(_subscribers.get(topic, ()))]
+    for handler, arg in targets:
+        try:
+            res = handler(arg)
+            if inspect.isawaitable(res):
+                task = asyncio.ensure_future(res)
+                _handler_tasks.add(task)
+                task.add_done_callback(_handler_done)
+        except Exception:
+            logger.exception("cache bus: %s handler %r failed", topic.value, handler)
+
+
+def _handler_done(task: asyncio.Task[Any]) -> None:
+    _handler_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("cache bus: async handler failed: %s", task.exception())
+
+
+def publish(topic: Topic, key: str | int | None = None) -> None:
+    """Invalidate ``topic`` here and, when the bus runs, in every other process."""
+    topic = Topic(topic)
+    skey = None if key is None else str(key)
+    dispatch(topic, skey)
+    cache_bus.send(topic, skey)
+
+
+def encode_message(topic: Topic, key: str | None, origin: str = ORIGIN) -> str:
+    return json.dumps({"t": topic.value, "k": key, "o": origin}, separators=(",", ":"))
+
+
+def decode_message(payload: str) -> tuple[Topic, str | None, str | None] | None:
+    """``(topic, key, origin)`` or ``None`` for a malformed / unknown payload."""
+    try:
+        data = json.loads(payload)
+        topic = Topic(data["t"])
+    except Exception:
+        return None
+    key = data.get("k")
+    return topic, (None if key is None else str(key)), data.get("o")
+
+
+class CacheBus:
+    """LISTEN connection with reconnect + a sender task for outgoing NOTIFYs."""
+
+    def __init__(
+        self,
+        *,
+        channel: str = CHANNEL,
+        retry_max_seconds: float = 30.0,
+        ping_seconds: float = 30.0,
+    ) -> None:
+        self.channel = channel
+        self.retry_max_seconds = retry_max_seconds
+        self.ping_seconds = ping_seconds
+        self.running = False
+        self.connected = False
+        self.connects = 0
+        self.received = 0
+        self.sent = 0
+        self._outbox: list[tuple[Topic, str | None]] = []
+        self._wake: asyncio.Event | None = None
+        self._lost: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+    # -- outgoing ------------------------------------------------------------
+
+    def send(self, topic: Topic, key: str | None) -> None:
+        if not self.running or self._wake is None:
+            return
+        item = (topic, key)
+        if item not in self._outbox:
+            self._outbox.append(item)
+        self._wake.set()
+
+    async def _sender(self) -> None:
+        from bot.app.core.db import get_engine
+
+        assert self._wake is not None
+        delay = 0.5
+        while self.running:
+            await self._wake.wait()
+            self._wake.clear()
+            batch, self._outbox = self._outbox, []
+            # a topic-wide entry makes the keyed ones of that topic redundant
+            wide = {t for t, k in batch if k is None}
+            batch = [(t, k) for t, k in batch if k is None or t not in wide]
+            if not batch:
+                continue
+            try:
+                async with get_engine().connect() as conn:
+                    for topic, key in batch:
+                        await conn.execute(
+                            text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": self.channel, "payload": encode_message(topic, key)},
+                        )
+                    await conn.commit()
+                self.sent += len(batch)
+                delay = 0.5
+            except Exception as exc:
+                logger.warning("cache bus: NOTIFY failed (%s); retrying in %.1fs", exc, delay)
+                self._outbox[:0] = batch
+                await asyncio.sleep(delay)
+                delay = min(self.retry_max_seconds, delay * 2)
+                self._wake.set()
+
+    # -- incoming ------------------------------------------------------------
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        msg = decode_message(payload)
+        if msg is None:
+            logger.warning("cache bus: ignoring payload %r", payload[:200])
+            return
+        topic, key, origin = msg
+        if origin == ORIGIN:
+            return
+        self.received += 1
+        dispatch(topic, key)
+
+    def _on_lost(self, *_args: Any) -> None:
+        if self._lost is not None:
+            self._lost.set()
+
+    def _on_connected(self) -> None:
+        self.connected = True
+        self.connects += 1
+        # anything published while we were not listening is lost: refresh all
+        dispatch(Topic.ALL)
+        logger.info("cache bus: listening on %s (connect #%d)", self.channel, self.connects)
+
+    async def _listener(self) -> None:
+        from bot.app.core.db import get_engine
+
+        delay = 1.0
+        while self.running:
+            conn = None
+            try:
+                conn = await get_engine().connect()
+                raw = (await conn.get_raw_connection()).driver_connection
+                self._lost = asyncio.Event()
+                raw.add_termination_listener(self._on_lost)
+                await raw.add_listener(self.channel, self._on_notify)
+                self._on_connected()
+                delay = 1.0
+                while self.running and not self._lost.is_set():
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._lost.wait(), self.ping_seconds)
+                    if self.running and not self._lost.is_set():
+                        # catches half-open TCP connections the driver has not noticed
+                        await raw.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("cache bus: listener connection failed: %s", exc)
+            finally:
+                self.connected = False
+                if conn is not None:
+                    # never hand a connection with LISTEN state back to the pool
+                    with contextlib.suppress(Exception):
+                        await conn.invalidate()
+                    with contextlib.suppress(Exception):
+                        await conn.close()
+            if self.running:
+                await asyncio.sleep(delay)
+                delay = min(self.retry_max_seconds, delay * 2)
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def start(self) -> bool:
+        """Start listening (Postgres only). Returns False when the bus stays local."""
+        from bot.app.core.db import get_engine
+
+        if self.running:
+            return True
+        if get_engine().dialect.name != "postgresql":
+            logger.info(
+                "cache bus: %s database, invalidation stays in-process",
+                get_engine().dialect.name,
+            )
+            return False
+        self.running = True
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._listener(), name="cache-bus-listen"),
+            asyncio.create_task(self._sender(), name="cache-bus-send"),
+        ]
+        return True
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._wake is not None:
+            self._wake.set()
+        self._on_lost()
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(BaseException):
+                await task
+        self._wake = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "connected": self.connected,
+            "connects": self.connects,
+            "received": self.received,
+            "sent": self.sent,
+            "pending": len(self._outbox),
+        }
+
+
+cache_bus = CacheBus()
+
+
+async def start_cache_bus() -> bool:
+    """Start the process-wide bus unless ``CACHE_BUS=0``."""
+    from bot.app.core.constants import CACHE_BUS_ENABLED
+
+    if not CACHE_BUS_ENABLED:
+        return False
+    try:
+        return await cache_bus.start()
+    except Exception:
+        logger.exception("cache bus: failed to start")
+        return False
+
+
+async def stop_cache_bus() -> None:
+    with contextlib.suppress(Exception):
+        await cache_bus.stop()
@@ -78,6 +78,14 @@ MASTER_IDS_LIST: list[int] = _env_int_list("MASTER_IDS")
 
 # Feature flags / logging
 LOG_LEVEL_NAME: str = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+# bot.app.core.logger: "text" (Rich console) or "json" (one object per line);
+# LOG_FILE keeps WARNING+ on disk ("" disables); LOG_RATE_LIMITS caps sub-WARNING
+# records per logger prefix ("aiogram.event=20,bot.app.services=50", records/s);
+# LOG_DEBUG_USER_IDS logs DEBUG for updates/requests of these Telegram ids.
+LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text").strip().lower()
+LOG_FILE: str = os.getenv("LOG_FILE", "bot.log").strip()
+LOG_RATE_LIMITS: str = os.getenv("LOG_RATE_LIMITS", "aiogram.event=20").strip()
+LOG_DEBUG_USER_IDS: list[int] = _env_int_list("LOG_DEBUG_USER_IDS")
 RUN_BOOTSTRAP_ENABLED: bool = _env_bool("RUN_BOOTSTRAP", False)
 REQUIRE_ROW_LOCK_STRICT: bool = _env_bool("REQUIRE_ROW_LOCK", False)
 
@@ -107,6 +115,28 @@ except ValueError:
     REMINDERS_CHECK_SECONDS_INVALID = True
 
 SETTINGS_CACHE_TTL_SECONDS: int = _env_int("SETTINGS_CACHE_TTL_SECONDS", 60)
+# Month availability heatmap cache (per master/month/duration); 0 disables it.
+AVAILABILITY_CACHE_TTL_SECONDS: int = _env_int("AVAILABILITY_CACHE_TTL_SECONDS", 30)
+# Cross-process cache invalidation over Postgres LISTEN/NOTIFY (core/cache_bus.py)
+CACHE_BUS_ENABLED: bool = _env_bool("CACHE_BUS", True)
+
+# Background scheduler: run sweeps inside the polling process (disable when a
+# separate `python -m bot.app.workers` process is deployed) and the Postgres
+# advisory-lock key used to elect a single leader across replicas.
+RUN_WORKERS_IN_BOT: bool = _env_bool("RUN_WORKERS_IN_BOT", True)
+WORKERS_LEADER_LOCK_KEY: int = _env_int("WORKERS_LEADER_LOCK_KEY", 72_410_001)
+WORKERS_LEADER_RETRY_SECONDS: int = _env_int("WORKERS_LEADER_RETRY_SECONDS", 15)
+
+# Startup: admin/master routers are imported on their first update or by a
+# background task once polling runs (LAZY_ROUTERS=0 imports them up front).
+LAZY_ROUTERS_ENABLED: bool = _env_bool("LAZY_ROUTERS", True)
+
+# Instrumentation (bot.app.core.metrics): handlers slower than this are logged
+# with their top SQL statements; METRICS_PORT exposes /metrics from the bot
+# process; METRICS_TOKEN (optional) protects the API's /metrics endpoint.
+SLOW_HANDLER_MS: int = _env_int("SLOW_HANDLER_MS", 1000)
+METRICS_PORT: int | None = _env_int_or_none("METRICS_PORT")
+METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "").strip()
 
 __all__ = [
     "DEFAULT_PAGE_SIZE",
@@ -122,6 +152,10 @@ __all__ = [
     "ADMIN_IDS_LIST",
     "MASTER_IDS_LIST",
     "LOG_LEVEL_NAME",
+    "LOG_FORMAT",
+    "LOG_FILE",
+    "LOG_RATE_LIMITS",
+    "LOG_DEBUG_USER_IDS",
     "RUN_BOOTSTRAP_ENABLED",
     "REQUIRE_ROW_LOCK_STRICT",
     "BOT_TOKEN",
@@ -133,5 +167,14 @@ __all__ = [
     "REMINDERS_CHECK_SECONDS_RAW",
     "REMINDERS_CHECK_SECONDS",
     "REMINDERS_CHECK_SECONDS_INVALID",
+    "RUN_WORKERS_IN_BOT",
+    "WORKERS_LEADER_LOCK_KEY",
+    "WORKERS_LEADER_RETRY_SECONDS",
+    "LAZY_ROUTERS_ENABLED",
     "SETTINGS_CACHE_TTL_SECONDS",
+    "AVAILABILITY_CACHE_TTL_SECONDS",
+    "CACHE_BUS_ENABLED",
+    "SLOW_HANDLER_MS",
+    "METRICS_PORT",
+    "METRICS_TOKEN",
 ]
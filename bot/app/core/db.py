@@ -2,18 +2,30 @@
 
 Single authoritative module providing:
     * get_engine / get_session / get_session_factory
+    * get_replica_engine / read_session (read-replica routing, see below)
     * init_db(force=..., on_create=...)
     * _reset_engine_for_tests (used in test isolation)
     * get_db (wrapper for dependency injection)
+
+Read-replica routing: with ``DATABASE_REPLICA_URL`` set,
+``get_session(readonly=True)`` hands out a session bound to the replica
+engine as long as the replica is reachable and its replay lag is within
+``DATABASE_REPLICA_MAX_LAG`` seconds (probed at most every
+``DATABASE_REPLICA_CHECK_SECONDS``); otherwise, and always without a replica
+URL, the primary is used. ``read_session(area)`` applies the per-area
+default: areas listed in ``DATABASE_REPLICA_AREAS`` (analytics, exports,
+history, dashboard by default) read from the replica. Booking writes and
+their read-your-write checks keep using plain ``get_session()``.
 """
 
 import os
+import time
 from contextlib import asynccontextmanager
 import logging
 import asyncio
 from collections.abc import AsyncIterator, Callable
 from typing import Any
-from sqlalchemy import event
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -29,8 +41,13 @@ from ..domain.models import Base
 DATABASE_URL_ENV = "DATABASE_URL"
 DEFAULT_URL = "postgresql+asyncpg://app_user:change_me@db:5432/booking_app"
 
+DATABASE_REPLICA_URL_ENV = "DATABASE_REPLICA_URL"
+DEFAULT_REPLICA_AREAS = "analytics,exports,history,dashboard"
+
 _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
+_replica_engine: AsyncEngine | None = None
+_replica_factory: async_sessionmaker[AsyncSession] | None = None
 
 # Schema init flags used by tests / bootstrapping
 _SCHEMA_READY: bool = False
@@ -92,6 +109,13 @@ def get_engine() -> AsyncEngine:
             event.listen(sync_engine, "checkin", _on_checkin)
         except Exception:
             logging.getLogger(__name__).exception("Failed to attach pool event listeners")
+        # Per-update / per-request SQL counters (bot.app.core.metrics)
+        try:
+            from .metrics import instrument_engine
+
+            instrument_engine(_engine)
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to attach SQL timing listeners")
         _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
     return _engine
 
@@ -102,11 +126,130 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _session_factory
 
 
+# =====================================================
+# 🪞 Read replica
+# =====================================================
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def get_replica_engine() -> AsyncEngine | None:
+    """Engine for ``DATABASE_REPLICA_URL`` (None when no replica is configured)."""
+    global _replica_engine, _replica_factory
+    if _replica_engine is None:
+        url = (os.getenv(DATABASE_REPLICA_URL_ENV) or "").strip()
+        if not url:
+            return None
+        _replica_engine = _make_engine(url)
+        try:
+            from .metrics import instrument_engine
+
+            instrument_engine(_replica_engine)
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to attach SQL timing listeners")
+        _replica_factory = async_sessionmaker(_replica_engine, expire_on_commit=False)
+    return _replica_engine
+
+
+# Raw standby state; ``_replica_lag`` turns it into seconds of lag.
+_REPLICA_LAG_SQL = text("""
+    SELECT
+        pg_is_in_recovery(),
+        EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'),
+        pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(),
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    """)
+
+
+def _replica_lag(
+    in_recovery: bool, streaming: bool, caught_up: bool | None, replay_age: Any
+) -> float | None:
+    """Replay lag in seconds, or None when the replica must not be used.
+
+    * not a standby (two independent instances locally): 0
+    * WAL receiver not streaming: None, receive == replay then only means the
+      standby stopped hearing from the primary
+    * streaming and everything received is replayed: 0, however long ago the
+      last write on the primary was (an idle salon is not a lagging replica)
+    * replay behind receive: age of the last replayed transaction
+    """
+    if not in_recovery:
+        return 0.0
+    if not streaming:
+        return None
+    if caught_up:
+        return 0.0
+    return None if replay_age is None else float(replay_age)
+
+
+class ReplicaHealth:
+    """Cached replica probe: lag (seconds) or None when unreachable, plus routing counters."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.lag: float | None = None
+        self.checked_at: float = float("-inf")
+        self.routed: dict[str, int] = {"replica": 0, "primary_fallback": 0}
+        self._lock: asyncio.Lock | None = None
+
+    async def probe(self, engine: AsyncEngine) -> float | None:
+        async with engine.connect() as conn:
+            row = (await conn.execute(_REPLICA_LAG_SQL)).one()
+        return _replica_lag(*row)
+
+    async def usable(self, engine: AsyncEngine, max_lag: float) -> bool:
+        interval = _env_float("DATABASE_REPLICA_CHECK_SECONDS", 5.0)
+        if time.monotonic() - self.checked_at >= interval:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # another task may have refreshed while we waited
+                if time.monotonic() - self.checked_at >= interval:
+                    try:
+                        self.lag = await asyncio.wait_for(self.probe(engine), timeout=2.0)
+                    except Exception as e:
+                        logging.getLogger(__name__).warning("replica probe failed: %s", e)
+                        self.lag = None
+                    self.checked_at = time.monotonic()
+        return self.lag is not None and self.lag <= max_lag
+
+
+replica_health = ReplicaHealth()
+
+
+def replica_areas() -> frozenset[str]:
+    raw = os.getenv("DATABASE_REPLICA_AREAS", DEFAULT_REPLICA_AREAS)
+    return frozenset(a.strip() for a in raw.split(",") if a.strip())
+
+
+async def _read_factory() -> async_sessionmaker[AsyncSession]:
+    engine = get_replica_engine()
+    if engine is not None:
+        max_lag = _env_float("DATABASE_REPLICA_MAX_LAG", 10.0)
+        if await replica_health.usable(engine, max_lag) and _replica_factory is not None:
+            replica_health.routed["replica"] += 1
+            return _replica_factory
+        replica_health.routed["primary_fallback"] += 1
+        logging.getLogger(__name__).debug(
+            "read routed to primary: replica lag=%s (max %ss)", replica_health.lag, max_lag
+        )
+    return get_session_factory()
+
+
 @asynccontextmanager
-async def get_session() -> AsyncIterator[AsyncSession]:
-    """Provide a new AsyncSession."""
+async def get_session(readonly: bool = False) -> AsyncIterator[AsyncSession]:
+    """Provide a new AsyncSession.
+
+    ``readonly=True`` may route to the read replica (see module docstring);
+    never use it for writes or for reads that must see a write just made.
+    """
     logger = logging.getLogger(__name__)
-    factory = get_session_factory()
+    factory = await _read_factory() if readonly else get_session_factory()
     session = factory()
     # capture a short creation stack to help track callers that don't close sessions
     logger.debug("get_session: created session id=%s", id(session))
@@ -140,8 +283,12 @@ async def init_db(
 def _reset_engine_for_tests() -> None:
     """Reset engine references (fast, synchronous)."""
     global _engine, _session_factory, _SCHEMA_READY, _SCHEMA_CHECKING
+    global _replica_engine, _replica_factory
     _engine = None
     _session_factory = None
+    _replica_engine = None
+    _replica_factory = None
+    replica_health.reset()
     _SCHEMA_READY = False
     _SCHEMA_CHECKING = False
 
@@ -159,6 +306,14 @@ async def get_db() -> AsyncIterator[AsyncSession]:
         yield session
 
 
+def read_session(area: str) -> Any:
+    """``get_session`` for a read-only workload area (``analytics``, ``exports``, ...).
+
+    Goes to the replica when ``area`` is in ``DATABASE_REPLICA_AREAS``.
+    """
+    return get_session(readonly=area in replica_areas())
+
+
 # =====================================================
 # 📦 Export
 # =====================================================
@@ -166,6 +321,11 @@ __all__ = [
     "get_engine",
     "get_session",
     "get_session_factory",
+    "get_replica_engine",
+    "ReplicaHealth",
+    "read_session",
+    "replica_areas",
+    "replica_health",
     "init_db",
     "_reset_engine_for_tests",
     "get_db",
@@ -1,11 +1,71 @@
+"""Non-blocking logging pipeline shared by the bot, the API and the workers.
+
+``configure_logging(service)`` replaces the root handlers with a single
+``QueueHandler``: the event loop thread only copies the record into a queue,
+and a ``QueueListener`` thread does the formatting and the console / file
+I/O. On the way in two filters run (still on the caller's thread, so they
+stay cheap):
+
+* ``LevelGate`` - drops records below ``LOG_LEVEL`` unless the current
+  update / request belongs to a user with debug-on-demand enabled
+  (``enable_user_debug`` / ``LOG_DEBUG_USER_IDS``). While any such user
+  exists the root level is DEBUG, otherwise it stays at ``LOG_LEVEL`` so
+  ``logger.debug`` calls cost nothing;
+* ``RateLimitFilter`` - a token bucket per configured logger prefix
+  (``LOG_RATE_LIMITS``) for records below WARNING; the next record that gets
+  through carries ``sampled_out`` with the number dropped meanwhile.
+
+``LOG_FORMAT=json`` prints one JSON object per line (``ts``, ``level``,
+``logger``, ``msg``, ``service``, ``user_id``, extras, ``exc``); ``text``
+keeps the Rich console. The user id is bound per update / request with
+``bind_log_user`` (bot middleware, API auth dependency).
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import json
 import logging
+import queue
+import sys
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+__all__ = [
+    "JsonFormatter",
+    "LevelGate",
+    "RateLimitFilter",
+    "bind_log_user",
+    "configure_logging",
+    "debug_users",
+    "disable_user_debug",
+    "enable_user_debug",
+    "get_logger",
+    "parse_rate_limits",
+    "set_log_user",
+    "shutdown_logging",
+]
 
-__all__ = ["get_logger"]
+_log_user: ContextVar[int | None] = ContextVar("salon_log_user", default=None)
 
-# Установим глобальный уровень логирования
-logging.basicConfig(
-    level=logging.DEBUG,  # <-- ключевая строка
-    format="%(asctime)s %(levelname)-8s %(name)s: %(message)s",
+# Noisy third-party loggers: keep WARNINGs, drop chatter regardless of LOG_LEVEL
+_QUIET = {
+    "aiogram": logging.INFO,
+    "asyncpg": logging.WARNING,
+    "alembic": logging.WARNING,
+    "sqlalchemy.engine": logging.WARNING,
+}
+
+_STD_ATTRS = frozenset(
+    vars(logging.LogRecord("x", logging.INFO, "", 0, "", None, None)).keys()
+    | {"message", "asctime", "user_id", "sampled_out", "taskName"}
 )
 
 
@@ -13,3 +73,289 @@ def get_logger(name: str | None = None) -> logging.Logger:
     logger = logging.getLogger(name or __name__)
     logger.setLevel(logging.DEBUG)  # <-- дополнительно для конкретного логгера
     return logger
+
+
+# -- per-user debug ----------------------------------------------------------
+
+
+class _DebugState:
+    base_level: int = logging.INFO
+    users: set[int] = set()
+
+
+def set_log_user(user_id: int | None) -> Token[int | None]:
+    """Bind the Telegram id of the current update / request to log records."""
+    return _log_user.set(int(user_id) if user_id is not None else None)
+
+
+@contextmanager
+def bind_log_user(user_id: int | None) -> Iterator[None]:
+    token = set_log_user(user_id)
+    try:
+        yield
+    finally:
+        _log_user.reset(token)
+
+
+def _apply_root_level() -> None:
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG if _DebugState.users else _DebugState.base_level)
+
+
+def enable_user_debug(user_id: int) -> None:
+    """Log DEBUG for everything handled on behalf of ``user_id`` (this process)."""
+    _DebugState.users.add(int(user_id))
+    _apply_root_level()
+
+
+def disable_user_debug(user_id: int) -> None:
+    _DebugState.users.discard(int(user_id))
+    _apply_root_level()
+
+
+def debug_users() -> frozenset[int]:
+    return frozenset(_DebugState.users)
+
+
+class LevelGate(logging.Filter):
+    """Pass records at/above the configured level, or any record of a debug user."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= _DebugState.base_level:
+            return True
+        return _log_user.get() in _DebugState.users
+
+
+# -- rate limiting -------------------------------------------------------------
+
+
+def parse_rate_limits(raw: str | None) -> dict[str, float]:
+    """``"aiogram.event=20, bot.app.services=5"`` -> ``{prefix: records_per_second}``."""
+    limits: dict[str, float] = {}
+    for part in (raw or "").replace(";", ",").split(","):
+        name, sep, value = part.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            rate = float(value)
+        except ValueError:
+            continue
+        if rate >= 0:
+            limits[name.strip()] = rate
+    return limits
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per configured logger prefix; WARNING and above always pass.
+
+    The most specific prefix wins (``a.b`` over ``a``); the bucket holds one
+    second worth of records, so short bursts pass and floods are cut.
+    """
+
+    def __init__(self, limits: Mapping[str, float], *, clock: Any = time.monotonic) -> None:
+        super().__init__()
+        self.limits = dict(limits)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # prefix -> [tokens, last refill, dropped since last pass]
+        self._buckets: dict[str, list[float]] = {}
+        self._prefix_of: dict[str, str | None] = {}
+
+    def _prefix(self, name: str) -> str | None:
+        try:
+            return self._prefix_of[name]
+        except KeyError:
+            pass
+        best = None
+        for prefix in self.limits:
+            if (name == prefix or name.startswith(prefix + ".")) and (
+                best is None or len(prefix) > len(best)
+            ):
+                best = prefix
+        self._prefix_of[name] = best
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.limits:
+            return True
+        prefix = self._prefix(record.name)
+        if prefix is None:
+            return True
+        rate = self.limits[prefix]
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.setdefault(prefix, [rate, now, 0.0])
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            dropped, bucket[2] = int(bucket[2]), 0.0
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+# -- formatting ----------------------------------------------------------------
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; ``extra=`` fields are kept as top-level keys."""
+
+    def __init__(self, service: str | None = None) -> None:
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if self.service:
+            payload["service"] = self.service
+        for key in ("user_id", "sampled_out"):
+            value = getattr(record, key, None)
+            if value is not None:
+                payload[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _STD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        dropped = getattr(record, "sampled_out", None)
+        return f"{text} [+{dropped} sampled out]" if dropped else text
+
+
+class _LoopSafeQueueHandler(QueueHandler):
+    """Enqueue a self-contained copy: message rendered, traceback as text, user bound."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if getattr(record, "user_id", None) is None:
+            record.user_id = _log_user.get()
+        return record
+
+
+# -- setup ---------------------------------------------------------------------
+
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+_setup_lock = threading.Lock()
+
+
+def _console_handler(fmt: str, service: str) -> logging.Handler:
+    if fmt == "json":
+        handler: logging.Handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter(service))
+        return handler
+    try:
+        from rich.logging import RichHandler
+
+        handler = RichHandler(
+            rich_tracebacks=True,
+            markup=True,
+            show_time=True,
+            show_level=True,
+            show_path=False,
+            log_time_format="%H:%M:%S",
+        )
+        handler.setFormatter(_TextFormatter("%(message)s"))
+    except ImportError:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(_TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    return handler
+
+
+def configure_logging(
+    service: str,
+    *,
+    level: str | int | None = None,
+    fmt: str | None = None,
+    log_file: str | None = None,
+    rate_limits: Mapping[str, float] | str | None = None,
+    debug_user_ids: list[int] | None = None,
+) -> QueueListener:
+    """Install the queue-backed pipeline on the root logger (idempotent).
+
+    Unset arguments come from ``LOG_LEVEL`` / ``LOG_FORMAT`` / ``LOG_FILE`` /
+    ``LOG_RATE_LIMITS`` / ``LOG_DEBUG_USER_IDS``. Returns the running listener.
+    """
+    global _listener, _queue_handler
+    from bot.app.core import constants as c
+
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        lvl = level if level is not None else c.LOG_LEVEL_NAME
+        if isinstance(lvl, str):
+            lvl = logging.getLevelName(lvl.upper())
+        _DebugState.base_level = lvl if isinstance(lvl, int) else logging.INFO
+        _DebugState.users.update(
+            debug_user_ids if debug_user_ids is not None else c.LOG_DEBUG_USER_IDS
+        )
+        fmt = (fmt or c.LOG_FORMAT or "text").lower()
+        log_file = c.LOG_FILE if log_file is None else log_file
+        if rate_limits is None or isinstance(rate_limits, str):
+            raw = c.LOG_RATE_LIMITS if rate_limits is None else rate_limits
+            rate_limits = parse_rate_limits(raw)
+
+        handlers = [_console_handler(fmt, service)]
+        if log_file:
+            file_handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+            file_handler.setLevel(logging.WARNING)
+            file_handler.setFormatter(
+                JsonFormatter(service)
+                if fmt == "json"
+                else _TextFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+            )
+            handlers.append(file_handler)
+
+        q: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        qh = _LoopSafeQueueHandler(q)
+        qh.addFilter(LevelGate())
+        qh.addFilter(RateLimitFilter(rate_limits))
+        root = logging.getLogger()
+        for old in list(root.handlers):
+            root.removeHandler(old)
+        root.addHandler(qh)
+        _apply_root_level()
+        for name, quiet in _QUIET.items():
+            logging.getLogger(name).setLevel(quiet)
+
+        listener = QueueListener(q, *handlers, respect_handler_level=True)
+        listener.start()
+        _listener, _queue_handler = listener, qh
+        atexit.register(shutdown_logging)
+        return listener
+
+
+def shutdown_logging() -> None:
+    """Flush the queue and stop the listener thread (safe to call twice)."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        listener, qh = _listener, _queue_handler
+        _listener = _queue_handler = None
+    if qh is not None:
+        logging.getLogger().removeHandler(qh)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
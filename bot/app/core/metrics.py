@@ -0,0 +1,346 @@
+"""Latency and SQL-count instrumentation.
+
+A ``RequestStats`` scope is opened per Telegram update (see
+``bot.app.telegram.common.metrics_middleware``) or per HTTP request
+(``HTTPMetricsMiddleware``) and kept in a contextvar. The SQLAlchemy cursor
+listeners installed by ``instrument_engine`` add every statement's duration to
+the current scope, so each handler is measured as: wall time, number of SQL
+statements and time spent in the DB. SQLAlchemy runs the sync cursor calls in
+a greenlet that inherits the task context, so the contextvar is visible there.
+
+Aggregates are kept in-process (no extra dependency) and rendered in the
+Prometheus text format by ``render_prometheus``: the API serves it on
+``/metrics``; the bot process exposes it with ``serve_metrics`` when
+``METRICS_PORT`` is set. Scopes slower than ``SLOW_HANDLER_MS`` are logged
+together with their slowest statements.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import logging
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, MutableMapping
+from contextlib import asynccontextmanager, contextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .constants import SLOW_HANDLER_MS
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CONTENT_TYPE",
+    "HTTPMetricsMiddleware",
+    "RequestStats",
+    "collect_statements",
+    "current_stats",
+    "instrument_engine",
+    "record_stats",
+    "render_prometheus",
+    "reset_metrics",
+    "serve_metrics",
+    "track",
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus-style latency buckets, seconds
+BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+TOP_STATEMENTS = 3
+_STATEMENT_PREVIEW = 160
+_WS = re.compile(r"\s+")
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """Per-update / per-request tally filled by the cursor listeners."""
+
+    kind: str
+    name: str
+    started: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_seconds: float = 0.0
+    # min-heap of (duration, sql) keeping the slowest TOP_STATEMENTS
+    top: list[tuple[float, str]] = field(default_factory=list)
+    failed: bool = False
+    # every statement, in order (query budgets in tests); None = not kept
+    log: list[str] | None = None
+    # enclosing scope (e.g. a test's query budget around an HTTP request scope)
+    parent: RequestStats | None = None
+
+    def add_statement(self, duration: float, statement: str) -> None:
+        self.statements += 1
+        self.db_seconds += duration
+        item = (duration, statement)
+        if len(self.top) < TOP_STATEMENTS:
+            heapq.heappush(self.top, item)
+        elif duration > self.top[0][0]:
+            heapq.heapreplace(self.top, item)
+        if self.log is not None:
+            self.log.append(statement)
+        if self.parent is not None:
+            self.parent.add_statement(duration, statement)
+
+    def slowest(self) -> list[tuple[float, str]]:
+        return sorted(self.top, reverse=True)
+
+
+_current: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+@contextmanager
+def collect_statements(name: str = "collect") -> Iterator[RequestStats]:
+    """Scope that keeps every statement in ``stats.log`` and is not aggregated (tests)."""
+    stats = RequestStats(kind="collect", name=name, log=[], parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# Aggregates
+# ---------------------------------------------------------------------------
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "sum", "statements", "db_seconds", "errors")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.errors = 0
+
+
+_lock = threading.Lock()
+_series: dict[tuple[str, str], _Series] = {}
+
+
+def record_stats(stats: RequestStats) -> float:
+    """Fold a finished scope into the aggregates; return its duration in seconds."""
+    duration = time.perf_counter() - stats.started
+    with _lock:
+        s = _series.get((stats.kind, stats.name))
+        if s is None:
+            s = _series[(stats.kind, stats.name)] = _Series()
+        for i, bound in enumerate(BUCKETS):
+            if duration <= bound:
+                s.buckets[i] += 1
+        s.count += 1
+        s.sum += duration
+        s.statements += stats.statements
+        s.db_seconds += stats.db_seconds
+        if stats.failed:
+            s.errors += 1
+    if duration * 1000 >= SLOW_HANDLER_MS:
+        top = "; ".join(
+            f"{d * 1000:.0f}ms {_WS.sub(' ', sql)[:_STATEMENT_PREVIEW]}"
+            for d, sql in stats.slowest()
+        )
+        logger.warning(
+            "slow %s %s: %.0f ms, %d SQL (%.0f ms in DB); top: %s",
+            stats.kind,
+            stats.name,
+            duration * 1000,
+            stats.statements,
+            stats.db_seconds * 1000,
+            top or "-",
+        )
+    return duration
+
+
+@asynccontextmanager
+async def track(kind: str, name: str) -> AsyncIterator[RequestStats]:
+    """Open a stats scope; ``stats.name`` may be refined inside (e.g. once the handler is known)."""
+    stats = RequestStats(kind=kind, name=name, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    except BaseException:
+        stats.failed = True
+        raise
+    finally:
+        _current.reset(token)
+        try:
+            record_stats(stats)
+        except Exception:
+            logger.exception("metrics: failed to record %s %s", kind, stats.name)
+
+
+def reset_metrics() -> None:
+    """Drop all aggregates (tests)."""
+    with _lock:
+        _series.clear()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_prometheus() -> str:
+    """Render the aggregates in the Prometheus text exposition format (0.0.4)."""
+    # (kind, name), bucket counts, count, sum, (statements, db seconds, errors)
+    items: list[tuple[tuple[str, str], list[int], int, float, tuple[float, float, float]]]
+    with _lock:
+        items = sorted(
+            (k, list(s.buckets), s.count, s.sum, (s.statements, s.db_seconds, s.errors))
+            for k, s in _series.items()
+        )
+    out: list[str] = [
+        "# HELP salon_handler_duration_seconds Handler latency per update / HTTP endpoint.",
+        "# TYPE salon_handler_duration_seconds histogram",
+    ]
+    for (kind, name), buckets, count, total, _counters in items:
+        labels = f'kind="{_label(kind)}",handler="{_label(name)}"'
+        for bound, n in zip(BUCKETS, buckets, strict=True):
+            out.append(f'salon_handler_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+        out.append(f'salon_handler_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        out.append(f"salon_handler_duration_seconds_sum{{{labels}}} {_fmt(total)}")
+        out.append(f"salon_handler_duration_seconds_count{{{labels}}} {count}")
+    counters = (
+        ("salon_handler_db_statements_total", "SQL statements executed by the handler.", 0),
+        ("salon_handler_db_seconds_total", "Time spent in SQL statements.", 1),
+        ("salon_handler_errors_total", "Handler invocations that raised.", 2),
+    )
+    for metric, help_text, idx in counters:
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} counter")
+        for (kind, name), _buckets, _count, _total, values in items:
+            labels = f'kind="{_label(kind)}",handler="{_label(name)}"'
+            out.append(f"{metric}{{{labels}}} {_fmt(values[idx])}")
+    return "\n".join(out) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy cursor listeners
+# ---------------------------------------------------------------------------
+
+_START_ATTR = "_salon_metrics_start"
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    if context is not None and _current.get() is not None:
+        setattr(context, _START_ATTR, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    stats = _current.get()
+    started = getattr(context, _START_ATTR, None)
+    if stats is not None and started is not None:
+        stats.add_statement(time.perf_counter() - started, statement)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach the cursor timing listeners to ``engine`` (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware (FastAPI / Starlette)
+# ---------------------------------------------------------------------------
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]], Any]
+
+
+class HTTPMetricsMiddleware:
+    """Pure ASGI middleware: one stats scope per HTTP request, labelled by route template.
+
+    The router stores the matched route in ``scope["route"]``, so the label is
+    ``GET /api/slots`` rather than the raw path (bounded cardinality).
+    Unmatched paths are folded into ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp, *, exclude: tuple[str, ...] = ("/metrics", "/health")) -> None:
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Any, send: Any) -> None:
+        if scope.get("type") != "http" or scope.get("path") in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        method = scope.get("method", "GET")
+        status_code = 500
+
+        async def _send(message: MutableMapping[str, Any]) -> None:
+            nonlocal status_code
+            if message.get("type") == "http.response.start":
+                status_code = int(message.get("status", 500))
+            await send(message)
+
+        async with track("http", f"{method} unmatched") as stats:
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                path = getattr(scope.get("route"), "path", None)
+                if path:
+                    stats.name = f"{method} {path}"
+                # 5xx counts as an error even when the app turned the exception into a response
+                stats.failed = stats.failed or status_code >= 500
+
+
+# ---------------------------------------------------------------------------
+# Standalone exposition (bot / worker processes have no HTTP server)
+# ---------------------------------------------------------------------------
+
+
+async def _handle_scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # drain headers
+        while await asyncio.wait_for(reader.readline(), timeout=5) not in (b"\r\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[1].split("?", 1)[0] == "/metrics":
+            body = render_prometheus().encode("utf-8")
+            head = f"HTTP/1.1 200 OK\r\nContent-Type: {CONTENT_TYPE}\r\n"
+        else:
+            body = b"not found\n"
+            head = "HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n"
+        head += f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+    except Exception:
+        logger.debug("metrics: scrape failed", exc_info=True)
+    finally:
+        with suppress(Exception):
+            writer.close()
+            await writer.wait_closed()
+
+
+async def serve_metrics(host: str = "0.0.0.0", port: int = 9100) -> asyncio.AbstractServer:
+    """Serve ``GET /metrics`` on ``host:port``; the caller closes the returned server."""
+    server = await asyncio.start_server(_handle_scrape, host, port)
+    logger.info("Metrics exposition listening on %s:%s/metrics", host, port)
+    return server
@@ -5,11 +5,13 @@ import os
 from datetime import timedelta
 from collections.abc import Iterable
 from dataclasses import replace
-
-from aiogram import Bot
+from typing import TYPE_CHECKING
 
 from bot.app.services.shared_services import _safe_send
 
+if TYPE_CHECKING:
+    from aiogram import Bot
+
 logger = logging.getLogger(__name__)
 
 __all__ = ["notify_admins", "notify_admins_bot_started", "send_booking_notification"]
@@ -91,7 +93,7 @@ async def send_booking_notification(
     This is moved here from client_services to centralize notification sending.
     Text/markup construction stays here with lazy imports to avoid cycles.
     """
-    logger.info(
+    logger.debug(
         "send_booking_notification: booking=%s event=%s recipients=%s",
         booking_id,
         event_type,
@@ -0,0 +1,162 @@
+"""Local-day boundaries and integer minute conversions for the business zone.
+
+Bookings are stored in UTC while schedules, calendars and analytics are
+expressed in local wall-clock days. Converting every slot / window / day
+with ``datetime.combine(...).replace(tzinfo=tz).astimezone(UTC)`` is a zone
+lookup per call; ``LocalDays`` computes each local day once::
+
+    DayBounds(day, start, end, offset, uniform)
+
+``start`` / ``end`` are the UTC instants of this and the next local midnight
+(the first existing instant when midnight falls into a DST gap), so
+``end - start`` is 23, 24 or 25 hours (23.5 / 24.5 in half-hour zones).
+On a ``uniform`` day (one UTC offset from midnight to midnight, i.e. every
+day except the few with a transition) minute ``m`` of the wall clock is
+simply ``start + m minutes``, and the conversions below are integer
+arithmetic; transition days fall back to ``zoneinfo``.
+
+Minutes are wall-clock minutes since local midnight (``hour * 60 +
+minute``), the same axis as the ``schedule_grid`` day masks. Nonexistent
+wall times resolve like ``zoneinfo`` with ``fold=0`` (shifted forward by the
+gap), ambiguous ones to their first occurrence.
+
+Pure module (no settings, no DB): ``shared_services.local_days()`` returns
+the shared instance for the configured business zone.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+
+__all__ = ["DayBounds", "LocalDays"]
+
+ONE_MINUTE = timedelta(minutes=1)
+_ONE_DAY = timedelta(days=1)
+_MAX_DAYS = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class DayBounds:
+    day: date
+    start: datetime  # UTC instant of local midnight
+    end: datetime  # UTC instant of the next local midnight
+    offset: int  # UTC offset at midnight, minutes
+    uniform: bool  # no offset change during the day
+
+    @property
+    def minutes(self) -> int:
+        """Elapsed minutes in the local day (1440 unless a transition happens)."""
+        return int((self.end - self.start) // ONE_MINUTE)
+
+
+def _offset_minutes(moment: datetime, tz: tzinfo) -> int:
+    offset = moment.astimezone(tz).utcoffset() or timedelta(0)
+    return int(offset // ONE_MINUTE)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # naive datetimes are UTC in this codebase (DB timestamps, utc_now)
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=UTC)
+    return moment.astimezone(UTC)
+
+
+class LocalDays:
+    """Memoized ``DayBounds`` of one zone plus minute <-> UTC conversions."""
+
+    _by_zone: dict[str, LocalDays] = {}
+
+    def __init__(self, tz: tzinfo) -> None:
+        self.tz = tz
+        self._days: dict[date, DayBounds] = {}
+        self._last_offset = 0
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    @classmethod
+    def for_zone(cls, tz: tzinfo) -> LocalDays:
+        """Shared instance per zone key."""
+        key = getattr(tz, "key", None) or str(tz)
+        inst = cls._by_zone.get(key)
+        if inst is None:
+            inst = cls._by_zone[key] = cls(tz)
+        return inst
+
+    def _midnight(self, day: date) -> datetime:
+        return datetime.combine(day, time(0, 0), tzinfo=self.tz).astimezone(UTC)
+
+    def bounds(self, day: date) -> DayBounds:
+        found = self._days.get(day)
+        if found is not None:
+            return found
+        start = self._midnight(day)
+        end = self._midnight(day + _ONE_DAY)
+        offset = _offset_minutes(start, self.tz)
+        uniform = end - start == _ONE_DAY and offset == _offset_minutes(end - ONE_MINUTE, self.tz)
+        found = DayBounds(day, start, end, offset, uniform)
+        if len(self._days) >= _MAX_DAYS:
+            self._days.clear()
+        self._days[day] = found
+        self._last_offset = offset
+        return found
+
+    def warm(self, start: date, end: date) -> None:
+        """Precompute ``[start, end)`` (e.g. the bookable horizon around today)."""
+        d = start
+        while d < end:
+            self.bounds(d)
+            d += _ONE_DAY
+
+    def range_bounds(self, first: date, last: date) -> tuple[datetime, datetime]:
+        """UTC ``[start, end)`` covering local days ``first..last`` inclusive."""
+        return self.bounds(first).start, self.bounds(last).end
+
+    def day_of(self, moment: datetime) -> DayBounds:
+        """Bounds of the local day containing ``moment``."""
+        utc = _as_utc(moment)
+        guess = (utc + timedelta(minutes=self._last_offset)).date()
+        b = self.bounds(guess)
+        while utc < b.start:
+            b = self.bounds(b.day - _ONE_DAY)
+        while utc >= b.end:
+            b = self.bounds(b.day + _ONE_DAY)
+        return b
+
+    def local_minute(self, moment: datetime, *, ceil: bool = False) -> tuple[date, int]:
+        """``(local date, wall minute)`` of ``moment``; ``ceil`` rounds partial minutes up.
+
+        A ceiled minute can be 1440: the end of that day, usable as the
+        exclusive end of a ``span_mask``.
+        """
+        utc = _as_utc(moment)
+        b = self.day_of(utc)
+        if b.uniform:
+            elapsed = utc - b.start
+            minute = elapsed // ONE_MINUTE
+            if ceil and elapsed % ONE_MINUTE:
+                minute += 1
+            return b.day, int(minute)
+        local = utc.astimezone(self.tz)
+        minute = local.hour * 60 + local.minute
+        if ceil and (local.second or local.microsecond):
+            minute += 1
+        return b.day, minute
+
+    def utc_at(self, day: date, minute: int) -> datetime:
+        """UTC instant of wall minute ``minute`` (0..1440) of local ``day``."""
+        b = self.bounds(day)
+        if minute >= 1440:
+            return b.end
+        if b.uniform:
+            return b.start + timedelta(minutes=minute)
+        wall = datetime.combine(day, time(minute // 60, minute % 60), tzinfo=self.tz)
+        return wall.astimezone(UTC)
+
+    def minutes_since_midnight(self, moment: datetime, day: date, *, ceil: bool = False) -> int:
+        """Wall minute of ``moment`` on ``day``, clamped to ``0..1440`` (a cutoff mask bound)."""
+        d, minute = self.local_minute(moment, ceil=ceil)
+        if d == day:
+            return minute
+        return 0 if d < day else 1440
@@ -4,6 +4,7 @@ from typing import Any
 
 from sqlalchemy import (
     Boolean,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
@@ -14,6 +15,8 @@ from sqlalchemy import (
     Time,
     Date,
     Index,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
@@ -97,8 +100,23 @@ REVENUE_STATUSES = frozenset(
 )
 
 
+# Lower-cased "name first last username" for client search (pg_trgm GIN index)
+USER_SEARCH_TEXT_SQL = (
+    "lower(coalesce(name, '') || ' ' || coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || coalesce(username, ''))"
+)
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
     name: Mapped[str] = mapped_column(String(120))
@@ -114,6 +132,9 @@ class User(Base):
         ).utc_now(),
     )
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)  # ✅ добавь это
+    search_text: Mapped[str | None] = mapped_column(
+        Text, Computed(USER_SEARCH_TEXT_SQL, persisted=True), nullable=True
+    )
 
 
 class Master(Base):
@@ -227,6 +248,66 @@ class Booking(Base):
     last_reminder_lead_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
 
+class ReminderJob(Base):
+    """Precomputed client reminder: one row per (booking, lead).
+
+    Rows are written when a booking becomes CONFIRMED/PAID, re-armed on
+    reschedule and dropped on cancel; the reminders sweep only claims pending
+    rows whose ``due_at`` has passed (partial index on ``sent_at IS NULL``).
+    """
+
+    __tablename__ = "reminder_jobs"
+    __table_args__ = (
+        UniqueConstraint("booking_id", "lead_minutes", name="uq_reminder_jobs_booking_lead"),
+        Index(
+            "ix_reminder_jobs_pending_due_at",
+            "due_at",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    booking_id: Mapped[int] = mapped_column(
+        ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False
+    )
+    lead_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    # "lead" (regular) or "same_day" (legacy short lead); picks the message template
+    kind: Mapped[str] = mapped_column(String(16), nullable=False, default="lead")
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # lease set by the claiming sweep; a crashed sender's claim expires on its own
+    claimed_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: __import__(
+            "bot.app.services.shared_services", fromlist=["utc_now"]
+        ).utc_now(),
+    )
+
+
+class MasterStats(Base):
+    """Reputation counters per master, maintained incrementally.
+
+    Updated in the same transaction as the status change / rating that moves
+    them (``bot.app.services.master_stats``); ``rebuild_master_stats``
+    recomputes everything from ``bookings`` / ``booking_ratings``.
+    """
+
+    __tablename__ = "master_stats"
+    master_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("masters.id", ondelete="CASCADE"), primary_key=True
+    )
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    no_shows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # starts_at of the latest DONE / NO_SHOW booking
+    last_visit_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_no_show_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class Setting(Base):
     __tablename__ = "settings"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -304,6 +385,38 @@ class MasterClientNote(Base):
     note: Mapped[str] = mapped_column(Text)
 
 
+class MasterClientSummary(Base):
+    """Per (master, client) CRM summary, recomputed on every booking change.
+
+    Maintained by ``bot.app.services.client_summary`` in the transaction that
+    moves the pair's bookings; ``rebuild_client_summaries`` recomputes all rows.
+    """
+
+    __tablename__ = "master_client_summary"
+    __table_args__ = (
+        Index("ix_master_client_summary_last_visit", "master_id", "last_visit_at"),
+        Index("ix_master_client_summary_spend", "master_id", "spend_cents"),
+        Index("ix_master_client_summary_no_shows", "master_id", "no_shows"),
+    )
+    master_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("masters.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    # completed (DONE) visits and revenue-status spend (final or original price)
+    visits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    spend_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    no_shows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_visit_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # earliest active booking ahead of the last refresh (may lag until the next change)
+    next_visit_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    note_id: Mapped[int | None] = mapped_column(
+        ForeignKey("master_client_notes.id", ondelete="SET NULL"), nullable=True
+    )
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class MasterSchedule(Base):
     __tablename__ = "master_schedules"
     __table_args__ = (
@@ -356,15 +469,19 @@ __all__ = [
     "MasterService",
     "BookingStatus",
     "Booking",
+    "ReminderJob",
+    "MasterStats",
     "Setting",
     "BookingRating",
     "BookingItem",
     "BookingStatusHistory",
     "MasterClientNote",
+    "MasterClientSummary",
     "MasterSchedule",
     "MasterScheduleException",
     "normalize_booking_status",
     "TERMINAL_STATUSES",
     "ACTIVE_STATUSES",
     "REVENUE_STATUSES",
+    "REMINDER_ELIGIBLE_STATUSES",
 ]
@@ -0,0 +1,281 @@
+"""Minute-grid model of a master's working time.
+
+A day is a 1440-bit integer: bit ``m`` set means minute ``m`` (local wall
+clock, 0 = 00:00) is bookable. Python ints are arbitrary precision and the
+bitwise operators run in C over machine words, so masking a whole day
+(work & ~busy, lead-time cutoffs, "does a 90-minute service fit anywhere")
+is a handful of integer operations instead of per-slot datetime loops.
+
+``MasterGrid`` holds the weekly template (7 day masks) plus per-date
+exception overlays; booked intervals are painted into a per-day busy mask
+by the caller. The grid is pure (no DB access) and is shared by the slot
+search, the month calendar and analytics.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, tzinfo
+
+from bot.app.domain.local_time import LocalDays
+
+MINUTES_PER_DAY = 1440
+FULL_DAY = (1 << MINUTES_PER_DAY) - 1
+
+__all__ = [
+    "MINUTES_PER_DAY",
+    "FULL_DAY",
+    "MasterGrid",
+    "minute_of",
+    "span_mask",
+    "windows_mask",
+    "mask_runs",
+    "mask_windows",
+    "fit_starts",
+    "stride_mask",
+    "start_minutes",
+    "iter_bits",
+    "busy_mask_for_day",
+    "busy_masks_by_day",
+]
+
+
+def minute_of(t: time) -> int:
+    """Minute of day for a ``time`` (seconds are ignored)."""
+    return t.hour * 60 + t.minute
+
+
+def span_mask(start: int, end: int) -> int:
+    """Mask with bits ``[start, end)`` set, clamped to the day."""
+    start = max(0, start)
+    end = min(MINUTES_PER_DAY, end)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def windows_mask(windows: Iterable[tuple[time, time]]) -> int:
+    """Union of ``(start, end)`` time windows. ``end == 00:00`` means midnight."""
+    mask = 0
+    for start, end in windows:
+        s = minute_of(start)
+        e = minute_of(end)
+        if e == 0 and s > 0:
+            e = MINUTES_PER_DAY
+        mask |= span_mask(s, e)
+    return mask
+
+
+def mask_runs(mask: int) -> list[tuple[int, int]]:
+    """Maximal runs of set bits as ``(start, end)`` minute pairs, end exclusive."""
+    runs: list[tuple[int, int]] = []
+    pos = 0
+    while mask:
+        # skip zeros
+        zeros = (mask & -mask).bit_length() - 1
+        mask >>= zeros
+        pos += zeros
+        # length of the run of ones
+        ones = (~mask & (mask + 1)).bit_length() - 1
+        runs.append((pos, pos + ones))
+        mask >>= ones
+        pos += ones
+    return runs
+
+
+def _to_time(minute: int) -> time:
+    if minute >= MINUTES_PER_DAY:
+        return time(0, 0)
+    return time(minute // 60, minute % 60)
+
+
+def mask_windows(mask: int) -> list[tuple[time, time]]:
+    """Runs of a day mask as ``time`` windows (a run ending at 24:00 ends at 00:00)."""
+    return [(_to_time(s), _to_time(e)) for s, e in mask_runs(mask)]
+
+
+def fit_starts(free: int, duration: int) -> int:
+    """Bits ``m`` where minutes ``[m, m + duration)`` are all free.
+
+    Uses doubling: after covering ``k`` minutes, AND-ing with itself shifted
+    by ``k`` covers ``2k``, so the cost is O(log duration) big-int operations.
+    """
+    if duration <= 0:
+        return free
+    acc = free
+    covered = 1
+    while covered < duration:
+        step = min(covered, duration - covered)
+        acc &= acc >> step
+        covered += step
+    return acc
+
+
+def stride_mask(start: int, end: int, step: int) -> int:
+    """Bits ``start, start + step, ...`` below ``end``."""
+    if step <= 0:
+        return span_mask(start, start + 1)
+    mask = 0
+    for m in range(max(0, start), min(end, MINUTES_PER_DAY), step):
+        mask |= 1 << m
+    return mask
+
+
+def start_minutes(free: int, duration: int, step: int) -> int:
+    """Bookable starts: ``step``-strided from the start of each free run, fully fitting.
+
+    The same candidate set the slot search offers, so a day counted here has
+    exactly the starts the time picker will show.
+    """
+    candidates = 0
+    for run_start, run_end in mask_runs(free):
+        candidates |= stride_mask(run_start, run_end, step)
+    return candidates & fit_starts(free, duration)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield set bit positions in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def busy_mask_for_day(day: date, intervals: Iterable[tuple[datetime, datetime]], tz: tzinfo) -> int:
+    """Paint aware ``(start, end)`` intervals onto ``day``'s local minute grid.
+
+    Starts are floored and ends are ceiled to the minute so partially
+    occupied minutes count as busy.
+    """
+    day_start = datetime.combine(day, time(0, 0)).replace(tzinfo=tz)
+    mask = 0
+    for start, end in intervals:
+        try:
+            s_local = start.astimezone(tz)
+            e_local = end.astimezone(tz)
+        except Exception:
+            continue
+        s = int((s_local.replace(second=0, microsecond=0) - day_start).total_seconds() // 60)
+        e_delta = e_local - day_start
+        e = int(-(-e_delta.total_seconds() // 60))
+        if e <= 0 or s >= MINUTES_PER_DAY:
+            continue
+        mask |= span_mask(s, e)
+    return mask
+
+
+def busy_masks_by_day(
+    intervals: Iterable[tuple[datetime, datetime]], days: LocalDays
+) -> dict[date, int]:
+    """Paint aware ``(start, end)`` intervals onto every local day they touch.
+
+    Same minute rounding as ``busy_mask_for_day`` but one pass over the
+    intervals instead of one per day, with integer minute conversions.
+    """
+    masks: dict[date, int] = {}
+    one_day = timedelta(days=1)
+    for start, end in intervals:
+        try:
+            d, s = days.local_minute(start)
+            last, e = days.local_minute(end, ceil=True)
+        except Exception:
+            continue
+        while d <= last:
+            span = span_mask(s, e if d == last else MINUTES_PER_DAY)
+            if span:
+                masks[d] = masks.get(d, 0) | span
+            d += one_day
+            s = 0
+    return masks
+
+
+@dataclass
+class MasterGrid:
+    """Weekly template + per-date overlays for one master.
+
+    ``weekly[wd]`` is the mask for ``date.weekday() == wd``; ``None`` means
+    the weekday has no template rows and ``fallback`` applies. An entry in
+    ``exceptions`` replaces the weekday mask for that date (0 = day off).
+    """
+
+    weekly: tuple[int | None, ...] = (None,) * 7
+    exceptions: Mapping[date, int] = field(default_factory=dict)
+    fallback: int = 0
+
+    @classmethod
+    def from_rows(
+        cls,
+        schedule_rows: Iterable[tuple[int, time | None, time | None, bool]],
+        exception_rows: Iterable[tuple[date, time | None, time | None, str | None]] = (),
+        *,
+        fallback: int = 0,
+    ) -> MasterGrid:
+        """Build a grid from ``(day_of_week, start, end, is_day_off)`` and
+        ``(exception_date, start, end, reason)`` rows.
+
+        Mirrors the per-day rules used by the bot: any ``is_day_off`` row closes
+        the weekday; an exception that is ``00:00-00:00`` or has reason ``off``
+        closes the date; otherwise exception windows replace the template.
+        """
+        weekly: list[int | None] = [None] * 7
+        closed: set[int] = set()
+        for dow, start, end, is_off in schedule_rows:
+            try:
+                wd = int(dow)
+            except Exception:
+                continue
+            if not 0 <= wd <= 6:
+                continue
+            if weekly[wd] is None:
+                weekly[wd] = 0
+            if is_off:
+                closed.add(wd)
+                continue
+            if start is None or end is None:
+                continue
+            weekly[wd] = (weekly[wd] or 0) | windows_mask([(start, end)])
+        for wd in closed:
+            weekly[wd] = 0
+
+        exc_masks: dict[date, int] = {}
+        exc_closed: set[date] = set()
+        for d, start, end, reason in exception_rows:
+            if (reason and str(reason).lower() == "off") or (
+                start is not None and end is not None and minute_of(start) == minute_of(end) == 0
+            ):
+                exc_closed.add(d)
+                continue
+            if start is None or end is None:
+                continue
+            exc_masks[d] = exc_masks.get(d, 0) | windows_mask([(start, end)])
+        for d in exc_closed:
+            exc_masks[d] = 0
+        return cls(weekly=tuple(weekly), exceptions=exc_masks, fallback=fallback)
+
+    def work_mask(self, day: date) -> int:
+        """Working minutes of ``day`` after applying exceptions."""
+        if day in self.exceptions:
+            return self.exceptions[day]
+        mask = self.weekly[day.weekday()]
+        return self.fallback if mask is None else mask
+
+    def windows_for(self, day: date) -> list[tuple[time, time]]:
+        return mask_windows(self.work_mask(day))
+
+    def work_minutes(self, day: date) -> int:
+        return self.work_mask(day).bit_count()
+
+    def free_mask(self, day: date, busy: int = 0, *, not_before: int | None = None) -> int:
+        """Bookable minutes of ``day``: work minus busy, optionally from a cutoff minute."""
+        free = self.work_mask(day) & ~busy & FULL_DAY
+        if not_before is not None:
+            free &= ~span_mask(0, not_before)
+        return free
+
+    def iter_days(self, start: date, end: date) -> Iterator[tuple[date, int]]:
+        """Yield ``(day, work_mask)`` for ``start <= day < end``."""
+        d = start
+        while d < end:
+            yield d, self.work_mask(d)
+            d += timedelta(days=1)
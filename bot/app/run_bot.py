@@ -9,59 +9,34 @@ from typing import Any
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
-from rich.logging import RichHandler
 
-from bot.app.core.constants import BOT_TOKEN, LOG_LEVEL_NAME, RUN_BOOTSTRAP_ENABLED
+from bot.app.core.constants import (
+    BOT_TOKEN,
+    LOG_FILE,
+    METRICS_PORT,
+    RUN_BOOTSTRAP_ENABLED,
+    RUN_WORKERS_IN_BOT,
+)
+from bot.app.core.logger import configure_logging
 from bot.app.core.notifications import notify_admins_bot_started
 from bot.app.core.db import get_session
 from bot.app.telegram.main_router import build_main_router
 from bot.app.telegram.common import webapp_entry
-from bot.app.workers.expiration import start_expiration_worker, start_cleanup_worker
-from bot.app.workers.reminders import start_reminders_worker
+from bot.app.workers.scheduler import build_scheduler
 from bot.app.domain.models import Master
 from bot.app.services.shared_services import get_admin_ids
 
 # ==============================================================
-# LOGGING CONFIG (Variant B)
+# LOGGING CONFIG
 # ==============================================================
 
-# Console: INFO / WARNING / ERROR (Rich)
-console_handler = RichHandler(
-    rich_tracebacks=True,
-    markup=True,
-    show_time=True,
-    show_level=True,
-    show_path=False,
-    log_time_format="%H:%M:%S",
-)
-
-# File: WARNING+ only
-file_handler = logging.FileHandler("bot.log", encoding="utf-8")
-file_handler.setLevel(logging.WARNING)
-file_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-
-# Resolve root log level from environment (LOG_LEVEL), default INFO
-_level = getattr(logging, LOG_LEVEL_NAME, logging.INFO)
-
-logging.basicConfig(
-    level=_level,  # configurable via LOG_LEVEL
-    format="%(message)s",
-    handlers=[console_handler, file_handler],
-)
+# Queue-backed pipeline (bot.app.core.logger): Rich console or JSON on stdout,
+# WARNING+ in LOG_FILE, per-logger rate limits and per-user debug.
+configure_logging("bot", log_file=LOG_FILE)
 
 logger = logging.getLogger("bot")
 
 
-# Reduce noisy logs — but keep WARNINGS
-logging.getLogger("aiogram").setLevel(logging.INFO)
-logging.getLogger("aiogram.dispatcher").setLevel(logging.INFO)
-logging.getLogger("aiogram.event").setLevel(logging.INFO)
-
-logging.getLogger("asyncpg").setLevel(logging.WARNING)
-logging.getLogger("alembic").setLevel(logging.WARNING)
-logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
-
-
 # ==============================================================
 # BOOTSTRAP
 # ==============================================================
@@ -98,6 +73,20 @@ async def main() -> None:
     bot = Bot(token=token, default=DefaultBotProperties(parse_mode="HTML"))
     dp = Dispatcher()
 
+    # Per-update latency / SQL counters (registered before routers are included)
+    try:
+        from bot.app.telegram.common.metrics_middleware import install_update_metrics
+
+        install_update_metrics(dp)
+    except Exception:
+        logger.exception("main: failed to install update metrics middleware")
+    try:
+        from bot.app.telegram.common.log_middleware import install_log_context
+
+        install_log_context(dp)
+    except Exception:
+        logger.exception("main: failed to install log context middleware")
+
     # Navigation first
     try:
         from bot.app.telegram.common.navigation import nav_router
@@ -114,6 +103,13 @@ async def main() -> None:
         logger.info("Main router included")
     except Exception as e:
         logger.error("Failed to include main router: %s", e)
+    try:
+        from bot.app.telegram.common.lazy_router import install_lazy_preload
+
+        # Deferred admin/master routers are imported in the background once polling runs
+        install_lazy_preload(dp)
+    except Exception:
+        logger.exception("main: failed to schedule lazy router preload")
 
     # WebApp entry (Mini App launcher)
     try:
@@ -209,28 +205,40 @@ async def main() -> None:
     # Notify admins
     await notify_admins_bot_started(bot)
 
-    # Start background workers
-    stop_exp = await start_expiration_worker()
-    stop_rem = await start_reminders_worker(bot)
-    stop_cleanup = await start_cleanup_worker(bot)
+    # Start background workers: one scheduler; across replicas the advisory-lock
+    # leader runs the sweeps. Disable with RUN_WORKERS_IN_BOT=0 when a separate
+    # `python -m bot.app.workers` process is deployed.
+    scheduler = build_scheduler(bot) if RUN_WORKERS_IN_BOT else None
+    if scheduler is not None:
+        await scheduler.start()
+
+    # Cross-process cache invalidation (API workers, standalone workers)
+    from bot.app.core.cache_bus import start_cache_bus, stop_cache_bus
+
+    await start_cache_bus()
+
+    metrics_server = None
+    if METRICS_PORT:
+        try:
+            from bot.app.core.metrics import serve_metrics
+
+            metrics_server = await serve_metrics(port=METRICS_PORT)
+        except Exception:
+            logger.exception("main: failed to start metrics exposition on port %s", METRICS_PORT)
 
     logger.info("Starting polling…")
 
     try:
         await dp.start_polling(bot)
     finally:
-        try:
-            await stop_exp()
-        except Exception:
-            logger.exception("main: stop_exp failed during shutdown")
-        try:
-            await stop_rem()
-        except Exception:
-            logger.exception("main: stop_rem failed during shutdown")
-        try:
-            await stop_cleanup()
-        except Exception:
-            logger.exception("main: stop_cleanup failed during shutdown")
+        if metrics_server is not None:
+            metrics_server.close()
+        if scheduler is not None:
+            try:
+                await scheduler.stop()
+            except Exception:
+                logger.exception("main: scheduler stop failed during shutdown")
+        await stop_cache_bus()
 
 
 # ==============================================================
@@ -246,8 +254,27 @@ if __name__ == "__main__":
     cm.add_argument("--name", type=str, required=True)
     cm.add_argument("--admin-id", type=int, required=True)
 
+    sub.add_parser("rebuild-master-stats", help="recompute master_stats from bookings/ratings")
+    sub.add_parser(
+        "rebuild-client-summaries", help="recompute master_client_summary from bookings/notes"
+    )
+
     args = parser.parse_args()
 
+    if args.cmd == "rebuild-master-stats":
+        from bot.app.services.master_stats import rebuild_master_stats
+
+        rows = asyncio.run(rebuild_master_stats())
+        print(f"master_stats rebuilt: {rows} masters")
+        raise SystemExit(0)
+
+    if args.cmd == "rebuild-client-summaries":
+        from bot.app.services.client_summary import rebuild_client_summaries
+
+        rows = asyncio.run(rebuild_client_summaries())
+        print(f"master_client_summary rebuilt: {rows} pairs")
+        raise SystemExit(0)
+
     if args.cmd == "create-master":
         admin_ids = set(get_admin_ids())
         if args.admin_id not in admin_ids:
@@ -2,21 +2,35 @@ from __future__ import annotations
 import csv
 import io
 import logging
+import os
 import re
 import time
 from contextlib import suppress, ExitStack
-from datetime import UTC, datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import UTC, date as _date, datetime, time as _time, timedelta
 import json
 from zoneinfo import ZoneInfo
 from typing import Any, IO
 from collections.abc import Mapping
 
-from sqlalchemy import func, select, String, and_
+from sqlalchemy import func, select, String
 from sqlalchemy.sql.expression import ColumnElement
 
 
-from bot.app.domain.models import Booking, Master, Service, User, BookingStatus, REVENUE_STATUSES
-from bot.app.core.db import get_session
+from bot.app.core.constants import DEFAULT_SERVICE_FALLBACK_DURATION
+from bot.app.domain.models import (
+    ACTIVE_STATUSES,
+    Booking,
+    Master,
+    Service,
+    User,
+    BookingStatus,
+    REVENUE_STATUSES,
+)
+from bot.app.domain.local_time import LocalDays
+from bot.app.domain.schedule_grid import MasterGrid, busy_masks_by_day, mask_runs
+from bot.app.core.cache_bus import Topic, publish, subscribe
+from bot.app.core.db import get_session, read_session
 from bot.app.services.shared_services import (
     BookingInfo,
     booking_info_from_mapping,
@@ -133,7 +147,6 @@ def validate_webapp_title(value: str) -> tuple[str | None, str | None]:
         return None, "invalid_data"
 
 
-DEFAULT_DAILY_SLOTS = get_env_int("DEFAULT_DAILY_SLOTS", 8)
 DEFAULT_CALENDAR_MAX_DAYS_AHEAD = get_env_int("CALENDAR_MAX_DAYS_AHEAD", 365)
 
 
@@ -222,11 +235,45 @@ DEFAULT_CLIENT_CANCEL_LOCK_MINUTES = DEFAULT_CANCEL_LOCK_MINUTES
 
 
 def invalidate_services_cache() -> None:
-    """Invalidate services cache (useful after CRUD)."""
+    """Invalidate services cache (useful after CRUD) in every process."""
+    publish(Topic.CATALOG)
+
+
+@subscribe(Topic.CATALOG)
+def _drop_services_cache(_key: str | None = None) -> None:
     global _services_cache_store
     _services_cache_store = None
 
 
+@subscribe(Topic.SETTINGS)
+def _expire_settings_snapshot(_key: str | None = None) -> None:
+    # values stay as a fallback; the next read goes to the DB
+    global _settings_last_checked
+    _settings_last_checked = None
+
+
+def _admin_mode_where(mode: str | None, now: datetime) -> tuple[list[Any], Any]:
+    """Predicates + ordering for an admin bookings tab (``None`` = every booking)."""
+    terminal = [
+        BookingStatus.CANCELLED,
+        BookingStatus.DONE,
+        BookingStatus.NO_SHOW,
+        BookingStatus.EXPIRED,
+    ]
+    if mode is None:
+        return [], Booking.starts_at
+    if mode == "done":
+        return [Booking.status == BookingStatus.DONE], Booking.starts_at.desc()
+    if mode == "no_show":
+        return [Booking.status == BookingStatus.NO_SHOW], Booking.starts_at.desc()
+    if mode == "cancelled":
+        return [Booking.status == BookingStatus.CANCELLED], Booking.starts_at.desc()
+    if mode == "all":
+        return [Booking.starts_at >= now], Booking.starts_at
+    # upcoming
+    return [Booking.starts_at >= now, Booking.status.notin_(terminal)], Booking.starts_at
+
+
 class ServiceRepo:
     """Repository for Service-related lookups and caches.
 
@@ -401,32 +448,8 @@ class ServiceRepo:
                 done_count = cancelled_count = noshow_count = upcoming_count = 0
 
             # Логика фильтрации по 'mode'
-            if mode == "done":
-                where_clause = [*base_where, Booking.status == BookingStatus.DONE]
-                order_expr = Booking.starts_at.desc()
-            elif mode == "no_show":
-                where_clause = [*base_where, Booking.status == BookingStatus.NO_SHOW]
-                order_expr = Booking.starts_at.desc()
-            elif mode == "cancelled":
-                where_clause = [*base_where, Booking.status == BookingStatus.CANCELLED]
-                order_expr = Booking.starts_at.desc()
-            elif mode == "all":
-                where_clause = [*base_where, Booking.starts_at >= now]
-                order_expr = Booking.starts_at
-            else:  # upcoming
-                where_clause = [
-                    *base_where,
-                    Booking.starts_at >= now,
-                    Booking.status.notin_(
-                        [
-                            BookingStatus.CANCELLED,
-                            BookingStatus.DONE,
-                            BookingStatus.NO_SHOW,
-                            BookingStatus.EXPIRED,
-                        ]
-                    ),
-                ]
-                order_expr = Booking.starts_at
+            mode_where, order_expr = _admin_mode_where(mode, now)
+            where_clause = [*base_where, *mode_where]
 
             if start is not None:
                 where_clause.append(Booking.starts_at >= start)
@@ -851,6 +874,190 @@ class ServiceRepo:
             return {"total_minutes": total_minutes, "total_price_cents": 0}
 
 
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_BATCH_SIZE = 1000
+_EXPORT_CSV_HEADER = ["ID", "Date", "Client", "Master", "Service", "Amount", "Status"]
+
+
+def build_bookings_export_query(
+    *,
+    mode: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    master_id: int | None = None,
+    now: datetime | None = None,
+) -> Any:
+    """One flat SELECT for exports: booking + client/master names + service names.
+
+    Service names are aggregated per booking by a correlated subquery, so rows
+    can be streamed in order without a second query per page.
+    """
+    from sqlalchemy.dialects.postgresql import aggregate_order_by
+    from bot.app.domain.models import BookingItem
+
+    mode_where, order_expr = _admin_mode_where(mode, now or utc_now())
+    where: list[Any] = list(mode_where)
+    if master_id is not None:
+        where.append(Booking.master_id == int(master_id))
+    if start is not None:
+        where.append(Booking.starts_at >= start)
+    if end is not None:
+        where.append(Booking.starts_at < end)
+
+    svc_name = func.coalesce(Service.name, func.cast(BookingItem.service_id, String))
+    services_expr = (
+        select(func.string_agg(aggregate_order_by(svc_name, BookingItem.position), " + "))
+        .select_from(BookingItem)
+        .outerjoin(Service, Service.id == BookingItem.service_id)
+        .where(BookingItem.booking_id == Booking.id)
+        .correlate(Booking)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Booking.id,
+            Booking.starts_at,
+            Booking.status,
+            Booking.master_id,
+            Booking.user_id,
+            Booking.original_price_cents,
+            Booking.final_price_cents,
+            Booking.paid_at,
+            User.name.label("client_name"),
+            Master.name.label("master_name"),
+            services_expr.label("service_name"),
+        )
+        .join(User, User.id == Booking.user_id, isouter=True)
+        .join(Master, Master.id == Booking.master_id, isouter=True)
+        .where(*where)
+        .order_by(order_expr, Booking.id)
+    )
+
+
+def _export_record(row: Any, tz: Any) -> dict[str, Any]:
+    starts_at = row.starts_at
+    local = starts_at.astimezone(tz) if starts_at is not None and tz is not None else starts_at
+    status_val = getattr(row.status, "value", row.status)
+    cents = row.final_price_cents or row.original_price_cents or 0
+    return {
+        "id": int(row.id),
+        "starts_at": local,
+        "status": str(status_val) if status_val is not None else "",
+        "client": row.client_name or "",
+        "master": row.master_name or "",
+        "master_id": row.master_id,
+        "user_id": row.user_id,
+        "service": row.service_name or "",
+        "amount_cents": int(cents),
+        "original_price_cents": row.original_price_cents,
+        "paid_at": row.paid_at,
+    }
+
+
+async def stream_bookings_export(
+    out: IO[bytes],
+    *,
+    fmt: str = "csv",
+    compress: bool = False,
+    mode: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    master_id: int | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> int:
+    """Write bookings to the binary stream ``out`` as CSV or JSON Lines.
+
+    Rows come from a server-side cursor (``AsyncSession.stream`` with
+    ``yield_per``) and are encoded (and gzip-compressed when ``compress``)
+    as they arrive, so memory stays constant regardless of the range size.
+    Returns the number of exported rows.
+    """
+    import gzip
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unsupported export format: {fmt}")
+    stmt = build_bookings_export_query(mode=mode, start=start, end=end, master_id=master_id)
+    tz = get_local_tz() or UTC
+    count = 0
+    with ExitStack() as stack:
+        sink: IO[bytes] | gzip.GzipFile = out
+        if compress:
+            sink = stack.enter_context(gzip.GzipFile(fileobj=out, mode="wb"))
+        text_out = io.TextIOWrapper(sink, encoding="utf-8", newline="", write_through=True)
+        # never close the caller's stream through the wrapper
+        stack.callback(text_out.detach)
+        writer = csv.writer(text_out) if fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(_EXPORT_CSV_HEADER)
+
+        async with read_session("exports") as session:
+            result = await session.stream(stmt.execution_options(yield_per=max(1, int(batch_size))))
+            async for partition in result.partitions():
+                buf = io.StringIO()
+                part_writer = csv.writer(buf) if writer is not None else None
+                for row in partition:
+                    try:
+                        rec = _export_record(row, tz)
+                    except Exception:
+                        continue  # skip malformed row
+                    if part_writer is not None:
+                        dt = rec["starts_at"]
+                        part_writer.writerow(
+                            [
+                                rec["id"],
+                                f"{dt:%Y-%m-%d %H:%M}" if dt else "",
+                                rec["client"],
+                                rec["master"],
+                                rec["service"],
+                                format_money_cents(rec["amount_cents"]),
+                                rec["status"],
+                            ]
+                        )
+                    else:
+                        buf.write(json.dumps(rec, ensure_ascii=False, default=str))
+                        buf.write("\n")
+                    count += 1
+                text_out.write(buf.getvalue())
+        text_out.flush()
+    return count
+
+
+async def export_bookings(
+    *,
+    fmt: str = "csv",
+    compress: bool = False,
+    mode: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    master_id: int | None = None,
+    file_stem: str | None = None,
+) -> tuple[str, str]:
+    """Stream an export into a temporary file and return ``(path, file_name)``."""
+    import tempfile
+
+    ext = "csv" if fmt == "csv" else "jsonl"
+    suffix = f".{ext}.gz" if compress else f".{ext}"
+    stem = file_stem or f"bookings_{mode or 'any'}_{local_now():%Y_%m_%d}"
+    with tempfile.NamedTemporaryFile("wb", suffix=suffix, delete=False) as fh:
+        path = fh.name
+        try:
+            rows = await stream_bookings_export(
+                fh,
+                fmt=fmt,
+                compress=compress,
+                mode=mode,
+                start=start,
+                end=end,
+                master_id=master_id,
+            )
+        except Exception:
+            with suppress(Exception):
+                os.unlink(path)
+            raise
+    logger.info("Exported %d bookings to %s (%s%s)", rows, path, fmt, ", gzip" if compress else "")
+    return path, stem + suffix
+
+
 async def generate_bookings_csv(
     mode: str,
     start: datetime | None,
@@ -860,105 +1067,32 @@ async def generate_bookings_csv(
     optimized: bool = True,
     in_memory: bool = False,
     compress: bool = False,
+    master_id: int | None = None,
 ) -> tuple[str, str]:
     """Stream bookings into a temporary CSV file and return its path + file name.
 
-    Previous implementation materialized all rows + full CSV in memory which could
-    lead to high RAM usage / OOM for large months. This version paginates through
-    bookings and writes rows incrementally to a temporary file.
-
-    Returns: (temp_file_path, file_name)
+    Thin wrapper over ``export_bookings``; ``optimized`` and ``in_memory`` are
+    accepted for compatibility (rows are always streamed from a server-side
+    cursor, and compression is done incrementally).
     """
-    import tempfile
-
+    now_local = reference or local_now()
     try:
-        # Prepare temp file for streaming writes
-        now_local = reference or local_now()
-        file_name = f"bookings_{mode}_{now_local:%Y_%m}.csv"
-        with ExitStack() as stack:
-            if in_memory:
-                tmp_bytes = stack.enter_context(
-                    tempfile.SpooledTemporaryFile(max_size=2_000_000, mode="w+b")
-                )
-                text_wrapper = stack.enter_context(
-                    io.TextIOWrapper(tmp_bytes, encoding="utf-8", newline="")
-                )
-                writer_handle: IO[str] = text_wrapper
-                tmp_obj: IO[bytes] | IO[str] = tmp_bytes
-            else:
-                tmp_file = stack.enter_context(
-                    tempfile.NamedTemporaryFile(
-                        "w", newline="", suffix=".csv", delete=False, encoding="utf-8"
-                    )
-                )
-                writer_handle = tmp_file
-                tmp_obj = tmp_file
-
-            writer = csv.writer(writer_handle)
-
-            writer.writerow(["ID", "Date", "Client", "Master", "Service", "Amount", "Status"])
-
-            page = 1
-            page_size = 1000  # tuned for reasonable memory / round trips
-            while True:
-                rows, _meta = await ServiceRepo.get_admin_bookings(
-                    mode=mode,
-                    page=page,
-                    page_size=page_size,
-                    start=start,
-                    end=end,
-                    optimized=optimized,
-                )
-                if not rows:
-                    break
-                for b in rows:
-                    try:
-                        c_cell = b.client_name or ""
-                        m_cell = b.master_name or ""
-                        s_name = b.service_name or str(b.service_id or "")
-
-                        dt_local = b.starts_at
-                        dt_txt = f"{dt_local:%Y-%m-%d %H:%M}" if dt_local else ""
-
-                        cents = int(b.final_price_cents or b.original_price_cents or 0)
-                        price = format_money_cents(cents)
-
-                        status_val = getattr(b.status, "value", None)
-                        status_value = str(status_val) if status_val is not None else str(b.status)
-                        writer.writerow([b.id, dt_txt, c_cell, m_cell, s_name, price, status_value])
-                    except Exception:
-                        continue  # skip malformed row
-                page += 1
-            with suppress(Exception):
-                writer_handle.flush()
-
-            if in_memory:
-                tmp_obj.seek(0)
-                raw_bytes = tmp_obj.read()
-                if isinstance(raw_bytes, str):
-                    raw_bytes = raw_bytes.encode("utf-8")
-                if compress:
-                    import gzip
-
-                    raw_bytes = gzip.compress(raw_bytes)
-                    file_name = file_name + ".gz"
-                    suffix = ".csv.gz"
-                else:
-                    suffix = ".csv"
-                with tempfile.NamedTemporaryFile("wb", suffix=suffix, delete=False) as final_file:
-                    final_file.write(raw_bytes)
-                    final_file.flush()
-                    final_path = final_file.name
-                return final_path, file_name
-
-            return tmp_obj.name, file_name
+        return await export_bookings(
+            fmt="csv",
+            compress=compress,
+            mode=mode,
+            start=start,
+            end=end,
+            master_id=master_id,
+            file_stem=f"bookings_{mode}_{now_local:%Y_%m}",
+        )
     except Exception as e:
         logger.exception("generate_bookings_csv failed: %s", e)
         raise
 
 
 async def export_month_bookings_csv(
-    mode: str, *, reference: datetime | None = None
+    mode: str, *, reference: datetime | None = None, compress: bool = False
 ) -> tuple[str, str]:
     """Helper to export the current calendar month for the given mode.
 
@@ -986,6 +1120,7 @@ async def export_month_bookings_csv(
         start=start_utc,
         end=end_utc,
         reference=ref,
+        compress=compress,
     )
 
 
@@ -1438,7 +1573,6 @@ class SettingsRepo:
             if _settings_cache is None:
                 _settings_cache = {}
             _settings_cache[str(key)] = value
-
             _settings_last_checked = utc_now()
 
             # Persist to DB Setting table when available
@@ -1463,6 +1597,9 @@ class SettingsRepo:
                     "SettingsRepo.update_setting: DB persist failed for %s: %s", key, db_e
                 )
                 # still consider update successful for runtime
+            # public config, month availability and other processes' snapshots
+            publish(Topic.SETTINGS, str(key))
+            _settings_last_checked = utc_now()
             # Note: previously this code called an optional `_safe_call` hook
             # (on_setting_update) if provided by `bot.config`. That hook was
             # removed to simplify the codebase and avoid silent failures.
@@ -1486,7 +1623,7 @@ class AdminRepo:
     @staticmethod
     async def get_basic_totals() -> dict[str, int]:
         try:
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, User
 
@@ -1686,7 +1823,7 @@ class AdminRepo:
         """
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func, and_
                 from bot.app.domain.models import Booking
 
@@ -1750,7 +1887,7 @@ class AdminRepo:
     async def get_top_masters(limit: int = 10) -> list[dict[str, Any]]:
         try:
             start, end = _range_bounds("month")
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, Master
 
@@ -1772,7 +1909,7 @@ class AdminRepo:
     async def get_top_services(limit: int = 10) -> list[dict[str, Any]]:
         try:
             start, end = _range_bounds("month")
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, BookingItem, Service
 
@@ -1800,7 +1937,7 @@ class AdminRepo:
         """
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func, and_
                 from bot.app.domain.models import Booking
 
@@ -1829,7 +1966,7 @@ class AdminRepo:
     async def get_revenue_by_master(kind: str = "month", limit: int = 10) -> list[dict[str, Any]]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, Master
 
@@ -1860,7 +1997,7 @@ class AdminRepo:
     async def get_revenue_by_service(kind: str = "month", limit: int = 10) -> list[dict[str, Any]]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, BookingItem, Service
 
@@ -1891,7 +2028,7 @@ class AdminRepo:
     async def get_retention(kind: str = "month") -> dict[str, Any]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking
 
@@ -1921,7 +2058,7 @@ class AdminRepo:
     async def get_no_show_rates(kind: str = "month") -> dict[str, Any]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, BookingStatus
 
@@ -1953,7 +2090,7 @@ class AdminRepo:
     async def get_top_clients_ltv(kind: str = "month", limit: int = 10) -> list[dict[str, Any]]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, User
 
@@ -1982,7 +2119,7 @@ class AdminRepo:
     async def get_conversion(kind: str = "month") -> dict[str, Any]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, BookingStatus
 
@@ -2011,7 +2148,7 @@ class AdminRepo:
     async def get_cancellations(kind: str = "month") -> dict[str, Any]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking, BookingStatus
 
@@ -2040,7 +2177,7 @@ class AdminRepo:
     async def get_daily_trends(kind: str = "month") -> list[dict[str, Any]]:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking
 
@@ -2077,7 +2214,7 @@ class AdminRepo:
     async def get_aov(kind: str = "month") -> float:
         try:
             start, end = _range_bounds(kind)
-            async with get_session() as session:
+            async with read_session("analytics") as session:
                 from sqlalchemy import select, func
                 from bot.app.domain.models import Booking
 
@@ -2113,7 +2250,7 @@ async def _stats_for_bounds(
     This mirrors AdminRepo.get_range_stats but accepts explicit datetimes.
     """
     try:
-        async with get_session() as session:
+        async with read_session("analytics") as session:
             from sqlalchemy import select, func, and_
             from bot.app.domain.models import Booking
 
@@ -2166,7 +2303,7 @@ async def _stats_for_bounds(
 
 async def _revenue_for_bounds(start: datetime, end: datetime, master_id: int | None = None) -> int:
     try:
-        async with get_session() as session:
+        async with read_session("analytics") as session:
             from sqlalchemy import select, func, and_
             from bot.app.domain.models import Booking
 
@@ -2192,7 +2329,7 @@ async def _revenue_count_for_bounds(
     This counts bookings whose status is in `REVENUE_STATUSES`.
     """
     try:
-        async with get_session() as session:
+        async with read_session("analytics") as session:
             from sqlalchemy import select, func, and_
             from bot.app.domain.models import Booking
 
@@ -2222,7 +2359,7 @@ async def _revenue_split_for_bounds(
     master_id can be used to restrict aggregation.
     """
     try:
-        async with get_session() as session:
+        async with read_session("analytics") as session:
             from sqlalchemy import select, func, and_
             from bot.app.domain.models import Booking, BookingStatus
 
@@ -2268,7 +2405,7 @@ async def _lost_revenue_for_bounds(
     This sums booking prices for statuses CANCELLED and NO_SHOW.
     """
     try:
-        async with get_session() as session:
+        async with read_session("analytics") as session:
             from sqlalchemy import select, func, and_
             from bot.app.domain.models import Booking, BookingStatus
 
@@ -2418,6 +2555,192 @@ async def _format_admin_dashboard_text(
         return t("admin_panel_title", lang_resolved)
 
 
+@dataclass(frozen=True)
+class DayUtilization:
+    """Scheduled vs booked minutes of one master on one local day."""
+
+    day: _date
+    scheduled_minutes: int
+    booked_minutes: int
+    # booked minutes that fall inside the schedule (numerator of occupancy)
+    occupied_minutes: int
+    idle_gaps: tuple[tuple[_time, _time], ...] = ()
+
+    @property
+    def occupancy_pct(self) -> float:
+        if self.scheduled_minutes <= 0:
+            return 0.0
+        return round(100.0 * self.occupied_minutes / self.scheduled_minutes, 1)
+
+
+@dataclass
+class MasterUtilization:
+    """Per-master utilization over a date range (local days)."""
+
+    master_id: int
+    name: str
+    telegram_id: int
+    days: list[DayUtilization] = field(default_factory=list)
+
+    @property
+    def scheduled_minutes(self) -> int:
+        return sum(d.scheduled_minutes for d in self.days)
+
+    @property
+    def booked_minutes(self) -> int:
+        return sum(d.booked_minutes for d in self.days)
+
+    @property
+    def occupancy_pct(self) -> float:
+        scheduled = self.scheduled_minutes
+        if scheduled <= 0:
+            return 0.0
+        return round(100.0 * sum(d.occupied_minutes for d in self.days) / scheduled, 1)
+
+
+# Booked time for utilization: held/confirmed slots plus visits that happened
+# (or were reserved and missed) — the chair was taken either way.
+UTILIZATION_STATUSES = frozenset(ACTIVE_STATUSES | {BookingStatus.DONE, BookingStatus.NO_SHOW})
+
+
+def utilization_from_grids(
+    grids: Mapping[int, MasterGrid],
+    intervals: Mapping[int, list[tuple[datetime, datetime]]],
+    start_day: _date,
+    end_day: _date,
+    tz: Any,
+    *,
+    min_gap_minutes: int = 30,
+) -> dict[int, list[DayUtilization]]:
+    """Pure interval arithmetic: per master and local day in ``[start_day, end_day]``.
+
+    Booked intervals are painted onto the day's minute mask (so overlaps are
+    merged for free); idle gaps are free runs of at least ``min_gap_minutes``.
+    """
+    result: dict[int, list[DayUtilization]] = {}
+    local = LocalDays.for_zone(tz)
+    for mid, grid in grids.items():
+        busy_by_day = busy_masks_by_day(intervals.get(mid, ()), local)
+        days: list[DayUtilization] = []
+        for day, work in grid.iter_days(start_day, end_day + timedelta(days=1)):
+            busy = busy_by_day.get(day, 0)
+            gaps = tuple(
+                (_time(s // 60, s % 60), _time(e // 60, e % 60) if e < 1440 else _time(0, 0))
+                for s, e in mask_runs(work & ~busy)
+                if e - s >= min_gap_minutes
+            )
+            days.append(
+                DayUtilization(
+                    day=day,
+                    scheduled_minutes=work.bit_count(),
+                    booked_minutes=busy.bit_count(),
+                    occupied_minutes=(work & busy).bit_count(),
+                    idle_gaps=gaps,
+                )
+            )
+        result[mid] = days
+    return result
+
+
+async def compute_master_utilization(
+    start_day: _date,
+    end_day: _date,
+    *,
+    master_ids: list[int] | None = None,
+    min_gap_minutes: int = 30,
+) -> list[MasterUtilization]:
+    """Scheduled vs booked minutes for every master (or ``master_ids``) over local days.
+
+    Four range queries for all masters at once (masters, weekly schedules,
+    exceptions, bookings); the arithmetic runs on minute-grid bitsets. Weekdays
+    without schedule rows count as not scheduled.
+    """
+    from bot.app.domain.models import MasterSchedule, MasterScheduleException
+
+    local_tz = get_local_tz() or UTC
+    range_start, range_end = LocalDays.for_zone(local_tz).range_bounds(start_day, end_day)
+    fallback_minutes = int(DEFAULT_SERVICE_FALLBACK_DURATION or 60)
+
+    async with read_session("analytics") as session:
+        m_stmt = select(Master.id, Master.name, Master.telegram_id).order_by(Master.name)
+        if master_ids:
+            m_stmt = m_stmt.where(Master.id.in_([int(m) for m in master_ids]))
+        masters = (await session.execute(m_stmt)).all()
+        ids = [int(r[0]) for r in masters]
+        if not ids:
+            return []
+        sched_rows = (
+            await session.execute(
+                select(
+                    MasterSchedule.master_id,
+                    MasterSchedule.day_of_week,
+                    MasterSchedule.start_time,
+                    MasterSchedule.end_time,
+                    MasterSchedule.is_day_off,
+                ).where(MasterSchedule.master_id.in_(ids))
+            )
+        ).all()
+        exc_rows = (
+            await session.execute(
+                select(
+                    MasterScheduleException.master_id,
+                    MasterScheduleException.exception_date,
+                    MasterScheduleException.start_time,
+                    MasterScheduleException.end_time,
+                    MasterScheduleException.reason,
+                ).where(
+                    MasterScheduleException.master_id.in_(ids),
+                    MasterScheduleException.exception_date >= start_day,
+                    MasterScheduleException.exception_date <= end_day,
+                )
+            )
+        ).all()
+        # Look back a day so bookings that started before the range still count
+        lookback_utc = range_start - timedelta(days=1)
+        booking_rows = (
+            await session.execute(
+                select(Booking.master_id, Booking.starts_at, Booking.ends_at).where(
+                    Booking.master_id.in_(ids),
+                    Booking.starts_at < range_end,
+                    Booking.starts_at >= lookback_utc,
+                    Booking.status.in_(tuple(UTILIZATION_STATUSES)),
+                )
+            )
+        ).all()
+
+    sched_by_master: dict[int, list[tuple[Any, ...]]] = {}
+    for mid, *rest in sched_rows:
+        sched_by_master.setdefault(int(mid), []).append(tuple(rest))
+    exc_by_master: dict[int, list[tuple[Any, ...]]] = {}
+    for mid, *rest in exc_rows:
+        exc_by_master.setdefault(int(mid), []).append(tuple(rest))
+    intervals: dict[int, list[tuple[datetime, datetime]]] = {}
+    for mid, b_start, b_end in booking_rows:
+        if b_start is None:
+            continue
+        b_end = b_end or b_start + timedelta(minutes=fallback_minutes)
+        if b_end <= range_start or b_end <= b_start:
+            continue
+        intervals.setdefault(int(mid), []).append((b_start, b_end))
+
+    grids = {
+        mid: MasterGrid.from_rows(sched_by_master.get(mid, ()), exc_by_master.get(mid, ()))
+        for mid in ids
+    }
+    per_master = utilization_from_grids(
+        grids, intervals, start_day, end_day, local_tz, min_gap_minutes=min_gap_minutes
+    )
+    return [
+        MasterUtilization(
+            master_id=int(mid),
+            name=str(name or ""),
+            telegram_id=int(tid or 0),
+            days=per_master.get(int(mid), []),
+        )
+        for mid, name, tid in masters
+    ]
+
+
 async def get_admin_dashboard_data(kind: str = "today", lang: str | None = None) -> dict[str, Any]:
     """Return structured admin dashboard data (no presentation).
 
@@ -2440,51 +2763,48 @@ async def get_admin_dashboard_data(kind: str = "today", lang: str | None = None)
     except Exception:
         prev_stats = {"bookings": 0, "unique_users": 0}
         prev_revenue = 0
-    async with get_session() as session:
-        stmt = (
-            select(
-                Master.name,
-                Master.telegram_id,
-                func.count(Booking.id).label("bookings"),
-            )
-            .select_from(Master)
-            .join(
-                Booking,
-                and_(
-                    Booking.master_id == Master.telegram_id,
-                    Booking.starts_at.between(start, end),
-                    Booking.status.in_(tuple(REVENUE_STATUSES)),
-                ),
-                isouter=True,
+    # Master load: real utilization (scheduled vs booked minutes) over the period's local days
+    try:
+        utilization = await compute_master_utilization(start.date(), end.date())
+    except Exception:
+        logger.exception("get_admin_dashboard_data: utilization failed")
+        utilization = []
+
+    masters_lines: list[str] = []
+    zero_names: list[str] = []
+    for mu in utilization:
+        if mu.booked_minutes > 0:
+            masters_lines.append(
+                tr("admin_dashboard_master_load_line", lang=lang_resolved).format(
+                    name=mu.name,
+                    pct=f"{mu.occupancy_pct:g}",
+                    booked=f"{mu.booked_minutes / 60:.1f}",
+                    scheduled=f"{mu.scheduled_minutes / 60:.1f}",
+                )
             )
-            .group_by(Master.telegram_id, Master.name)
-            .order_by(Master.name)
-        )
-        rows = (await session.execute(stmt)).all()
-        default_slots = DEFAULT_DAILY_SLOTS
-
-        masters_lines: list[str] = []
-        zero_names: list[str] = []
-        for name, _tid, cnt in rows:
-            cnt_int = int(cnt or 0)
-            if cnt_int > 0:
-                masters_lines.append(f"• {name}: {cnt_int}/{default_slots} слотов")
-            else:
-                zero_names.append(name)
+        else:
+            zero_names.append(mu.name)
 
     masters_load_text = "\n".join(masters_lines)
     if zero_names:
         zero_text = ", ".join(zero_names[:5])
         if len(zero_names) > 5:
             zero_text += ", ..."
-        masters_load_text = (
-            masters_load_text + "\n" if masters_load_text else ""
-        ) + f"(Нет записей: {zero_text})"
+        masters_load_text = (masters_load_text + "\n" if masters_load_text else "") + tr(
+            "admin_dashboard_no_bookings", lang=lang_resolved
+        ).format(names=zero_text)
 
     # Also include a simple masters list (raw) for views that want to render differently
     masters_raw = [
-        {"name": name, "telegram_id": int(tid or 0), "bookings": int(cnt or 0)}
-        for name, tid, cnt in rows
+        {
+            "name": mu.name,
+            "telegram_id": mu.telegram_id,
+            "master_id": mu.master_id,
+            "scheduled_minutes": mu.scheduled_minutes,
+            "booked_minutes": mu.booked_minutes,
+            "occupancy_pct": mu.occupancy_pct,
+        }
+        for mu in utilization
     ]
 
     # Prepare localized trend suffixes for key metrics
@@ -2595,5 +2915,13 @@ __all__ = [
     "invalidate_services_cache",
     "generate_bookings_csv",
     "export_month_bookings_csv",
+    "EXPORT_FORMATS",
+    "build_bookings_export_query",
+    "stream_bookings_export",
+    "export_bookings",
+    "DayUtilization",
+    "MasterUtilization",
+    "compute_master_utilization",
+    "utilization_from_grids",
     # Note: lightweight facades were removed; call repository APIs directly
 ]
@@ -0,0 +1,63 @@
+"""Booking status labels and groups shared by the bot and the Mini App API.
+
+Lives in the service layer so ``bot.api`` can render statuses without
+importing Telegram UI modules; ``bot.app.telegram.common.status`` re-exports it.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from bot.app.domain.models import BookingStatus
+from bot.app.translations import tr
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ACTIVE_BLOCKING_STATUSES",
+    "get_status_label",
+    "status_label_map",
+]
+
+
+status_label_map: dict[Any, str] = {
+    getattr(BookingStatus, "PAID", object()): "status_paid",
+    getattr(BookingStatus, "PENDING_PAYMENT", object()): "status_pending_payment",
+    getattr(BookingStatus, "RESERVED", object()): "status_reserved",
+    getattr(BookingStatus, "CONFIRMED", object()): "status_confirmed",
+    getattr(BookingStatus, "CANCELLED", object()): "status_cancelled",
+    getattr(BookingStatus, "DONE", object()): "status_done",
+    getattr(BookingStatus, "NO_SHOW", object()): "status_no_show",
+}
+
+
+async def get_status_label(status: Any, lang: str | None = None) -> str:
+    """Return a localized label for a booking status.
+
+    Uses translation keys so bot/TMA stay in sync. Falls back to raw string.
+    """
+    try:
+        # Direct mapping by status object
+        if status in status_label_map:
+            return str(tr(status_label_map[status], lang=lang))
+
+        # Try by underlying value (e.g., Enum.value)
+        sval = getattr(status, "value", None)
+        if sval is not None:
+            for k, v in status_label_map.items():
+                if getattr(k, "value", None) == sval:
+                    return str(tr(v, lang=lang))
+
+        # Fallback to string representation
+        return str(status)
+    except Exception as e:
+        logger.error("Ошибка при получении метки статуса %s: %s", status, e)
+        return str(status)
+
+
+ACTIVE_BLOCKING_STATUSES = {
+    BookingStatus.CONFIRMED,
+    BookingStatus.PAID,
+    BookingStatus.RESERVED,
+}
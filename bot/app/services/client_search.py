@@ -0,0 +1,167 @@
+"""Indexed client search over ``users`` for the admin and master flows.
+
+Matches a free-text query against ``users.search_text`` (generated column:
+lower-cased name, first/last name and username, GIN ``gin_trgm_ops`` index)
+and an exact Telegram id. Ranking, best first:
+
+* ``3``        - exact Telegram id or username;
+* ``2 + sim``  - a word of the client's name / username starts with the query;
+* ``sim``      - fuzzy match (pg_trgm ``word_similarity``, typos included).
+
+Pages are keyset-paginated on ``(score DESC, users.id)``: the opaque cursor
+returned with a page is passed back as ``after`` for the next one, so deep
+pages cost the same as the first. Masters search only their own clients
+(``master_client_summary``). Queries shorter than ``MIN_QUERY_LEN`` are
+rejected; trigram lookups need at least three characters to use the index.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Float, and_, case, cast, func, literal, or_, select
+
+from bot.app.core.db import get_session
+from bot.app.domain.models import MasterClientSummary, User
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ClientHit",
+    "ClientSearchPage",
+    "MIN_QUERY_LEN",
+    "build_search_statement",
+    "decode_cursor",
+    "encode_cursor",
+    "normalize_query",
+    "search_clients",
+]
+
+MIN_QUERY_LEN = 2
+MAX_QUERY_LEN = 64
+_WS = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class ClientHit:
+    user_id: int
+    telegram_id: int | None
+    name: str | None
+    username: str | None
+    score: float
+
+
+@dataclass(frozen=True)
+class ClientSearchPage:
+    query: str
+    items: list[ClientHit] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def normalize_query(raw: str | None) -> str:
+    """Lower-case, collapse whitespace, drop a leading ``@``; capped at ``MAX_QUERY_LEN``."""
+    q = _WS.sub(" ", (raw or "").strip().lower()).lstrip("@").strip()
+    return q[:MAX_QUERY_LEN]
+
+
+def encode_cursor(score: float, user_id: int) -> str:
+    # repr() round-trips the double exactly, so the keyset predicate is stable
+    return f"{float(score)!r}:{int(user_id)}"
+
+
+def decode_cursor(cursor: str | None) -> tuple[float, int] | None:
+    if not cursor:
+        return None
+    try:
+        score, uid = cursor.rsplit(":", 1)
+        return float(score), int(uid)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_search_statement(
+    query: str,
+    *,
+    limit: int = 10,
+    after: tuple[float, int] | None = None,
+    master_id: int | None = None,
+) -> Any:
+    """SELECT id, telegram_id, name, username, score for a normalized ``query``."""
+    text = User.search_text
+    sim = func.word_similarity(query, text)
+    word_prefix = or_(
+        text.startswith(query, autoescape=True), text.contains(" " + query, autoescape=True)
+    )
+    tid_match = User.telegram_id == int(query) if query.isdigit() else None
+    # query is lower-cased by normalize_query; usernames are stored as typed ("Olha_K")
+    username = func.lower(User.username)
+    exact = username == query if tid_match is None else or_(username == query, tid_match)
+    score = cast(case((exact, literal(3.0)), (word_prefix, 2.0 + sim), else_=sim), Float).label(
+        "score"
+    )
+
+    # every branch is index-backed (telegram_id btree, search_text trigram GIN), so
+    # Postgres can BitmapOr them; an exact username is already a substring match
+    matches = [text.contains(query, autoescape=True)]
+    if tid_match is not None:
+        matches.append(tid_match)
+    if len(query) >= 3:
+        matches.append(text.op("%>")(query))  # word_similarity above pg_trgm threshold
+    stmt = select(User.id, User.telegram_id, User.name, User.username, score).where(or_(*matches))
+    if master_id is not None:
+        stmt = stmt.join(
+            MasterClientSummary,
+            and_(
+                MasterClientSummary.user_id == User.id,
+                MasterClientSummary.master_id == int(master_id),
+            ),
+        )
+    if after is not None:
+        last_score, last_id = after
+        stmt = stmt.where(
+            or_(score < last_score, and_(score == last_score, User.id > int(last_id)))
+        )
+    return stmt.order_by(score.desc(), User.id).limit(int(limit) + 1)
+
+
+async def search_clients(
+    raw_query: str | None,
+    *,
+    limit: int = 10,
+    after: str | None = None,
+    master_id: int | None = None,
+) -> ClientSearchPage:
+    """One ranked page of clients matching ``raw_query`` (see module docstring).
+
+    ``master_id`` (surrogate id) restricts the search to that master's clients.
+    """
+    query = normalize_query(raw_query)
+    if len(query) < MIN_QUERY_LEN and not query.isdigit():
+        return ClientSearchPage(query=query)
+    limit = max(1, min(int(limit), 50))
+    stmt = build_search_statement(
+        query, limit=limit, after=decode_cursor(after), master_id=master_id
+    )
+    try:
+        async with get_session() as session:
+            rows = (await session.execute(stmt)).all()
+    except Exception:
+        logger.exception("client_search: lookup failed for %r", query)
+        return ClientSearchPage(query=query)
+    hits = [
+        ClientHit(
+            user_id=int(r.id),
+            telegram_id=int(r.telegram_id) if r.telegram_id is not None else None,
+            name=r.name,
+            username=r.username,
+            score=float(r.score or 0.0),
+        )
+        for r in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit and hits:
+        next_cursor = encode_cursor(hits[-1].score, hits[-1].user_id)
+    return ClientSearchPage(query=query, items=hits, next_cursor=next_cursor)
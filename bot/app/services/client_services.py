@@ -7,34 +7,36 @@ from datetime import datetime, time as dtime, timedelta, UTC
 from typing import Any, TypedDict
 from collections.abc import Iterable, Sequence
 
-from sqlalchemy import select, and_, func, or_, String
+from sqlalchemy import select, func, String
 
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from bot.app.domain.models import (
     Booking,
     BookingStatus,
-    Master,
     Service,
     User,
     BookingRating,
-    MasterSchedule,
-    BookingItem,
     normalize_booking_status,
     TERMINAL_STATUSES,
     ACTIVE_STATUSES,
 )
-from bot.app.core.db import get_session
+from bot.app.core.db import get_session, read_session
+from bot.app.domain.schedule_grid import (
+    MasterGrid,
+    busy_masks_by_day,
+    iter_bits,
+    span_mask,
+    start_minutes,
+)
 from bot.app.core.constants import (
     DEFAULT_CURRENCY,
-    REQUIRE_ROW_LOCK_STRICT,
     BOT_TOKEN,
     TELEGRAM_PROVIDER_TOKEN,
 )
 from bot.app.services import master_services
 from bot.app.services.master_services import MasterRepo
 
-from aiogram import Bot
 from bot.app.services.shared_services import (
     BookingInfo,
     booking_info_from_mapping,
@@ -45,7 +47,7 @@ from bot.app.services.shared_services import (
     format_date,
     utc_now,
     get_local_tz,
-    get_service_duration,
+    local_days,
     ONLINE_PAYMENT_DISCOUNT_PERCENT_DEFAULT,
     resolve_online_payment_discount_percent,
     apply_online_payment_discount,
@@ -55,7 +57,7 @@ from bot.app.services.shared_services import (
 from bot.app.core.notifications import send_booking_notification
 from bot.app.services.admin_services import SettingsRepo
 from bot.app.services.admin_services import ServiceRepo
-from bot.app.telegram.common.status import ACTIVE_BLOCKING_STATUSES
+from bot.app.services.booking_status import ACTIVE_BLOCKING_STATUSES
 
 
 async def _finalize_booking_payment(
@@ -154,7 +156,15 @@ async def _finalize_booking_payment(
             session.add(hist)
         except Exception:
             pass
+        from bot.app.services.client_summary import refresh_client_summaries
+        from bot.app.services.reminder_jobs import sync_reminder_jobs
+
+        await sync_reminder_jobs(session, [booking.id], now=now_utc)
+        await refresh_client_summaries(session, [(booking.master_id, booking.user_id)], now=now_utc)
         await session.commit()
+        from bot.app.services.month_availability import invalidate_month_availability
+
+        invalidate_month_availability(booking.master_id)
         return True, None
 
 
@@ -175,6 +185,7 @@ class BookingConflictRow:
     user_id: int | None
     user_name: str | None
     username: str | None
+    ends_at: datetime | None = None
 
 
 # ---------------- Formatting helpers (moved from client_keyboards) ----------------
@@ -659,90 +670,57 @@ class BookingRepo:
         return None
 
     @staticmethod
-    async def get_conflicting_bookings_ids(
+    async def get_blocking_bookings(
         master_id: int,
-        windows: Sequence[tuple[int, int, int]],
         start: datetime,
         end: datetime,
         *,
         excluded_statuses: Sequence[Any] | None = None,
-        return_ids_only: bool = False,
-    ) -> list[int] | list[BookingConflictRow]:
-        """Return bookings that overlap configured windows (by master and datetime range).
-
-        Args:
-            master_id: The ID of the master.
-            windows: A sequence of tuples containing day, start minute, and end minute.
-            start: The start datetime for the query.
-            end: The end datetime for the query.
-            excluded_statuses: Optional list of statuses to exclude from the results.
-            return_ids_only: If True, return only the booking IDs.
-
-        Returns:
-            A list of booking IDs or BookingConflictRow objects.
+    ) -> list[BookingConflictRow]:
+        """Return a master's non-terminal bookings starting in ``[start, end)``.
+
+        A plain range scan on ``(master_id, starts_at)``; weekday/time-of-day
+        matching against a schedule is done by the caller in local time.
         """
-        if not windows:
-            return []
         from bot.app.domain.models import Booking, User
-        from sqlalchemy import select, func
+        from sqlalchemy import select
 
         if excluded_statuses is None:
             excluded_statuses = tuple(TERMINAL_STATUSES)
 
-        minute_of_day = func.date_part("hour", Booking.starts_at) * 60 + func.date_part(
-            "minute", Booking.starts_at
-        )
-        day_expr = func.date_part("dow", Booking.starts_at)
-        clauses = [
-            and_(
-                day_expr == day,
-                minute_of_day >= start_min,
-                minute_of_day < end_min,
+        stmt = (
+            select(
+                Booking.id,
+                Booking.starts_at,
+                Booking.ends_at,
+                Booking.status,
+                Booking.master_id,
+                Booking.user_id,
+                User.name,
+                User.username,
             )
-            for day, start_min, end_min in windows
-        ]
-        if not clauses:
-            return []
-
-        filters = [
-            Booking.master_id == master_id,
-            Booking.starts_at >= start,
-            Booking.starts_at < end,
-            Booking.status.notin_(excluded_statuses),
-            or_(*clauses),
-        ]
-
-        async with get_session() as session:
-            if return_ids_only:
-                stmt_ids = select(Booking.id).where(*filters).order_by(Booking.starts_at)
-                res = await session.execute(stmt_ids)
-                return [int(r) for r in res.scalars().all()]
-
-            stmt_full = (
-                select(
-                    Booking.id,
-                    Booking.starts_at,
-                    Booking.status,
-                    Booking.master_id,
-                    Booking.user_id,
-                    User.name,
-                    User.username,
-                )
-                .join(User, User.id == Booking.user_id)
-                .where(*filters)
-                .order_by(Booking.starts_at)
+            .join(User, User.id == Booking.user_id, isouter=True)
+            .where(
+                Booking.master_id == int(master_id),
+                Booking.starts_at >= start,
+                Booking.starts_at < end,
+                Booking.status.notin_(excluded_statuses),
             )
-            res = await session.execute(stmt_full)
+            .order_by(Booking.starts_at)
+        )
+        async with get_session() as session:
+            res = await session.execute(stmt)
             rows: list[BookingConflictRow] = []
             for row in res.fetchall():
                 try:
-                    bid, starts_at, status, master_id, user_id, user_name, username = row
+                    bid, starts_at, ends_at, status, mid, user_id, user_name, username = row
                     rows.append(
                         BookingConflictRow(
                             booking_id=int(bid),
                             starts_at=starts_at,
+                            ends_at=ends_at,
                             status=status,
-                            master_id=int(master_id) if master_id is not None else None,
+                            master_id=int(mid) if mid is not None else None,
                             user_id=int(user_id) if user_id is not None else None,
                             user_name=str(user_name) if user_name is not None else None,
                             username=str(username) if username is not None else None,
@@ -754,24 +732,23 @@ class BookingRepo:
 
     @staticmethod
     async def update_status(booking_id: int, new_status: Any) -> bool:
-        async with get_session() as session:
-            from bot.app.domain.models import Booking, BookingStatusHistory
+        """Set a booking's status (with history row). True if the booking exists."""
+        from bot.app.services.transitions import transition_bookings
 
-            booking = await session.get(Booking, booking_id)
-            if not booking:
-                return False
-            old = getattr(booking, "status", None)
-            booking.status = new_status  # Update the booking status
-            try:
-                hist = BookingStatusHistory(
-                    booking_id=booking.id, old_status=old, new_status=new_status
-                )
-                session.add(hist)
-            except Exception:
-                # best-effort: do not fail status update if history insert has issues
-                pass
-            await session.commit()
+        target = normalize_booking_status(new_status) or new_status
+        if await transition_bookings(target, ids=[int(booking_id)]):
             return True
+        # already in the target status (no-op) or missing
+        return await BookingRepo._exists(int(booking_id))
+
+    @staticmethod
+    async def _exists(booking_id: int) -> bool:
+        async with get_session() as session:
+            from sqlalchemy import select
+
+            return (
+                await session.execute(select(Booking.id).where(Booking.id == int(booking_id)))
+            ).first() is not None
 
     @staticmethod
     async def recent_by_user(user_id: int, limit: int = 10) -> list[Booking]:
@@ -835,7 +812,16 @@ class BookingRepo:
 
             with suppress(Exception):
                 b.cash_hold_expires_at = None
+            from bot.app.services.client_summary import refresh_client_summaries
+            from bot.app.services.reminder_jobs import sync_reminder_jobs
+
+            # re-arm reminders for the new start time
+            await sync_reminder_jobs(session, [b.id])
+            await refresh_client_summaries(session, [(b.master_id, b.user_id)])
             await session.commit()
+            from bot.app.services.month_availability import invalidate_month_availability
+
+            invalidate_month_availability(b.master_id)
             return True
 
     @staticmethod
@@ -853,23 +839,7 @@ class BookingRepo:
 
     @staticmethod
     async def set_cancelled(booking_id: int) -> bool:
-        async with get_session() as session:
-            from bot.app.domain.models import Booking, BookingStatus, BookingStatusHistory
-
-            b = await session.get(Booking, booking_id)
-            if not b:
-                return False
-            old = getattr(b, "status", None)
-            b.status = BookingStatus.CANCELLED
-            try:
-                hist = BookingStatusHistory(
-                    booking_id=b.id, old_status=old, new_status=BookingStatus.CANCELLED
-                )
-                session.add(hist)
-            except Exception:
-                pass
-            await session.commit()
-            return True
+        return await BookingRepo.update_status(int(booking_id), BookingStatus.CANCELLED)
 
     @staticmethod
     async def delete_booking(booking_id: int) -> bool:
@@ -927,7 +897,7 @@ class BookingRepo:
         OR visit already started in a non-temporary status (confirmed/paid/done/etc.).
         """
         try:
-            async with get_session() as session:
+            async with read_session("history") as session:
                 from sqlalchemy import select, or_, and_, not_
                 from bot.app.domain.models import Booking
 
@@ -1094,6 +1064,34 @@ class BookingRepo:
             # No booking_items: return booking id as a fallback display.
             return str(booking_id)
 
+    @staticmethod
+    async def get_service_names_map(booking_ids: Iterable[int], sep: str = ", ") -> dict[int, str]:
+        """Return ``{booking_id: "Service A, Service B"}`` for many bookings in one query.
+
+        Bookings without items are absent from the result.
+        """
+        ids = sorted({int(i) for i in booking_ids})
+        if not ids:
+            return {}
+        try:
+            async with get_session() as session:
+                from bot.app.domain.models import BookingItem, Service
+
+                rows = await session.execute(
+                    select(BookingItem.booking_id, Service.name)
+                    .join(Service, Service.id == BookingItem.service_id)
+                    .where(BookingItem.booking_id.in_(ids))
+                    .order_by(BookingItem.booking_id, BookingItem.position)
+                )
+                names: dict[int, list[str]] = {}
+                for bid, name in rows.all():
+                    if name:
+                        names.setdefault(int(bid), []).append(str(name))
+            return {bid: sep.join(parts) for bid, parts in names.items()}
+        except Exception as e:
+            logger.exception("BookingRepo.get_service_names_map failed: %s", e)
+            return {}
+
     @staticmethod
     async def _prepare_pagination_context(
         session: Any,
@@ -1718,31 +1716,33 @@ class UserRepo:
     async def get_or_create(
         telegram_id: int, name: str | None = None, username: str | None = None
     ) -> Any:
-        async with get_session() as session:
-            from sqlalchemy import select
+        """Upsert a user by Telegram id in a single round trip.
 
-            user = await session.scalar(select(User).where(User.telegram_id == telegram_id))
-            if user:
-                changed = False
-                if username and getattr(user, "username", None) != username:
-                    with suppress(Exception):
-                        user.username = username
-                        changed = True
-                if name and getattr(user, "name", None) != name:
-                    with suppress(Exception):
-                        user.name = name
-                        changed = True
-                if changed:
-                    await session.commit()
-                return user
+        ``INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING`` creates
+        the row or refreshes name/username (only when provided) and returns the
+        current row, including ``locale``, without a preceding SELECT.
+        """
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-            new_user = User(telegram_id=telegram_id, name=name or (username or str(telegram_id)))
-            with suppress(Exception):
-                new_user.username = username
-            session.add(new_user)
+        stmt = pg_insert(User).values(
+            telegram_id=telegram_id,
+            name=name or (username or str(telegram_id)),
+            username=username,
+        )
+        updates: dict[str, Any] = {}
+        if username:
+            updates["username"] = stmt.excluded.username
+        if name:
+            updates["name"] = stmt.excluded.name
+        # DO NOTHING would return no row on conflict; a no-op SET keeps RETURNING.
+        upsert = stmt.on_conflict_do_update(
+            index_elements=[User.telegram_id],
+            set_=updates or {"telegram_id": stmt.excluded.telegram_id},
+        ).returning(User)
+        async with get_session() as session:
+            user = (await session.scalars(upsert)).one()
             await session.commit()
-            await session.refresh(new_user)
-            return new_user
+            return user
 
     @staticmethod
     async def set_locale(telegram_id: int, locale: str) -> bool:
@@ -1796,11 +1796,12 @@ async def get_available_time_slots_for_services(
     exclude_booking_id: int | None = None,
 ) -> list[datetime]:
     """
-    Calculates available slots based on 'Gap' logic:
-    1. Get work windows.
-    2. Get busy intervals (bookings).
-    3. Subtract busy intervals from windows to find free gaps.
-    4. A slot is available at the START of each gap if the gap is long enough.
+    Calculates available slots on the master's minute grid:
+    1. Work minutes of the day (weekly template + per-date exceptions).
+    2. Busy minutes painted from blocking bookings.
+    3. Free = work & ~busy (minus the same-day lead time).
+    4. Candidate starts step through each free run; a start is kept when the
+       whole service duration fits (``start_minutes``).
 
     Returns timezone-aware datetimes in the business/local timezone so
     callers can safely compare entire instants (not just hours/minutes).
@@ -1809,37 +1810,35 @@ async def get_available_time_slots_for_services(
     if total_duration <= 0:
         return []
 
-    try:
-        # Normalize input `date` into an aware local datetime representing
-        # the target day in the business/local timezone. Callers typically
-        # pass a naive ISO date (e.g. 2025-12-10) — treat those as local-day
-        # references rather than guessing UTC.
-        local_tz = get_local_tz() or UTC
-        if isinstance(date, datetime):
-            if date.tzinfo is None:
-                ref_local = date.replace(tzinfo=local_tz)
-            else:
-                ref_local = date.astimezone(local_tz)
+    # Normalize input `date` into an aware local datetime representing
+    # the target day in the business/local timezone. Callers typically
+    # pass a naive ISO date (e.g. 2025-12-10) — treat those as local-day
+    # references rather than guessing UTC.
+    local_tz = get_local_tz() or UTC
+    if isinstance(date, datetime):
+        if date.tzinfo is None:
+            ref_local = date.replace(tzinfo=local_tz)
         else:
-            # If a plain date was passed, construct a midnight-local datetime
-            ref_local = datetime.combine(date, dtime()).replace(tzinfo=local_tz)
+            ref_local = date.astimezone(local_tz)
+    else:
+        # If a plain date was passed, construct a midnight-local datetime
+        ref_local = datetime.combine(date, dtime()).replace(tzinfo=local_tz)
+    day = ref_local.date()
 
-        # 1. Get Work Windows (Local Time)
-        # Returns list of (start_time, end_time) as time objects
-        windows_local = await master_services.get_work_windows_for_day(master_id, ref_local)
+    # 1. Work minutes (local wall clock)
+    try:
+        grid = await master_services.load_master_grid(int(master_id), day, day)
     except Exception:
-        windows_local = [(dtime(hour=9), dtime(hour=18))]
-
-    if not windows_local:
+        grid = MasterGrid(fallback=span_mask(9 * 60, 18 * 60))
+    if not grid.work_mask(day):
         return []
 
     # 2. Get Bookings (UTC)
-    # Compute the local-day boundaries (aware datetimes) and convert them
-    # to UTC for DB-range queries. All DB timestamps are stored in UTC.
-    local_day_start = ref_local.replace(hour=0, minute=0, second=0, microsecond=0)
-    local_day_end = local_day_start + timedelta(days=1)
-    day_start_utc = local_day_start.astimezone(UTC)
-    day_end_utc = local_day_end.astimezone(UTC)
+    # Local-day boundaries in UTC (DST-aware, memoized per day). The range
+    # starts a day early so a late booking spilling past midnight is seen,
+    # same as the month availability pass.
+    days = local_days()
+    day_start_utc, day_end_utc = days.range_bounds(day - timedelta(days=1), day)
 
     async with get_session() as session:
         stmt = select(Booking).where(
@@ -1859,274 +1858,67 @@ async def get_available_time_slots_for_services(
     busy_intervals = []
     for b in bookings_objs:
         if is_booking_slot_blocked(b, now_utc, hold_minutes):
-            # Use a default fallback if duration is missing, though usually it should be there.
-            # We use 1 minute as absolute minimum fallback to avoid zero-length blocks if something is wrong.
             interval = _get_booking_interval(b, 60)
             if interval:
                 busy_intervals.append(interval)
+    busy = busy_masks_by_day(busy_intervals, days).get(day, 0)
 
-    # Merge overlapping busy intervals
-    # Sort by start time
-    busy_intervals.sort(key=lambda x: x[0])
-    merged_busy: list[tuple[datetime, datetime]] = []
-    for b_start, b_end in busy_intervals:
-        if not merged_busy:
-            merged_busy.append((b_start, b_end))
-        else:
-            last_start, last_end = merged_busy[-1]
-            if b_start < last_end:
-                # Overlap or adjacent
-                merged_busy[-1] = (last_start, max(last_end, b_end))
-            else:
-                merged_busy.append((b_start, b_end))
-
-    # 3. Calculate Gaps
-    # Convert windows (local times) into UTC-aware intervals for gap
-    # calculations. Use the `ref_local` date so we map times to the
-    # correct calendar day in local timezone.
-    window_intervals_utc = []
-    for ws, we in windows_local:
-        w_start = datetime.combine(ref_local.date(), ws).replace(tzinfo=local_tz).astimezone(UTC)
-        w_end = datetime.combine(ref_local.date(), we).replace(tzinfo=local_tz).astimezone(UTC)
-        window_intervals_utc.append((w_start, w_end))
-
-    free_gaps = []
-    for w_start, w_end in window_intervals_utc:
-        current_start = w_start
-        for b_start, b_end in merged_busy:
-            # If booking ends before current window position, skip it
-            if b_end <= current_start:
-                continue
-            # If booking starts after this window, we are done with bookings for this window
-            if b_start >= w_end:
-                break
-
-            # If there is a gap before the booking
-            if b_start > current_start:
-                free_gaps.append((current_start, b_start))
-
-            # Advance current_start to the end of the booking
-            current_start = max(current_start, b_end)
-
-        # If there is space left after the last booking in this window
-        if current_start < w_end:
-            free_gaps.append((current_start, w_end))
+    # 3. Free minutes, honouring the same-day lead time
+    today, _ = days.local_minute(now_utc)
+    if day < today:
+        return []
+    not_before = None
+    if day == today:
+        lead_min = await SettingsRepo.get_same_day_lead_minutes()
+        not_before = days.minutes_since_midnight(
+            now_utc + timedelta(minutes=int(lead_min or 0)), day, ceil=True
+        )
+    free = grid.free_mask(day, busy, not_before=not_before)
+    if not free:
+        return []
 
-    # 4. Filter and Collect Slots
-    slots = []
-    lead_min = await SettingsRepo.get_same_day_lead_minutes()
-    now_utc = utc_now()
-    now_local = now_utc.astimezone(local_tz)
-    is_today = local_day_start.date() == now_local.date()
-
-    for gap_start, gap_end in free_gaps:
-        # Calculate duration in minutes
-        gap_duration_minutes = (gap_end - gap_start).total_seconds() / 60
-
-        # Check if the gap is large enough for the total service duration
-        if gap_duration_minutes >= total_duration:
-            # Instead of only returning the gap start, generate stepped slots
-            # across the gap so clients can pick any available start time.
-            # Determine tick step for generating candidate starts.
-            # Prefer explicit admin setting `slot_tick_minutes` if available,
-            # otherwise fall back to 5 minutes which provides fine-grained
-            # selection for clients.
-            try:
-                slot_step_min = await SettingsRepo.get_slot_tick_minutes()
-                slot_step_min = int(slot_step_min or 0)
-            except Exception:
-                slot_step_min = 0
-
-            if not slot_step_min or slot_step_min <= 0:
-                # default to a 15-minute grid to match the main bot UX
-                # and avoid client-side adjustments. Administrators can
-                # still override via `slot_tick_minutes` setting.
-                slot_step_min = 15
-
-            current = gap_start
-            # walk the gap in steps and add each candidate that fits total_duration
-            while (current + timedelta(minutes=total_duration)) <= gap_end:
-                # Check lead time if it's today (compare in local timezone)
-                if is_today and lead_min:
-                    try:
-                        candidate_local = current.astimezone(local_tz)
-                        if (candidate_local - now_local).total_seconds() / 60 < lead_min:
-                            current = current + timedelta(minutes=slot_step_min)
-                            continue
-                    except Exception:
-                        pass
+    # 4. Candidate starts. Prefer explicit admin setting `slot_tick_minutes`;
+    # default to a 15-minute grid to match the main bot UX.
+    try:
+        slot_step_min = int(await SettingsRepo.get_slot_tick_minutes() or 0)
+    except Exception:
+        slot_step_min = 0
+    if slot_step_min <= 0:
+        slot_step_min = 15
 
-                # Return aware datetimes in local tz for precise comparisons
-                slots.append(current.astimezone(local_tz).replace(second=0, microsecond=0))
-                current = current + timedelta(minutes=slot_step_min)
+    slots = [
+        datetime.combine(day, dtime(minute // 60, minute % 60)).replace(tzinfo=local_tz)
+        for minute in iter_bits(start_minutes(free, total_duration, slot_step_min))
+    ]
 
-    logger.debug("Slots (Gap-based) for master %s on %s: %s", master_id, date, slots)
+    logger.debug("Slots (grid) for master %s on %s: %s", master_id, date, slots)
     return slots
 
 
 async def get_available_days_for_month(
-    master_id: int, year: int, month: int, service_duration_min: int = 60
+    master_id: int,
+    year: int,
+    month: int,
+    service_duration_min: int = 60,
+    *,
+    prefetch: bool = False,
 ) -> set[int]:
     """
     Возвращает набор дней (числа месяца), в которые у мастера есть свободные слоты.
-    Использует SQL-таблицу master_schedules для получения графика работы.
+
+    Тонкая обёртка над ``month_availability.get_month_availability``: один
+    проход по минутной сетке мастера, те же кандидаты старта, что и в выборе
+    времени (шаг ``slot_tick_minutes`` от начала свободного окна), результат
+    кэшируется. ``prefetch`` прогревает соседние месяцы в фоне.
+    Дни недели без строк в master_schedules считаются выходными.
     """
     try:
-        from calendar import monthrange
-        from sqlalchemy import select
-
-        _, days_in_month = monthrange(year, month)
-
-        # 1. Определяем границы месяца (в локальном часовом поясе бизнеса)
-        local_tz = get_local_tz() or UTC
-        month_start_local = datetime(year, month, 1, tzinfo=local_tz)
-        if month == 12:
-            next_month_local = datetime(year + 1, 1, 1, tzinfo=local_tz)
-        else:
-            next_month_local = datetime(year, month + 1, 1, tzinfo=local_tz)
-
-        month_start_utc = month_start_local.astimezone(UTC)
-        next_month_utc = next_month_local.astimezone(UTC)
-        now_utc = utc_now()
-
-        async with get_session() as session:
-            # 2. Загружаем все бронирования мастера за этот месяц (одним запросом)
-            # Используем master_id как есть (предполагаем, что это суррогатный ID, если нет - резолвим)
-
-            # Резолвинг ID (на всякий случай, если передан telegram_id)
-            real_master_id = master_id
-            master_obj = await session.execute(
-                select(Master.id).where(Master.telegram_id == master_id)
-            )
-            mid_row = master_obj.scalar_one_or_none()
-            if mid_row:
-                real_master_id = mid_row
-
-            # Получаем брони
-            bookings_stmt = (
-                select(Booking)
-                .where(
-                    Booking.master_id == real_master_id,
-                    Booking.starts_at >= month_start_utc,
-                    Booking.starts_at < next_month_utc,
-                    Booking.status.notin_(tuple(TERMINAL_STATUSES)),  # Игнорируем отмененные
-                )
-                .order_by(Booking.starts_at)
-            )
-
-            bookings_result = await session.execute(bookings_stmt)
-            bookings_raw_objs = bookings_result.scalars().all()
-
-            # 3. Загружаем расписание из SQL (master_schedules)
-            # Теперь расписание привязано напрямую к мастеру по master_id
-            schedule_stmt = select(MasterSchedule).where(MasterSchedule.master_id == real_master_id)
-            schedule_result = await session.execute(schedule_stmt)
-            schedule_rows = schedule_result.scalars().all()
-
-        # 4. Преобразуем расписание в удобный словарь: {день_недели (0-6): [(start, end), ...]}
-        weekly_schedule: dict[int, list[tuple[dtime, dtime]]] = {}
-        for row in schedule_rows:
-            if row.start_time and row.end_time:
-                # В базе хранятся time объекты (напр. 09:00:00)
-                weekly_schedule.setdefault(row.day_of_week, []).append(
-                    (row.start_time, row.end_time)
-                )
-
-        # 5. Подготавливаем интервалы занятости (брони)
-        blocked_intervals: list[tuple[datetime, datetime]] = []
-        hold_minutes = await SettingsRepo.get_reservation_hold_minutes()
-
-        for b in bookings_raw_objs:
-            if is_booking_slot_blocked(b, now_utc, hold_minutes):
-                interval = _get_booking_interval(b, service_duration_min)
-                if interval:
-                    blocked_intervals.append(interval)
-
-        available_days: set[int] = set()
-        step = timedelta(minutes=service_duration_min)
-        lead_min = await SettingsRepo.get_same_day_lead_minutes()
-        now_local = now_utc.astimezone(local_tz)
-
-        # 6. Проходим по каждому дню месяца
-        for day in range(1, days_in_month + 1):
-            day_date_local = datetime(year, month, day, tzinfo=local_tz)
-            weekday = day_date_local.weekday()
-
-            # Получаем окна работы для этого дня недели из словаря
-            # Если для дня нет записей в БД -> день выходной
-            windows_time = weekly_schedule.get(weekday, [])
-
-            if not windows_time:
-                continue  # Выходной
-
-            # Конвертируем окна (time) в полные datetime для текущего дня
-            windows_local = []
-            for start_t, end_t in windows_time:
-                w_start = datetime.combine(day_date_local.date(), start_t).replace(tzinfo=local_tz)
-                w_end = datetime.combine(day_date_local.date(), end_t).replace(tzinfo=local_tz)
-                windows_local.append((w_start, w_end))
-
-            # Фильтруем брони, относящиеся к этому дню (в UTC)
-            day_start_utc = day_date_local.astimezone(UTC)
-            day_end_utc = (day_date_local + timedelta(days=1)).astimezone(UTC)
-
-            bookings_for_day = [
-                (b_start, b_end)
-                for b_start, b_end in blocked_intervals
-                if b_start < day_end_utc and b_end > day_start_utc
-            ]
-
-            is_today = day_date_local.date() == now_local.date()
-            any_slot_found = False
-
-            # Проверяем наличие слотов
-            for w_start_local, w_end_local in windows_local:
-                # Переводим окно работы в UTC для сравнения с бронями
-                current_utc = w_start_local.astimezone(UTC)
-                w_end_utc = w_end_local.astimezone(UTC)
-
-                while current_utc + step <= w_end_utc:
-                    slot_start = current_utc
-                    slot_end = current_utc + step
-
-                    # Проверка lead time (если сегодня)
-                    if lead_min and is_today:
-                        try:
-                            # Сравниваем в локальном времени
-                            local_slot_dt = slot_start.astimezone(local_tz)
-                            if (local_slot_dt - now_local).total_seconds() / 60 < lead_min:
-                                current_utc += step
-                                continue
-                        except Exception:
-                            pass
-
-                    # Проверка на прошедшее время
-                    if slot_start < now_utc:
-                        current_utc += step
-                        continue
-
-                    # Проверка пересечений с бронями
-                    overlap = False
-                    for b_start, b_end in bookings_for_day:
-                        # Стандартная проверка пересечения интервалов: max(start1, start2) < min(end1, end2)
-                        if slot_start < b_end and slot_end > b_start:
-                            overlap = True
-                            break
-
-                    if not overlap:
-                        any_slot_found = True
-                        break  # Нашли хотя бы один слот в этот день
-
-                    current_utc += step
-
-                if any_slot_found:
-                    break
-
-            if any_slot_found:
-                available_days.add(day)
-
-        return available_days
+        from bot.app.services.month_availability import get_month_availability
 
+        result = await get_month_availability(
+            master_id, year, month, service_duration_min, prefetch=prefetch
+        )
+        return result.available_days()
     except Exception as e:
         logger.exception(
             "Ошибка получения доступных дней (SQL) для мастера %s %04d-%02d: %s",
@@ -2150,7 +1942,7 @@ async def create_booking(
 
     Args:
         client_id: ID клиента.
-        master_id: Telegram ID мастера.
+        master_id: ID мастера (surrogate id или legacy Telegram ID).
         service_id: ID услуги.
         slot: Время начала записи.
         hold_minutes: Время удержания резерва в минутах (опционально).
@@ -2158,183 +1950,9 @@ async def create_booking(
     Returns:
         Объект Booking.
     """
-    try:
-        async with get_session() as session:
-            # Normalize provided master identifier into canonical surrogate id
-            # (Master.id). Callers may pass either the surrogate id or the
-            # legacy telegram_id — prefer surrogate id and fall back to
-            # telegram_id for compatibility. If resolution fails, raise so
-            # the calling flow can handle it.
-            try:
-                from sqlalchemy import select
-                from bot.app.domain.models import Master
-
-                mid = await session.scalar(select(Master.id).where(Master.id == int(master_id)))
-                if not mid:
-                    mid = await session.scalar(
-                        select(Master.id).where(Master.telegram_id == int(master_id))
-                    )
-                if not mid:
-                    raise ValueError("master_not_found")
-                resolved_master_id = int(mid)
-            except ValueError:
-                raise
-            except Exception:
-                # If resolution failed due to DB error, log and re-raise to
-                # surface the failure to callers.
-                logger.exception("Failed to resolve master id for %s", master_id)
-                raise
-
-            new_start = slot
-
-            # Acquire advisory lock for the specific (master_id, slot) pair to
-            # avoid races with the expiration worker. Use the two-int advisory
-            # lock variant; reduce the surrogate id and epoch to 32-bit space
-            # deterministically to avoid overflow.
-            try:
-                from sqlalchemy import text
-
-                k1 = int(resolved_master_id) % 2147483647
-                k2 = int(new_start.timestamp()) % 2147483647
-                await session.execute(
-                    text("SELECT pg_advisory_xact_lock(:k1, :k2)"), {"k1": k1, "k2": k2}
-                )
-            except Exception:
-                # Advisory locks are best-effort; if unavailable, continue and
-                # rely on existing row-level locking and unique-index checks.
-                pass
-            # Application-level guard: delegate interval-overlap checks to BookingRepo
-            try:
-                # Determine duration for the new booking (minutes) so we can compute new_end
-                try:
-                    totals = await get_services_duration_and_price(
-                        [service_id], online_payment=False, master_id=resolved_master_id
-                    )
-                    new_dur = int(totals.get("total_minutes") or 0)
-                except Exception:
-                    new_dur = 0
-                if not new_dur:
-                    new_dur = await SettingsRepo.get_slot_duration()
-
-                new_end = new_start + timedelta(minutes=new_dur)
-
-                conflict = await BookingRepo.find_conflicting_booking(
-                    session,
-                    client_id,
-                    resolved_master_id,
-                    new_start,
-                    new_end,
-                    service_ids=[service_id],
-                )
-                if conflict:
-                    raise ValueError(conflict)
-            except ValueError:
-                raise
-            except Exception:
-                # on DB error (rare), continue to attempt create and let the
-                # commit surface the exception
-                pass
-
-            # Optional lightweight locking: lock potentially overlapping bookings for master and client
-            try:
-                from bot.app.domain.models import Booking as _B
-
-                await session.execute(
-                    select(_B.id)
-                    .where(
-                        _B.master_id == resolved_master_id,
-                        _B.starts_at < new_end,
-                        _B.ends_at > new_start,
-                    )
-                    .with_for_update()
-                )
-                await session.execute(
-                    select(_B.id)
-                    .where(
-                        _B.user_id == client_id,
-                        _B.starts_at < new_end,
-                        _B.ends_at > new_start,
-                    )
-                    .with_for_update()
-                )
-            except Exception as e:
-                # If locking fails (e.g., DB backend limitations), log the failure.
-                # In some deployments row-locking is critical to avoid races; enable
-                # strict behavior via `REQUIRE_ROW_LOCK` flag in constants.
-                logger.exception("Row-level locking failed while creating booking: %s", e)
-                if REQUIRE_ROW_LOCK_STRICT:
-                    raise
-
-            # Snapshot service price at booking time and create booking via helper
-            svc = await session.get(Service, service_id)
-            svc_price = int(getattr(svc, "price_cents", 0) or 0)
-            booking = await _create_booking_base(
-                session,
-                client_id,
-                resolved_master_id,
-                slot,
-                price_cents=svc_price,
-                hold_minutes=hold_minutes,
-                service_id=service_id,
-                duration_minutes=new_dur,
-            )
-
-            # Backfill booking_items for single-service bookings so booking_items
-            # remains the canonical composition source.
-            try:
-                await session.flush()
-                # Persist price snapshot for this booking item
-                session.add(
-                    BookingItem(
-                        booking_id=booking.id,
-                        service_id=str(service_id),
-                        price_cents=svc_price,
-                        position=0,
-                    )
-                )
-            except IntegrityError as ie:
-                # Integrity errors during flush (e.g. exclusion constraint violation)
-                # leave the session in a rolled-back state and surface a friendly
-                # `slot_unavailable` error so callers can handle it.
-                with suppress(Exception):
-                    await session.rollback()
-                logger.info(
-                    "IntegrityError on flush while creating booking (slot likely taken): %s", ie
-                )
-                raise ValueError("slot_unavailable") from ie
-            except Exception:
-                # If flush/add fails for non-integrity reasons, let commit surface the error.
-                pass
-
-            try:
-                await session.commit()
-            except IntegrityError as ie:
-                await session.rollback()
-                logger.info(
-                    "IntegrityError on commit while creating booking (slot likely taken): %s", ie
-                )
-                raise ValueError("slot_unavailable") from ie
-            await session.refresh(booking)
-            logger.info(
-                "Создана запись №%s: client_id=%s, master_id=%s (resolved=%s), slot=%s, expires_at=%s",
-                booking.id,
-                client_id,
-                master_id,
-                resolved_master_id,
-                slot,
-                booking.cash_hold_expires_at,
-            )
-            return booking
-    except SQLAlchemyError as e:
-        logger.error(
-            "Ошибка создания записи: client_id=%s, master_id=%s, service_id=%s, slot=%s, error=%s",
-            client_id,
-            master_id,
-            service_id,
-            slot,
-            e,
-        )
-        raise
+    return await _insert_booking_atomic(
+        client_id, master_id, [service_id], slot, hold_minutes=hold_minutes
+    )
 
 
 async def get_services_duration_and_price(
@@ -2521,118 +2139,13 @@ async def create_composite_booking(
 ) -> Booking:
     """Create a booking with multiple services snapshot into booking_items and total price snapshot on Booking.
 
-    The Booking.service_id will be set to the first service id for backward compatibility; detailed list stored in BookingItem rows.
+    Booking items keep the requested order (``position``) with a per-item price snapshot.
     """
     if not service_ids:
         raise ValueError("service_ids must not be empty")
-    try:
-        totals = await get_services_duration_and_price(
-            service_ids, online_payment=False, master_id=master_id
-        )
-        async with get_session() as session:
-            # Compute proposed interval (use aggregated duration; exclusion constraints or commit will enforce uniqueness)
-            new_dur = (
-                int(totals.get("total_minutes") or 0) or await SettingsRepo.get_slot_duration()
-            )
-            new_start = slot
-            new_end = new_start + timedelta(minutes=new_dur)
-
-            # Acquire advisory lock for this (master_id, starts_at) pair to
-            # reduce race with expiration worker and other creators.
-            try:
-                from sqlalchemy import text
-
-                k1 = int(master_id) % 2147483647
-                k2 = int(new_start.timestamp()) % 2147483647
-                await session.execute(
-                    text("SELECT pg_advisory_xact_lock(:k1, :k2)"), {"k1": k1, "k2": k2}
-                )
-            except Exception:
-                # Best-effort only.
-                pass
-
-            # Optional lightweight locking: lock existing potentially overlapping rows to reduce race window.
-            try:
-                from bot.app.domain.models import Booking as _B
-
-                await session.execute(
-                    select(_B.id)
-                    .where(
-                        _B.master_id == master_id,
-                        _B.starts_at < new_end,
-                        _B.ends_at > new_start,
-                    )
-                    .with_for_update()
-                )
-                await session.execute(
-                    select(_B.id)
-                    .where(
-                        _B.user_id == client_id,
-                        _B.starts_at < new_end,
-                        _B.ends_at > new_start,
-                    )
-                    .with_for_update()
-                )
-            except Exception as e:
-                logger.exception("Row-level locking failed while creating composite booking: %s", e)
-                if REQUIRE_ROW_LOCK_STRICT:
-                    raise
-
-            price_cents = int(totals.get("total_price_cents", 0) or 0) or None
-            booking = await _create_booking_base(
-                session,
-                client_id,
-                master_id,
-                slot,
-                price_cents=price_cents,
-                hold_minutes=hold_minutes,
-                service_id=str(service_ids[0]),
-                duration_minutes=new_dur,
-            )
-            await session.flush()
-            # Add items with per-item price snapshot. Load current service prices
-            svc_rows = await session.execute(
-                select(Service.id, Service.price_cents).where(Service.id.in_(list(service_ids)))
-            )
-            svc_map = {str(r[0]): int(r[1] or 0) for r in svc_rows.all()}
-            for pos, sid in enumerate(service_ids):
-                item_price = svc_map.get(str(sid), 0)
-                session.add(
-                    BookingItem(
-                        booking_id=booking.id,
-                        service_id=str(sid),
-                        price_cents=item_price,
-                        position=pos,
-                    )
-                )
-            try:
-                await session.commit()
-            except IntegrityError as ie:
-                await session.rollback()
-                # Map constraint violation to user-friendly codes (generic fallback)
-                msg = str(ie).lower()
-                if "client" in msg:
-                    raise ValueError("client_already_has_booking_at_this_time") from ie
-                raise ValueError("slot_unavailable") from ie
-            await session.refresh(booking)
-            logger.info(
-                "Создана композитная запись №%s: client=%s master=%s services=%s",
-                booking.id,
-                client_id,
-                master_id,
-                list(service_ids),
-            )
-            return booking
-    except SQLAlchemyError as e:
-        logger.error(
-            "Ошибка создания композитной записи: client_id=%s, master_id=%s, services=%s, slot=%s, error=%s",
-            client_id,
-            master_id,
-            service_ids,
-            slot,
-            e,
-        )
-        raise
+    return await _insert_booking_atomic(
+        client_id, master_id, list(service_ids), slot, hold_minutes=hold_minutes
+    )
 
 
 async def book_slot(
@@ -2758,54 +2271,209 @@ async def get_client_active_bookings(user_id: int) -> list[Booking]:
         return []
 
 
-async def _create_booking_base(
-    session: Any,
+# Single-statement booking writer. Resolves the master (surrogate or legacy
+# telegram id), sums durations/prices with per-master overrides, checks client
+# and master overlaps, inserts the booking and its items - all in one round
+# trip. Races that slip past the overlap check are stopped by the
+# bookings_*_no_overlap exclusion constraints and mapped to the same codes.
+# Unknown / deleted service ids yield 'invalid_service' (no phantom booking).
+_ATOMIC_BOOKING_SQL = """
+WITH m AS (
+    SELECT id FROM masters
+    WHERE id = :master_ref OR telegram_id = :master_ref
+    ORDER BY (id = :master_ref) DESC
+    LIMIT 1
+),
+req AS (
+    SELECT r.sid, r.pos
+    FROM unnest(CAST(:service_ids AS varchar[])) WITH ORDINALITY AS r(sid, pos)
+),
+svc AS (
+    SELECT req.pos, s.id AS service_id, s.price_cents,
+           COALESCE(NULLIF(ms.duration_minutes, 0), NULLIF(s.duration_minutes, 0), 60) AS minutes
+    FROM req
+    LEFT JOIN services s ON s.id = req.sid
+    LEFT JOIN master_services ms ON ms.master_id = (SELECT id FROM m) AND ms.service_id = req.sid
+),
+span AS (
+    SELECT CAST(:starts_at AS timestamptz) AS starts_at,
+           CAST(:starts_at AS timestamptz)
+               + make_interval(mins => COALESCE(NULLIF(SUM(svc.minutes), 0), :default_minutes)::int)
+               AS ends_at,
+           COALESCE(SUM(svc.price_cents), 0) AS price_cents
+    FROM svc
+),
+verdict AS (
+    SELECT CASE
+        WHEN NOT EXISTS (SELECT 1 FROM m) THEN 'master_not_found'
+        WHEN EXISTS (SELECT 1 FROM svc WHERE svc.service_id IS NULL) THEN 'invalid_service'
+        WHEN EXISTS (
+            SELECT 1 FROM bookings b, span
+            WHERE b.user_id = :client_id
+              AND b.status IN (__ACTIVE__)
+              AND b.starts_at >= span.starts_at - interval '12 hours'
+              AND b.starts_at < span.ends_at
+              AND COALESCE(b.ends_at, b.starts_at + make_interval(mins => :default_minutes))
+                  > span.starts_at
+        ) THEN 'client_already_has_booking_at_this_time'
+        WHEN EXISTS (
+            SELECT 1 FROM bookings b, span
+            WHERE b.master_id = (SELECT id FROM m)
+              AND b.status IN (__ACTIVE__)
+              AND b.starts_at >= span.starts_at - interval '12 hours'
+              AND b.starts_at < span.ends_at
+              AND COALESCE(b.ends_at, b.starts_at + make_interval(mins => :default_minutes))
+                  > span.starts_at
+        ) THEN 'slot_unavailable'
+    END AS code
+),
+ins AS (
+    INSERT INTO bookings (
+        user_id, master_id, status, starts_at, ends_at, created_at,
+        original_price_cents, final_price_cents, cash_hold_expires_at,
+        remind_24h_sent, remind_1h_sent
+    )
+    SELECT :client_id, m.id, 'reserved', span.starts_at, span.ends_at, :now,
+           NULLIF(span.price_cents, 0), NULLIF(span.price_cents, 0), :hold_until,
+           false, false
+    FROM m, span, verdict
+    WHERE verdict.code IS NULL
+    RETURNING *
+),
+items AS (
+    INSERT INTO booking_items (booking_id, service_id, price_cents, position)
+    SELECT ins.id, svc.service_id, COALESCE(svc.price_cents, 0), svc.pos - 1
+    FROM ins, svc
+    WHERE svc.service_id IS NOT NULL
+)
+SELECT verdict.code AS conflict_code, ins.*
+FROM verdict LEFT JOIN ins ON true
+""".replace("__ACTIVE__", ", ".join(sorted(f"'{st.value}'" for st in ACTIVE_STATUSES)))
+
+
+# Until the exclusion constraints are confirmed (e.g. a database migrated
+# before b7e2c4d91f30) the writer takes the (master, start) advisory lock the
+# expiration worker uses before running the statement. Only a positive check
+# is cached.
+_OVERLAP_CONSTRAINTS = ("bookings_master_no_overlap", "bookings_client_no_overlap")
+_overlap_constraints_ok = False
+
+_SLOT_LOCK_SQL = """
+SELECT pg_advisory_xact_lock(CAST(id % 2147483647 AS integer), :k2)
+FROM masters
+WHERE id = :master_ref OR telegram_id = :master_ref
+ORDER BY (id = :master_ref) DESC
+LIMIT 1
+"""
+
+
+async def _lock_unless_constrained(session: Any, master_ref: int, slot: datetime) -> None:
+    """Serialize writers on the slot when the overlap constraints are missing."""
+    global _overlap_constraints_ok
+    from sqlalchemy import text
+
+    if _overlap_constraints_ok:
+        return
+    bind = getattr(session, "bind", None)
+    if getattr(getattr(bind, "dialect", None), "name", None) != "postgresql":
+        return
+    found = await session.scalar(
+        text("SELECT count(*) FROM pg_constraint WHERE contype = 'x' AND conname = ANY(:names)"),
+        {"names": list(_OVERLAP_CONSTRAINTS)},
+    )
+    if int(found or 0) == len(_OVERLAP_CONSTRAINTS):
+        _overlap_constraints_ok = True
+        return
+    logger.warning("Booking overlap constraints missing: using the slot advisory lock")
+    await session.execute(
+        text(_SLOT_LOCK_SQL),
+        {"master_ref": int(master_ref), "k2": int(slot.timestamp()) % 2147483647},
+    )
+
+
+def _booking_conflict_code(exc: IntegrityError) -> str:
+    """Map a constraint violation raised by the booking writer to an error code."""
+    msg = str(getattr(exc, "orig", exc)).lower()
+    if "client" in msg:
+        return "client_already_has_booking_at_this_time"
+    return "slot_unavailable"
+
+
+async def _insert_booking_atomic(
     client_id: int,
     master_id: int,
+    service_ids: Sequence[str],
     slot: datetime,
     *,
-    price_cents: int | None = None,
     hold_minutes: int | None = None,
-    service_id: str | None = None,
-    duration_minutes: int | None = None,
 ) -> Booking:
-    """Internal helper: populate Booking object, add to session, but do not commit outer changes.
+    """Create a RESERVED booking (+ booking_items) in a single statement.
 
-    The caller is responsible for committing if needed. This centralizes setting created_at,
-    cash_hold_expires_at, and price snapshot fields.
+    Raises ``ValueError`` with ``master_not_found``, ``invalid_service``,
+    ``slot_unavailable`` or ``client_already_has_booking_at_this_time``. The returned Booking is a
+    detached snapshot of the inserted row.
     """
-    booking = Booking(
-        user_id=client_id,
-        master_id=master_id,
-        starts_at=slot,
-        status=BookingStatus.RESERVED,
-        created_at=utc_now(),
-    )
-    try:
-        if price_cents is not None and price_cents > 0:
-            booking.original_price_cents = int(price_cents)
-            booking.final_price_cents = int(price_cents)
-    except Exception:
-        pass
+    from sqlalchemy import text
+
     _hold = (
         hold_minutes
         if hold_minutes is not None
         else await SettingsRepo.get_reservation_hold_minutes()
     )
-    booking.cash_hold_expires_at = utc_now() + timedelta(minutes=max(1, _hold))
-    # Determine and set ends_at for exclusion constraint correctness.
+    default_minutes = await SettingsRepo.get_slot_duration()
+    now = utc_now()
+    params = {
+        "master_ref": int(master_id),
+        "client_id": int(client_id),
+        "service_ids": [str(sid) for sid in service_ids],
+        "starts_at": slot,
+        "default_minutes": int(default_minutes or 60),
+        "now": now,
+        "hold_until": now + timedelta(minutes=max(1, int(_hold))),
+    }
     try:
-        # Prefer explicit caller-provided duration; otherwise resolve via helper
-        if duration_minutes and int(duration_minutes) > 0:
-            duration_min = int(duration_minutes)
-        else:
-            duration_min = await get_service_duration(session, service_id, master_id)
-        booking.ends_at = slot + timedelta(minutes=int(duration_min))
-    except Exception:
-        # best-effort: if we can't compute ends_at, leave it None and rely
-        # on DB-level checks (commit may fail). Prefer not to crash here.
-        pass
-    session.add(booking)
+        async with get_session() as session:
+            try:
+                await _lock_unless_constrained(session, int(master_id), slot)
+                row = (await session.execute(text(_ATOMIC_BOOKING_SQL), params)).one()
+                await session.commit()
+            except IntegrityError as ie:
+                with suppress(Exception):
+                    await session.rollback()
+                code = _booking_conflict_code(ie)
+                logger.info("Booking insert rejected by constraint (%s): %s", code, ie)
+                raise ValueError(code) from ie
+    except SQLAlchemyError as e:
+        logger.error(
+            "Ошибка создания записи: client_id=%s, master_id=%s, services=%s, slot=%s, error=%s",
+            client_id,
+            master_id,
+            list(service_ids),
+            slot,
+            e,
+        )
+        raise
+
+    data = dict(row._mapping)
+    code = data.pop("conflict_code", None)
+    if code:
+        raise ValueError(str(code))
+    columns = Booking.__table__.columns.keys()
+    booking = Booking(**{k: v for k, v in data.items() if k in columns})
+    booking.status = normalize_booking_status(data.get("status")) or BookingStatus.RESERVED
+    from bot.app.services.month_availability import invalidate_month_availability
+
+    invalidate_month_availability(booking.master_id)
+    logger.info(
+        "Создана запись №%s: client_id=%s, master_id=%s (resolved=%s), services=%s, slot=%s, expires_at=%s",
+        booking.id,
+        client_id,
+        master_id,
+        booking.master_id,
+        list(service_ids),
+        slot,
+        booking.cash_hold_expires_at,
+    )
     return booking
 
 
@@ -3023,7 +2691,8 @@ async def record_booking_rating(booking_id: int, rating: int) -> dict[str, Any]:
             return {"status": "invalid"}
 
         async with get_session() as session:
-            booking = await session.get(Booking, booking_id)
+            # Row lock: concurrent ratings of one booking must not both pass the check below
+            booking = await session.get(Booking, booking_id, with_for_update=True)
             if not booking:
                 logger.warning("Запись не найдена для оценки: id=%s", booking_id)
                 return {"status": "not_found"}
@@ -3038,6 +2707,10 @@ async def record_booking_rating(booking_id: int, rating: int) -> dict[str, Any]:
 
             new_rating = BookingRating(booking_id=booking.id, rating=rating)
             session.add(new_rating)
+            from bot.app.services.master_stats import apply_rating
+
+            await session.flush()
+            await apply_rating(session, booking.master_id, rating)
             await session.commit()
             logger.info("Оценка %d записана для записи #%s", rating, booking_id)
             return {"status": "ok"}
@@ -3290,6 +2963,8 @@ async def _send_reschedule_notifications(
             recipients.extend(get_admin_ids())
 
         if recipients:
+            from aiogram import Bot
+
             bot = Bot(BOT_TOKEN)
             try:
                 await send_booking_notification(
@@ -3464,6 +3139,8 @@ async def process_booking_finalization(
             return {"ok": False, "error": "invalid_amount", "booking_id": None}
 
         invoice_url = None
+        from aiogram import Bot
+
         bot = Bot(BOT_TOKEN)
         try:
             from aiogram.types import LabeledPrice
@@ -3552,6 +3229,8 @@ async def _notify_after_cash_confirmation(
             recipients.extend(get_admin_ids())
         if not recipients:
             return
+        from aiogram import Bot
+
         bot = Bot(BOT_TOKEN)
         try:
             await send_booking_notification(bot, booking_id, "cash_confirmed", recipients)
@@ -3605,6 +3284,8 @@ async def process_invoice_link(user_id: int, booking_id: int) -> BookingResult:
             prices = []
 
     currency = getattr(b, "currency", None) or "USD"
+    from aiogram import Bot
+
     bot = Bot(BOT_TOKEN)
     try:
         provider_token = TELEGRAM_PROVIDER_TOKEN or None
@@ -0,0 +1,268 @@
+"""Per master/client CRM summary (``master_client_summary``).
+
+One row per (master, client) pair holds completed visits, spend, no-shows,
+the last and the next visit and a pointer to the master's note, so the
+master's client list is a single indexed, sortable and paginated query and
+the client card reads one row instead of the client's whole booking history.
+
+Rows are recomputed from ``bookings`` for the affected pairs only, inside the
+writer's transaction:
+
+* ``transition_bookings`` - every status batch (done / no-show / cancel /
+  expire, admin edits);
+* payment finalization (confirm / paid) and reschedule;
+* the master's note upserts (refresh the note pointer).
+
+A pair recompute is one ``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` over
+that pair's bookings (index ``(master_id, user_id)`` friendly), so
+``next_visit_at`` stays correct when the upcoming booking is cancelled or
+moved, which plain deltas cannot do. It runs in a savepoint and is
+best-effort: a failure never blocks the booking change.
+``rebuild_client_summaries`` (``python -m bot.app.run_bot
+rebuild-client-summaries``) recomputes every pair and is safe while live.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.app.core.db import get_session, read_session
+from bot.app.domain.models import (
+    ACTIVE_STATUSES,
+    REVENUE_STATUSES,
+    Booking,
+    BookingStatus,
+    MasterClientNote,
+    MasterClientSummary,
+    User,
+)
+from bot.app.services.shared_services import utc_now
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CLIENT_SORTS",
+    "DEFAULT_SORT",
+    "ClientSummaryRow",
+    "ClientsPage",
+    "build_refresh_statement",
+    "get_client_summary",
+    "get_clients_page",
+    "rebuild_client_summaries",
+    "refresh_client_summaries",
+]
+
+_S = MasterClientSummary
+
+# sort key -> ORDER BY (user_id last keeps pages stable on ties)
+CLIENT_SORTS: dict[str, tuple[Any, ...]] = {
+    "last": (_S.last_visit_at.desc().nullslast(), _S.user_id),
+    "spend": (_S.spend_cents.desc(), _S.last_visit_at.desc().nullslast(), _S.user_id),
+    "no_shows": (_S.no_shows.desc(), _S.last_visit_at.desc().nullslast(), _S.user_id),
+}
+DEFAULT_SORT = "last"
+
+_COLS = [
+    "master_id",
+    "user_id",
+    "visits",
+    "spend_cents",
+    "no_shows",
+    "last_visit_at",
+    "next_visit_at",
+    "note_id",
+    "updated_at",
+]
+
+
+@dataclass(frozen=True)
+class ClientSummaryRow:
+    user_id: int
+    name: str | None = None
+    username: str | None = None
+    visits: int = 0
+    spend_cents: int = 0
+    no_shows: int = 0
+    last_visit_at: datetime | None = None
+    next_visit_at: datetime | None = None
+    note_id: int | None = None
+
+    @classmethod
+    def from_row(
+        cls, summary: Any, name: str | None = None, username: str | None = None
+    ) -> ClientSummaryRow:
+        return cls(
+            user_id=int(summary.user_id),
+            name=name,
+            username=username,
+            visits=int(summary.visits or 0),
+            spend_cents=int(summary.spend_cents or 0),
+            no_shows=int(summary.no_shows or 0),
+            last_visit_at=summary.last_visit_at,
+            next_visit_at=summary.next_visit_at,
+            note_id=summary.note_id,
+        )
+
+    def upcoming(self, now: datetime | None = None) -> datetime | None:
+        """``next_visit_at`` unless it already passed (rows refresh on change, not on time)."""
+        nxt = self.next_visit_at
+        if nxt is None:
+            return None
+        if nxt.tzinfo is None:  # SQLite hands back naive values
+            nxt = nxt.replace(tzinfo=UTC)
+        return nxt if nxt >= (now or utc_now()) else None
+
+
+@dataclass(frozen=True)
+class ClientsPage:
+    items: list[ClientSummaryRow] = field(default_factory=list)
+    total: int = 0
+    page: int = 1
+    pages: int = 0
+    sort: str = DEFAULT_SORT
+
+
+def _pairs(pairs: Iterable[tuple[Any, Any]]) -> list[tuple[int, int]]:
+    return sorted({(int(m), int(u)) for m, u in pairs if m is not None and u is not None})
+
+
+def build_refresh_statement(now: datetime, pairs: Iterable[tuple[Any, Any]] | None = None) -> Any:
+    """``INSERT ... SELECT`` of absolute values for ``pairs`` (every pair when ``None``)."""
+    done = Booking.status == BookingStatus.DONE
+    no_show = Booking.status == BookingStatus.NO_SHOW
+    revenue = Booking.status.in_(tuple(REVENUE_STATUSES))
+    upcoming = Booking.status.in_(tuple(ACTIVE_STATUSES)) & (Booking.starts_at >= now)
+    price = func.coalesce(Booking.final_price_cents, Booking.original_price_cents, 0)
+    note = (
+        select(func.max(MasterClientNote.id))
+        .where(
+            MasterClientNote.master_id == Booking.master_id,
+            MasterClientNote.user_id == Booking.user_id,
+        )
+        .scalar_subquery()
+    )
+    source = select(
+        Booking.master_id,
+        Booking.user_id,
+        func.count().filter(done),
+        func.coalesce(func.sum(price).filter(revenue), 0),
+        func.count().filter(no_show),
+        func.max(Booking.starts_at).filter(done),
+        func.min(Booking.starts_at).filter(upcoming),
+        note,
+        literal(now, type_=_S.__table__.c.updated_at.type),
+    ).where(Booking.master_id.is_not(None))
+    if pairs is not None:
+        source = source.where(tuple_(Booking.master_id, Booking.user_id).in_(list(pairs)))
+    source = source.group_by(Booking.master_id, Booking.user_id)
+    stmt = pg_insert(_S).from_select(_COLS, source)
+    return stmt.on_conflict_do_update(
+        index_elements=[_S.master_id, _S.user_id],
+        set_={c: getattr(stmt.excluded, c) for c in _COLS if c not in ("master_id", "user_id")},
+    )
+
+
+async def refresh_client_summaries(
+    session: AsyncSession, pairs: Iterable[tuple[Any, Any]], *, now: datetime | None = None
+) -> bool:
+    """Recompute the (master_id, user_id) ``pairs`` in the caller's transaction."""
+    keys = _pairs(pairs)
+    if not keys:
+        return True
+    try:
+        async with session.begin_nested():
+            await session.execute(build_refresh_statement(now or utc_now(), keys))
+        return True
+    except Exception:
+        logger.exception(
+            "client_summary: refresh failed for %s (run rebuild-client-summaries)", keys[:10]
+        )
+        return False
+
+
+async def rebuild_client_summaries(*, now: datetime | None = None) -> int:
+    """Recompute every pair from ``bookings``. Returns rows written."""
+    async with get_session() as session:
+        res = await session.execute(build_refresh_statement(now or utc_now()))
+        await session.commit()
+    count = int(getattr(res, "rowcount", 0) or 0)
+    logger.info("client_summary: rebuilt %d rows", count)
+    return count
+
+
+async def get_clients_page(
+    master_id: int, *, sort: str | None = None, page: int = 1, page_size: int = 5
+) -> ClientsPage:
+    """One page of the master's clients ordered by ``sort`` (see ``CLIENT_SORTS``).
+
+    ``page`` is 1-indexed and clamped to the last page.
+    """
+    sort = sort if sort in CLIENT_SORTS else DEFAULT_SORT
+    page_size = max(1, int(page_size))
+    try:
+        async with read_session("history") as session:
+            total = int(
+                await session.scalar(
+                    select(func.count()).select_from(_S).where(_S.master_id == int(master_id))
+                )
+                or 0
+            )
+            pages = (total + page_size - 1) // page_size
+            page = min(max(1, int(page or 1)), pages or 1)
+            if not total:
+                return ClientsPage(total=0, page=1, pages=0, sort=sort)
+            res = await session.execute(
+                select(_S, User.name, User.username)
+                .join(User, User.id == _S.user_id)
+                .where(_S.master_id == int(master_id))
+                .order_by(*CLIENT_SORTS[sort])
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+            )
+            items = [ClientSummaryRow.from_row(s, n, u) for s, n, u in res.all()]
+    except Exception:
+        logger.exception("client_summary: page lookup failed for master %s", master_id)
+        return ClientsPage(sort=sort)
+    return ClientsPage(items=items, total=total, page=page, pages=pages, sort=sort)
+
+
+async def get_client_summary(
+    master_id: int, user_id: int
+) -> tuple[ClientSummaryRow, str | None] | None:
+    """The pair's summary row and note text; ``None`` when the user does not exist.
+
+    Clients without a row yet (no booking change since the rollout) get zeros.
+    """
+    try:
+        async with read_session("history") as session:
+            row = (
+                await session.execute(
+                    select(User.name, User.username, _S, MasterClientNote.note)
+                    .outerjoin(_S, (_S.user_id == User.id) & (_S.master_id == int(master_id)))
+                    .outerjoin(
+                        MasterClientNote,
+                        (MasterClientNote.user_id == User.id)
+                        & (MasterClientNote.master_id == int(master_id)),
+                    )
+                    .where(User.id == int(user_id))
+                    .order_by(MasterClientNote.id.desc())
+                    .limit(1)
+                )
+            ).first()
+    except Exception:
+        logger.exception("client_summary: lookup failed for %s/%s", master_id, user_id)
+        return None
+    if row is None:
+        return None
+    name, username, summary, note = row
+    if summary is None:
+        return ClientSummaryRow(user_id=int(user_id), name=name, username=username), note
+    return ClientSummaryRow.from_row(summary, name, username), note
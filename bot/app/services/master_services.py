@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import logging
 from contextlib import suppress
+from dataclasses import dataclass
 from datetime import UTC, datetime, date as _date, time as _time, timedelta
-from typing import Any, cast
-from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any, cast
+from collections.abc import Iterable, Mapping, Sequence
 import re
 import sqlalchemy as sa
 
@@ -19,12 +20,14 @@ from bot.app.core.constants import (
     DEFAULT_TIME_STEP_MINUTES,
 )
 
-from bot.app.core.db import get_session
+from bot.app.core.cache_bus import Topic, publish, subscribe
+from bot.app.core.db import get_session, read_session
 from bot.app.domain.models import (
     Booking,
     BookingStatus,
     TERMINAL_STATUSES,
 )
+from bot.app.domain.schedule_grid import MasterGrid, mask_windows, span_mask
 from bot.app.services.admin_services import ServiceRepo, SettingsRepo
 from bot.app.services.shared_services import (
     format_money_cents,
@@ -37,11 +40,14 @@ from bot.app.services.shared_services import (
     format_booking_list_item,
     format_booking_details_text,
     get_local_tz,
+    local_days,
     format_user_display_name,
     utc_now,
 )
 from bot.app.translations import tr, t
-from aiogram.types import InlineKeyboardMarkup
+
+if TYPE_CHECKING:
+    from aiogram.types import InlineKeyboardMarkup
 
 logger = logging.getLogger(__name__)
 
@@ -318,35 +324,15 @@ async def get_master_dashboard_summary(master_id: int, *, lang: str | None = Non
             resolved_mid = None
         mid = resolved_mid or int(master_id)
 
-        # Pre-compute rating summary for header (always show, default 0.0)
+        # Rating summary for the header (always show, default 0.0): one master_stats row
         rating_line = ""
         try:
-            async with get_session() as session:
-                from sqlalchemy import select
-                from bot.app.domain.models import BookingRating, Booking
-
-                res = await session.execute(
-                    select(func.avg(BookingRating.rating), func.count(BookingRating.rating))
-                    .select_from(BookingRating)
-                    .join(Booking, Booking.id == BookingRating.booking_id)
-                    .where(Booking.master_id == mid)
-                )
-                rating_avg, ratings_count = res.one_or_none() or (0.0, 0)
-
-                completed_orders = int(
-                    (
-                        await session.execute(
-                            select(func.count())
-                            .select_from(Booking)
-                            .where(Booking.master_id == mid, Booking.status == BookingStatus.DONE)
-                        )
-                    ).scalar()
-                    or 0
-                )
+            from bot.app.services.master_stats import get_master_stats
 
-                rating_label = tr("rating_label", lang=lang_value)
-                orders_word = tr("orders", lang=lang_value)
-                rating_line = f"⭐ {rating_label}: {float(rating_avg or 0.0):.1f}/5 ({completed_orders} {orders_word})"
+            rep = await get_master_stats(mid)
+            rating_label = tr("rating_label", lang=lang_value)
+            orders_word = tr("orders", lang=lang_value)
+            rating_line = f"⭐ {rating_label}: {float(rep.rating_avg or 0.0):.1f}/5 ({rep.completed_orders} {orders_word})"
         except Exception:
             try:
                 rating_label = tr("rating_label", lang=lang_value)
@@ -355,15 +341,13 @@ async def get_master_dashboard_summary(master_id: int, *, lang: str | None = Non
             except Exception:
                 rating_line = ""
 
-        # compute local day bounds and convert to UTC
+        # local day bounds in UTC (memoized, DST-aware)
         local_tz = get_local_tz() or UTC
         try:
             now_utc = utc_now()
-            local_now = now_utc.astimezone(local_tz)
-            local_day_start = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
-            local_day_end = local_day_start + timedelta(days=1)
-            day_start_utc = local_day_start.astimezone(UTC)
-            day_end_utc = local_day_end.astimezone(UTC)
+            today = local_days().day_of(now_utc)
+            day_start_utc, day_end_utc = today.start, today.end
+            local_day_start = day_start_utc.astimezone(local_tz)
         except Exception:
             now_utc = utc_now()
             day_start_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -400,7 +384,7 @@ async def get_master_dashboard_summary(master_id: int, *, lang: str | None = Non
         # totals caused by limiting page_size above (previous bug: totals
         # reflected only first 5 bookings).
         try:
-            async with get_session() as session:
+            async with read_session("dashboard") as session:
                 counts_stmt = select(
                     func.count(Booking.id).label("total"),
                     func.sum(case((Booking.status == BookingStatus.DONE, 1), else_=0)).label(
@@ -681,7 +665,12 @@ async def handle_cancel_note(
 
 
 def invalidate_masters_cache() -> None:
-    """Invalidate masters cache (useful after CRUD)."""
+    """Invalidate masters cache (useful after CRUD) in every process."""
+    publish(Topic.ROLES)
+
+
+@subscribe(Topic.ROLES)
+def _drop_masters_cache(_key: str | None = None) -> None:
     global _masters_cache_store
     _masters_cache_store = None
     # Also clear resolve cache so future lookups hit DB once and refresh.
@@ -722,6 +711,22 @@ class MasterRepo:
             logger.exception("MasterRepo._resolve_mid failed for %s: %s", master_identifier, e)
             return None
 
+    @staticmethod
+    def _schedule_from_rows(rows: Sequence[Any]) -> dict[str, Any]:
+        """(day_of_week, start_time, end_time) rows -> normalized schedule dict."""
+        if not rows:
+            return {}
+        sched: dict[str, list[list[str]]] = {}
+        for dow, st, et in rows:
+            try:
+                s = format_slot_label(st, fmt="%H:%M") if st is not None else str(st)
+                e = format_slot_label(et, fmt="%H:%M") if et is not None else str(et)
+            except Exception:
+                s = str(st)
+                e = str(et)
+            sched.setdefault(str(int(dow)), []).append([s, e])
+        return _normalize_schedule(sched)
+
     @staticmethod
     async def get_schedule(master_id: int) -> dict[str, Any]:
         """Return normalized schedule dict (DB-only).
@@ -748,21 +753,7 @@ class MasterRepo:
                     .order_by(MasterSchedule.day_of_week, MasterSchedule.start_time)
                 )
                 ms_res = await session.execute(ms_stmt)
-                rows = ms_res.all()
-                if not rows:
-                    return {}
-                sched: dict[str, list[list[str]]] = {}
-                for dow, st, et in rows:
-                    try:
-                        s = format_slot_label(st, fmt="%H:%M") if st is not None else str(st)
-                        e = format_slot_label(et, fmt="%H:%M") if et is not None else str(et)
-                    except Exception:
-                        s = str(st)
-                        e = str(et)
-                    sched.setdefault(str(int(dow)), []).append([s, e])
-                from bot.app.services.master_services import _normalize_schedule
-
-                return _normalize_schedule(sched)
+                return MasterRepo._schedule_from_rows(ms_res.all())
         except Exception as e:
             logger.warning("MasterRepo.get_schedule failed for %s: %s", master_id, e)
             return {}
@@ -813,6 +804,9 @@ class MasterRepo:
                             )
                         )
                 await session.commit()
+            from bot.app.services.month_availability import invalidate_month_availability
+
+            invalidate_month_availability(int(mid))
             logger.info("MasterRepo.set_schedule: schedule set for %s", master_id)
             return True
         except Exception as e:
@@ -1137,6 +1131,10 @@ class MasterRepo:
                         note=note_text,
                     )
                     session.add(note)
+                    from bot.app.services.client_summary import refresh_client_summaries
+
+                    # point the CRM summary at the new note
+                    await refresh_client_summaries(session, [(booking.master_id, booking.user_id)])
                 await session.commit()
                 logger.info(
                     "MasterRepo.upsert_client_note: note updated for booking %s master=%s user=%s",
@@ -1218,7 +1216,7 @@ class MasterRepo:
         Mapping contains keys: name, visits, total_spent_cents, last_visit, note, rating
         """
         try:
-            async with get_session() as session:
+            async with read_session("history") as session:
                 from bot.app.domain.models import Booking
 
                 current_booking = await session.get(Booking, booking_id)
@@ -1244,11 +1242,12 @@ class MasterRepo:
         """Return a mapping with client history for the given master/user pair.
 
         Mapping contains keys: name, visits, total_spent_cents, last_visit, note
+        (plus no_shows and next_visit). Read from ``master_client_summary``.
         """
         try:
-            async with get_session() as session:
-                from sqlalchemy import select, and_
-                from bot.app.domain.models import Booking, MasterClientNote, User, Master
+            async with read_session("history") as session:
+                from sqlalchemy import select
+                from bot.app.domain.models import Master
 
                 # Resolve surrogate master id from provided telegram id or accept if already surrogate
                 mid = await session.scalar(
@@ -1260,83 +1259,44 @@ class MasterRepo:
                     )
                 if not mid:
                     return None
+            from bot.app.services.client_summary import get_client_summary
 
-                history_stmt = (
-                    select(Booking)
-                    .where(Booking.user_id == int(user_id), Booking.master_id == int(mid))
-                    .order_by(Booking.starts_at.desc())
-                )
-                history_result = await session.execute(history_stmt)
-                all_bookings = history_result.scalars().all()
-
-                note = await session.scalar(
-                    select(MasterClientNote.note).where(
-                        and_(
-                            MasterClientNote.master_id == int(mid),
-                            MasterClientNote.user_id == int(user_id),
-                        )
-                    )
-                )
-
-                total_spent_cents = 0
-                try:
-                    for b in all_bookings:
-                        if getattr(b, "status", None) in (
-                            (
-                                __import__(
-                                    "bot.app.domain.models", fromlist=["BookingStatus"]
-                                ).BookingStatus
-                            ).PAID,
-                            (
-                                __import__(
-                                    "bot.app.domain.models", fromlist=["BookingStatus"]
-                                ).BookingStatus
-                            ).CONFIRMED,
-                            (
-                                __import__(
-                                    "bot.app.domain.models", fromlist=["BookingStatus"]
-                                ).BookingStatus
-                            ).DONE,
-                        ):
-                            total_spent_cents += int(
-                                getattr(b, "final_price_cents", None)
-                                or getattr(b, "original_price_cents", 0)
-                                or 0
-                            )
-                except Exception:
-                    total_spent_cents = 0
-
-                user = await session.get(User, user_id)
-                texts = _MASTER_TEXT_DEFAULTS
-                # Use configured currency (SettingsRepo) rather than hardcoded UAH
-                try:
-                    cur_code = await SettingsRepo.get_currency()
-                except Exception:
-                    from bot.app.services.shared_services import _default_currency
+            found = await get_client_summary(int(mid), int(user_id))
+            texts = _MASTER_TEXT_DEFAULTS
+            summary, note = found if found else (None, None)
+            # Use configured currency (SettingsRepo) rather than hardcoded UAH
+            try:
+                cur_code = await SettingsRepo.get_currency()
+            except Exception:
+                from bot.app.services.shared_services import _default_currency
 
-                    cur_code = _default_currency()
-                history = {
-                    "name": (
-                        getattr(user, "name", None)
-                        if user
-                        else texts.get("unknown_client", "unknown")
-                    ),
-                    "visits": len(all_bookings),
-                    "total_spent_cents": total_spent_cents,
-                    "total_spent": format_money_cents(total_spent_cents, cur_code),
-                    "last_visit": (
-                        format_date(all_bookings[0].starts_at, "%d.%m.%Y")
-                        if all_bookings
-                        else texts.get("no_visits", "Нет")
-                    ),
-                    "note": note or texts.get("no_notes", ""),
-                }
-                logger.info(
-                    "MasterRepo.get_client_history_for_master_by_user: history built for master=%s user=%s",
-                    master_telegram_id,
-                    user_id,
-                )
-                return history
+                cur_code = _default_currency()
+            spent = summary.spend_cents if summary else 0
+            upcoming = summary.upcoming() if summary else None
+            history = {
+                "name": (
+                    summary.name
+                    if summary and summary.name
+                    else texts.get("unknown_client", "unknown")
+                ),
+                "visits": summary.visits if summary else 0,
+                "no_shows": summary.no_shows if summary else 0,
+                "total_spent_cents": spent,
+                "total_spent": format_money_cents(spent, cur_code),
+                "last_visit": (
+                    format_date(summary.last_visit_at, "%d.%m.%Y")
+                    if summary and summary.last_visit_at
+                    else texts.get("no_visits", "Нет")
+                ),
+                "next_visit": format_date(upcoming, "%d.%m.%Y %H:%M") if upcoming else None,
+                "note": note or texts.get("no_notes", ""),
+            }
+            logger.info(
+                "MasterRepo.get_client_history_for_master_by_user: history built for master=%s user=%s",
+                master_telegram_id,
+                user_id,
+            )
+            return history
         except Exception as e:
             logger.exception(
                 "MasterRepo.get_client_history_for_master_by_user failed for %s/%s: %s",
@@ -1378,6 +1338,9 @@ class MasterRepo:
                         master_id=int(mid), user_id=int(user_id), note=note_text
                     )
                     session.add(note)
+                    from bot.app.services.client_summary import refresh_client_summaries
+
+                    await refresh_client_summaries(session, [(int(mid), int(user_id))])
                 await session.commit()
             logger.info(
                 "MasterRepo.upsert_client_note_for_user: updated note for master=%s user=%s",
@@ -1396,7 +1359,11 @@ class MasterRepo:
 
     @staticmethod
     async def get_master_profile_data(master_id: int) -> dict[str, Any] | None:
-        """Fetch master profile composed data: master, services, durations_map, about_text, reviews."""
+        """Fetch master profile composed data: master, services, durations_map, about_text, reviews.
+
+        Also returns the rating header (from ``master_stats``) and the weekly
+        ``schedule`` so the profile endpoint needs no further round trips.
+        """
         try:
             async with get_session() as session:
                 from sqlalchemy import select
@@ -1432,37 +1399,13 @@ class MasterRepo:
 
                 services = [(str(r[0]), r[1], r[2], r[3], global_currency) for r in rows]
 
-                # Aggregate rating and completed orders for the profile header
-                rating_avg = None
-                ratings_count = 0
-                completed_orders = 0
-                try:
-                    rating_row = await session.execute(
-                        select(func.avg(BookingRating.rating), func.count(BookingRating.rating))
-                        .select_from(BookingRating)
-                        .join(Booking, Booking.id == BookingRating.booking_id)
-                        .where(Booking.master_id == master_id)
-                    )
-                    rating_avg, ratings_count = rating_row.one_or_none() or (None, 0)
-                except Exception:
-                    rating_avg, ratings_count = None, 0
+                # Rating and completed orders for the profile header: one master_stats row
+                from bot.app.services.master_stats import get_master_stats
 
-                try:
-                    completed_orders = int(
-                        (
-                            await session.execute(
-                                select(func.count())
-                                .select_from(Booking)
-                                .where(
-                                    Booking.master_id == master_id,
-                                    Booking.status == BookingStatus.DONE,
-                                )
-                            )
-                        ).scalar()
-                        or 0
-                    )
-                except Exception:
-                    completed_orders = 0
+                rep = await get_master_stats(int(master_id), session)
+                rating_avg = rep.rating_avg
+                ratings_count = rep.rating_count
+                completed_orders = rep.completed_orders
 
                 # Attach metrics to master instance for downstream formatter
                 with suppress(Exception):
@@ -1535,6 +1478,20 @@ class MasterRepo:
                 rev_res = await session.execute(reviews_stmt)
                 reviews = [(int(r[0]) if r[0] is not None else 0, r[1]) for r in rev_res.all()]
 
+                # weekly schedule in the same session (profile page shows it too)
+                from bot.app.domain.models import MasterSchedule
+
+                sched_res = await session.execute(
+                    select(
+                        MasterSchedule.day_of_week,
+                        MasterSchedule.start_time,
+                        MasterSchedule.end_time,
+                    )
+                    .where(MasterSchedule.master_id == master_id)
+                    .order_by(MasterSchedule.day_of_week, MasterSchedule.start_time)
+                )
+                schedule = MasterRepo._schedule_from_rows(sched_res.all())
+
                 data = {
                     "master": master,
                     "services": services,
@@ -1544,6 +1501,7 @@ class MasterRepo:
                     "rating": rating_avg,
                     "ratings_count": ratings_count,
                     "completed_orders": completed_orders,
+                    "schedule": schedule,
                 }
                 return data
         except Exception as e:
@@ -2050,6 +2008,31 @@ class MasterRepo:
             )
             return []
 
+    @staticmethod
+    async def get_clients_page(
+        master_telegram_id: int, *, sort: str | None = None, page: int = 1, page_size: int = 5
+    ) -> Any:
+        """Paginated, sortable client list (``ClientsPage``) from ``master_client_summary``.
+
+        ``sort`` is one of ``client_summary.CLIENT_SORTS`` ("last", "spend", "no_shows").
+        """
+        from bot.app.services.client_summary import ClientsPage, get_clients_page
+
+        try:
+            async with get_session() as session:
+                from sqlalchemy import select
+                from bot.app.domain.models import Master
+
+                mid = await session.scalar(
+                    select(Master.id).where(Master.telegram_id == int(master_telegram_id))
+                )
+        except Exception as e:
+            logger.exception("MasterRepo.get_clients_page failed for %s: %s", master_telegram_id, e)
+            mid = None
+        if not mid:
+            return ClientsPage()
+        return await get_clients_page(int(mid), sort=sort, page=page, page_size=page_size)
+
     @staticmethod
     async def get_masters_for_service(service_id: str) -> list[Any]:
         """Return list of Master models for a given service_id."""
@@ -2064,35 +2047,14 @@ class MasterRepo:
                 mid_rows = await session.execute(
                     select(MasterService.master_id).where(MasterService.service_id == service_id)
                 )
-                raw_mid_rows = mid_rows.all()
-                mids = [int(r[0]) for r in raw_mid_rows if r and r[0] is not None]
-
-                logger.info(
-                    "get_masters_for_service: service_id=%r -> raw_mid_rows=%r -> mids=%s",
-                    service_id,
-                    raw_mid_rows,
-                    mids,
-                )
-
+                mids = [int(r[0]) for r in mid_rows.all() if r and r[0] is not None]
                 if not mids:
-                    # Debug: sample master_services rows if none found
-                    try:
-                        all_rows = await session.execute(
-                            select(MasterService.master_id, MasterService.service_id)
-                        )
-                        logger.info(
-                            "get_masters_for_service: master_services full sample=%r",
-                            all_rows.all(),
-                        )
-                    except Exception:
-                        logger.info(
-                            "get_masters_for_service: failed to fetch master_services sample for debugging"
-                        )
+                    logger.debug("get_masters_for_service: no masters for %r", service_id)
                     return []
 
                 res = await session.execute(select(Master).where(Master.id.in_(mids)))
                 masters = list(res.scalars().all())
-                logger.info(
+                logger.debug(
                     "get_masters_for_service: service_id=%s -> master_ids=%s, masters_found=%d",
                     service_id,
                     mids,
@@ -2161,6 +2123,25 @@ class MasterRepo:
         except Exception:
             return None
 
+    @staticmethod
+    async def get_master_names(master_ids: Iterable[int]) -> dict[int, str]:
+        """Return ``{masters.id: name}`` for many masters in one query (surrogate ids only)."""
+        ids = sorted({int(i) for i in master_ids})
+        if not ids:
+            return {}
+        try:
+            async with get_session() as session:
+                from bot.app.domain.models import Master
+                from sqlalchemy import select
+
+                res = await session.execute(
+                    select(Master.id, Master.name).where(Master.id.in_(ids))
+                )
+                return {int(mid): str(name) for mid, name in res.all() if name}
+        except Exception:
+            logger.exception("MasterRepo.get_master_names failed for %s", ids)
+            return {}
+
     @staticmethod
     async def find_masters_for_services(service_ids: Sequence[str]) -> list[tuple[int, str | None]]:
         """Return masters who offer all given services: list of (telegram_id, name)."""
@@ -2266,6 +2247,8 @@ def format_client_history(hist: Mapping[str, Any], user_id: int, lang: str | Non
             (tr("master_total_visits", lang=lang_value) or "Visits", visits),
             (tr("master_total_spent", lang=lang_value) or "Spent", format_money_cents(spent)),
             (tr("master_last_visit", lang=lang_value) or "Last visit", hist.get("last_visit")),
+            (tr("master_next_booking", lang=lang_value) or "Next booking", hist.get("next_visit")),
+            (tr("master_no_shows", lang=lang_value) or "No-shows", hist.get("no_shows") or None),
             (tr("rating_label", lang=lang_value) or "Rating", rating_txt),
             (tr("master_note", lang=lang_value) or "Note", hist.get("note")),
         ]
@@ -2277,6 +2260,139 @@ def format_client_history(hist: Mapping[str, Any], user_id: int, lang: str | Non
         return ""
 
 
+@dataclass(frozen=True)
+class ScheduleConflict:
+    """A future booking that a (proposed) schedule no longer covers."""
+
+    booking_id: int
+    starts_at: datetime
+    local_start: datetime
+    status: Any
+    master_id: int | None
+    user_id: int | None
+    user_name: str | None
+    username: str | None
+
+    def client_label(self) -> str:
+        label = self.user_name or f"id:{self.user_id}"
+        return f"{label} (@{self.username})" if self.username else label
+
+
+def _windows_to_mask(windows: Sequence[Any] | None) -> int:
+    """Mask for schedule windows given as ``[["09:00", "13:00"], ...]`` or ``"09:00-13:00"``."""
+    mask = 0
+    for w in windows or ():
+        try:
+            if isinstance(w, (list, tuple)) and len(w) >= 2:
+                a, b = str(w[0]), str(w[1])
+            else:
+                a, b = str(w).split("-", 1)
+            mask |= span_mask(_parse_hm_to_minutes(a.strip()), _parse_hm_to_minutes(b.strip()))
+        except Exception:
+            continue
+    return mask
+
+
+def proposed_schedule_grid(
+    current: MasterGrid,
+    *,
+    weekly: Mapping[Any, Sequence[Any] | None] | None = None,
+    exceptions: Mapping[_date, Sequence[Any] | None] | None = None,
+) -> MasterGrid:
+    """Overlay a proposed weekly template / exceptions on the current grid.
+
+    ``weekly`` maps weekday (0=Mon, as str or int) to its windows; an empty
+    list closes the day, weekdays not mentioned keep their current template.
+    ``exceptions`` maps dates to windows (empty/None = day off) and overrides
+    stored exceptions for those dates.
+    """
+    week = list(current.weekly)
+    for key, windows in (weekly or {}).items():
+        with suppress(Exception):
+            wd = int(key)
+            if 0 <= wd <= 6:
+                week[wd] = _windows_to_mask(windows)
+    exc = dict(current.exceptions)
+    for d, windows in (exceptions or {}).items():
+        exc[d] = _windows_to_mask(windows)
+    return MasterGrid(weekly=tuple(week), exceptions=exc, fallback=current.fallback)
+
+
+def find_schedule_conflicts(
+    bookings: Sequence[Any],
+    grid: MasterGrid,
+    tz: Any,
+    *,
+    baseline: MasterGrid | None = None,
+    fallback_minutes: int = DEFAULT_SERVICE_FALLBACK_DURATION,
+) -> list[ScheduleConflict]:
+    """Bookings whose local ``[start, end)`` is not fully inside ``grid`` working time.
+
+    With ``baseline`` (the current grid), bookings already outside it are not
+    reported, so only conflicts introduced by the change remain. Pure; the
+    bookings are rows with ``booking_id/starts_at/ends_at/status/...``.
+    """
+    out: list[ScheduleConflict] = []
+    for b in bookings:
+        try:
+            starts = b.starts_at
+            ends = getattr(b, "ends_at", None) or starts + timedelta(minutes=fallback_minutes)
+            local = starts.astimezone(tz)
+            day = local.date()
+            s_min = local.hour * 60 + local.minute
+            dur = max(1, int(-(-(ends - starts).total_seconds() // 60)))
+            need = span_mask(s_min, s_min + dur)
+            if grid.work_mask(day) & need == need:
+                continue
+            if baseline is not None and baseline.work_mask(day) & need != need:
+                continue
+            out.append(
+                ScheduleConflict(
+                    booking_id=int(b.booking_id),
+                    starts_at=starts,
+                    local_start=local,
+                    status=getattr(b, "status", None),
+                    master_id=getattr(b, "master_id", None),
+                    user_id=getattr(b, "user_id", None),
+                    user_name=getattr(b, "user_name", None),
+                    username=getattr(b, "username", None),
+                )
+            )
+        except Exception:
+            continue
+    return out
+
+
+async def preview_schedule_change(
+    master_id: int,
+    *,
+    weekly: Mapping[Any, Sequence[Any] | None] | None = None,
+    exceptions: Mapping[_date, Sequence[Any] | None] | None = None,
+    horizon_days: int = 365,
+    only_new: bool = False,
+) -> list[ScheduleConflict]:
+    """What-if check of a schedule edit against the master's future bookings.
+
+    Loads the current grid (2 queries) and the master's non-terminal future
+    bookings with one ``(master_id, starts_at)`` range scan, then evaluates
+    everything in salon-local time in memory. Nothing is persisted, so the UI
+    can preview an edit before committing it. ``master_id`` may be the
+    surrogate id or a telegram id.
+    """
+    from bot.app.services.client_services import BookingRepo
+
+    mid = await MasterRepo.resolve_master_id(int(master_id))
+    if mid is None:
+        return []
+    tz = get_local_tz() or UTC
+    now = utc_now()
+    today = now.astimezone(tz).date()
+    current = await load_master_grid(mid, today, today + timedelta(days=horizon_days))
+    proposed = proposed_schedule_grid(current, weekly=weekly, exceptions=exceptions)
+    bookings = await BookingRepo.get_blocking_bookings(mid, now, now + timedelta(days=horizon_days))
+    return find_schedule_conflicts(bookings, proposed, tz, baseline=current if only_new else None)
+
+
 async def check_future_booking_conflicts(
     master_telegram_id: int,
     *,
@@ -2287,85 +2403,35 @@ async def check_future_booking_conflicts(
 ) -> list[str]:
     """Return a list of human-readable conflict strings for future bookings.
 
-    - If day_to_clear is provided, only bookings that fall into that weekday's
-      configured windows are considered.
-    - If clear_all is True, all weekdays configured in the master's schedule are
-      considered.
+    - If day_to_clear is provided, bookings covered by that weekday's windows
+      that clearing it would leave uncovered are returned.
+    - If clear_all is True, every weekday is cleared.
     - horizon_days bounds how far into the future we scan (default 365 days).
 
-    Returns a list of formatted strings like '#<id> 2025-01-01 09:00 — <client>'.
+    Returns a list of formatted strings like '#<id> 2025-01-01 09:00 — <client>'
+    (local time), or booking ids as strings when ``return_ids``.
     """
     try:
-        now = utc_now()
-        end = now + timedelta(days=horizon_days)
-        from bot.app.services.master_services import MasterRepo
-
-        sched = _normalize_schedule(await MasterRepo.get_schedule(master_telegram_id) or {})
-
         if clear_all:
-            days_to_check = set(range(7))
+            days_to_clear = range(7)
         elif day_to_clear is not None:
-            days_to_check = {int(day_to_clear)}
+            days_to_clear = range(int(day_to_clear), int(day_to_clear) + 1)
         else:
             return []
 
-        windows: list[tuple[int, int, int]] = []
-        for day in days_to_check:
-            raw_windows = sched.get(str(day)) or []
-            for w in raw_windows:
-                if not isinstance(w, (list, tuple)) or len(w) < 2:
-                    continue
-                try:
-                    a = str(w[0])
-                    b = str(w[1])
-                    a_min = _parse_hm_to_minutes(a)
-                    b_min = _parse_hm_to_minutes(b)
-                    if a_min >= b_min:
-                        continue
-                except Exception:
-                    continue
-                windows.append((day, a_min, b_min))
-
-        if not windows:
-            return []
-
-        try:
-            from bot.app.services.client_services import BookingRepo
-        except Exception as exc:
-            logger.exception("check_future_booking_conflicts: BookingRepo import failed: %s", exc)
-            return []
-
-        conflicts_source = await BookingRepo.get_conflicting_bookings_ids(
-            master_id=master_telegram_id,
-            windows=windows,
-            start=now,
-            end=end,
-            return_ids_only=return_ids,
+        found = await preview_schedule_change(
+            master_telegram_id,
+            weekly={d: [] for d in days_to_clear},
+            horizon_days=horizon_days,
+            only_new=True,
         )
-
         if return_ids:
-            return [str(r) for r in cast(list[int], conflicts_source)]
-
-        conflicts: list[str] = []
-        for row in conflicts_source:
-            try:
-                bid = getattr(row, "booking_id", None)
-                starts = getattr(row, "starts_at", None)
-                status = getattr(row, "status", None)
-                master_id = getattr(row, "master_id", None)
-                user_id = getattr(row, "user_id", None)
-                user_name = getattr(row, "user_name", None)
-                username = getattr(row, "username", None)
-                iso = starts.isoformat() if starts and hasattr(starts, "isoformat") else str(starts)
-                display_user = user_name or f"id:{user_id}"
-                if username:
-                    display_user = f"{display_user} (@{username})"
-                conflicts.append(
-                    f"#{bid} {iso} (master={master_id}) status={getattr(status, 'value', status)} — {display_user}"
-                )
-            except Exception:
-                continue
-        return conflicts
+            return [str(c.booking_id) for c in found]
+        return [
+            f"#{c.booking_id} {c.local_start:%Y-%m-%d %H:%M} (master={c.master_id}) "
+            f"status={getattr(c.status, 'value', c.status)} — {c.client_label()}"
+            for c in found
+        ]
     except Exception as e:
         logger.exception(
             "check_future_booking_conflicts failed for master %s: %s", master_telegram_id, e
@@ -2379,51 +2445,45 @@ async def cancel_bookings_and_notify(
     """Cancel bookings by id and notify clients + admins. Returns number cancelled.
 
     This centralizes the logic used by master and admin handlers so history is
-    preserved and notification logic is consistent.
+    preserved and notification logic is consistent. All bookings are cancelled
+    in one set-based transition (one statement, history included).
     """
     if not booking_ids:
         return 0
 
-    cancelled = 0
     try:
-        from bot.app.services.client_services import BookingRepo
+        from bot.app.services.transitions import transition_bookings
+
+        rows = await transition_bookings(BookingStatus.CANCELLED, ids=[int(b) for b in booking_ids])
     except Exception as e:
-        logger.exception("cancel_bookings_and_notify: BookingRepo unavailable: %s", e)
+        logger.exception("cancel_bookings_and_notify: transition failed: %s", e)
         return 0
     try:
         from bot.app.core.notifications import send_booking_notification
     except Exception:
         send_booking_notification = None
 
-    for bid in booking_ids:
+    admins = list(get_admin_ids() or []) if notify_admins else []
+    for row in rows:
+        bid = row.booking_id
+        # notify client + admins
         try:
             bd = await MasterRepo.get_booking_display_data(int(bid))
-            ok = await BookingRepo.set_cancelled(int(bid))
-            if ok:
-                cancelled += 1
-                # notify client + admins
-                try:
-                    client_tid = None
-                    if bd:
-                        client_tid = bd.get("client_telegram_id") if isinstance(bd, dict) else None
-                    recipients = []
-                    if client_tid:
-                        recipients.append(int(client_tid))
-                    if notify_admins:
-                        admins = get_admin_ids()
-                        if admins:
-                            recipients.extend(admins)
-                    # de-duplicate and send
-                    recipients = list(dict.fromkeys(recipients))
-                    if bot and recipients and send_booking_notification:
-                        await send_booking_notification(bot, int(bid), "cancelled", recipients)
-                except Exception:
-                    logger.exception("Failed to notify recipients for cancelled booking %s", bid)
+            client_tid = None
+            if bd:
+                client_tid = bd.get("client_telegram_id") if isinstance(bd, dict) else None
+            recipients = []
+            if client_tid:
+                recipients.append(int(client_tid))
+            recipients.extend(admins)
+            # de-duplicate and send
+            recipients = list(dict.fromkeys(recipients))
+            if bot and recipients and send_booking_notification:
+                await send_booking_notification(bot, int(bid), "cancelled", recipients)
         except Exception:
-            logger.exception("cancel_bookings_and_notify: failed for %s", bid)
-            continue
+            logger.exception("Failed to notify recipients for cancelled booking %s", bid)
 
-    return cancelled
+    return len(rows)
 
 
 async def cancel_booking(booking_id: int) -> bool:
@@ -2530,6 +2590,9 @@ async def set_master_schedule(
             for obj in to_add:
                 session.add(obj)
             await session.commit()
+        from bot.app.services.month_availability import invalidate_month_availability
+
+        invalidate_month_availability(int(mid))
         logger.info(
             "set_master_schedule: stored %d windows for master %s", len(to_add), master_telegram_id
         )
@@ -2615,41 +2678,12 @@ async def remove_schedule_window_by_value(
         if idx is None:
             # window disappeared or modified — treat as benign no-op
             return False, []
-        # Reuse conflict detection logic (specialize for single window)
-        conflicts: list[str] = []
-        # Use shared utc_now() helper to obtain an aware UTC datetime
-        now = utc_now()
-        try:
-            bookings = await MasterRepo.get_bookings_for_period(mid, start=now, days=365)
-        except SQLAlchemyError:
-            bookings = []
-        # a_min and b_min already computed above
-        for booking in bookings or []:
-            try:
-                starts = getattr(booking, "starts_at", None)
-                if not starts or starts.weekday() != d:
-                    continue
-                start_min = starts.hour * 60 + starts.minute
-                if start_min >= a_min and start_min < b_min:
-                    try:
-                        client, _ = await enrich_booking_context(booking)
-                        user_name = (
-                            getattr(client, "name", None) or f"id:{getattr(client, 'id', '?')}"
-                        )
-                    except SQLAlchemyError:
-                        user_name = f"id:{getattr(booking, 'user_id', '?')}"
-                    except Exception:
-                        user_name = f"id:{getattr(booking, 'user_id', '?')}"
-                    try:
-                        iso = starts.isoformat()
-                    except AttributeError:
-                        try:
-                            iso = format_date(starts, "%Y-%m-%d %H:%M")
-                        except Exception:
-                            iso = str(starts)
-                    conflicts.append(f"#{getattr(booking, 'id', '?')} {iso} — {user_name}")
-            except (AttributeError, ValueError, TypeError, SQLAlchemyError):
-                continue
+        # What-if: the day without this window, against future bookings (local time)
+        remaining = [w for i, w in enumerate(day_slots) if i != idx]
+        found = await preview_schedule_change(mid, weekly={d: remaining}, only_new=True)
+        conflicts = [
+            f"#{c.booking_id} {c.local_start:%Y-%m-%d %H:%M} — {c.client_label()}" for c in found
+        ]
         if conflicts:
             return False, conflicts
         # Perform removal and persist
@@ -2755,7 +2789,7 @@ async def get_master_stats_summary(master_telegram_id: int, *, days: int = 7) ->
         now = utc_now()
         start = now - timedelta(days=days)
         end = now
-        async with get_session() as session:
+        async with read_session("dashboard") as session:
             # Single aggregate query for counts and revenue
             agg_stmt = select(
                 func.count(Booking.id).label("total"),
@@ -2828,11 +2862,69 @@ async def get_master_stats_summary(master_telegram_id: int, *, days: int = 7) ->
         }
 
 
+def _default_window_mask() -> int:
+    """Mask of the configured default working window (09:00–18:00 if constants are invalid)."""
+    with suppress(Exception):
+        start_h = int(DEFAULT_DAY_START_HOUR)
+        end_h = int(DEFAULT_DAY_END_HOUR)
+        if 0 <= start_h < 24 and 0 < end_h <= 24 and start_h < end_h:
+            return span_mask(start_h * 60, end_h * 60)
+    return span_mask(9 * 60, 18 * 60)
+
+
+async def load_master_grid(
+    master_id: int,
+    start: _date,
+    end: _date,
+    *,
+    fallback: int | None = None,
+) -> MasterGrid:
+    """Load a master's weekly template and exceptions in ``[start, end]`` as a MasterGrid.
+
+    Two queries in one session regardless of the range length. ``fallback``
+    is the mask for weekdays without schedule rows; defaults to the
+    configured default working window (same rule as ``get_work_windows_for_day``).
+    Accepts only the surrogate ``masters.id``.
+    """
+    from bot.app.domain.models import MasterSchedule, MasterScheduleException
+
+    async with get_session() as session:
+        sched = await session.execute(
+            select(
+                MasterSchedule.day_of_week,
+                MasterSchedule.start_time,
+                MasterSchedule.end_time,
+                MasterSchedule.is_day_off,
+            ).where(MasterSchedule.master_id == int(master_id))
+        )
+        exc = await session.execute(
+            select(
+                MasterScheduleException.exception_date,
+                MasterScheduleException.start_time,
+                MasterScheduleException.end_time,
+                MasterScheduleException.reason,
+            ).where(
+                MasterScheduleException.master_id == int(master_id),
+                MasterScheduleException.exception_date >= start,
+                MasterScheduleException.exception_date <= end,
+            )
+        )
+        sched_rows = sched.all()
+        exc_rows = exc.all()
+    return MasterGrid.from_rows(
+        [r.tuple() for r in sched_rows],
+        [r.tuple() for r in exc_rows],
+        fallback=_default_window_mask() if fallback is None else fallback,
+    )
+
+
 async def get_work_windows_for_day(
     master_id: int, target_date: _date | datetime
 ) -> list[tuple[_time, _time]]:
-    """Async helper: fetch MasterSchedule rows and return
-    work windows for target_date.
+    """Async helper: return work windows for target_date from the master's schedule grid.
+
+    Per-date exceptions win over the weekly template (`is_day_off` closes the
+    weekday); weekdays without rows fall back to the default working hours.
 
     IMPORTANT: this function accepts only the surrogate `masters.id` value.
     Callers must pass the database primary key (`Master.id`). Legacy
@@ -2840,111 +2932,13 @@ async def get_work_windows_for_day(
     telegram IDs, schedules may not be found — callers should resolve
     telegram->id before calling this helper.
     """
-
-    def _default_window() -> list[tuple[_time, _time]]:
-        """Return the configured default working window using constants.
-
-        Falls back to 09:00–18:00 if constants are missing/invalid.
-        """
-        with suppress(Exception):
-            start_h = int(DEFAULT_DAY_START_HOUR)
-            end_h = int(DEFAULT_DAY_END_HOUR)
-            if 0 <= start_h < 24 and 0 < end_h <= 24 and start_h < end_h:
-                return [(_time(hour=start_h), _time(hour=end_h))]
-        return [(_time(hour=9), _time(hour=18))]
-
     try:
         # Normalize target_date to a date object
         td = target_date.date() if isinstance(target_date, datetime) else target_date
-        # Use relational tables only: check per-date exceptions first, then
-        # weekly schedules (respecting `is_day_off`), and finally default
-        # working hours. We no longer read `master_profiles.bio` for schedules.
-        async with get_session() as session:
-            from sqlalchemy import select
-            from bot.app.domain.models import MasterSchedule, MasterScheduleException
-
-            # Inspect exceptions for the target date by master_id
-            stmt_exc = (
-                select(
-                    MasterScheduleException.start_time,
-                    MasterScheduleException.end_time,
-                    MasterScheduleException.reason,
-                )
-                .where(
-                    MasterScheduleException.master_id == int(master_id),
-                    MasterScheduleException.exception_date == td,
-                )
-                .order_by(MasterScheduleException.start_time)
-            )
-            res_exc = await session.execute(stmt_exc)
-            exc_rows = res_exc.all()
-            if exc_rows:
-                # If any exception row is a sentinel off-day (start==end==00:00 or reason=='off'), treat as day off
-                for st, et, reason in exc_rows:
-                    with suppress(Exception):
-                        if (
-                            format_slot_label(st, fmt="%H:%M") == "00:00"
-                            and format_slot_label(et, fmt="%H:%M") == "00:00"
-                        ) or (reason and str(reason).lower() == "off"):
-                            return []
-                # Otherwise, return explicit exception windows
-                windows = []
-                for st, et, _ in exc_rows:
-                    try:
-                        s = format_slot_label(st, fmt="%H:%M") if st is not None else str(st)
-                        e = format_slot_label(et, fmt="%H:%M") if et is not None else str(et)
-                    except Exception:
-                        s = str(st)
-                        e = str(et)
-                    try:
-                        a_h, a_m = list(map(int, str(s).split(":")[:2]))
-                        b_h, b_m = list(map(int, str(e).split(":")[:2]))
-                        windows.append((_time(hour=a_h, minute=a_m), _time(hour=b_h, minute=b_m)))
-                    except Exception:
-                        continue
-                if windows:
-                    return windows
-
-            # No per-date exceptions -> consider weekly schedules
-            wd = int(td.weekday())
-            stmt = (
-                select(
-                    MasterSchedule.start_time, MasterSchedule.end_time, MasterSchedule.is_day_off
-                )
-                .where(MasterSchedule.master_id == int(master_id), MasterSchedule.day_of_week == wd)
-                .order_by(MasterSchedule.start_time)
-            )
-            res = await session.execute(stmt)
-            rows = res.all()
-            if rows:
-                # If any row marks the weekday as a day off, return empty
-                for _st, _et, is_off in rows:
-                    try:
-                        if bool(is_off):
-                            return []
-                    except Exception:
-                        continue
-                windows = []
-                for st, et, _ in rows:
-                    try:
-                        s = format_slot_label(st, fmt="%H:%M") if st is not None else str(st)
-                        e = format_slot_label(et, fmt="%H:%M") if et is not None else str(et)
-                    except Exception:
-                        s = str(st)
-                        e = str(et)
-                    try:
-                        a_h, a_m = list(map(int, str(s).split(":")[:2]))
-                        b_h, b_m = list(map(int, str(e).split(":")[:2]))
-                        windows.append((_time(hour=a_h, minute=a_m), _time(hour=b_h, minute=b_m)))
-                    except Exception:
-                        continue
-                if windows:
-                    return windows
-
-            # No schedules found: return default working window
-            return _default_window()
+        grid = await load_master_grid(int(master_id), td, td)
+        return grid.windows_for(td)
     except Exception:
-        return _default_window()
+        return mask_windows(_default_window_mask())
 
 
 def insert_window(
@@ -0,0 +1,258 @@
+"""Incrementally maintained master reputation (``master_stats``).
+
+One row per master holds the rating sum/count, completed visits, no-shows
+and the latest visit timestamps, so the master profile, the master dashboard
+and the Mini App catalog read a single row (or one ``IN`` lookup for a
+whole list) instead of all-time ``AVG/COUNT`` joins over ``booking_ratings``
+and ``bookings``.
+
+Writers keep it current inside their own transaction:
+
+* ``apply_transition_stats`` - called by ``transition_bookings`` for every
+  status batch (mark done / no-show, the no-show cleanup sweep, admin edits);
+  moving a booking out of DONE / NO_SHOW decrements again;
+* ``apply_rating`` - called by ``record_booking_rating``.
+
+Both are single ``INSERT ... ON CONFLICT DO UPDATE`` statements adding deltas,
+run in a savepoint and best-effort (a failure never blocks the status change).
+``rebuild_master_stats`` recomputes every row from the source tables
+(``python -m bot.app.run_bot rebuild-master-stats``); it upserts absolute
+values, so it is safe to run while the bot is live.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.app.core.db import get_session, read_session
+from bot.app.domain.models import Booking, BookingRating, BookingStatus, Master, MasterStats
+from bot.app.services.shared_services import utc_now
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "MasterReputation",
+    "apply_rating",
+    "apply_transition_stats",
+    "build_rebuild_statement",
+    "get_master_stats",
+    "get_master_stats_map",
+    "rebuild_master_stats",
+    "stats_deltas",
+]
+
+_COUNTED = {BookingStatus.DONE: "completed_orders", BookingStatus.NO_SHOW: "no_shows"}
+_LAST_AT = {BookingStatus.DONE: "last_visit_at", BookingStatus.NO_SHOW: "last_no_show_at"}
+
+
+@dataclass(frozen=True)
+class MasterReputation:
+    master_id: int
+    rating_avg: float | None = None
+    rating_count: int = 0
+    completed_orders: int = 0
+    no_shows: int = 0
+    last_visit_at: datetime | None = None
+    last_no_show_at: datetime | None = None
+
+    @classmethod
+    def from_row(cls, row: Any) -> MasterReputation:
+        count = int(row.rating_count or 0)
+        return cls(
+            master_id=int(row.master_id),
+            rating_avg=(float(row.rating_sum or 0) / count) if count else None,
+            rating_count=count,
+            completed_orders=max(0, int(row.completed_orders or 0)),
+            no_shows=max(0, int(row.no_shows or 0)),
+            last_visit_at=row.last_visit_at,
+            last_no_show_at=row.last_no_show_at,
+        )
+
+
+def stats_deltas(rows: Iterable[Any]) -> dict[int, dict[str, Any]]:
+    """Fold transition rows (``old_status``/``new_status``/``master_id``/``starts_at``) per master."""
+    out: dict[int, dict[str, Any]] = {}
+    for r in rows:
+        mid = getattr(r, "master_id", None)
+        old, new = getattr(r, "old_status", None), getattr(r, "new_status", None)
+        if mid is None or old == new or (old not in _COUNTED and new not in _COUNTED):
+            continue
+        d = out.setdefault(
+            int(mid),
+            {"completed_orders": 0, "no_shows": 0, "last_visit_at": None, "last_no_show_at": None},
+        )
+        if old in _COUNTED:
+            d[_COUNTED[old]] -= 1
+        if new in _COUNTED:
+            d[_COUNTED[new]] += 1
+            starts = getattr(r, "starts_at", None)
+            key = _LAST_AT[new]
+            if starts is not None and (d[key] is None or starts > d[key]):
+                d[key] = starts
+    return {mid: d for mid, d in out.items() if d["completed_orders"] or d["no_shows"]}
+
+
+def _upsert(values: Sequence[dict[str, Any]]) -> Any:
+    stmt = pg_insert(MasterStats).values(list(values))
+    ex = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[MasterStats.master_id],
+        set_={
+            "rating_sum": MasterStats.rating_sum + ex.rating_sum,
+            "rating_count": MasterStats.rating_count + ex.rating_count,
+            "completed_orders": MasterStats.completed_orders + ex.completed_orders,
+            "no_shows": MasterStats.no_shows + ex.no_shows,
+            # GREATEST ignores NULLs in Postgres
+            "last_visit_at": func.greatest(MasterStats.last_visit_at, ex.last_visit_at),
+            "last_no_show_at": func.greatest(MasterStats.last_no_show_at, ex.last_no_show_at),
+            "updated_at": ex.updated_at,
+        },
+    )
+
+
+async def _apply(session: AsyncSession, values: list[dict[str, Any]], what: str) -> bool:
+    if not values:
+        return True
+    try:
+        async with session.begin_nested():
+            await session.execute(_upsert(values))
+        return True
+    except Exception:
+        logger.exception("master_stats: %s update failed (run rebuild-master-stats)", what)
+        return False
+
+
+async def apply_transition_stats(
+    session: AsyncSession, rows: Iterable[Any], *, now: datetime | None = None
+) -> bool:
+    """Add the counters moved by a transition batch, in the caller's transaction."""
+    now = now or utc_now()
+    values = [
+        {"master_id": mid, "rating_sum": 0, "rating_count": 0, "updated_at": now, **d}
+        for mid, d in sorted(stats_deltas(rows).items())
+    ]
+    return await _apply(session, values, "transition")
+
+
+async def apply_rating(
+    session: AsyncSession, master_id: int | None, rating: int, *, now: datetime | None = None
+) -> bool:
+    """Add one rating to the master's sum/count, in the caller's transaction."""
+    if master_id is None:
+        return True
+    values = [
+        {
+            "master_id": int(master_id),
+            "rating_sum": int(rating),
+            "rating_count": 1,
+            "completed_orders": 0,
+            "no_shows": 0,
+            "last_visit_at": None,
+            "last_no_show_at": None,
+            "updated_at": now or utc_now(),
+        }
+    ]
+    return await _apply(session, values, "rating")
+
+
+def build_rebuild_statement(now: datetime) -> Any:
+    """``INSERT ... SELECT`` of absolute values for every master (upsert over existing rows)."""
+    ratings = (
+        select(
+            Booking.master_id.label("master_id"),
+            func.sum(BookingRating.rating).label("rating_sum"),
+            func.count(BookingRating.rating).label("rating_count"),
+        )
+        .join(Booking, Booking.id == BookingRating.booking_id)
+        .group_by(Booking.master_id)
+        .subquery("r")
+    )
+    done = Booking.status == BookingStatus.DONE
+    no_show = Booking.status == BookingStatus.NO_SHOW
+    visits = (
+        select(
+            Booking.master_id.label("master_id"),
+            func.count().filter(done).label("completed_orders"),
+            func.count().filter(no_show).label("no_shows"),
+            func.max(Booking.starts_at).filter(done).label("last_visit_at"),
+            func.max(Booking.starts_at).filter(no_show).label("last_no_show_at"),
+        )
+        .where(Booking.status.in_((BookingStatus.DONE, BookingStatus.NO_SHOW)))
+        .group_by(Booking.master_id)
+        .subquery("v")
+    )
+    source = (
+        select(
+            Master.id,
+            func.coalesce(ratings.c.rating_sum, 0),
+            func.coalesce(ratings.c.rating_count, 0),
+            func.coalesce(visits.c.completed_orders, 0),
+            func.coalesce(visits.c.no_shows, 0),
+            visits.c.last_visit_at,
+            visits.c.last_no_show_at,
+            literal(now, type_=MasterStats.__table__.c.updated_at.type),
+        )
+        .outerjoin(ratings, ratings.c.master_id == Master.id)
+        .outerjoin(visits, visits.c.master_id == Master.id)
+    )
+    cols = [
+        "master_id",
+        "rating_sum",
+        "rating_count",
+        "completed_orders",
+        "no_shows",
+        "last_visit_at",
+        "last_no_show_at",
+        "updated_at",
+    ]
+    stmt = pg_insert(MasterStats).from_select(cols, source)
+    return stmt.on_conflict_do_update(
+        index_elements=[MasterStats.master_id],
+        set_={c: getattr(stmt.excluded, c) for c in cols if c != "master_id"},
+    )
+
+
+async def rebuild_master_stats(*, now: datetime | None = None) -> int:
+    """Recompute every master's row from ``bookings`` / ``booking_ratings``. Returns rows written."""
+    async with get_session() as session:
+        res = await session.execute(build_rebuild_statement(now or utc_now()))
+        await session.commit()
+    count = int(getattr(res, "rowcount", 0) or 0)
+    logger.info("master_stats: rebuilt %d rows", count)
+    return count
+
+
+async def get_master_stats_map(master_ids: Iterable[int]) -> dict[int, MasterReputation]:
+    """Reputation for many masters in one lookup; masters without a row get zeros."""
+    ids = sorted({int(m) for m in master_ids if m is not None})
+    if not ids:
+        return {}
+    found: dict[int, MasterReputation] = {}
+    try:
+        async with read_session("dashboard") as session:
+            res = await session.execute(select(MasterStats).where(MasterStats.master_id.in_(ids)))
+            for row in res.scalars().all():
+                found[int(row.master_id)] = MasterReputation.from_row(row)
+    except Exception:
+        logger.exception("master_stats: lookup failed for %s", ids[:10])
+    return {mid: found.get(mid) or MasterReputation(master_id=mid) for mid in ids}
+
+
+async def get_master_stats(master_id: int, session: AsyncSession | None = None) -> MasterReputation:
+    """Single-row reputation lookup (zeros when the master has no row yet)."""
+    if session is None:
+        return (await get_master_stats_map([master_id]))[int(master_id)]
+    try:
+        row = await session.get(MasterStats, int(master_id))
+    except Exception:
+        logger.exception("master_stats: lookup failed for %s", master_id)
+        row = None
+    return MasterReputation.from_row(row) if row is not None else MasterReputation(int(master_id))
@@ -0,0 +1,383 @@
+"""Month availability heatmap: free-start counts per day, cached and prefetched.
+
+``get_month_availability`` answers "how many bookable starts does this master
+have on each day of the month for a ``duration``-minute visit, and when are
+the first and the last one" with one bookings query and one pass over the
+master's minute grid. The candidate starts are the ones the time picker
+offers (``slot_tick_minutes`` stride from the start of each free run, see
+``schedule_grid.start_minutes``), so a day shown as available always has
+slots and the counts match ``/api/slots``.
+
+Results are kept in a small in-process TTL cache
+(``AVAILABILITY_CACHE_TTL_SECONDS``) keyed by master / month / duration /
+step. Booking writes and schedule edits call
+``invalidate_month_availability`` (published on ``core.cache_bus`` so every
+process drops the master's months); status transitions invalidate through a
+transition hook and settings changes clear everything.
+``prefetch_adjacent_months`` warms month +- 1 in background tasks so
+flipping the calendar is served from the cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from calendar import monthrange
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time as dtime, timedelta, tzinfo
+
+from sqlalchemy import select
+
+from bot.app.core.cache_bus import Topic, publish, subscribe
+from bot.app.core.constants import AVAILABILITY_CACHE_TTL_SECONDS
+from bot.app.core.db import get_session
+from bot.app.domain.models import TERMINAL_STATUSES, Booking, BookingStatus, Master
+from bot.app.domain.local_time import LocalDays
+from bot.app.domain.schedule_grid import (
+    MasterGrid,
+    busy_masks_by_day,
+    iter_bits,
+    start_minutes,
+)
+from bot.app.services.transitions import TransitionRow, register_transition_hook
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "DayAvailability",
+    "MonthAvailability",
+    "compute_month_days",
+    "get_month_availability",
+    "invalidate_month_availability",
+    "prefetch_adjacent_months",
+]
+
+DEFAULT_SLOT_STEP = 15
+_CACHE_MAX_ENTRIES = 512
+
+# (requested master id, year, month, duration, step) -> (expires monotonic, result)
+_CacheKey = tuple[int, int, int, int, int]
+_cache: OrderedDict[_CacheKey, tuple[float, MonthAvailability]] = OrderedDict()
+_inflight: dict[_CacheKey, asyncio.Task[MonthAvailability]] = {}
+# strong references to background prefetches (the loop only keeps weak ones)
+_prefetch_tasks: set[asyncio.Task[MonthAvailability]] = set()
+# bumped by every invalidation: a computation that started before it is not cached
+_generation = 0
+
+
+@dataclass(frozen=True)
+class DayAvailability:
+    day: int
+    free_starts: int
+    first_start: dtime | None = None
+    last_start: dtime | None = None
+    # minutes of day of every start (only kept when requested)
+    starts: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class MonthAvailability:
+    master_id: int
+    year: int
+    month: int
+    duration: int
+    step: int
+    timezone: str
+    days: tuple[DayAvailability, ...] = ()
+    computed_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def available_days(self) -> set[int]:
+        return {d.day for d in self.days if d.free_starts}
+
+    def day(self, day: int) -> DayAvailability | None:
+        for d in self.days:
+            if d.day == day:
+                return d
+        return None
+
+
+def _minute_time(minute: int) -> dtime:
+    return dtime(minute // 60, minute % 60)
+
+
+def compute_month_days(
+    grid: MasterGrid,
+    year: int,
+    month: int,
+    *,
+    duration: int,
+    step: int,
+    busy_intervals: Iterable[tuple[datetime, datetime]],
+    tz: tzinfo,
+    now: datetime,
+    lead_minutes: int = 0,
+    include_starts: bool = False,
+) -> tuple[DayAvailability, ...]:
+    """One pass over the month: ``DayAvailability`` for every day with work minutes.
+
+    Pure (no DB): past days are skipped and today starts after ``now +
+    lead_minutes``. Starts depend only on the free mask, so identical days
+    (same template, no bookings) are computed once.
+    """
+    duration = max(1, int(duration))
+    step = int(step) if step and step > 0 else DEFAULT_SLOT_STEP
+    _, days_in_month = monthrange(year, month)
+    first = date(year, month, 1)
+    end = first + timedelta(days=days_in_month)
+    local = LocalDays.for_zone(tz)
+    busy_by_day = busy_masks_by_day(busy_intervals, local)
+    today, _ = local.local_minute(now)
+    cutoff = now + timedelta(minutes=int(lead_minutes or 0))
+    memo: dict[int, int] = {}
+    out: list[DayAvailability] = []
+    for day, work in grid.iter_days(max(first, today), end):
+        if not work:
+            continue
+        not_before = None
+        if day == today:
+            not_before = local.minutes_since_midnight(cutoff, day, ceil=True)
+        busy = busy_by_day.get(day, 0)
+        free = grid.free_mask(day, busy, not_before=not_before)
+        starts = memo.get(free)
+        if starts is None:
+            starts = memo[free] = start_minutes(free, duration, step)
+        if not starts:
+            out.append(DayAvailability(day=day.day, free_starts=0))
+            continue
+        first_minute = (starts & -starts).bit_length() - 1
+        out.append(
+            DayAvailability(
+                day=day.day,
+                free_starts=starts.bit_count(),
+                first_start=_minute_time(first_minute),
+                last_start=_minute_time(starts.bit_length() - 1),
+                starts=tuple(iter_bits(starts)) if include_starts else (),
+            )
+        )
+    return tuple(out)
+
+
+def _tz_name(tz: tzinfo) -> str:
+    return getattr(tz, "key", None) or str(tz)
+
+
+async def _slot_step() -> int:
+    from bot.app.services.admin_services import SettingsRepo
+
+    try:
+        step = int(await SettingsRepo.get_slot_tick_minutes() or 0)
+    except Exception:
+        step = 0
+    return step if step > 0 else DEFAULT_SLOT_STEP
+
+
+async def _compute(
+    master_id: int, year: int, month: int, duration: int, step: int
+) -> MonthAvailability:
+    from bot.app.services import master_services
+    from bot.app.services.admin_services import SettingsRepo
+    from bot.app.services.client_services import _get_booking_interval, is_booking_slot_blocked
+    from bot.app.services.shared_services import get_local_tz, utc_now
+
+    tz = get_local_tz() or UTC
+    _, days_in_month = monthrange(year, month)
+    first = date(year, month, 1)
+    last = date(year, month, days_in_month)
+    # from the day before: a late booking spilling over midnight blocks the 1st
+    range_start, range_end = LocalDays.for_zone(tz).range_bounds(first - timedelta(days=1), last)
+    now = utc_now()
+
+    async with get_session() as session:
+        # Резолвинг ID (на всякий случай, если передан telegram_id)
+        mid = await session.scalar(select(Master.id).where(Master.telegram_id == master_id))
+        real_master_id = int(mid or master_id)
+        bookings = (
+            (
+                await session.execute(
+                    select(Booking).where(
+                        Booking.master_id == real_master_id,
+                        Booking.starts_at >= range_start,
+                        Booking.starts_at < range_end,
+                        Booking.status.notin_(tuple(TERMINAL_STATUSES)),
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    grid = await master_services.load_master_grid(real_master_id, first, last, fallback=0)
+    hold_minutes = await SettingsRepo.get_reservation_hold_minutes()
+    lead_minutes = await SettingsRepo.get_same_day_lead_minutes()
+    busy: list[tuple[datetime, datetime]] = []
+    for b in bookings:
+        if is_booking_slot_blocked(b, now, hold_minutes):
+            interval = _get_booking_interval(b, 60)
+            if interval:
+                busy.append(interval)
+
+    days = compute_month_days(
+        grid,
+        year,
+        month,
+        duration=duration,
+        step=step,
+        busy_intervals=busy,
+        tz=tz,
+        now=now,
+        lead_minutes=int(lead_minutes or 0),
+        include_starts=True,
+    )
+    return MonthAvailability(
+        master_id=real_master_id,
+        year=year,
+        month=month,
+        duration=duration,
+        step=step,
+        timezone=_tz_name(tz),
+        days=days,
+        computed_at=now,
+    )
+
+
+def _cache_get(key: _CacheKey) -> MonthAvailability | None:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires, value = entry
+    if expires <= time.monotonic():
+        _cache.pop(key, None)
+        return None
+    _cache.move_to_end(key)
+    return value
+
+
+def _cache_put(key: _CacheKey, value: MonthAvailability, generation: int) -> None:
+    ttl = AVAILABILITY_CACHE_TTL_SECONDS
+    if ttl <= 0 or generation != _generation:
+        return
+    _cache[key] = (time.monotonic() + ttl, value)
+    _cache.move_to_end(key)
+    while len(_cache) > _CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def _load(key: _CacheKey) -> asyncio.Task[MonthAvailability]:
+    """Shared computation for ``key``: concurrent misses and prefetches await one task."""
+    task = _inflight.get(key)
+    if task is not None and not task.done():
+        return task
+
+    async def _run() -> MonthAvailability:
+        generation = _generation
+        result = await _compute(*key)
+        _cache_put(key, result, generation)
+        return result
+
+    task = asyncio.get_running_loop().create_task(_run())
+    _inflight[key] = task
+
+    def _done(t: asyncio.Task[MonthAvailability]) -> None:
+        if _inflight.get(key) is t:
+            del _inflight[key]
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def get_month_availability(
+    master_id: int,
+    year: int,
+    month: int,
+    duration: int,
+    *,
+    prefetch: bool = False,
+) -> MonthAvailability:
+    """Per-day free starts of ``master_id`` (surrogate or Telegram id) for a visit.
+
+    Served from the TTL cache when possible; concurrent misses for the same
+    key share one computation. ``prefetch`` warms month +- 1 in background.
+    """
+    step = await _slot_step()
+    key: _CacheKey = (int(master_id), int(year), int(month), max(1, int(duration)), step)
+    result = _cache_get(key)
+    if result is None:
+        result = await asyncio.shield(_load(key))
+    if prefetch:
+        prefetch_adjacent_months(*key)
+    return result
+
+
+def _shift_month(year: int, month: int, delta: int) -> tuple[int, int]:
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def prefetch_adjacent_months(
+    master_id: int, year: int, month: int, duration: int, step: int
+) -> int:
+    """Compute month - 1 and month + 1 into the cache in background tasks.
+
+    Months already cached or being computed are skipped, as is a previous
+    month that is entirely in the past. Returns the number of tasks started.
+    """
+    if AVAILABILITY_CACHE_TTL_SECONDS <= 0:
+        return 0
+    this_month = datetime.now(UTC).date().replace(day=1)
+    started = 0
+    for delta in (1, -1):
+        y, m = _shift_month(year, month, delta)
+        key: _CacheKey = (int(master_id), y, m, int(duration), int(step))
+        if date(y, m, 1) < this_month or key in _inflight or _cache_get(key) is not None:
+            continue
+        task = _load(key)
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_done)
+        started += 1
+    return started
+
+
+def _prefetch_done(task: asyncio.Task[MonthAvailability]) -> None:
+    _prefetch_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("availability prefetch failed: %s", task.exception())
+
+
+def invalidate_month_availability(master_id: int | None = None) -> None:
+    """Drop cached months of ``master_id`` (surrogate id), or everything for ``None``.
+
+    Published on the cache bus, so other API workers / the bot drop them too.
+    """
+    publish(Topic.AVAILABILITY, master_id)
+
+
+@subscribe(Topic.AVAILABILITY)
+def _drop_month_availability(key: str | None = None) -> None:
+    global _generation
+    _generation += 1
+    if key is None:
+        _cache.clear()
+        _inflight.clear()
+        return
+    mid = int(key)
+    for cache_key, (_, value) in list(_cache.items()):
+        if value.master_id == mid or cache_key[0] == mid:
+            _cache.pop(cache_key, None)
+    # running computations may have read the old rows: later callers start afresh
+    for cache_key in [k for k in _inflight if k[0] == mid]:
+        _inflight.pop(cache_key, None)
+
+
+@subscribe(Topic.SETTINGS)
+def _drop_on_settings(_key: str | None = None) -> None:
+    # slot step, timezone or lead time may have changed
+    _drop_month_availability(None)
+
+
+@register_transition_hook
+def _invalidate_on_transition(target: BookingStatus, rows: list[TransitionRow]) -> None:
+    for master_id in {r.master_id for r in rows if r.master_id is not None}:
+        invalidate_month_availability(master_id)
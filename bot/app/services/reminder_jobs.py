@@ -0,0 +1,391 @@
+"""Reminder job table maintenance (``reminder_jobs``).
+
+Instead of rescanning ``bookings`` for every lead on each sweep, one row per
+(booking, lead) is precomputed with its ``due_at``:
+
+* ``sync_reminder_jobs`` is called in the same transaction as a status change
+  or reschedule: eligible (CONFIRMED/PAID, future) bookings get a row per
+  configured lead, others lose their pending rows;
+* ``claim_due_reminders`` leases due rows with ``FOR UPDATE SKIP LOCKED`` so
+  concurrent sweeps never pick the same job; sending happens outside the
+  transaction and ``mark_reminder_sent`` / ``release_reminder`` close it
+  (``skip_reminder`` retires jobs that can never be sent);
+* ``resync_all_reminder_jobs`` rebuilds rows for all future bookings after the
+  lead configuration changes (and once per process, which doubles as backfill).
+
+Leads come from the ``reminder_leads_minutes`` setting (any number, e.g.
+``"1440,120,30"``); without it the legacy ``reminder_lead_minutes`` /
+``same_day_lead_minutes`` pair is used.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.app.core.db import get_session
+from bot.app.domain.models import Booking, REMINDER_ELIGIBLE_STATUSES, ReminderJob
+from bot.app.services.shared_services import utc_now
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LEADS_SETTING = "reminder_leads_minutes"
+# How long a claimed job stays leased to one sweep before another may retry it.
+REMINDER_CLAIM_LEASE = timedelta(minutes=5)
+REMINDER_MAX_ATTEMPTS = 5
+_SYNC_CHUNK = 500
+
+__all__ = [
+    "REMINDER_LEADS_SETTING",
+    "ClaimedReminder",
+    "claim_due_reminders",
+    "get_reminder_leads",
+    "mark_reminder_sent",
+    "parse_reminder_leads",
+    "plan_reminder_jobs",
+    "release_reminder",
+    "resync_all_reminder_jobs",
+    "set_reminder_leads",
+    "skip_reminder",
+    "sync_reminder_jobs",
+]
+
+
+@dataclass(frozen=True)
+class ClaimedReminder:
+    job_id: int
+    booking_id: int
+    kind: str
+    lead_minutes: int
+    due_at: datetime
+
+
+def parse_reminder_leads(raw: Any) -> list[int]:
+    """Parse ``"1440, 60"`` / ``[1440, 60]`` / JSON text into unique positive minutes, desc."""
+    if raw is None or raw == "":
+        return []
+    items: Iterable[Any]
+    if isinstance(raw, (list, tuple, set)):
+        items = raw
+    else:
+        text_val = str(raw).strip()
+        try:
+            decoded = json.loads(text_val)
+            items = decoded if isinstance(decoded, list) else [decoded]
+        except Exception:
+            items = text_val.replace(";", ",").split(",")
+    out: set[int] = set()
+    for item in items:
+        try:
+            minutes = int(str(item).strip())
+        except Exception:
+            continue
+        if minutes > 0:
+            out.add(minutes)
+    return sorted(out, reverse=True)
+
+
+async def get_reminder_leads() -> list[tuple[str, int]]:
+    """Configured ``(kind, lead_minutes)`` pairs, longest lead first."""
+    from bot.app.services.admin_services import SettingsRepo
+
+    try:
+        explicit = parse_reminder_leads(await SettingsRepo.get_setting(REMINDER_LEADS_SETTING))
+    except Exception:
+        explicit = []
+    if explicit:
+        return [("lead", m) for m in explicit]
+
+    leads: list[tuple[str, int]] = []
+    try:
+        primary = int(await SettingsRepo.get_reminder_lead_minutes())
+    except Exception:
+        primary = 60
+    try:
+        same_day = int(await SettingsRepo.get_same_day_lead_minutes())
+    except Exception:
+        same_day = 0
+    if primary > 0:
+        leads.append(("lead", primary))
+    if same_day > 0 and same_day != primary:
+        leads.append(("same_day", same_day))
+    return sorted(leads, key=lambda kv: kv[1], reverse=True)
+
+
+async def set_reminder_leads(minutes: Iterable[int]) -> bool:
+    """Persist the list of reminder leads (empty list = back to legacy settings)."""
+    from bot.app.services.admin_services import SettingsRepo
+
+    leads = parse_reminder_leads(list(minutes))
+    return bool(
+        await SettingsRepo.update_setting(REMINDER_LEADS_SETTING, ",".join(map(str, leads)))
+    )
+
+
+def plan_reminder_jobs(
+    starts_at: datetime | None, leads: Sequence[tuple[str, int]], now: datetime
+) -> list[tuple[str, int, datetime]]:
+    """``(kind, lead_minutes, due_at)`` rows wanted for a booking starting at ``starts_at``.
+
+    Leads whose due time already passed collapse into the shortest of them, so
+    a booking confirmed 30 minutes before the visit gets one reminder, not one
+    per lead.
+    """
+    if starts_at is None or starts_at <= now:
+        return []
+    planned: list[tuple[str, int, datetime]] = []
+    overdue: tuple[str, int, datetime] | None = None
+    for kind, minutes in leads:
+        due_at = starts_at - timedelta(minutes=int(minutes))
+        if due_at > now:
+            planned.append((kind, int(minutes), due_at))
+        elif overdue is None or minutes < overdue[1]:
+            overdue = (kind, int(minutes), due_at)
+    if overdue is not None:
+        planned.append(overdue)
+    return planned
+
+
+async def _sync(
+    session: AsyncSession,
+    booking_ids: Sequence[int],
+    leads: Sequence[tuple[str, int]],
+    now: datetime,
+) -> None:
+    rows = (
+        await session.execute(
+            select(Booking.id, Booking.status, Booking.starts_at).where(Booking.id.in_(booking_ids))
+        )
+    ).all()
+    wanted: list[dict[str, Any]] = []
+    for bid, status, starts_at in rows:
+        if status not in REMINDER_ELIGIBLE_STATUSES:
+            continue
+        wanted.extend(
+            {
+                "booking_id": int(bid),
+                "lead_minutes": minutes,
+                "kind": kind,
+                "due_at": due_at,
+                "attempts": 0,
+            }
+            for kind, minutes, due_at in plan_reminder_jobs(starts_at, leads, now)
+        )
+
+    # Drop pending rows that are no longer wanted (cancelled, moved into the past, lead removed).
+    stmt = delete(ReminderJob).where(
+        ReminderJob.booking_id.in_(booking_ids), ReminderJob.sent_at.is_(None)
+    )
+    if wanted:
+        keep = [(w["booking_id"], w["lead_minutes"]) for w in wanted]
+        stmt = stmt.where(tuple_(ReminderJob.booking_id, ReminderJob.lead_minutes).notin_(keep))
+    await session.execute(stmt.execution_options(synchronize_session=False))
+
+    if not wanted:
+        return
+    ins = pg_insert(ReminderJob).values(wanted)
+    # Re-arm only when the due time moved (reschedule); an unchanged job keeps
+    # its sent/claimed state so re-confirming does not resend.
+    await session.execute(
+        ins.on_conflict_do_update(
+            index_elements=[ReminderJob.booking_id, ReminderJob.lead_minutes],
+            set_={
+                "kind": ins.excluded.kind,
+                "due_at": ins.excluded.due_at,
+                "sent_at": None,
+                "claimed_until": None,
+                "attempts": 0,
+                "last_error": None,
+            },
+            where=ReminderJob.due_at.is_distinct_from(ins.excluded.due_at),
+        )
+    )
+
+
+async def sync_reminder_jobs(
+    session: AsyncSession,
+    booking_ids: Iterable[int],
+    *,
+    leads: Sequence[tuple[str, int]] | None = None,
+    now: datetime | None = None,
+) -> bool:
+    """Bring ``reminder_jobs`` in line with the current status/start of ``booking_ids``.
+
+    Runs inside the caller's transaction (in a savepoint) so the jobs commit
+    together with the status change. Best-effort: failures are logged and the
+    outer transaction is left usable; the sweep's resync repairs drift.
+    """
+    ids = sorted({int(b) for b in booking_ids if b is not None})
+    if not ids:
+        return True
+    if leads is None:
+        leads = await get_reminder_leads()
+    now = now or utc_now()
+    try:
+        async with session.begin_nested():
+            await _sync(session, ids, leads, now)
+        return True
+    except Exception:
+        logger.exception("reminder_jobs: sync failed for bookings %s", ids[:10])
+        return False
+
+
+def _stale_booking(now: datetime) -> Any:
+    """Correlated select: the job's booking is no longer remindable."""
+    return select(Booking.id).where(
+        Booking.id == ReminderJob.booking_id,
+        (Booking.starts_at <= now) | Booking.status.notin_(tuple(REMINDER_ELIGIBLE_STATUSES)),
+    )
+
+
+async def resync_all_reminder_jobs(
+    leads: Sequence[tuple[str, int]] | None = None, *, now: datetime | None = None
+) -> int:
+    """Rebuild pending jobs for every future CONFIRMED/PAID booking. Returns bookings synced."""
+    if leads is None:
+        leads = await get_reminder_leads()
+    now = now or utc_now()
+    async with get_session() as session:
+        await session.execute(
+            delete(ReminderJob)
+            .where(ReminderJob.sent_at.is_(None), _stale_booking(now).exists())
+            .execution_options(synchronize_session=False)
+        )
+        ids = [
+            int(x)
+            for x in (
+                await session.execute(
+                    select(Booking.id).where(
+                        Booking.starts_at > now,
+                        Booking.status.in_(tuple(REMINDER_ELIGIBLE_STATUSES)),
+                    )
+                )
+            ).scalars()
+        ]
+        for i in range(0, len(ids), _SYNC_CHUNK):
+            await _sync(session, ids[i : i + _SYNC_CHUNK], leads, now)
+        await session.commit()
+    logger.info("reminder_jobs: resynced %d bookings for leads %s", len(ids), list(leads))
+    return len(ids)
+
+
+async def _purge_stale_due(session: AsyncSession, now: datetime) -> None:
+    """Delete due pending jobs whose booking was cancelled/moved by an unhooked path."""
+    await session.execute(
+        delete(ReminderJob)
+        .where(
+            ReminderJob.sent_at.is_(None),
+            ReminderJob.due_at <= now,
+            _stale_booking(now).exists(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def claim_due_reminders(now: datetime, *, limit: int = 100) -> list[ClaimedReminder]:
+    """Lease up to ``limit`` due jobs to this sweep (``FOR UPDATE SKIP LOCKED``).
+
+    The lease (``claimed_until``) is committed immediately so the row locks
+    are not held while messages are being sent.
+    """
+    async with get_session() as session:
+        await _purge_stale_due(session, now)
+        due = (
+            select(ReminderJob.id)
+            .where(
+                ReminderJob.sent_at.is_(None),
+                ReminderJob.due_at <= now,
+                ReminderJob.attempts < REMINDER_MAX_ATTEMPTS,
+                (ReminderJob.claimed_until.is_(None)) | (ReminderJob.claimed_until < now),
+            )
+            .order_by(ReminderJob.due_at)
+            .limit(int(limit))
+            .with_for_update(skip_locked=True)
+        )
+        res = await session.execute(
+            update(ReminderJob)
+            .where(ReminderJob.id.in_(due.scalar_subquery()))
+            .values(claimed_until=now + REMINDER_CLAIM_LEASE, attempts=ReminderJob.attempts + 1)
+            .returning(
+                ReminderJob.id,
+                ReminderJob.booking_id,
+                ReminderJob.kind,
+                ReminderJob.lead_minutes,
+                ReminderJob.due_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        claimed = [
+            ClaimedReminder(
+                job_id=int(r[0]),
+                booking_id=int(r[1]),
+                kind=str(r[2] or "lead"),
+                lead_minutes=int(r[3]),
+                due_at=r[4],
+            )
+            for r in res.all()
+        ]
+        await session.commit()
+    claimed.sort(key=lambda c: c.due_at)
+    return claimed
+
+
+# legacy per-booking flags still shown by older UI code
+_LEGACY_FLAGS = {"lead": "remind_24h_sent", "same_day": "remind_1h_sent"}
+
+
+async def mark_reminder_sent(job: ClaimedReminder, sent_at: datetime | None = None) -> None:
+    sent_at = sent_at or utc_now()
+    async with get_session() as session:
+        await session.execute(
+            update(ReminderJob)
+            .where(ReminderJob.id == job.job_id)
+            .values(sent_at=sent_at, claimed_until=None, last_error=None)
+        )
+        values: dict[str, Any] = {
+            "last_reminder_sent_at": sent_at,
+            "last_reminder_lead_minutes": job.lead_minutes,
+        }
+        flag = _LEGACY_FLAGS.get(job.kind)
+        if flag:
+            values[flag] = True
+        await session.execute(update(Booking).where(Booking.id == job.booking_id).values(**values))
+        await session.commit()
+
+
+async def release_reminder(job: ClaimedReminder, error: str | None = None) -> None:
+    """Give a claimed job back (send failed); it is retried up to ``REMINDER_MAX_ATTEMPTS``."""
+    async with get_session() as session:
+        await session.execute(
+            update(ReminderJob)
+            .where(ReminderJob.id == job.job_id, ReminderJob.sent_at.is_(None))
+            .values(claimed_until=None, last_error=(error or "")[:200] or None)
+        )
+        await session.commit()
+
+
+async def skip_reminder(job: ClaimedReminder, reason: str) -> None:
+    """Retire a claimed job that can never be sent (no booking, no chat id).
+
+    ``attempts`` is set to the cap so sweeps stop claiming it; a reschedule
+    (new ``due_at``) re-arms it through ``sync_reminder_jobs`` as usual.
+    """
+    async with get_session() as session:
+        await session.execute(
+            update(ReminderJob)
+            .where(ReminderJob.id == job.job_id, ReminderJob.sent_at.is_(None))
+            .values(
+                claimed_until=None,
+                attempts=REMINDER_MAX_ATTEMPTS,
+                last_error=f"skipped:{reason}"[:200],
+            )
+        )
+        await session.commit()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import asyncio
 import logging
 import os
 import re
@@ -22,26 +23,19 @@ from bot.app.core.constants import (
     TELEGRAM_PROVIDER_TOKEN,
 )
 from bot.app.translations import tr as _tr_raw
-from aiogram import Bot
 
+# aiogram is only needed once a Bot / Message exists: keep it out of the
+# import graph of the API process (types are imported for checkers only).
 if TYPE_CHECKING:
-    from aiogram.exceptions import TelegramAPIError as TelegramAPIErrorType
-else:
-    try:
-        from aiogram.exceptions import TelegramAPIError as TelegramAPIErrorType
-    except Exception:
-
-        class TelegramAPIErrorType(Exception):
-            """Fallback exception type when aiogram is unavailable."""
-
-            pass
-
-
-TelegramAPIError: type[BaseException] = TelegramAPIErrorType
+    from aiogram import Bot
+    from aiogram.types import CallbackQuery, Message
 from datetime import UTC, datetime, timedelta, time as dt_time
 from decimal import Decimal, ROUND_HALF_UP
 from zoneinfo import ZoneInfo
 
+from bot.app.core.cache_bus import Topic, subscribe
+from bot.app.domain.local_time import LocalDays
+
 logger = logging.getLogger(__name__)
 
 # Default online payment discount percent (used when SettingsRepo lookup fails)
@@ -471,12 +465,19 @@ STATUS_EMOJI: dict[str, str] = {
 
 
 async def render_booking_item_for_api(
-    booking: Any, user_telegram_id: int | None = None, lang: str | None = None
+    booking: Any,
+    user_telegram_id: int | None = None,
+    lang: str | None = None,
+    *,
+    lock_r_minutes: int | None = None,
+    lock_c_minutes: int | None = None,
 ) -> dict[str, Any]:
     """Return a dict with API-friendly booking fields.
 
     This centralizes status label/emoji, price formatting and permission
-    checks so API endpoints can be thin and consistent.
+    checks so API endpoints can be thin and consistent. List endpoints pass
+    the lock windows (resolved once per request) and no ``user_telegram_id``
+    (ownership is already part of their query), so rendering is SQL-free.
     """
     out: dict[str, Any] = {}
     try:
@@ -488,7 +489,7 @@ async def render_booking_item_for_api(
     try:
         # Status label (localized) and emoji
         try:
-            from bot.app.telegram.common.status import get_status_label
+            from bot.app.services.booking_status import get_status_label
 
             status_label = await get_status_label(getattr(booking, "status", None), lang=lang)
         except Exception:
@@ -589,19 +590,22 @@ async def render_booking_item_for_api(
             from bot.app.services import client_services as _client_services
 
             # Try to read lock windows from SettingsRepo if available (best-effort)
+            lock_r, lock_c = lock_r_minutes, lock_c_minutes
             try:
                 from bot.app.services.admin_services import SettingsRepo
 
-                try:
-                    lock_r = await SettingsRepo.get_client_reschedule_lock_minutes()
-                except Exception:
-                    lock_r = None
-                try:
-                    lock_c = await SettingsRepo.get_client_cancel_lock_minutes()
-                except Exception:
-                    lock_c = None
+                if lock_r is None:
+                    try:
+                        lock_r = await SettingsRepo.get_client_reschedule_lock_minutes()
+                    except Exception:
+                        lock_r = None
+                if lock_c is None:
+                    try:
+                        lock_c = await SettingsRepo.get_client_cancel_lock_minutes()
+                    except Exception:
+                        lock_c = None
             except Exception:
-                lock_r = lock_c = None
+                pass
 
             (
                 can_cancel_calc,
@@ -870,6 +874,135 @@ async def is_online_payments_available() -> bool:
         return False
 
 
+# --- Public (client-facing) runtime config snapshot ---
+# Everything the Mini App needs on open is resolved once and served from
+# memory. Rebuilt lazily when invalidated (SettingsRepo.update_setting) or when
+# SETTINGS_CACHE_TTL_SECONDS passes, so other processes converge too.
+DEFAULT_WEBAPP_TITLE = "Telegram Mini App • Beauty"
+DEFAULT_DATE_FORMAT = "YYYY-MM-DD"
+
+
+@dataclass(frozen=True)
+class PublicConfig:
+    currency: str | None = None
+    webapp_title: str | None = DEFAULT_WEBAPP_TITLE
+    online_payments_available: bool | None = None
+    online_payment_discount_percent: int | None = None
+    date_format: str = DEFAULT_DATE_FORMAT
+    reminder_lead_minutes: int | None = None
+    address: str | None = None
+    contact_phone: str | None = None
+    contact_instagram: str | None = None
+    timezone: str = "UTC"
+
+
+_PUBLIC_CONFIG: PublicConfig | None = None
+_PUBLIC_CONFIG_BUILT_AT: datetime | None = None
+_PUBLIC_CONFIG_LOCK: asyncio.Lock | None = None
+# Bumped on every invalidation so a rebuild racing with a settings change
+# does not store a snapshot that is already stale.
+_PUBLIC_CONFIG_GENERATION = 0
+
+
+def invalidate_public_config() -> None:
+    """Drop the public config snapshot; the next reader rebuilds it."""
+    global _PUBLIC_CONFIG, _PUBLIC_CONFIG_BUILT_AT, _PUBLIC_CONFIG_GENERATION
+    _PUBLIC_CONFIG = None
+    _PUBLIC_CONFIG_BUILT_AT = None
+    _PUBLIC_CONFIG_GENERATION += 1
+
+
+@subscribe(Topic.SETTINGS)
+def _drop_public_config(_key: str | None = None) -> None:
+    invalidate_public_config()
+
+
+async def _build_public_config() -> PublicConfig:
+    from bot.app.services.admin_services import SettingsRepo
+
+    try:
+        currency: str | None = await SettingsRepo.get_currency()
+    except Exception as exc:
+        logger.exception("Failed to get currency setting: %s", exc)
+        currency = None
+
+    try:
+        online_payments_available: bool | None = await is_online_payments_available()
+    except Exception as exc:
+        logger.exception("Failed to determine online payment availability: %s", exc)
+        online_payments_available = None
+
+    try:
+        online_discount_percent: int | None = await resolve_online_payment_discount_percent()
+    except Exception as exc:
+        logger.exception("Failed to read online payment discount percent: %s", exc)
+        online_discount_percent = None
+
+    try:
+        date_format = await SettingsRepo.get_setting("date_format", DEFAULT_DATE_FORMAT)
+        if not isinstance(date_format, str):
+            date_format = str(date_format) if date_format is not None else DEFAULT_DATE_FORMAT
+    except Exception:
+        date_format = DEFAULT_DATE_FORMAT
+
+    try:
+        title = await SettingsRepo.get_setting("webapp_title", DEFAULT_WEBAPP_TITLE)
+        webapp_title = title if isinstance(title, str) else (str(title) if title else None)
+    except Exception as exc:
+        logger.exception("Failed to read webapp title setting: %s", exc)
+        webapp_title = DEFAULT_WEBAPP_TITLE
+
+    try:
+        reminder_lead: int | None = await SettingsRepo.get_reminder_lead_minutes()
+    except Exception:
+        reminder_lead = None
+
+    tz_name = os.getenv("BUSINESS_TIMEZONE") or os.getenv("LOCAL_TIMEZONE") or "UTC"
+
+    try:
+        contact = await get_contact_info()
+    except Exception:
+        contact = {}
+
+    return PublicConfig(
+        currency=currency,
+        webapp_title=webapp_title,
+        online_payments_available=online_payments_available,
+        online_payment_discount_percent=online_discount_percent,
+        date_format=date_format,
+        reminder_lead_minutes=reminder_lead,
+        address=contact.get("address"),
+        contact_phone=contact.get("phone"),
+        contact_instagram=contact.get("instagram"),
+        timezone=tz_name,
+    )
+
+
+async def get_public_config() -> PublicConfig:
+    """Return the cached public runtime config, rebuilding it at most once per TTL.
+
+    Concurrent callers during a rebuild wait on a single build instead of each
+    issuing their own settings queries.
+    """
+    global _PUBLIC_CONFIG, _PUBLIC_CONFIG_BUILT_AT, _PUBLIC_CONFIG_LOCK
+    cfg = _PUBLIC_CONFIG
+    if cfg is not None and not _settings_cache_expired(_PUBLIC_CONFIG_BUILT_AT):
+        return cfg
+    if _PUBLIC_CONFIG_LOCK is None:
+        _PUBLIC_CONFIG_LOCK = asyncio.Lock()
+    async with _PUBLIC_CONFIG_LOCK:
+        cfg = _PUBLIC_CONFIG
+        if cfg is not None and not _settings_cache_expired(_PUBLIC_CONFIG_BUILT_AT):
+            return cfg
+        generation = _PUBLIC_CONFIG_GENERATION
+        cfg = await _build_public_config()
+        if generation == _PUBLIC_CONFIG_GENERATION:
+            _PUBLIC_CONFIG = cfg
+            _PUBLIC_CONFIG_BUILT_AT = utc_now()
+        logger.debug("Public config rebuilt: %s", cfg)
+        return cfg
+
+
 def format_money_cents(cents: int | float | None, currency: str | None = None) -> str:
     """Format money given in cents using locale-aware formatting when
     Babel is available; otherwise fall back to a simple ``{amount} {CUR}``
@@ -1057,15 +1190,39 @@ def _minutes_to_hm(minutes: int) -> str:
     return f"{h:02d}:{mm:02d}"
 
 
+# (LOCAL_TIMEZONE value, resolved zone): the zone is built once per distinct value
+_local_tz_cache: tuple[str | None, ZoneInfo] | None = None
+
+
 def get_local_tz() -> ZoneInfo:
     """Return dynamic local timezone for rendering (fallback to cached or UTC)."""
+    global _local_tz_cache
+    tz_name = os.getenv("LOCAL_TIMEZONE", None)
+    cached = _local_tz_cache
+    if cached is not None and cached[0] == tz_name:
+        return cached[1]
+    tz: ZoneInfo | None = None
     try:
-        tz_name = os.getenv("LOCAL_TIMEZONE", None)
         if tz_name:
-            return ZoneInfo(tz_name)
+            tz = ZoneInfo(tz_name)
     except Exception:
-        pass
-    return LOCAL_TZ or ZoneInfo("UTC")
+        tz = None
+    tz = tz or LOCAL_TZ or ZoneInfo("UTC")
+    _local_tz_cache = (tz_name, tz)
+    return tz
+
+
+def local_days() -> LocalDays:
+    """Day bounds / minute conversions for the business zone (see ``domain.local_time``).
+
+    The first call for a zone precomputes the bookable horizon around today.
+    """
+    tz = get_local_tz()
+    days = LocalDays.for_zone(tz)
+    if not len(days):
+        today = datetime.now(UTC).astimezone(tz).date()
+        days.warm(today - timedelta(days=35), today + timedelta(days=400))
+    return days
     # Time helpers: prefer these helpers throughout the codebase so all
     # modules consistently produce timezone-aware datetimes.
 
@@ -1621,6 +1778,9 @@ __all__ = [
     "toggle_telegram_miniapp",
     "get_telegram_provider_token",
     "is_online_payments_available",
+    "PublicConfig",
+    "get_public_config",
+    "invalidate_public_config",
     "resolve_online_payment_discount_percent",
     "apply_online_payment_discount",
     "format_money_cents",
@@ -1630,6 +1790,7 @@ __all__ = [
     "default_language",
     "get_env_int",
     "get_local_tz",
+    "local_days",
     "get_admin_ids",
     "get_master_ids",
     "format_booking_list_item",
@@ -1641,8 +1802,6 @@ __all__ = [
 ]
 
 # ---------------- New shared helpers (i18n, profiles, notifications) ---------------- #
-from aiogram.types import Message, CallbackQuery
-
 # Provide type-only imports for optional third-party libs to satisfy Pylance
 if TYPE_CHECKING:
     with suppress(Exception):
@@ -1655,6 +1814,8 @@ def _msg(obj: Message | CallbackQuery | Any) -> Message | None:
 
     Returns None when the message is inaccessible (e.g., outdated or missing).
     """
+    from aiogram.types import Message
+
     try:
         candidate = getattr(obj, "message", obj)
         if isinstance(candidate, Message) and not getattr(candidate, "is_inaccessible", False):
@@ -1778,7 +1939,9 @@ async def _safe_send(
         # indicate bugs (formatting, logic) and should surface to the
         # caller/routing-level error handlers so they can be observed and fixed.
         try:
-            if TelegramAPIError is not None and isinstance(e, TelegramAPIError):
+            from aiogram.exceptions import TelegramAPIError
+
+            if isinstance(e, TelegramAPIError):
                 logger.warning("_safe_send TelegramAPIError for %s: %s", chat_id, e)
                 return False
         except Exception:
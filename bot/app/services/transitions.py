@@ -0,0 +1,205 @@
+"""Set-based booking status transitions.
+
+``transition_bookings`` moves every booking matching an id set and/or a
+predicate to a target status in ONE statement::
+
+    WITH prev AS (SELECT id, status FROM bookings WHERE ... FOR UPDATE),
+         upd  AS (UPDATE bookings SET status = :target ... FROM prev
+                  WHERE bookings.id = prev.id RETURNING ..., prev.status),
+         hist AS (INSERT INTO booking_status_history ... SELECT ... FROM upd)
+    SELECT * FROM upd
+
+so mass cancellations and the expiry / no-show sweeps cost one round trip and
+still leave a complete ``booking_status_history`` trail. The affected rows
+(old status, master, client, start) are returned for notifications.
+
+Pending reminder jobs, the ``master_stats`` counters and the
+``master_client_summary`` rows of the touched pairs are updated inside the
+same transaction. Hooks registered with ``register_transition_hook`` run
+once per batch after commit (cache invalidation, notifications); a failing
+hook is logged and never undoes the transition.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from bot.app.core.db import get_session
+from bot.app.domain.models import Booking, BookingStatus, BookingStatusHistory
+from bot.app.services.shared_services import utc_now
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "TransitionRow",
+    "build_transition_statement",
+    "fire_transition_hooks",
+    "register_transition_hook",
+    "transition_bookings",
+]
+
+
+@dataclass(frozen=True)
+class TransitionRow:
+    booking_id: int
+    old_status: BookingStatus | None
+    new_status: BookingStatus
+    master_id: int | None
+    user_id: int | None
+    starts_at: datetime | None
+
+
+TransitionHook = Callable[[BookingStatus, list[TransitionRow]], Awaitable[None] | None]
+
+_HOOKS: list[TransitionHook] = []
+
+
+def register_transition_hook(hook: TransitionHook) -> TransitionHook:
+    """Register ``hook(target, rows)``; called once per committed batch. Usable as decorator."""
+    if hook not in _HOOKS:
+        _HOOKS.append(hook)
+    return hook
+
+
+async def fire_transition_hooks(target: BookingStatus, rows: list[TransitionRow]) -> None:
+    """Run registered hooks for a committed batch (no-op for an empty batch)."""
+    if not rows:
+        return
+    for hook in list(_HOOKS):
+        try:
+            res = hook(target, rows)
+            if inspect.isawaitable(res):
+                await res
+        except Exception:
+            logger.exception("transition hook %r failed for %d rows", hook, len(rows))
+
+
+def build_transition_statement(
+    target: BookingStatus,
+    *,
+    ids: Iterable[int] | None = None,
+    where: Sequence[ColumnElement[bool]] = (),
+    from_statuses: Iterable[BookingStatus] | None = None,
+    values: Mapping[str, Any] | None = None,
+    now: datetime | None = None,
+) -> Any:
+    """Build the ``UPDATE ... RETURNING`` + history ``INSERT`` CTE statement.
+
+    Bookings already in ``target`` are never matched, so re-running a sweep
+    does not write duplicate history rows.
+    """
+    now = now or utc_now()
+    conds: list[ColumnElement[bool]] = [Booking.status != target, *where]
+    if ids is not None:
+        conds.append(Booking.id.in_(sorted({int(i) for i in ids})))
+    if from_statuses is not None:
+        conds.append(Booking.status.in_(tuple(from_statuses)))
+
+    prev = (
+        select(Booking.id.label("id"), Booking.status.label("old_status"))
+        .where(*conds)
+        .with_for_update()
+        .cte("prev")
+    )
+    upd = (
+        update(Booking)
+        .where(Booking.id == prev.c.id)
+        .values(status=target, **dict(values or {}))
+        .returning(
+            Booking.id.label("booking_id"),
+            prev.c.old_status,
+            Booking.master_id,
+            Booking.user_id,
+            Booking.starts_at,
+        )
+        .cte("upd")
+    )
+    status_type = BookingStatusHistory.__table__.c.new_status.type
+    hist = (
+        insert(BookingStatusHistory)
+        .from_select(
+            ["booking_id", "old_status", "new_status", "changed_at"],
+            select(
+                upd.c.booking_id,
+                upd.c.old_status,
+                literal(target, type_=status_type),
+                literal(now, type_=BookingStatusHistory.__table__.c.changed_at.type),
+            ),
+        )
+        .cte("hist")
+    )
+    return select(upd).add_cte(hist)
+
+
+async def transition_bookings(
+    target: BookingStatus,
+    *,
+    ids: Iterable[int] | None = None,
+    where: Sequence[ColumnElement[bool]] = (),
+    from_statuses: Iterable[BookingStatus] | None = None,
+    values: Mapping[str, Any] | None = None,
+    session: AsyncSession | None = None,
+    now: datetime | None = None,
+) -> list[TransitionRow]:
+    """Move matching bookings to ``target`` in one statement; return the changed rows.
+
+    Select rows by ``ids`` and/or ``where`` predicates (at least one is
+    required) and optionally restrict the source states with ``from_statuses``.
+    ``values`` sets extra columns (e.g. ``cash_hold_expires_at=None``).
+
+    With an external ``session`` the caller owns the transaction: nothing is
+    committed and hooks are not fired; call ``fire_transition_hooks`` after
+    the commit.
+    """
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return []
+    elif not where:
+        raise ValueError("transition_bookings needs ids or a where predicate")
+    now = now or utc_now()
+    stmt = build_transition_statement(
+        target, ids=ids, where=where, from_statuses=from_statuses, values=values, now=now
+    )
+
+    async def _run(s: AsyncSession) -> list[TransitionRow]:
+        res = await s.execute(stmt)
+        rows = [
+            TransitionRow(
+                booking_id=int(r.booking_id),
+                old_status=r.old_status,
+                new_status=target,
+                master_id=r.master_id,
+                user_id=r.user_id,
+                starts_at=r.starts_at,
+            )
+            for r in res.all()
+        ]
+        if rows:
+            from bot.app.services.client_summary import refresh_client_summaries
+            from bot.app.services.master_stats import apply_transition_stats
+            from bot.app.services.reminder_jobs import sync_reminder_jobs
+
+            await sync_reminder_jobs(s, [r.booking_id for r in rows], now=now)
+            await apply_transition_stats(s, rows, now=now)
+            await refresh_client_summaries(s, [(r.master_id, r.user_id) for r in rows], now=now)
+        return rows
+
+    if session is not None:
+        return await _run(session)
+    async with get_session() as own:
+        rows = await _run(own)
+        await own.commit()
+    if rows:
+        logger.info("Transitioned %d bookings to %s", len(rows), target.value)
+    await fire_transition_hooks(target, rows)
+    return rows
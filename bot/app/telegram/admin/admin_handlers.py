@@ -4,7 +4,7 @@ from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Protocol
 from contextlib import suppress
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from bot.app.telegram.common.callbacks import (
     pack_cb,
     BookingsPageCB,
@@ -38,7 +38,7 @@ from bot.app.telegram.common.callbacks import (
 from bot.app.telegram.common.callbacks import AdminEnterCurrencyCB
 
 from aiogram import F, Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.filters.callback_data import CallbackData
 from aiogram.fsm.context import FSMContext
 from aiogram.filters.state import StateFilter
@@ -109,6 +109,11 @@ from bot.app.services.admin_services import (
 )
 from bot.app.telegram.admin.states import AdminStates
 from bot.app.services.client_services import UserRepo, BookingRepo
+from bot.app.services.reminder_jobs import (
+    REMINDER_LEADS_SETTING,
+    parse_reminder_leads,
+    set_reminder_leads,
+)
 import bot.app.services.admin_services as admin_services
 from bot.app.services.shared_services import default_language
 from bot.app.services.master_services import (
@@ -159,6 +164,7 @@ logger = logging.getLogger(__name__)
 admin_router = Router(name="admin")
 # Attach locale middleware so handlers receive `locale` via data injection
 from bot.app.telegram.common.locale_middleware import LocaleMiddleware
+from bot.app.telegram.common.dispatch_index import CallbackPrefixGate, claim_callback_prefixes
 
 admin_router.message.middleware(LocaleMiddleware())
 admin_router.callback_query.middleware(LocaleMiddleware())
@@ -175,7 +181,10 @@ admin_router.callback_query.middleware(SafeUIMiddleware())
 # sends localized denial messages when access is denied.
 admin_router.message.filter(AdminRoleFilter())
 # Also filter callback queries so callback handlers are protected as well.
-admin_router.callback_query.filter(AdminRoleFilter())
+# The prefix gate runs first: callbacks owned by other routers skip the role lookup.
+admin_router.callback_query.filter(CallbackPrefixGate(admin_router), AdminRoleFilter())
+# Raw-string callback handlers below (lambda filters) — declare their prefixes for the index
+claim_callback_prefixes(admin_router, "__fast__", "select_view_master", "select_view_service")
 # Access control is enforced by the router-level AdminRoleFilter.
 
 # Prefer resolving local timezone at render time. Call `get_local_tz()` where needed
@@ -1040,6 +1049,76 @@ async def admin_lookup_user_callback(
     )
 
 
+def _admin_search_view(page: Any, lang: str) -> tuple[str, InlineKeyboardMarkup]:
+    from bot.app.telegram.common.client_search_ui import client_search_view
+
+    # a hit opens the client's recent bookings (same as the forwarded-user menu)
+    return client_search_view(
+        page,
+        lang,
+        hit_callback=lambda hit: pack_cb(
+            AdminLookupUserCB, action="view_client", user_id=int(hit.telegram_id or 0)
+        ),
+        more_callback=pack_cb(AdminMenuCB, act="find_more"),
+        back_callback=pack_cb(AdminMenuCB, act="panel"),
+    )
+
+
+@admin_router.message(Command("find"))
+async def admin_find_client(
+    message: Message, command: CommandObject, state: FSMContext, locale: str
+) -> None:
+    """/find <name | @username | telegram id> — ranked client search (all clients)."""
+    from bot.app.telegram.common.client_search_ui import start_search
+
+    lang = await _lang_with_state(state, locale)
+    if not (command.args or "").strip():
+        await message.answer(t("client_search_usage", lang))
+        return
+    page = await start_search(state, command.args)
+    text, kb = _admin_search_view(page, lang)
+    await message.answer(text, reply_markup=kb)
+
+
+@admin_router.callback_query(AdminMenuCB.filter(F.act == "find_more"))
+async def admin_find_client_more(callback: CallbackQuery, state: FSMContext, locale: str) -> None:
+    """Next keyset page of the admin's last /find."""
+    from bot.app.telegram.common.client_search_ui import next_search_page
+
+    lang = await _lang_with_state(state, locale)
+    page = await next_search_page(state)
+    if page is None:
+        await callback.answer()
+        return
+    text, kb = _admin_search_view(page, lang)
+    await safe_edit(_shared_msg(callback) or callback.message, text, reply_markup=kb)
+    await callback.answer()
+
+
+@admin_router.message(Command("debuglog"))
+async def admin_debug_log(message: Message, command: CommandObject, locale: str) -> None:
+    """/debuglog <telegram id> on|off — DEBUG logs for one user's updates (this process)."""
+    from bot.app.core.logger import debug_users, disable_user_debug, enable_user_debug
+
+    lang = await _language_default(locale)
+    parts = (command.args or "").split()
+    if len(parts) != 2 or parts[1].lower() not in {"on", "off"} or not parts[0].isdigit():
+        await message.answer(t("debuglog_usage", lang))
+        return
+    user_id, enable = int(parts[0]), parts[1].lower() == "on"
+    (enable_user_debug if enable else disable_user_debug)(user_id)
+    logger.warning(
+        "debuglog: admin %s turned %s debug logs for %s",
+        safe_user_id(message),
+        parts[1].lower(),
+        user_id,
+    )
+    active = ", ".join(str(u) for u in sorted(debug_users())) or "-"
+    await message.answer(
+        t("debuglog_state", lang).format(user_id=user_id, state=parts[1].lower(), active=active)
+    )
+
+
 @admin_router.callback_query(lambda q: q.data and q.data.startswith("select_view_master"))
 async def admin_show_services_for_master(
     callback: CallbackQuery, state: FSMContext, locale: str
@@ -1623,6 +1702,8 @@ class EditableSettingMeta:
     success_key: str
     validator: Callable[[str], tuple[str | None, str | None]]
     invalid_key: str | None
+    # custom persistence (normalization, resync); default SettingsRepo.update_setting
+    saver: Callable[[str], Awaitable[bool]] | None = None
 
 
 EDITABLE_CONTACT_SETTINGS: dict[str, EditableSettingMeta] = {
@@ -1664,6 +1745,21 @@ def validate_discount_percent(value: str) -> tuple[str | None, str | None]:
         return None, "invalid_data"
 
 
+def validate_reminder_leads(value: str) -> tuple[str | None, str | None]:
+    """``"1440, 120, 30"`` -> ``"1440,120,30"``; ``0`` / ``-`` clears the list."""
+    raw = str(value or "").strip()
+    if raw in ("0", "-"):
+        return "", None
+    leads = parse_reminder_leads(raw)
+    if not leads or any(m > 30 * 24 * 60 for m in leads):
+        return None, "invalid_reminder_leads"
+    return ",".join(map(str, leads)), None
+
+
+async def _save_reminder_leads(value: str) -> bool:
+    return await set_reminder_leads(parse_reminder_leads(value))
+
+
 EDITABLE_BUSINESS_SETTINGS: dict[str, EditableSettingMeta] = {
     "online_payment_discount_percent": EditableSettingMeta(
         prompt_key="enter_online_discount",
@@ -1671,6 +1767,13 @@ EDITABLE_BUSINESS_SETTINGS: dict[str, EditableSettingMeta] = {
         validator=validate_discount_percent,
         invalid_key="invalid_data",
     ),
+    REMINDER_LEADS_SETTING: EditableSettingMeta(
+        prompt_key="enter_reminder_leads",
+        success_key="reminder_leads_updated",
+        validator=validate_reminder_leads,
+        invalid_key="invalid_reminder_leads",
+        saver=_save_reminder_leads,
+    ),
 }
 
 
@@ -1832,7 +1935,10 @@ async def admin_edit_setting_input(message: Message, state: FSMContext, locale:
         return
     saved = False
     try:
-        saved = await SettingsRepo.update_setting(setting_key, value)
+        if meta.saver is not None:
+            saved = await meta.saver(value)
+        else:
+            saved = await SettingsRepo.update_setting(setting_key, value)
     except Exception:
         saved = False
     if saved:
@@ -1929,7 +2035,8 @@ async def admin_settings_reminder(callback: CallbackQuery, state: FSMContext, lo
 
         rem = await SettingsRepo.get_reminder_lead_minutes()
         rem_same = await SettingsRepo.get_same_day_lead_minutes()
-        kb = admin_reminder_menu_kb(lang, lead_min=rem, same_day_min=rem_same)
+        leads = parse_reminder_leads(await SettingsRepo.get_setting(REMINDER_LEADS_SETTING, None))
+        kb = admin_reminder_menu_kb(lang, lead_min=rem, same_day_min=rem_same, leads=leads)
         title = t("settings_reminder_desc", lang)
         if m := _shared_msg(callback):
             await nav_push(state, title, kb, lang=lang)
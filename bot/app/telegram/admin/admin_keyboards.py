@@ -789,9 +789,16 @@ def admin_hold_menu_kb(lang: str = "uk", current_min: int | None = None) -> Inli
 
 
 def admin_reminder_menu_kb(
-    lang: str = "uk", lead_min: int | None = None, same_day_min: int | None = None
+    lang: str = "uk",
+    lead_min: int | None = None,
+    same_day_min: int | None = None,
+    leads: list[int] | None = None,
 ) -> InlineKeyboardMarkup:
-    """Меню выбора напоминаний: основное (за N минут/часов) и в день записи."""
+    """Меню выбора напоминаний: основное (за N минут/часов), в день записи и список лидов.
+
+    ``leads`` — текущее значение ``reminder_leads_minutes``; если оно задано,
+    две кнопки выше игнорируются воркером.
+    """
     kb = InlineKeyboardBuilder()
     from bot.app.telegram.common.callbacks import (
         AdminSetReminderCB,
@@ -835,8 +842,16 @@ def admin_reminder_menu_kb(
         callback_data=pack_cb(AdminSetReminderSameDayCB, minutes=0),
     )
 
+    # Произвольный список лидов (перекрывает две настройки выше)
+    leads_label = tr("reminder_leads_label", lang=lang) or "Reminder schedule"
+    leads_value = ", ".join(str(m) for m in leads) if leads else "—"
+    kb.button(
+        text=f"{leads_label}: {leads_value}",
+        callback_data=pack_cb(AdminEditSettingCB, setting_key="reminder_leads_minutes"),
+    )
+
     kb.button(text=t("back", lang), callback_data=pack_cb(AdminMenuCB, act="settings_business"))
-    kb.adjust(4, 1, 4, 1)
+    kb.adjust(4, 1, 4, 1, 1, 1)
     logger.debug("Меню настройки времени напоминания сгенерировано")
     return kb.as_markup()
 
@@ -133,6 +133,8 @@ from bot.app.services.master_services import MasterRepo
 
 logger = logging.getLogger(__name__)
 
+from bot.app.telegram.common.dispatch_index import CallbackPrefixGate
+
 client_router = Router(name="client")
 # Locale middleware provides `locale: str` to handlers
 client_router.message.middleware(LocaleMiddleware())
@@ -140,6 +142,8 @@ client_router.callback_query.middleware(LocaleMiddleware())
 # Safe UI middleware for consistent error handling
 client_router.message.middleware(SafeUIMiddleware())
 client_router.callback_query.middleware(SafeUIMiddleware())
+# Skip the client handler scan for callbacks owned by admin/master routers
+client_router.callback_query.filter(CallbackPrefixGate(client_router))
 
 
 class BookingStates(StatesGroup):
@@ -755,7 +759,7 @@ async def select_master(
         now = local_now()
         year, month = now.year, now.month
         available_days = await get_available_days_for_month(
-            master_id, year, month, service_duration_min=duration
+            master_id, year, month, service_duration_min=duration, prefetch=True
         )
         sched = await MasterRepo.get_schedule(master_id)
         allowed_weekdays = (
@@ -886,7 +890,7 @@ async def navigate_calendar(
             sd = DEFAULT_SERVICE_FALLBACK_DURATION
 
         available_days = await get_available_days_for_month(
-            resolved_master, callback_data.year, callback_data.month, sd
+            resolved_master, callback_data.year, callback_data.month, sd, prefetch=True
         )
         sched = await MasterRepo.get_schedule(resolved_master)
         allowed_weekdays = (
@@ -2772,7 +2776,7 @@ async def client_reschedule_start(
         now = _dt.now()
         year, month = now.year, now.month
         available_days = await get_available_days_for_month(
-            master_id, year, month, service_duration_min=duration
+            master_id, year, month, service_duration_min=duration, prefetch=True
         )
         sched = await MasterRepo.get_schedule(master_id)
         allowed_weekdays = (
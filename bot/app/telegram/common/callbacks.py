@@ -9,6 +9,7 @@ __all__ = [
     "MasterMenuCB",
     "MasterBookingsCB",
     "ClientInfoCB",
+    "MasterClientsCB",
     "MasterClientNoteCB",
     "ServiceSelectCB",
     "MasterSelectCB",
@@ -90,6 +91,8 @@ def pack_cb(cb_cls: type[CallbackData], **kwargs: Any) -> str:
 
 MasterMenuCB = create_callback_data("mm", act=str, page=int | None)
 ClientInfoCB = create_callback_data("cinfo", user_id=int)
+# Master's client list: sort key ("last" / "spend" / "no_shows") + 1-indexed page
+MasterClientsCB = create_callback_data("mcl", sort=str, page=int)
 ServiceSelectCB = create_callback_data("svc", service_id=str)
 MasterSelectCB = create_callback_data("ms", service_id=str, master_id=int)
 MasterProfileCB = create_callback_data(
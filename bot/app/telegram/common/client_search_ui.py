@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from bot.app.services.client_search import ClientHit, ClientSearchPage, search_clients
+from bot.app.translations import t
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["client_search_view", "hit_label", "next_search_page", "start_search"]
+
+# FSM data keys holding the active query and the keyset cursor of the next page
+_Q_KEY = "client_search_q"
+_AFTER_KEY = "client_search_after"
+PAGE_SIZE = 8
+
+
+def hit_label(hit: ClientHit) -> str:
+    label = hit.name or (f"@{hit.username}" if hit.username else f"#{hit.user_id}")
+    if hit.username and hit.name:
+        label = f"{label} (@{hit.username})"
+    return f"{label} · {hit.telegram_id}" if hit.telegram_id else label
+
+
+async def start_search(
+    state: FSMContext, raw_query: str | None, *, master_id: int | None = None
+) -> ClientSearchPage:
+    """Run a new search and remember the query/cursor for "next page"."""
+    page = await search_clients(raw_query, limit=PAGE_SIZE, master_id=master_id)
+    await state.update_data({_Q_KEY: page.query, _AFTER_KEY: page.next_cursor})
+    return page
+
+
+async def next_search_page(
+    state: FSMContext, *, master_id: int | None = None
+) -> ClientSearchPage | None:
+    """Next keyset page of the remembered search (``None`` when nothing is pending)."""
+    data = await state.get_data()
+    query, after = data.get(_Q_KEY), data.get(_AFTER_KEY)
+    if not query or not after:
+        return None
+    page = await search_clients(query, limit=PAGE_SIZE, after=after, master_id=master_id)
+    await state.update_data({_AFTER_KEY: page.next_cursor})
+    return page
+
+
+def client_search_view(
+    page: ClientSearchPage,
+    lang: str,
+    *,
+    hit_callback: Callable[[ClientHit], str],
+    more_callback: str,
+    back_callback: str,
+) -> tuple[str, InlineKeyboardMarkup]:
+    """Results text + keyboard: one button per client, then "next" and "back"."""
+    if not page.items:
+        text = t("client_search_empty", lang).format(q=page.query)
+    else:
+        text = t("client_search_results", lang).format(q=page.query)
+    kb = InlineKeyboardBuilder()
+    for hit in page.items:
+        kb.button(text=hit_label(hit), callback_data=hit_callback(hit))
+    nav = 1
+    if page.next_cursor:
+        kb.button(text=t("page_next", lang), callback_data=more_callback)
+        nav += 1
+    kb.button(text=t("back", lang), callback_data=back_callback)
+    kb.adjust(*([1] * len(page.items)), nav)
+    return text, kb.as_markup()
@@ -0,0 +1,223 @@
+"""Prefix index for callback dispatch across feature routers.
+
+Feature routers are chained (client -> admin -> master) and the admin/master
+routers carry role filters that hit the DB (``ensure_role``). Without an index
+every callback the client router does not claim pays for an admin role lookup
+(and a silent ``answer()``) before reaching the master router.
+
+At startup ``build_dispatch_index`` walks the callback handlers of each gated
+router and collects the ``CallbackData`` prefixes they filter on. A
+``CallbackPrefixGate`` placed *before* the role filter then lets a callback
+into a router only when its prefix belongs to that router, so role filters are
+evaluated for the owning router only.
+
+Handlers that filter on raw strings (lambdas on ``q.data``) cannot be
+introspected; their router declares those prefixes via ``claim_callback_prefixes``.
+A router with undeclared raw handlers stays "open" (gate always passes), which
+is the old behaviour.
+
+``dispatch_stats`` counts gate decisions and role-filter evaluations per
+update; ``FilterCountMiddleware`` closes the per-update tally.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from aiogram import BaseMiddleware, Router
+from aiogram.filters import BaseFilter
+from aiogram.filters.callback_data import CallbackQueryFilter
+from aiogram.types import CallbackQuery, TelegramObject
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CallbackPrefixGate",
+    "DispatchStats",
+    "FilterCountMiddleware",
+    "build_dispatch_index",
+    "callback_prefix",
+    "claim_callback_prefixes",
+    "dispatch_stats",
+    "note_filter_evaluation",
+]
+
+# router name -> prefixes of raw-string callback handlers declared by the module
+_DECLARED: dict[str, set[str]] = {}
+# router name -> owned prefixes (None = open, gate always passes)
+_INDEX: dict[str, frozenset[str] | None] = {}
+
+_update_evals: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar(
+    "dispatch_filter_evals", default=None
+)
+
+
+def callback_prefix(data: str | None, sep: str = ":") -> str | None:
+    """Return the CallbackData prefix of packed callback data (``prefix:...``)."""
+    if not data:
+        return None
+    return data.split(sep, 1)[0]
+
+
+def claim_callback_prefixes(router: Router, *prefixes: str) -> None:
+    """Declare prefixes handled by raw-string callback handlers of ``router``."""
+    _DECLARED.setdefault(router.name, set()).update(p for p in prefixes if p)
+
+
+def _walk(router: Router) -> Iterator[Router]:
+    yield router
+    for sub in router.sub_routers:
+        yield from _walk(sub)
+
+
+def _handler_prefixes(handler: Any) -> set[str] | None:
+    """Prefixes a callback handler filters on; None when it cannot be determined."""
+    found: set[str] = set()
+    for flt in handler.filters or ():
+        cb = getattr(flt, "callback", None)
+        if isinstance(cb, CallbackQueryFilter):
+            prefix = getattr(cb.callback_data, "__prefix__", None)
+            if prefix:
+                found.add(str(prefix))
+    return found or None
+
+
+def _router_prefixes(router: Router) -> frozenset[str] | None:
+    owned: set[str] = set(_DECLARED.get(router.name, ()))
+    raw_handlers = 0
+    for r in _walk(router):
+        for h in r.callback_query.handlers:
+            prefixes = _handler_prefixes(h)
+            if prefixes is None:
+                raw_handlers += 1
+            else:
+                owned |= prefixes
+    if raw_handlers and router.name not in _DECLARED:
+        logger.info(
+            "dispatch index: router %s has %d raw callback handlers and no declared "
+            "prefixes; leaving it open",
+            router.name,
+            raw_handlers,
+        )
+        return None
+    return frozenset(owned)
+
+
+def build_dispatch_index(*routers: Router) -> dict[str, frozenset[str] | None]:
+    """(Re)build the prefix index for the given feature routers.
+
+    Call after all handlers are registered (``build_main_router`` does).
+    Returns a copy of the index for logging/tests.
+    """
+    for router in routers:
+        try:
+            _INDEX[router.name] = _router_prefixes(router)
+        except Exception:
+            logger.exception("dispatch index: failed to index router %s", router.name)
+            _INDEX[router.name] = None
+    with_prefixes = {k: len(v) for k, v in _INDEX.items() if v is not None}
+    logger.info("dispatch index built: %s", with_prefixes)
+    return dict(_INDEX)
+
+
+class DispatchStats:
+    """Process-wide counters for callback gating and role-filter evaluations."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.gate_passed = 0
+        self.gate_skipped = 0
+        self.filter_evaluations: Counter[str] = Counter()
+        # number of role-filter evaluations per update -> updates count
+        self.per_update: Counter[int] = Counter()
+
+    def gate(self, passed: bool) -> None:
+        with self._lock:
+            if passed:
+                self.gate_passed += 1
+            else:
+                self.gate_skipped += 1
+
+    def evaluation(self, kind: str) -> None:
+        with self._lock:
+            self.filter_evaluations[kind] += 1
+
+    def close_update(self, evaluations: int) -> None:
+        with self._lock:
+            self.updates += 1
+            self.per_update[evaluations] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "updates": self.updates,
+                "gate_passed": self.gate_passed,
+                "gate_skipped": self.gate_skipped,
+                "filter_evaluations": dict(self.filter_evaluations),
+                "evaluations_per_update": dict(sorted(self.per_update.items())),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.updates = self.gate_passed = self.gate_skipped = 0
+            self.filter_evaluations.clear()
+            self.per_update.clear()
+
+
+dispatch_stats = DispatchStats()
+
+
+def note_filter_evaluation(kind: str) -> None:
+    """Record one evaluation of a (costly) router filter, e.g. ``admin_role``."""
+    dispatch_stats.evaluation(kind)
+    tally = _update_evals.get()
+    if tally is not None:
+        tally[0] += 1
+
+
+class CallbackPrefixGate(BaseFilter):
+    """Router-level filter: pass only callbacks whose prefix the router owns.
+
+    Register it before role filters so foreign callbacks never reach them.
+    Messages and callbacks without data always pass.
+    """
+
+    def __init__(self, router: Router) -> None:
+        self.router_name = router.name
+
+    async def __call__(self, obj: TelegramObject) -> bool:
+        if not isinstance(obj, CallbackQuery):
+            return True
+        owned = _INDEX.get(self.router_name)
+        if owned is None:
+            return True
+        prefix = callback_prefix(obj.data)
+        passed = prefix is None or prefix in owned
+        dispatch_stats.gate(passed)
+        return passed
+
+
+class FilterCountMiddleware(BaseMiddleware):
+    """Outer middleware that tallies role-filter evaluations per update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Any],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        tally = [0]
+        token = _update_evals.set(tally)
+        try:
+            return await handler(event, data)
+        finally:
+            _update_evals.reset(token)
+            dispatch_stats.close_update(tally[0])
+            if tally[0] > 1:
+                logger.debug("dispatch: %d role-filter evaluations for one update", tally[0])
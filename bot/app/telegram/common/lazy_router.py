@@ -0,0 +1,140 @@
+"""Deferred import of feature routers.
+
+The admin and master handler modules are large and only a handful of users
+ever reach them, yet importing them used to sit between process start and the
+first ``getUpdates``. ``LazyRouter`` puts an empty placeholder router in their
+place in the main router (so the client -> admin -> master order is kept) and
+imports the real router the first time an update reaches the placeholder, or
+earlier from ``preload_lazy_routers`` which ``install_lazy_preload`` schedules
+on dispatcher startup: the module is imported in a worker thread and then
+attached on the event loop.
+
+On load the router is included into the placeholder and added to the callback
+dispatch index, so gating and middleware inheritance behave exactly as if it
+had been included up front.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher, Router
+from aiogram.types import TelegramObject
+
+from bot.app.telegram.common.dispatch_index import build_dispatch_index
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["LazyRouter", "install_lazy_preload", "lazy_routers", "preload_lazy_routers"]
+
+# name -> placeholder of the current main router (rebuilt routers replace it)
+_REGISTRY: dict[str, LazyRouter] = {}
+
+
+class _EnsureLoaded(BaseMiddleware):
+    def __init__(self, owner: LazyRouter) -> None:
+        self.owner = owner
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Any],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if self.owner.router is None:
+            self.owner.load()
+        return await handler(event, data)
+
+
+class LazyRouter:
+    """Placeholder for ``module:attr`` router, loaded on first use.
+
+    ``update_types`` must list every event type the real router handles: the
+    placeholder only intercepts those, and ``dp.resolve_used_update_types``
+    (allowed updates for polling) cannot see into a router not loaded yet.
+    """
+
+    def __init__(
+        self,
+        module: str,
+        attr: str,
+        *,
+        name: str,
+        update_types: Iterable[str] = ("message", "callback_query"),
+    ) -> None:
+        self.module = module
+        self.attr = attr
+        self.router: Router | None = None
+        self.slot = Router(name=f"lazy:{name}")
+        self.update_types = tuple(update_types)
+        ensure = _EnsureLoaded(self)
+        for update_type in self.update_types:
+            self.slot.observers[update_type].outer_middleware(ensure)
+            # A never-matching handler keeps the type in resolve_used_update_types
+            self.slot.observers[update_type].register(_never, _no_match)
+        _REGISTRY[name] = self
+
+    def load(self) -> Router | None:
+        """Import and attach the real router (idempotent, runs on the loop thread)."""
+        if self.router is not None:
+            return self.router
+        started = time.perf_counter()
+        try:
+            router = getattr(importlib.import_module(self.module), self.attr)
+            self.slot.include_router(router)
+            self.router = router
+        except Exception:
+            logger.exception("lazy router: failed to load %s:%s", self.module, self.attr)
+            return None
+        try:
+            build_dispatch_index(router)
+        except Exception:
+            logger.exception("lazy router: failed to index %s", router.name)
+        logger.info(
+            "lazy router %s loaded in %.1f ms",
+            router.name,
+            (time.perf_counter() - started) * 1000,
+        )
+        return router
+
+
+def _no_match(_event: TelegramObject) -> bool:
+    return False
+
+
+async def _never(_event: TelegramObject) -> None:
+    """Placeholder handler, guarded by ``_no_match``."""
+
+
+def lazy_routers() -> list[LazyRouter]:
+    return list(_REGISTRY.values())
+
+
+async def preload_lazy_routers() -> None:
+    """Import pending routers off the loop, then attach them on it."""
+    for lazy in lazy_routers():
+        if lazy.router is not None:
+            continue
+        try:
+            await asyncio.to_thread(importlib.import_module, lazy.module)
+        except Exception:
+            logger.exception("lazy router: background import of %s failed", lazy.module)
+            continue
+        lazy.load()
+
+
+def install_lazy_preload(dp: Dispatcher) -> None:
+    """Start ``preload_lazy_routers`` in the background once polling starts."""
+    tasks: set[asyncio.Task[None]] = set()
+
+    async def _on_startup() -> None:
+        task = asyncio.create_task(preload_lazy_routers())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    dp.startup.register(_on_startup)
@@ -38,7 +38,9 @@ class LocaleMiddleware(BaseMiddleware):
             # Delegate to the shared safe_get_locale helper which handles
             # DB failures and provides a default fallback.
             data["locale"] = await safe_get_locale(int(user_id))
-            logger.info("LocaleMiddleware: set locale %s for user %s", data["locale"], int(user_id))
+            logger.debug(
+                "LocaleMiddleware: set locale %s for user %s", data["locale"], int(user_id)
+            )
         except Exception:
             # Be defensive: do not prevent handlers from running if locale
             # resolution fails for any reason.
@@ -0,0 +1,38 @@
+"""Binds the Telegram user of each update to log records.
+
+``LogContextMiddleware`` (outer, on ``dp.update``) reads the user aiogram's
+own ``UserContextMiddleware`` resolved (``data["event_from_user"]``) and sets
+it in ``bot.app.core.logger`` for the duration of the update, so every record
+emitted while handling it carries ``user_id`` and debug-on-demand users get
+their DEBUG records through.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+
+from bot.app.core.logger import bind_log_user
+
+__all__ = ["LogContextMiddleware", "install_log_context"]
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """Outer ``update`` middleware: ``user_id`` on every record of the update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Any],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        with bind_log_user(getattr(user, "id", None)):
+            return await handler(event, data)
+
+
+def install_log_context(dp: Dispatcher) -> None:
+    dp.update.outer_middleware(LogContextMiddleware())
@@ -0,0 +1,77 @@
+"""Per-update latency / SQL-count middleware for the dispatcher.
+
+``UpdateMetricsMiddleware`` (outer, on ``dp.update``) opens a
+``bot.app.core.metrics`` scope for the whole update, so the time spent in
+filters (role lookups) and middlewares is included. The handler is only known
+after routing, so ``HandlerLabelMiddleware`` is registered as an *inner*
+middleware on the dispatcher observers: inner middlewares of a parent router
+apply to every nested router, and aiogram passes the chosen ``HandlerObject``
+in ``data["handler"]``. Updates no handler claims keep the ``<type>:unhandled``
+label.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import suppress
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from bot.app.core.metrics import current_stats, track
+
+__all__ = ["HandlerLabelMiddleware", "UpdateMetricsMiddleware", "install_update_metrics"]
+
+_MODULE_PREFIX = "bot.app.telegram."
+
+
+def handler_label(callback: Any) -> str:
+    """``admin.admin_handlers.show_stats`` style label for a handler callback."""
+    module = getattr(callback, "__module__", None) or ""
+    if module.startswith(_MODULE_PREFIX):
+        module = module[len(_MODULE_PREFIX) :]
+    name = getattr(callback, "__qualname__", None) or type(callback).__name__
+    return f"{module}.{name}" if module else name
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer ``update`` middleware: one stats scope per update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Any],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        kind = "update"
+        if isinstance(event, Update):
+            with suppress(Exception):
+                kind = event.event_type
+        async with track("update", f"{kind}:unhandled"):
+            return await handler(event, data)
+
+
+class HandlerLabelMiddleware(BaseMiddleware):
+    """Inner middleware: names the current scope after the handler that runs."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Any],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        stats = current_stats()
+        handler_obj = data.get("handler")
+        if stats is not None and handler_obj is not None:
+            stats.name = handler_label(getattr(handler_obj, "callback", handler_obj))
+        return await handler(event, data)
+
+
+def install_update_metrics(dp: Dispatcher) -> None:
+    """Attach both middlewares to ``dp`` (every event type except ``update``/``error``)."""
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    label = HandlerLabelMiddleware()
+    for name, observer in dp.observers.items():
+        if name not in {"update", "error"}:
+            observer.middleware(label)
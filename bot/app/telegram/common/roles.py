@@ -16,6 +16,7 @@ from bot.app.core.db import get_session
 from ...domain.models import User, Master
 from sqlalchemy import select
 from bot.app.services.shared_services import safe_get_locale, get_admin_ids, get_master_ids
+from bot.app.telegram.common.dispatch_index import note_filter_evaluation
 from bot.app.translations import t
 
 logger = logging.getLogger(__name__)
@@ -159,10 +160,11 @@ class AdminRoleFilter(BaseFilter):
     """
 
     async def __call__(self, obj: Message | CallbackQuery) -> bool:
+        note_filter_evaluation("admin_role")
         try:
             uid = obj.from_user.id
             allowed = await ensure_admin(obj)
-            logger.info("AdminRoleFilter: uid=%s allowed=%s", uid, allowed)
+            logger.debug("AdminRoleFilter: uid=%s allowed=%s", uid, allowed)
             return allowed
         except Exception:
             return False
@@ -175,10 +177,11 @@ class MasterRoleFilter(BaseFilter):
     """
 
     async def __call__(self, obj: Message | CallbackQuery) -> bool:
+        note_filter_evaluation("master_role")
         try:
             uid = obj.from_user.id
             allowed = await ensure_master(obj)
-            logger.info("MasterRoleFilter: uid=%s allowed=%s", uid, allowed)
+            logger.debug("MasterRoleFilter: uid=%s allowed=%s", uid, allowed)
             return allowed
         except Exception:
             return False
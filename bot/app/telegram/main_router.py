@@ -1,12 +1,16 @@
 """Telegram interfaces composition: include all feature routers here."""
 
 import contextlib
+import importlib
 import logging
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery
 from aiogram.fsm.context import FSMContext
+from bot.app.core.constants import LAZY_ROUTERS_ENABLED
 from bot.app.telegram.common.callbacks import NavCB
+from bot.app.telegram.common.dispatch_index import FilterCountMiddleware, build_dispatch_index
+from bot.app.telegram.common.lazy_router import LazyRouter
 from bot.app.telegram.common.navigation import nav_root, nav_pop, nav_role_root
 
 logger = logging.getLogger(__name__)
@@ -14,6 +18,7 @@ logger = logging.getLogger(__name__)
 
 def build_main_router() -> Router:
     router = Router()
+    feature_routers: list[Router] = []
     # Register global navigation handler after feature routers so feature
     # CallbackData handlers are matched first.
 
@@ -29,27 +34,30 @@ def build_main_router() -> Router:
         from .client.client_handlers import client_router
 
         router.include_router(client_router)
+        feature_routers.append(client_router)
         logger.info("Client router included")
     except Exception as e:
         logger.error("Failed to include client_router: %s", e)
 
     # Then include admin and master routers which are protected by
-    # role filters and should be evaluated after public handlers.
-    try:
-        from .admin.admin_handlers import admin_router
-
-        router.include_router(admin_router)
-        logger.info("Admin router included")
-    except Exception as e:
-        logger.error("Failed to include admin_router: %s", e)
-
-    try:
-        from .master.master_handlers import master_router
-
-        router.include_router(master_router)
-        logger.info("Master router included")
-    except Exception as e:
-        logger.error("Failed to include master_router: %s", e)
+    # role filters and should be evaluated after public handlers. By default
+    # they are placeholders that import the handler modules on first use
+    # (see common.lazy_router); LAZY_ROUTERS=0 restores eager loading.
+    for name, module in (
+        ("admin", "bot.app.telegram.admin.admin_handlers"),
+        ("master", "bot.app.telegram.master.master_handlers"),
+    ):
+        try:
+            if LAZY_ROUTERS_ENABLED:
+                router.include_router(LazyRouter(module, f"{name}_router", name=name).slot)
+                logger.info("%s router deferred", name.capitalize())
+                continue
+            feature = getattr(importlib.import_module(module), f"{name}_router")
+            router.include_router(feature)
+            feature_routers.append(feature)
+            logger.info("%s router included", name.capitalize())
+        except Exception as e:
+            logger.error("Failed to include %s_router: %s", name, e)
 
     # Register global navigation handler after feature routers so it doesn't
     # intercept typed callback_data handlers defined in feature routers.
@@ -74,5 +82,13 @@ def build_main_router() -> Router:
             with contextlib.suppress(Exception):
                 logging.getLogger(__name__).exception("_global_nav_handler failed")
 
+    # Prefix index: each feature router only sees callbacks whose CallbackData
+    # prefix it handles, so admin/master role filters run for the owner only.
+    try:
+        build_dispatch_index(*feature_routers)
+    except Exception:
+        logger.exception("Failed to build callback dispatch index")
+    router.callback_query.outer_middleware(FilterCountMiddleware())
+
     logger.info("Main router assembled")
     return router
@@ -4,7 +4,7 @@ import contextlib
 import logging
 
 from aiogram import Bot, F, Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import CallbackQuery, InaccessibleMessage, Message
 from aiogram.fsm.context import FSMContext
 from datetime import datetime
@@ -22,11 +22,13 @@ from bot.app.telegram.common.callbacks import (
     BookingsPageCB,
     MasterBookingsCB,
     ClientInfoCB,
+    MasterClientsCB,
     MasterClientNoteCB,
     MasterCancelReasonCB,
     MasterSetServiceDurationCB,
 )
 from bot.app.services.shared_services import _decode_time, get_admin_ids, is_cancel_text
+from bot.app.services.shared_services import format_date, format_money_cents
 from bot.app.services.client_services import BookingRepo, build_booking_details
 from bot.app.services.shared_services import format_booking_details_text
 from bot.app.telegram.client.client_keyboards import build_booking_card_kb
@@ -93,10 +95,12 @@ master_router = Router(name="master")
 # Apply master role filter and locale middleware so handlers receive `locale: str` from middleware
 from bot.app.telegram.common.locale_middleware import LocaleMiddleware
 from bot.app.telegram.common.ui_fail_safe import SafeUIMiddleware
+from bot.app.telegram.common.dispatch_index import CallbackPrefixGate
 
 # 1. Ensure only masters reach these handlers (redundant if applied elsewhere)
+# Prefix gate first so callbacks of other routers never trigger the role lookup.
 master_router.message.filter(MasterRoleFilter())
-master_router.callback_query.filter(MasterRoleFilter())
+master_router.callback_query.filter(CallbackPrefixGate(master_router), MasterRoleFilter())
 
 # 2. Attach LocaleMiddleware so callbacks/messages get `locale: str` injected
 master_router.message.middleware(LocaleMiddleware())
@@ -470,13 +474,37 @@ async def handle_master_menu_entry(cb: CallbackQuery, state: FSMContext, locale:
     await cb.answer()
 
 
+_CLIENT_SORT_LABELS = {
+    "last": "master_last_visit",
+    "spend": "master_total_spent",
+    "no_shows": "master_no_shows",
+}
+
+
+def _client_button_label(row: Any, sort: str) -> str:
+    """Client name (@username) plus the value the list is sorted by."""
+    label = row.name or f"#{row.user_id}"
+    if row.username:
+        label = f"{label} (@{row.username})"
+    if sort == "spend":
+        label = f"{label} · {format_money_cents(row.spend_cents)}"
+    elif sort == "no_shows":
+        label = f"{label} · 👻{row.no_shows}"
+    elif row.last_visit_at is not None:
+        label = f"{label} · {format_date(row.last_visit_at, '%d.%m.%y')}"
+    return f"📝 {label}" if row.note_id else label
+
+
 @master_router.callback_query(MasterMenuCB.filter(F.act == "my_clients"))
+@master_router.callback_query(MasterClientsCB.filter())
 async def master_my_clients(
     cb: CallbackQuery, callback_data: MenuCallback, state: FSMContext, locale: str
 ) -> None:
     """Show paginated list of clients for the master.
 
-    Supports MasterMenuCB(act="my_clients", page=<n>) where page is 1-indexed.
+    Supports MasterMenuCB(act="my_clients", page=<n>) and
+    MasterClientsCB(sort=<last|spend|no_shows>, page=<n>) where page is 1-indexed.
+    Pages come from ``master_client_summary`` (sorted and paginated in SQL).
     """
     # Prefer middleware-provided `locale`; fall back to default when missing
     lang = locale or default_language()
@@ -485,79 +513,76 @@ async def master_my_clients(
         await cb.answer()
         return
 
+    PAGE_SIZE = 5
+    sort = str(getattr(callback_data, "sort", None) or "last")
+    page = max(1, int(getattr(callback_data, "page", 1) or 1))
     try:
-        clients = await master_services.MasterRepo.get_clients_for_master(int(master_id))
+        result = await master_services.MasterRepo.get_clients_page(
+            int(master_id), sort=sort, page=page, page_size=PAGE_SIZE
+        )
     except Exception:
-        clients = []
+        logger.exception("master: failed to load clients page")
+        result = None
+
+    if not result or not result.total:
+        try:
+            await safe_edit(
+                cb.message,
+                text=t("master_no_clients", lang),
+                reply_markup=get_master_main_menu(lang),
+            )
+            await nav_push(
+                state, t("master_no_clients", lang), get_master_main_menu(lang), lang=lang
+            )
+        except Exception:
+            logger.exception("master: failed to show 'no clients' UI")
+            raise
+        await cb.answer()
+        return
 
     from aiogram.utils.keyboard import InlineKeyboardBuilder
     from bot.app.telegram.common.callbacks import pack_cb, ClientInfoCB
 
     builder = InlineKeyboardBuilder()
-
-    # Pagination params
-    PAGE_SIZE = 5
-    page = int(getattr(callback_data, "page", 1) or 1)
-    if page < 1:
-        page = 1
-
-        if not clients:
-            try:
-                await safe_edit(
-                    cb.message,
-                    text=t("master_no_clients", lang),
-                    reply_markup=get_master_main_menu(lang),
-                )
-                await nav_push(
-                    state, t("master_no_clients", lang), get_master_main_menu(lang), lang=lang
-                )
-            except Exception:
-                logger.exception("master: failed to show 'no clients' UI")
-                raise
-            await cb.answer()
-            return
-
-    total = len(clients)
-    total_pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
-    if page > total_pages:
-        page = total_pages or 1
-
-    start = (page - 1) * PAGE_SIZE
-    end = start + PAGE_SIZE
-    page_clients = clients[start:end]
+    sort, page, total_pages = result.sort, result.page, result.pages
 
     # One button per client on the page
-    for uid, name, username in page_clients:
-        label = name or f"#{uid}"
-        if username:
-            label = f"{label} (@{username})"
-        builder.button(text=label, callback_data=pack_cb(ClientInfoCB, user_id=int(uid)))
+    for row in result.items:
+        builder.button(
+            text=_client_button_label(row, sort),
+            callback_data=pack_cb(ClientInfoCB, user_id=int(row.user_id)),
+        )
+
+    # Sort row: the active key is marked
+    for key, label_key in _CLIENT_SORT_LABELS.items():
+        mark = "• " if key == sort else ""
+        builder.button(
+            text=f"{mark}{t(label_key, lang)}",
+            callback_data=pack_cb(MasterClientsCB, sort=key, page=1),
+        )
 
     # Navigation row: Prev / Back / Next
-    if total_pages > 1:
-        if page > 1:
-            builder.button(
-                text=t("page_prev", lang),
-                callback_data=pack_cb(MasterMenuCB, act="my_clients", page=page - 1),
-            )
-        else:
-            # filler disabled button (Telegram doesn't support disabled; omit)
-            pass
-            builder.button(text=t("back", lang), callback_data=pack_cb(MasterMenuCB, act="menu"))
-        if page < total_pages:
-            builder.button(
-                text=t("page_next", lang),
-                callback_data=pack_cb(MasterMenuCB, act="my_clients", page=page + 1),
-            )
-    else:
-        builder.button(text=t("back", lang), callback_data=pack_cb(MasterMenuCB, act="menu"))
+    nav = 1
+    if page > 1:
+        builder.button(
+            text=t("page_prev", lang),
+            callback_data=pack_cb(MasterClientsCB, sort=sort, page=page - 1),
+        )
+        nav += 1
+    builder.button(text=t("back", lang), callback_data=pack_cb(MasterMenuCB, act="menu"))
+    if page < total_pages:
+        builder.button(
+            text=t("page_next", lang),
+            callback_data=pack_cb(MasterClientsCB, sort=sort, page=page + 1),
+        )
+        nav += 1
 
-    # Layout: each client its own row, nav row at the end (3 buttons if present)
-    sizes = [1] * len(page_clients)
-    sizes.append(3 if total_pages > 1 else 1)
-    builder.adjust(*sizes)
+    # Layout: each client its own row, then the sort row and the nav row
+    builder.adjust(*([1] * len(result.items)), len(_CLIENT_SORT_LABELS), nav)
     kb = builder.as_markup()
     title = t("master_my_clients_header", lang)
+    if total_pages > 1:
+        title = f"{title} ({page}/{total_pages})"
     try:
         await safe_edit(cb.message, text=title, reply_markup=kb)
         await nav_push(state, title, kb, lang=lang)
@@ -567,6 +592,53 @@ async def master_my_clients(
     await cb.answer()
 
 
+def _master_search_view(page: Any, lang: str) -> tuple[str, InlineKeyboardMarkup]:
+    from bot.app.telegram.common.client_search_ui import client_search_view
+
+    return client_search_view(
+        page,
+        lang,
+        hit_callback=lambda hit: pack_cb(ClientInfoCB, user_id=int(hit.user_id)),
+        more_callback=pack_cb(MasterMenuCB, act="find_more"),
+        back_callback=pack_cb(MasterMenuCB, act="my_clients"),
+    )
+
+
+@master_router.message(Command("find"))
+async def master_find_client(
+    message: Message, command: CommandObject, state: FSMContext, locale: str
+) -> None:
+    """/find <name | @username | telegram id> — search among the master's own clients."""
+    from bot.app.telegram.common.client_search_ui import start_search
+
+    lang = locale or default_language()
+    if not (command.args or "").strip() or message.from_user is None:
+        await message.answer(t("client_search_usage", lang))
+        return
+    mid = await master_services.MasterRepo.resolve_master_id(int(message.from_user.id))
+    if not mid:
+        return
+    page = await start_search(state, command.args, master_id=int(mid))
+    text, kb = _master_search_view(page, lang)
+    await message.answer(text, reply_markup=kb)
+
+
+@master_router.callback_query(MasterMenuCB.filter(F.act == "find_more"))
+async def master_find_client_more(cb: CallbackQuery, state: FSMContext, locale: str) -> None:
+    """Next keyset page of the master's last /find."""
+    from bot.app.telegram.common.client_search_ui import next_search_page
+
+    lang = locale or default_language()
+    mid = await master_services.MasterRepo.resolve_master_id(int(cb.from_user.id))
+    page = await next_search_page(state, master_id=int(mid)) if mid else None
+    if page is None:
+        await cb.answer()
+        return
+    text, kb = _master_search_view(page, lang)
+    await safe_edit(cb.message, text=text, reply_markup=kb)
+    await cb.answer()
+
+
 @master_router.callback_query(ClientInfoCB.filter())
 async def master_client_info(
     cb: CallbackQuery, callback_data: ClientInfoData, state: FSMContext, locale: str
@@ -12,3 +12,58 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[3]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+import asyncio  # noqa: E402
+from collections.abc import Iterator  # noqa: E402
+from typing import Any  # noqa: E402
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def budget_db() -> Iterator[Any]:
+    """Point ``bot.app.core.db`` at a scratch database for query-budget tests.
+
+    ``TEST_DATABASE_URL`` (a disposable Postgres) when set, otherwise an
+    in-memory SQLite stand-in; the schema is created from the models and
+    dropped afterwards. Yields the session factory.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool, StaticPool
+
+    from bot.app.core import db
+    from bot.app.core.metrics import instrument_engine
+    from bot.app.domain.models import Base
+    from bot.app.tests_new.query_budget import TEST_DATABASE_URL
+
+    if TEST_DATABASE_URL:
+        # every test body runs its own event loop: no pooled connections across loops
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    else:
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+    instrument_engine(engine)
+
+    async def _create() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def _drop() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+    asyncio.run(_create())
+    db._reset_engine_for_tests()
+    db._engine = engine
+    db._session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        yield db._session_factory
+    finally:
+        db._reset_engine_for_tests()
+        asyncio.run(_drop())
@@ -0,0 +1,192 @@
+"""Query-budget harness: fail a test when a call runs more SQL than it declares.
+
+Statements are counted by the cursor listeners of ``bot.app.core.metrics``
+(one ``cursor.execute`` = one round trip; ``executemany`` counts once), so the
+budget sees exactly what production instrumentation sees, including SQL run
+inside nested HTTP / update scopes.
+
+    @query_budget(max=3)
+    async def test_list_bookings(budget_db): ...
+
+    async with query_budget(max=2):          # or around a single call
+        await BookingRepo.list_active_by_user(uid)
+
+    budgeted = query_budget(max=4)(client_services.get_slots)   # wrap a service
+
+    await assert_constant_queries(call, sizes=(1, 10), seed=seed)
+
+``seed(n)`` writes ``n`` rows (not counted) and ``call(n)`` performs the
+measured call; its statement count must not depend on ``n``. On failure the
+report lists the statements grouped by shape (literals stripped) with repeat
+counts, and ``assert_constant_queries`` adds a diff between the smallest and
+the largest run - repeated shapes are the usual N+1 signature.
+
+The ``budget_db`` fixture (conftest) points ``bot.app.core.db`` at
+``TEST_DATABASE_URL`` (a scratch Postgres) or an in-memory SQLite stand-in.
+Postgres-only SQL (``ON CONFLICT``, ``SKIP LOCKED``, ``string_agg``) needs the
+real database; use ``requires_postgres`` for those tests.
+"""
+
+from __future__ import annotations
+
+import difflib
+import functools
+import inspect
+import os
+import re
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import ExitStack
+from typing import Any, TypeVar
+
+import pytest
+
+from bot.app.core.metrics import RequestStats, collect_statements
+
+__all__ = [
+    "QueryBudgetExceeded",
+    "assert_constant_queries",
+    "format_statements",
+    "query_budget",
+    "requires_postgres",
+    "statement_shape",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "").strip()
+
+requires_postgres = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"),
+    reason="needs TEST_DATABASE_URL pointing at a scratch Postgres",
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\$\d+|%\(\w+\)s|\?")
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_WS = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a budgeted block runs more statements than allowed."""
+
+
+def statement_shape(sql: str) -> str:
+    """Normalize a statement: collapse whitespace, replace literals/params with ``?``."""
+    shape = _LITERALS.sub("?", _WS.sub(" ", sql).strip())
+    return _IN_LIST.sub("(?...)", shape)
+
+
+def format_statements(statements: Iterable[str], *, limit: int = 160) -> str:
+    """Statements grouped by shape, most repeated first (``x12`` marks a likely N+1)."""
+    counts = Counter(statement_shape(s) for s in statements)
+    lines = []
+    for shape, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
+        mark = f"x{n}" if n > 1 else "  "
+        lines.append(f"  {mark:>4}  {shape[:limit]}")
+    return "\n".join(lines)
+
+
+class query_budget:
+    """Assert that a block / call runs at most ``max`` SQL statements.
+
+    Usable as a (sync or async) context manager and as a decorator for sync
+    or async callables - test functions, service functions or endpoints.
+    """
+
+    def __init__(self, max: int, *, label: str | None = None) -> None:
+        self.max = max
+        self.label = label
+        self.stats: RequestStats | None = None
+        self._stack: ExitStack | None = None
+
+    # -- context manager ---------------------------------------------------
+    def __enter__(self) -> query_budget:
+        self._stack = ExitStack()
+        self.stats = self._stack.enter_context(collect_statements(self.label or "budget"))
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        assert self._stack is not None
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+
+    async def __aenter__(self) -> query_budget:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+    @property
+    def statements(self) -> list[str]:
+        return list(self.stats.log or []) if self.stats is not None else []
+
+    def check(self) -> None:
+        count = len(self.statements)
+        if count > self.max:
+            where = f" in {self.label}" if self.label else ""
+            raise QueryBudgetExceeded(
+                f"query budget exceeded{where}: {count} statements > max {self.max}\n"
+                + format_statements(self.statements)
+            )
+
+    # -- decorator ---------------------------------------------------------
+    def __call__(self, fn: F) -> F:
+        label = self.label or getattr(fn, "__qualname__", repr(fn))
+        limit = self.max
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def _async(*args: Any, **kwargs: Any) -> Any:
+                async with query_budget(limit, label=label):
+                    return await fn(*args, **kwargs)
+
+            return _async  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def _sync(*args: Any, **kwargs: Any) -> Any:
+            with query_budget(limit, label=label):
+                return fn(*args, **kwargs)
+
+        return _sync  # type: ignore[return-value]
+
+
+def _diff(small: list[str], large: list[str]) -> Iterator[str]:
+    return difflib.unified_diff(
+        [statement_shape(s) for s in small],
+        [statement_shape(s) for s in large],
+        fromfile="smallest",
+        tofile="largest",
+        lineterm="",
+        n=1,
+    )
+
+
+async def assert_constant_queries(
+    call: Callable[[int], Awaitable[Any]],
+    sizes: Iterable[int] = (1, 5),
+    *,
+    seed: Callable[[int], Awaitable[Any]] | None = None,
+) -> int:
+    """Run ``seed(n)`` then ``call(n)`` per size; fail unless ``call`` issues a constant count.
+
+    Only the statements executed by ``call`` are counted. Returns that count.
+    """
+    runs: list[tuple[int, list[str]]] = []
+    for n in sizes:
+        if seed is not None:
+            await seed(n)
+        with collect_statements(f"size={n}") as stats:
+            await call(n)
+        runs.append((n, list(stats.log or [])))
+    counts = {n: len(log) for n, log in runs}
+    if len(set(counts.values())) > 1:
+        (_n_small, small), (n_large, large) = runs[0], runs[-1]
+        raise QueryBudgetExceeded(
+            f"statement count depends on data size: {counts}\n"
+            + "\n".join(_diff(small, large))
+            + f"\nstatements for size={n_large}:\n"
+            + format_statements(large)
+        )
+    return next(iter(counts.values()), 0)
@@ -0,0 +1,76 @@
+import hashlib
+import hmac
+import json
+import time
+import urllib.parse
+
+import pytest
+from fastapi import HTTPException
+
+from bot.api import auth
+
+
+@pytest.fixture(autouse=True)
+def _jwt_secret(monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET", "test-secret-test-secret-test-secret")
+    auth.principal_cache.clear()
+
+
+def _token(user_id: int = 7, tg_id: int = 700) -> str:
+    return auth.issue_jwt(user_id, auth.TelegramUser(id=tg_id, username="bob"))
+
+
+def test_decoded_principal_is_cached_and_copied():
+    token = _token()
+
+    first = auth.authenticate_bearer(f"Bearer {token}")
+    first.language = "uk"
+    second = auth.authenticate_bearer(f"Bearer {token}")
+
+    assert (second.user_id, second.telegram_id, second.username) == (7, 700, "bob")
+    assert second.language is None
+    assert auth.principal_cache.hits == 1
+    assert len(auth.principal_cache) == 1
+
+
+def test_forged_and_malformed_tokens_are_rejected():
+    token = _token()
+    forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+    for bad in (forged, "not-a-jwt", "a.b", "a.b.c.d"):
+        with pytest.raises(HTTPException) as exc:
+            auth.authenticate_bearer(f"Bearer {bad}")
+        assert exc.value.status_code == 401
+        assert exc.value.detail == "invalid_token"
+    assert len(auth.principal_cache) == 0
+
+
+def test_cache_drops_expired_and_evicts_oldest():
+    cache = auth.PrincipalCache(maxsize=2)
+    p = auth.Principal(user_id=1, telegram_id=1)
+    now = time.time()
+
+    cache.put(b"a", p, now + 60)
+    cache.put(b"b", p, now + 60)
+    cache.get(b"a")
+    cache.put(b"c", p, now + 60)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is p
+    assert cache.get(b"c", now=now + 61) is None
+
+
+def test_validate_init_data_uses_cached_secret(monkeypatch):
+    monkeypatch.setattr(auth, "BOT_TOKEN", "123:test")
+    fields = {
+        "auth_date": str(int(time.time())),
+        "user": json.dumps({"id": 42, "first_name": "Ann"}),
+    }
+    check = "\n".join(f"{k}={fields[k]}" for k in sorted(fields))
+    secret = hmac.new(b"WebAppData", b"123:test", hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+
+    user = auth.validate_init_data(urllib.parse.urlencode(fields))
+
+    assert user.id == 42 and user.first_name == "Ann"
+    assert auth.webapp_secret_key("123:test") == secret
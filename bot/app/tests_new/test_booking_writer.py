@@ -0,0 +1,91 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from bot.app.domain.models import BookingStatus
+from bot.app.services import client_services
+
+
+def _patch_session(monkeypatch, mapping, executed):
+    class FakeSession:
+        async def execute(self, stmt, params):
+            executed.append((str(stmt), params))
+            return SimpleNamespace(one=lambda: SimpleNamespace(_mapping=mapping))
+
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def fake_get_session():
+        yield FakeSession()
+
+    async def const(value):
+        return value
+
+    monkeypatch.setattr(client_services, "get_session", fake_get_session)
+    monkeypatch.setattr(
+        client_services.SettingsRepo, "get_reservation_hold_minutes", lambda: const(5)
+    )
+    monkeypatch.setattr(client_services.SettingsRepo, "get_slot_duration", lambda: const(60))
+
+
+def test_booking_writer_uses_one_statement_and_returns_row(monkeypatch):
+    slot = datetime(2030, 1, 1, 10, tzinfo=UTC)
+    executed = []
+    row = {"conflict_code": None, "id": 11, "user_id": 3, "master_id": 2, "status": "reserved"}
+    _patch_session(monkeypatch, row, executed)
+
+    booking = asyncio.run(client_services.create_composite_booking(3, 777, ["a", "b"], slot))
+
+    assert len(executed) == 1
+    assert executed[0][1]["service_ids"] == ["a", "b"]
+    assert executed[0][1]["master_ref"] == 777
+    assert (booking.id, booking.master_id, booking.status) == (11, 2, BookingStatus.RESERVED)
+
+
+def test_booking_writer_maps_conflicts(monkeypatch):
+    slot = datetime(2030, 1, 1, 10, tzinfo=UTC)
+    _patch_session(monkeypatch, {"conflict_code": "slot_unavailable", "id": None}, [])
+
+    with pytest.raises(ValueError, match="slot_unavailable"):
+        asyncio.run(client_services.create_booking(3, 2, "a", slot))
+
+    exc = SimpleNamespace(orig='conflicting key value violates "bookings_client_no_overlap"')
+    assert client_services._booking_conflict_code(exc) == "client_already_has_booking_at_this_time"
+
+
+def test_slot_lock_is_kept_until_overlap_constraints_exist(monkeypatch):
+    slot = datetime(2030, 1, 1, 10, tzinfo=UTC)
+    monkeypatch.setattr(client_services, "_overlap_constraints_ok", False)
+
+    class PgSession:
+        bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+        def __init__(self, found):
+            self.found = found
+            self.executed = []
+
+        async def scalar(self, stmt, params):
+            return self.found
+
+        async def execute(self, stmt, params):
+            self.executed.append((str(stmt), params))
+
+    unmigrated = PgSession(found=1)
+    asyncio.run(client_services._lock_unless_constrained(unmigrated, 2, slot))
+    assert "pg_advisory_xact_lock" in unmigrated.executed[0][0]
+    assert unmigrated.executed[0][1]["k2"] == int(slot.timestamp()) % 2147483647
+    assert client_services._overlap_constraints_ok is False
+
+    migrated = PgSession(found=2)
+    asyncio.run(client_services._lock_unless_constrained(migrated, 2, slot))
+    assert migrated.executed == [] and client_services._overlap_constraints_ok is True
+
+
+def test_unknown_service_is_rejected_before_the_insert():
+    sql = client_services._ATOMIC_BOOKING_SQL
+    assert sql.index("'invalid_service'") < sql.index("INSERT INTO bookings")
+    assert "WHERE verdict.code IS NULL" in sql
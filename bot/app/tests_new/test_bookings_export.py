@@ -0,0 +1,88 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from bot.app.domain.models import BookingStatus
+from bot.app.services import admin_services
+from bot.app.services.admin_services import build_bookings_export_query, stream_bookings_export
+
+START = datetime(2030, 1, 1, 9, 0, tzinfo=UTC)
+
+
+def _rows(n):
+    return [
+        SimpleNamespace(
+            id=i,
+            starts_at=START + timedelta(hours=i),
+            status=BookingStatus.PAID,
+            master_id=2,
+            user_id=10 + i,
+            original_price_cents=1500,
+            final_price_cents=1200 if i % 2 else None,
+            paid_at=None,
+            client_name=f"Client {i}",
+            master_name="Anna",
+            service_name="Cut + Wash",
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def _fake_stream(monkeypatch, rows, batch):
+    seen = {}
+
+    class _Result:
+        async def partitions(self):
+            for i in range(0, len(rows), batch):
+                yield rows[i : i + batch]
+
+    class _Session:
+        async def stream(self, stmt):
+            seen["yield_per"] = stmt.get_execution_options().get("yield_per")
+            return _Result()
+
+    @asynccontextmanager
+    async def fake_get_session():
+        yield _Session()
+
+    monkeypatch.setattr(admin_services, "get_session", fake_get_session)
+    monkeypatch.setattr(admin_services, "read_session", lambda area: fake_get_session())
+    monkeypatch.setattr(admin_services, "get_local_tz", lambda: UTC)
+    return seen
+
+
+def test_export_query_is_single_streamable_select():
+    stmt = build_bookings_export_query(start=START, end=START + timedelta(days=365), master_id=2)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "string_agg(" in sql and "ORDER BY booking_items.position" in sql
+    assert "bookings.master_id = " in sql and "bookings.starts_at < " in sql
+    assert "count(" not in sql.lower()  # no per-page tab/total counts
+
+
+def test_csv_export_streams_all_partitions(monkeypatch):
+    seen = _fake_stream(monkeypatch, _rows(5), batch=2)
+    out = io.BytesIO()
+    n = asyncio.run(stream_bookings_export(out, fmt="csv", batch_size=2))
+    assert n == 5 and seen["yield_per"] == 2
+    lines = list(csv.reader(io.StringIO(out.getvalue().decode("utf-8"))))
+    assert lines[0][0] == "ID" and len(lines) == 6
+    assert lines[1][:5] == ["1", "2030-01-01 10:00", "Client 1", "Anna", "Cut + Wash"]
+    assert lines[1][6] == "paid"
+    assert not out.closed
+
+
+def test_jsonl_export_gzip(monkeypatch):
+    _fake_stream(monkeypatch, _rows(3), batch=10)
+    out = io.BytesIO()
+    assert asyncio.run(stream_bookings_export(out, fmt="jsonl", compress=True)) == 3
+    records = [json.loads(line) for line in gzip.decompress(out.getvalue()).splitlines()]
+    assert [r["id"] for r in records] == [1, 2, 3]
+    assert records[0]["amount_cents"] == 1200 and records[1]["amount_cents"] == 1500
+    assert records[0]["starts_at"].startswith("2030-01-01 10:00")
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from bot.app.core import cache_bus as cb
+
+
+@pytest.fixture
+def subscribers(monkeypatch):
+    registry: dict = {}
+    monkeypatch.setattr(cb, "_subscribers", registry)
+    return registry
+
+
+def test_publish_runs_local_subscribers_and_all_fans_out(subscribers):
+    seen: list[tuple[str, str | None]] = []
+
+    @cb.subscribe(cb.Topic.CATALOG)
+    def on_catalog(key):
+        seen.append(("catalog", key))
+
+    cb.subscribe(cb.Topic.AVAILABILITY, lambda key: seen.append(("availability", key)))
+    cb.subscribe(cb.Topic.CATALOG, on_catalog)  # idempotent
+
+    cb.publish(cb.Topic.AVAILABILITY, 42)
+    cb.publish(cb.Topic.SETTINGS, "timezone")  # no subscribers
+    assert seen == [("availability", "42")]
+
+    seen.clear()
+    cb.dispatch(cb.Topic.ALL)
+    assert sorted(seen) == [("availability", None), ("catalog", None)]
+
+
+def test_failing_handler_does_not_stop_the_others(subscribers):
+    seen = []
+
+    def boom(_key):
+        raise RuntimeError("boom")
+
+    cb.subscribe(cb.Topic.ROLES, boom)
+    cb.subscribe(cb.Topic.ROLES, seen.append)
+    cb.dispatch(cb.Topic.ROLES, "1")
+    assert seen == ["1"]
+
+
+def test_notifications_decode_and_skip_own_origin(subscribers):
+    seen = []
+    cb.subscribe(cb.Topic.AVAILABILITY, seen.append)
+    bus = cb.CacheBus()
+
+    bus._on_notify(None, 1, cb.CHANNEL, cb.encode_message(cb.Topic.AVAILABILITY, "7", "other"))
+    bus._on_notify(None, 1, cb.CHANNEL, cb.encode_message(cb.Topic.AVAILABILITY, "8"))
+    bus._on_notify(None, 1, cb.CHANNEL, "not json")
+    bus._on_notify(None, 1, cb.CHANNEL, '{"t": "unknown", "k": null}')
+
+    assert seen == ["7"]
+    assert bus.received == 1
+    encoded = cb.encode_message(cb.Topic.ALL, None, "x")
+    assert cb.decode_message(encoded) == (cb.Topic.ALL, None, "x")
+
+
+def test_reconnect_triggers_full_refresh_and_async_handlers(subscribers):
+    refreshed = []
+
+    async def on_settings(key):
+        refreshed.append(key)
+
+    cb.subscribe(cb.Topic.SETTINGS, on_settings)
+
+    async def scenario():
+        bus = cb.CacheBus()
+        bus._on_connected()
+        bus._on_connected()
+        await asyncio.sleep(0)
+        assert bus.connects == 2
+
+    asyncio.run(scenario())
+    assert refreshed == [None, None]
+
+
+def test_send_is_noop_until_started_and_dedupes():
+    bus = cb.CacheBus()
+    bus.send(cb.Topic.CATALOG, None)
+    assert bus.snapshot()["pending"] == 0
+
+    async def scenario():
+        bus.running = True
+        bus._wake = asyncio.Event()
+        bus.send(cb.Topic.CATALOG, None)
+        bus.send(cb.Topic.CATALOG, None)
+        bus.send(cb.Topic.AVAILABILITY, "3")
+        return bus.snapshot()["pending"]
+
+    assert asyncio.run(scenario()) == 2
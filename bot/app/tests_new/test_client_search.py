@@ -0,0 +1,53 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from bot.app.services.client_search import (
+    build_search_statement,
+    decode_cursor,
+    encode_cursor,
+    normalize_query,
+    search_clients,
+)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_normalize_query_and_cursor_round_trip():
+    assert normalize_query("  @Olha   Koval ") == "olha koval"
+    assert normalize_query(None) == ""
+    score = 2.0 + 0.3571428656578064  # real-valued similarity widened to double
+    assert decode_cursor(encode_cursor(score, 42)) == (score, 42)
+    assert decode_cursor("garbage") is None and decode_cursor(None) is None
+
+
+def test_search_statement_is_index_backed_and_keyset_paginated():
+    sql = _sql(build_search_statement("olh", limit=10))
+    where = sql.split("WHERE", 1)[1]
+    assert "users.search_text LIKE '%%' || %(search_text_3)s::VARCHAR || '%%' ESCAPE '/'" in where
+    assert "users.search_text %%> %(search_text_4)s" in where
+    assert "word_similarity(%(word_similarity_2)s::VARCHAR, users.search_text)" in sql
+    assert "ORDER BY score DESC, users.id" in sql and "telegram_id =" not in where
+
+    paged = build_search_statement("380501234567", after=(2.5, 7), master_id=3)
+    sql = _sql(paged)
+    assert "JOIN master_client_summary ON master_client_summary.user_id = users.id" in sql
+    assert "OR users.telegram_id = %(telegram_id_1)s::BIGINT OR" in sql.split("WHERE", 1)[1]
+    assert "users.id > %(id_1)s" in sql
+    params = paged.compile(dialect=postgresql.dialect()).params
+    assert params["telegram_id_1"] == 380501234567 and params["param_4"] == 11
+
+
+def test_mixed_case_username_gets_the_exact_match_score():
+    query = normalize_query("@Olha_K")
+    stmt = build_search_statement(query)
+    sql = _sql(stmt)
+    assert "CASE WHEN (lower(users.username) = %(lower_1)s::VARCHAR) THEN" in sql
+    assert stmt.compile(dialect=postgresql.dialect()).params["lower_1"] == "olha_k"
+
+
+def test_too_short_queries_do_not_hit_the_database():
+    page = asyncio.run(search_clients(" @a "))
+    assert page.query == "a" and page.items == [] and page.next_cursor is None
@@ -0,0 +1,87 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from bot.app.domain.models import Master, MasterClientNote, MasterClientSummary, User
+from bot.app.services.client_summary import (
+    build_refresh_statement,
+    get_clients_page,
+    refresh_client_summaries,
+)
+from bot.app.tests_new.query_budget import query_budget
+
+T0 = datetime(2030, 1, 7, 9, 0, tzinfo=UTC)
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+def test_refresh_recomputes_only_touched_pairs():
+    session = _Session()
+    pairs = [(1, 7), (1, 7), (None, 8), (2, 9)]
+    assert asyncio.run(refresh_client_summaries(session, pairs, now=T0))
+    assert asyncio.run(refresh_client_summaries(session, [(None, 1)], now=T0))  # no statement
+    (stmt,) = session.statements
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("INSERT INTO master_client_summary")
+    assert "(bookings.master_id, bookings.user_id) IN" in sql
+    assert "GROUP BY bookings.master_id, bookings.user_id" in sql
+    assert "ON CONFLICT (master_id, user_id) DO UPDATE SET visits = excluded.visits" in sql
+    assert "max(master_client_notes.id)" in sql
+    assert [(1, 7), (2, 9)] in compiled.params.values()
+
+
+def test_rebuild_statement_covers_every_pair():
+    sql = str(build_refresh_statement(T0).compile(dialect=postgresql.dialect()))
+    assert "bookings.user_id) IN" not in sql and "bookings.master_id IS NOT NULL" in sql
+
+
+def test_clients_page_sorts_and_paginates_in_sql(budget_db):
+    from bot.app.services.master_services import MasterRepo
+
+    async def run():
+        async with budget_db() as s:
+            s.add(Master(id=1, telegram_id=11, name="Anna"))
+            s.add_all([User(id=i, telegram_id=100 + i, name=f"U{i}") for i in range(1, 5)])
+            await s.flush()
+            s.add(MasterClientNote(id=3, master_id=1, user_id=2, note="allergy"))
+            await s.flush()
+            for uid, spend, no_shows, days in ((1, 500, 0, 1), (2, 9000, 1, 30), (3, 100, 3, 5)):
+                s.add(
+                    MasterClientSummary(
+                        master_id=1,
+                        user_id=uid,
+                        visits=2,
+                        spend_cents=spend,
+                        no_shows=no_shows,
+                        last_visit_at=T0 - timedelta(days=days),
+                        next_visit_at=T0 if uid == 2 else None,
+                        note_id=3 if uid == 2 else None,
+                    )
+                )
+            await s.commit()
+        async with query_budget(max=2):
+            last = await get_clients_page(1, page_size=2)
+        spend = await get_clients_page(1, sort="spend", page=9, page_size=2)
+        no_shows = await get_clients_page(1, sort="no_shows", page_size=3)
+        hist = await MasterRepo.get_client_history_for_master_by_user(11, 2)
+        return last, spend, no_shows, hist
+
+    last, spend, no_shows, hist = asyncio.run(run())
+    assert [r.user_id for r in last.items] == [1, 3] and (last.total, last.pages) == (3, 2)
+    assert spend.page == 2 and [r.user_id for r in spend.items] == [3]  # clamped to last page
+    assert [r.user_id for r in no_shows.items] == [3, 2, 1] and no_shows.items[1].note_id == 3
+    assert hist["visits"] == 2 and hist["total_spent_cents"] == 9000 and hist["no_shows"] == 1
+    assert hist["note"] == "allergy" and hist["name"] == "U2"
@@ -39,3 +39,86 @@ def test_reset_engine_clears_state():
     assert db._session_factory is None
     assert db._SCHEMA_READY is False
     assert db._SCHEMA_CHECKING is False
+
+
+def test_readonly_sessions_route_to_replica_within_lag(monkeypatch):
+    import asyncio
+
+    db._reset_engine_for_tests()
+    monkeypatch.setenv("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    monkeypatch.setenv("DATABASE_REPLICA_URL", "sqlite+aiosqlite:///:memory:")
+    monkeypatch.setenv("DATABASE_REPLICA_MAX_LAG", "5")
+    monkeypatch.setenv("DATABASE_REPLICA_CHECK_SECONDS", "0")
+    monkeypatch.setenv("DATABASE_REPLICA_AREAS", "analytics")
+    lags = iter([1.0, 30.0, RuntimeError("replica down"), None, 0.0])
+
+    async def fake_probe(self, engine):
+        lag = next(lags)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    monkeypatch.setattr(db.ReplicaHealth, "probe", fake_probe)
+
+    async def bind(ctx):
+        async with ctx as session:
+            return session.bind
+
+    async def scenario():
+        primary, replica = db.get_engine(), db.get_replica_engine()
+        assert await bind(db.get_session()) is primary  # writes never probe
+        assert await bind(db.get_session(readonly=True)) is replica  # lag 1s
+        assert await bind(db.get_session(readonly=True)) is primary  # lag 30s
+        assert await bind(db.get_session(readonly=True)) is primary  # probe failed
+        assert await bind(db.get_session(readonly=True)) is primary  # not streaming
+        assert await bind(db.read_session("exports")) is primary  # area not routed
+        assert await bind(db.read_session("analytics")) is replica
+        await primary.dispose()
+        await replica.dispose()
+
+    try:
+        asyncio.run(scenario())
+        assert db.replica_health.routed == {"replica": 2, "primary_fallback": 3}
+    finally:
+        db._reset_engine_for_tests()
+
+
+def test_replica_lag_idle_primary_is_not_lag():
+    from decimal import Decimal
+
+    # not a standby
+    assert db._replica_lag(False, False, None, None) == 0
+    # receiver down: receive == replay proves nothing
+    assert db._replica_lag(True, False, True, Decimal("3")) is None
+    # idle primary: caught up, last write 10 minutes ago
+    assert db._replica_lag(True, True, True, Decimal("600.5")) == 0
+    # replay behind receive: age of the last replayed transaction
+    assert db._replica_lag(True, True, False, Decimal("12.5")) == 12.5
+    assert db._replica_lag(True, True, None, None) is None
+
+
+def test_replica_probe_reads_one_state_row():
+    import asyncio
+
+    sql = str(db._REPLICA_LAG_SQL)
+    assert "pg_stat_wal_receiver WHERE status = 'streaming'" in sql
+
+    class _Conn:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, stmt):
+            return SimpleNamespace(one=lambda: (True, True, True, 900.0))
+
+    engine = SimpleNamespace(connect=_Conn)
+    assert asyncio.run(db.ReplicaHealth().probe(engine)) == 0
+
+
+def test_readonly_without_replica_uses_primary(monkeypatch):
+    db._reset_engine_for_tests()
+    monkeypatch.delenv("DATABASE_REPLICA_URL", raising=False)
+    assert db.get_replica_engine() is None
+    db._reset_engine_for_tests()
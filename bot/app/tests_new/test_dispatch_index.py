@@ -0,0 +1,94 @@
+import asyncio
+from datetime import UTC, datetime
+
+from aiogram import Router
+from aiogram.filters import BaseFilter
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from bot.app.telegram.common import dispatch_index
+from bot.app.telegram.common.dispatch_index import (
+    CallbackPrefixGate,
+    FilterCountMiddleware,
+    build_dispatch_index,
+    claim_callback_prefixes,
+    dispatch_stats,
+    note_filter_evaluation,
+)
+
+
+class AlphaCB(CallbackData, prefix="t_alpha"):
+    n: int
+
+
+class BetaCB(CallbackData, prefix="t_beta"):
+    n: int
+
+
+class _CountingRole(BaseFilter):
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+
+    async def __call__(self, obj) -> bool:
+        note_filter_evaluation(self.kind)
+        return True
+
+
+def _callback(data: str) -> CallbackQuery:
+    user = User(id=1, is_bot=False, first_name="u")
+    msg = Message(
+        message_id=1, date=datetime(2030, 1, 1, tzinfo=UTC), chat=Chat(id=1, type="private")
+    )
+    return CallbackQuery(id="1", from_user=user, chat_instance="c", data=data, message=msg)
+
+
+def _build():
+    root, first, second = Router(name="t_root"), Router(name="t_first"), Router(name="t_second")
+    handled: list[str] = []
+
+    @first.callback_query(AlphaCB.filter())
+    async def on_alpha(cb: CallbackQuery) -> None:
+        handled.append("alpha")
+
+    @second.callback_query(BetaCB.filter())
+    async def on_beta(cb: CallbackQuery) -> None:
+        handled.append("beta")
+
+    @second.callback_query(lambda q: q.data and q.data.startswith("t_raw:"))
+    async def on_raw(cb: CallbackQuery) -> None:
+        handled.append("raw")
+
+    for r, kind in ((first, "first_role"), (second, "second_role")):
+        r.callback_query.filter(CallbackPrefixGate(r), _CountingRole(kind))
+        root.include_router(r)
+    root.callback_query.outer_middleware(FilterCountMiddleware())
+    return root, first, second, handled
+
+
+def test_gate_routes_callbacks_to_owning_router_only():
+    root, first, second, handled = _build()
+    claim_callback_prefixes(second, "t_raw")
+    index = build_dispatch_index(first, second)
+    assert index["t_first"] == {"t_alpha"}
+    assert index["t_second"] == {"t_beta", "t_raw"}
+
+    dispatch_stats.reset()
+
+    async def scenario():
+        for data in (BetaCB(n=1).pack(), "t_raw:x", AlphaCB(n=2).pack()):
+            await root.propagate_event("callback_query", _callback(data))
+
+    asyncio.run(scenario())
+    assert handled == ["beta", "raw", "alpha"]
+    snap = dispatch_stats.snapshot()
+    # one role filter per update: the first router's filter never runs for beta/raw
+    assert snap["filter_evaluations"] == {"second_role": 2, "first_role": 1}
+    assert snap["evaluations_per_update"] == {1: 3}
+    assert snap["gate_skipped"] == 2
+
+
+def test_router_with_undeclared_raw_handlers_stays_open():
+    _, first, second, _ = _build()
+    dispatch_index._DECLARED.pop("t_second", None)
+    index = build_dispatch_index(first, second)
+    assert index["t_second"] is None
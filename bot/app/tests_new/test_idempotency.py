@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from bot.api.idempotency import IdempotencyCache, body_fingerprint
+
+
+def test_concurrent_duplicates_share_one_call_and_later_ones_replay():
+    cache = IdempotencyCache(ttl_seconds=60, max_entries=16)
+    calls = []
+
+    async def hold():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True, "booking_id": len(calls)}
+
+    async def scenario():
+        fp = body_fingerprint({"slot": "2026-01-01T10:00"})
+        first = await asyncio.gather(*(cache.run("hold", 1, "k1", fp, hold) for _ in range(5)))
+        again = await cache.run("hold", 1, "k1", fp, hold)
+        other_user = await cache.run("hold", 2, "k1", fp, hold)
+        no_key = await cache.run("hold", 1, None, fp, hold)
+        return first, again, other_user, no_key
+
+    first, again, other_user, no_key = asyncio.run(scenario())
+    assert [r["booking_id"] for r in first] == [1] * 5
+    assert again == {"ok": True, "booking_id": 1}
+    assert other_user["booking_id"] == 2 and no_key["booking_id"] == 3
+    assert cache.snapshot()["joins"] == 4 and cache.snapshot()["hits"] == 1
+
+
+def test_reused_key_with_other_body_is_rejected():
+    cache = IdempotencyCache(ttl_seconds=60, max_entries=16)
+
+    async def ok():
+        return "done"
+
+    async def scenario():
+        await cache.run("cancel", 1, "k", body_fingerprint({"booking_id": 1}), ok)
+        await cache.run("cancel", 1, "k", body_fingerprint({"booking_id": 2}), ok)
+
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(scenario())
+    assert err.value.status_code == 422
+
+
+def test_failures_reach_waiters_and_are_not_stored():
+    cache = IdempotencyCache(ttl_seconds=60, max_entries=16)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("db down")
+        return "ok"
+
+    async def scenario():
+        results = await asyncio.gather(
+            cache.run("finalize", 1, "k", "fp", flaky),
+            cache.run("finalize", 1, "k", "fp", flaky),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        return await cache.run("finalize", 1, "k", "fp", flaky)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_expired_entries_run_again(monkeypatch):
+    from bot.api import idempotency
+
+    now = [1000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: now[0])
+    cache = IdempotencyCache(ttl_seconds=10, max_entries=1)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        assert await cache.run("hold", 1, "a", "fp", call) == 1
+        assert await cache.run("hold", 1, "a", "fp", call) == 1
+        now[0] += 11
+        assert await cache.run("hold", 1, "a", "fp", call) == 2
+        await cache.run("hold", 1, "b", "fp", call)  # evicts "a" (max_entries=1)
+        assert await cache.run("hold", 1, "a", "fp", call) == 4
+
+    asyncio.run(scenario())
@@ -0,0 +1,132 @@
+"""Property checks of ``LocalDays`` against plain ``zoneinfo`` arithmetic.
+
+Randomized with a fixed seed over zones with hour, half-hour and
+midnight DST transitions; every transition day of the sampled years is
+checked exhaustively minute by minute.
+"""
+
+import random
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from bot.app.domain.local_time import LocalDays
+from bot.app.domain.schedule_grid import busy_mask_for_day, busy_masks_by_day
+
+ZONES = [
+    "UTC",
+    "Europe/Kyiv",
+    "America/New_York",
+    "Australia/Lord_Howe",  # 30-minute DST
+    "America/Santiago",  # transitions at local midnight
+    "Asia/Kolkata",  # no DST, +05:30
+    "America/St_Johns",  # -03:30 / -02:30
+]
+
+
+def _ref_midnight(day: date, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, time(0), tzinfo=tz).astimezone(UTC)
+
+
+def _transition_days(tz: ZoneInfo, year: int) -> list[date]:
+    days = []
+    d = date(year, 1, 1)
+    while d.year == year:
+        a = datetime.combine(d, time(0), tzinfo=tz).utcoffset()
+        b = datetime.combine(d, time(23, 59), tzinfo=tz).utcoffset()
+        nxt = datetime.combine(d + timedelta(days=1), time(0), tzinfo=tz).utcoffset()
+        if a != b or b != nxt:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_day_bounds_tile_the_timeline(zone):
+    tz = ZoneInfo(zone)
+    days = LocalDays(tz)
+    d = date(2024, 1, 1)
+    while d < date(2026, 1, 1):
+        b = days.bounds(d)
+        assert b.start == _ref_midnight(d, tz)
+        assert b.end == days.bounds(d + timedelta(days=1)).start
+        assert 23 * 60 <= b.minutes <= 25 * 60
+        assert b.start.astimezone(tz).date() == d
+        d += timedelta(days=1)
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_local_minute_matches_zoneinfo_on_random_instants(zone):
+    tz = ZoneInfo(zone)
+    days = LocalDays(tz)
+    rng = random.Random(zone)
+    lo = datetime(2000, 1, 1, tzinfo=UTC).timestamp()
+    hi = datetime(2040, 1, 1, tzinfo=UTC).timestamp()
+    for _ in range(3000):
+        utc = datetime.fromtimestamp(rng.uniform(lo, hi), UTC)
+        local = utc.astimezone(tz)
+        wall = local.hour * 60 + local.minute
+        assert days.local_minute(utc) == (local.date(), wall)
+        partial = bool(local.second or local.microsecond)
+        assert days.local_minute(utc, ceil=True) == (local.date(), wall + partial)
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_transition_days_exhaustive(zone):
+    tz = ZoneInfo(zone)
+    days = LocalDays(tz)
+    for year in (2025, 2026):
+        for d in _transition_days(tz, year):
+            b = days.bounds(d)
+            assert not b.uniform or b.minutes == 1440
+            for minute in range(1440):
+                wall = datetime.combine(d, time(minute // 60, minute % 60), tzinfo=tz)
+                utc = days.utc_at(d, minute)
+                assert utc == wall.astimezone(UTC)
+                # every minute of the elapsed day maps back onto the wall clock
+                instant = b.start + timedelta(minutes=minute)
+                if instant < b.end:
+                    local = instant.astimezone(tz)
+                    assert days.local_minute(instant) == (
+                        local.date(),
+                        local.hour * 60 + local.minute,
+                    )
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_utc_at_roundtrips_existing_wall_times(zone):
+    tz = ZoneInfo(zone)
+    days = LocalDays(tz)
+    rng = random.Random(zone + "rt")
+    for _ in range(2000):
+        d = date(2020, 1, 1) + timedelta(days=rng.randrange(0, 6000))
+        minute = rng.randrange(0, 1440)
+        utc = days.utc_at(d, minute)
+        local = utc.astimezone(tz)
+        if (local.date(), local.hour * 60 + local.minute) != (d, minute):
+            # nonexistent wall time: zoneinfo shifts it forward by the gap
+            assert local.replace(tzinfo=None) > datetime.combine(d, time(minute // 60, minute % 60))
+            continue
+        assert days.local_minute(utc) == (d, minute)
+
+
+@pytest.mark.parametrize("zone", ["Europe/Kyiv", "America/Santiago", "Australia/Lord_Howe"])
+def test_busy_masks_by_day_matches_per_day_painter(zone):
+    tz = ZoneInfo(zone)
+    days = LocalDays(tz)
+    rng = random.Random(zone + "busy")
+    first = date(2026, 3, 20)
+    intervals = []
+    for _ in range(400):
+        start = datetime.combine(first, time(0), tzinfo=UTC) + timedelta(
+            seconds=rng.randrange(0, 45 * 86400)
+        )
+        intervals.append((start, start + timedelta(minutes=rng.randrange(1, 600))))
+    masks = busy_masks_by_day(intervals, days)
+    for offset in range(45):
+        d = first + timedelta(days=offset)
+        touching = [
+            (s, e) for s, e in intervals if s.astimezone(tz).date() <= d <= e.astimezone(tz).date()
+        ]
+        assert masks.get(d, 0) == busy_mask_for_day(d, touching, tz)
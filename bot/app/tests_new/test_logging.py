@@ -0,0 +1,76 @@
+import json
+import logging
+import queue
+import sys
+
+from bot.app.core import logger as log
+
+
+def _record(name="bot.app.x", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_parse_rate_limits_skips_garbage():
+    assert log.parse_rate_limits("aiogram.event=20, bot.app=2.5;bad, x=y, =3") == {
+        "aiogram.event": 20.0,
+        "bot.app": 2.5,
+    }
+    assert log.parse_rate_limits(None) == {}
+
+
+def test_rate_limit_drops_floods_and_reports_them():
+    now = [100.0]
+    flt = log.RateLimitFilter({"aiogram": 1, "aiogram.event": 2}, clock=lambda: now[0])
+    passed = [flt.filter(_record("aiogram.event")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Other loggers / WARNING+ are never limited
+    assert flt.filter(_record("bot.app.services")) is True
+    assert flt.filter(_record("aiogram.event", logging.WARNING)) is True
+
+    now[0] += 0.5  # one token back at 2/s
+    record = _record("aiogram.event")
+    assert flt.filter(record) is True and record.sampled_out == 3
+    # "aiogram" has its own bucket (most specific prefix wins)
+    assert flt.filter(_record("aiogram.dispatcher")) is True
+    assert flt.filter(_record("aiogram.dispatcher")) is False
+
+
+def test_level_gate_passes_debug_only_for_debug_users(monkeypatch):
+    monkeypatch.setattr(log._DebugState, "base_level", logging.INFO)
+    monkeypatch.setattr(log._DebugState, "users", set())
+    gate = log.LevelGate()
+    root_level = logging.getLogger().level
+    try:
+        log.enable_user_debug(42)
+        assert logging.getLogger().level == logging.DEBUG
+        with log.bind_log_user(42):
+            assert gate.filter(_record(level=logging.DEBUG)) is True
+        with log.bind_log_user(7):
+            assert gate.filter(_record(level=logging.DEBUG)) is False
+            assert gate.filter(_record(level=logging.INFO)) is True
+        log.disable_user_debug(42)
+        assert log.debug_users() == frozenset()
+        assert logging.getLogger().level == logging.INFO
+    finally:
+        logging.getLogger().setLevel(root_level)
+
+
+def test_queue_handler_prepares_self_contained_json_records():
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    handler = log._LoopSafeQueueHandler(q)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = _record(exc_info=sys.exc_info(), booking_id=5)
+    with log.bind_log_user(99):
+        handler.emit(record)
+    queued = q.get_nowait()
+    assert queued.msg == "hello world" and queued.args is None
+    assert queued.exc_info is None and "ValueError: boom" in queued.exc_text
+
+    payload = json.loads(log.JsonFormatter("bot").format(queued))
+    assert payload["msg"] == "hello world" and payload["service"] == "bot"
+    assert payload["user_id"] == 99 and payload["booking_id"] == 5
+    assert payload["level"] == "INFO" and "ValueError: boom" in payload["exc"]
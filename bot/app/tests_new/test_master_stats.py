@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, time, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from bot.app.domain.models import BookingStatus, Master, MasterSchedule, MasterStats
+from bot.app.services.master_stats import (
+    MasterReputation,
+    apply_rating,
+    apply_transition_stats,
+    build_rebuild_statement,
+    get_master_stats_map,
+    stats_deltas,
+)
+from bot.app.tests_new.query_budget import query_budget
+
+T0 = datetime(2030, 1, 7, 9, 0, tzinfo=UTC)
+
+
+def _row(mid, old, new, hours=0):
+    return SimpleNamespace(
+        master_id=mid, old_status=old, new_status=new, starts_at=T0 + timedelta(hours=hours)
+    )
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_deltas_fold_per_master_and_undo():
+    rows = [
+        _row(1, BookingStatus.CONFIRMED, BookingStatus.DONE, hours=1),
+        _row(1, BookingStatus.PAID, BookingStatus.DONE, hours=5),
+        _row(1, BookingStatus.CONFIRMED, BookingStatus.NO_SHOW, hours=2),
+        _row(2, BookingStatus.DONE, BookingStatus.CONFIRMED),  # mark-done undone
+        _row(3, BookingStatus.CONFIRMED, BookingStatus.CANCELLED),  # not counted
+        _row(None, BookingStatus.CONFIRMED, BookingStatus.DONE),
+    ]
+    deltas = stats_deltas(rows)
+    assert set(deltas) == {1, 2}
+    assert deltas[1]["completed_orders"] == 2 and deltas[1]["no_shows"] == 1
+    assert deltas[1]["last_visit_at"] == T0 + timedelta(hours=5)
+    assert deltas[1]["last_no_show_at"] == T0 + timedelta(hours=2)
+    assert deltas[2] == {
+        "completed_orders": -1,
+        "no_shows": 0,
+        "last_visit_at": None,
+        "last_no_show_at": None,
+    }
+
+
+def test_incremental_updates_are_additive_upserts():
+    session = _Session()
+    rows = [_row(1, BookingStatus.CONFIRMED, BookingStatus.DONE)]
+    assert asyncio.run(apply_transition_stats(session, rows, now=T0))
+    assert asyncio.run(apply_rating(session, 1, 4, now=T0))
+    assert asyncio.run(apply_transition_stats(session, [], now=T0))  # no statement
+    transition, rating = session.statements
+    sql = _sql(transition)
+    assert "ON CONFLICT (master_id) DO UPDATE" in sql
+    assert "completed_orders = (master_stats.completed_orders + excluded.completed_orders)" in sql
+    assert "greatest(master_stats.last_visit_at, excluded.last_visit_at)" in sql
+    params = rating.compile(dialect=postgresql.dialect()).params
+    assert params["rating_sum_m0"] == 4 and params["rating_count_m0"] == 1
+
+
+def test_rebuild_is_one_upsert_from_source_tables():
+    sql = _sql(build_rebuild_statement(T0))
+    assert sql.startswith("INSERT INTO master_stats")
+    assert "FILTER (WHERE bookings.status = " in sql
+    assert "LEFT OUTER JOIN" in sql and "GROUP BY bookings.master_id" in sql
+    assert "ON CONFLICT (master_id) DO UPDATE SET rating_sum = excluded.rating_sum" in sql
+
+
+def test_reputation_average_from_row():
+    row = SimpleNamespace(
+        master_id=5,
+        rating_sum=14,
+        rating_count=3,
+        completed_orders=7,
+        no_shows=-1,  # drift before a rebuild never shows negative
+        last_visit_at=None,
+        last_no_show_at=None,
+    )
+    rep = MasterReputation.from_row(row)
+    assert round(rep.rating_avg, 2) == 4.67 and rep.no_shows == 0
+    assert MasterReputation(master_id=5).rating_avg is None
+
+
+def test_profile_and_catalog_read_master_stats(budget_db):
+    from bot.app.services.master_services import MasterRepo
+
+    async def run():
+        async with budget_db() as s:
+            s.add_all([Master(id=1, telegram_id=11, name="Anna"), Master(id=2, name="Iryna")])
+            await s.flush()
+            s.add(MasterStats(master_id=1, rating_sum=9, rating_count=2, completed_orders=5))
+            s.add(MasterSchedule(master_id=1, day_of_week=0, start_time=time(9), end_time=time(18)))
+            await s.commit()
+        async with query_budget(max=1):
+            catalog = await get_master_stats_map([1, 2])
+        data = await MasterRepo.get_master_profile_data(1)
+        return catalog, data
+
+    catalog, data = asyncio.run(run())
+    assert catalog[1].rating_avg == 4.5 and catalog[2].completed_orders == 0
+    assert data["rating"] == 4.5 and data["ratings_count"] == 2 and data["completed_orders"] == 5
+    assert data["schedule"]["0"] == [["09:00", "18:00"]]
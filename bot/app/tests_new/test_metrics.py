@@ -0,0 +1,101 @@
+import asyncio
+from datetime import UTC, datetime
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Chat, Message, Update, User
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route, Router as ASGIRouter
+
+from bot.app.core import metrics
+from bot.app.core.metrics import HTTPMetricsMiddleware, instrument_engine, render_prometheus, track
+from bot.app.telegram.common.metrics_middleware import install_update_metrics
+
+
+def _line(name: str, handler: str) -> str:
+    prefix = f'{name}{{kind="'
+    for line in render_prometheus().splitlines():
+        if line.startswith(prefix) and f'handler="{handler}"' in line:
+            return line.rsplit(" ", 1)[1]
+    raise AssertionError(f"{name} for {handler} not rendered")
+
+
+def test_sql_statements_counted_per_scope():
+    metrics.reset_metrics()
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine)
+        instrument_engine(engine)  # idempotent
+        async with engine.connect() as conn:
+            await conn.execute(text("select 1"))  # outside any scope: not counted
+            async with track("update", "demo") as stats:
+                await conn.execute(text("select 1"))
+                await conn.execute(text("select 2"))
+        await engine.dispose()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats.statements == 2 and stats.db_seconds > 0
+    assert {sql for _d, sql in stats.slowest()} == {"select 1", "select 2"}
+    assert _line("salon_handler_db_statements_total", "demo") == "2"
+    assert _line("salon_handler_duration_seconds_count", "demo") == "1"
+
+
+def test_update_scope_is_labelled_with_the_handler():
+    metrics.reset_metrics()
+    router = Router()
+
+    @router.message()
+    async def greet(message: Message) -> None:
+        return None
+
+    dp = Dispatcher()
+    install_update_metrics(dp)
+    dp.include_router(router)
+    msg = Message(
+        message_id=1,
+        date=datetime(2030, 1, 1, tzinfo=UTC),
+        chat=Chat(id=1, type="private"),
+        from_user=User(id=1, is_bot=False, first_name="u"),
+        text="hi",
+    )
+    bot = Bot(token="42:TEST")
+    asyncio.run(dp.feed_update(bot, Update(update_id=1, message=msg)))
+    label = f"{__name__}.test_update_scope_is_labelled_with_the_handler.<locals>.greet"
+    assert _line("salon_handler_duration_seconds_count", label) == "1"
+    assert _line("salon_handler_errors_total", label) == "0"
+
+
+def test_http_middleware_uses_route_template():
+    metrics.reset_metrics()
+
+    async def item(request):
+        return PlainTextResponse("ok")
+
+    async def boom(request):
+        return PlainTextResponse("fail", status_code=503)
+
+    app = HTTPMetricsMiddleware(
+        ASGIRouter(routes=[Route("/items/{item_id}", item), Route("/boom", boom)])
+    )
+
+    async def call(path):
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+        await app(scope, receive, send)
+        return sent[0]["status"]
+
+    assert asyncio.run(call("/items/1")) == 200
+    assert asyncio.run(call("/items/2")) == 200
+    assert asyncio.run(call("/boom")) == 503
+    assert _line("salon_handler_duration_seconds_count", "GET /items/{item_id}") == "2"
+    assert _line("salon_handler_errors_total", "GET /boom") == "1"
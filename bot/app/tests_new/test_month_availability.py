@@ -0,0 +1,110 @@
+import asyncio
+from datetime import UTC, datetime, time
+
+import pytest
+
+from bot.app.domain.schedule_grid import MasterGrid, span_mask
+from bot.app.services import month_availability as ma
+
+
+def _grid() -> MasterGrid:
+    # Mon-Fri 09:00-12:00, weekends off
+    return MasterGrid(weekly=(span_mask(540, 720),) * 5 + (0, 0))
+
+
+def test_compute_month_days_counts_first_and_last_start():
+    now = datetime(2026, 3, 10, 9, 50, tzinfo=UTC)  # Tuesday
+    booked = (datetime(2026, 3, 11, 10, 0, tzinfo=UTC), datetime(2026, 3, 11, 11, 0, tzinfo=UTC))
+    days = ma.compute_month_days(
+        _grid(),
+        2026,
+        3,
+        duration=60,
+        step=30,
+        busy_intervals=[booked],
+        tz=UTC,
+        now=now,
+        lead_minutes=10,
+        include_starts=True,
+    )
+    by_day = {d.day: d for d in days}
+    assert min(by_day) == 10 and 14 not in by_day  # past days and weekends skipped
+    # today: from 10:00 (09:50 + lead), starts 10:00, 10:30, 11:00
+    assert by_day[10].free_starts == 3 and by_day[10].first_start == time(10)
+    # 10:00-11:00 booked: 09:00 and 11:00 remain
+    assert by_day[11].starts == (540, 660)
+    assert (by_day[12].free_starts, by_day[12].last_start) == (5, time(11))
+
+
+def test_cache_shares_computation_prefetches_and_invalidates(monkeypatch):
+    calls: list[tuple] = []
+
+    async def fake_compute(master_id, year, month, duration, step):
+        calls.append((year, month))
+        await asyncio.sleep(0)
+        return ma.MonthAvailability(master_id, year, month, duration, step, "UTC")
+
+    async def fake_step():
+        return 15
+
+    monkeypatch.setattr(ma, "_compute", fake_compute)
+    monkeypatch.setattr(ma, "_slot_step", fake_step)
+    monkeypatch.setattr(ma, "AVAILABILITY_CACHE_TTL_SECONDS", 30)
+    monkeypatch.setattr(ma, "_cache", ma.OrderedDict())
+
+    async def scenario():
+        year = datetime.now(UTC).year + 1
+        a, b = await asyncio.gather(
+            ma.get_month_availability(7, year, 6, 60),
+            ma.get_month_availability(7, year, 6, 60, prefetch=True),
+        )
+        assert a is b
+        await asyncio.gather(*list(ma._prefetch_tasks))
+        assert sorted(calls) == [(year, 5), (year, 6), (year, 7)]
+        await ma.get_month_availability(7, year, 7, 60)
+        assert len(calls) == 3  # served by the prefetch
+        ma.invalidate_month_availability(7)
+        await ma.get_month_availability(7, year, 7, 60)
+        assert len(calls) == 4
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("delta,expected", [(1, (2027, 1)), (-1, (2026, 11)), (-12, (2025, 12))])
+def test_shift_month(delta, expected):
+    assert ma._shift_month(2026, 12, delta) == expected
+
+
+@pytest.mark.parametrize("year", [0, 1, 9999, 10000])
+def test_endpoint_rejects_years_outside_the_calendar(year):
+    from fastapi import HTTPException
+
+    from bot.api.app import availability_month
+
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(availability_month(1, year, 1, ["svc"], principal=None))
+    assert err.value.status_code == 400 and err.value.detail == "invalid_year"
+
+
+def test_endpoint_uses_the_masters_duration_override(budget_db, monkeypatch):
+    from bot.api import app as api
+    from bot.app.domain.models import Master, MasterService, Service
+
+    async def seed():
+        async with budget_db() as session:
+            session.add(Master(id=7, telegram_id=700, name="Olha"))
+            session.add(Service(id="cut", name="Cut", duration_minutes=30))
+            await session.flush()
+            session.add(MasterService(master_id=7, service_id="cut", duration_minutes=90))
+            await session.commit()
+
+    asyncio.run(seed())
+    durations = []
+
+    async def fake_month(master_id, year, month, duration, prefetch=True):
+        durations.append(duration)
+        return ma.MonthAvailability(master_id, year, month, duration, 15, "UTC", days=())
+
+    monkeypatch.setattr(api, "get_month_availability", fake_month)
+    asyncio.run(api.availability_month(7, 2030, 3, ["cut"], principal=None, prefetch=False))
+    assert durations == [90]
@@ -0,0 +1,27 @@
+import asyncio
+
+from bot.app.services import shared_services
+
+
+def test_public_config_is_built_once_until_invalidated(monkeypatch):
+    builds = []
+
+    async def fake_build():
+        builds.append(1)
+        return shared_services.PublicConfig(currency="UAH", timezone="Europe/Kyiv")
+
+    monkeypatch.setattr(shared_services, "_build_public_config", fake_build)
+    shared_services.invalidate_public_config()
+
+    async def scenario():
+        first = await asyncio.gather(*(shared_services.get_public_config() for _ in range(5)))
+        shared_services.invalidate_public_config()
+        second = await shared_services.get_public_config()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(builds) == 2
+    assert all(cfg is first[0] for cfg in first)
+    assert second.currency == "UAH" and second is not first[0]
+    shared_services.invalidate_public_config()
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from bot.app.domain.models import Booking, BookingItem, BookingStatus, Master, Service, User
+from bot.app.services.shared_services import utc_now
+from bot.app.tests_new.query_budget import (
+    QueryBudgetExceeded,
+    assert_constant_queries,
+    query_budget,
+    statement_shape,
+)
+
+
+def test_statement_shape_strips_literals():
+    assert statement_shape("SELECT  x FROM t\n WHERE id = 42 AND n = 'a''b'") == (
+        "SELECT x FROM t WHERE id = ? AND n = ?"
+    )
+    assert statement_shape("SELECT 1 WHERE id IN (?, ?, ?)") == "SELECT ? WHERE id IN (?...)"
+
+
+async def _seed(factory, n: int) -> None:
+    async with factory() as s:
+        if await s.get(User, 1) is None:
+            s.add(User(id=1, telegram_id=111, name="Olha"))
+            s.add(Master(id=1, telegram_id=222, name="Anna"))
+            s.add(Service(id="cut", name="Cut"))
+            s.add(Service(id="wash", name="Wash"))
+            await s.flush()
+        start = utc_now() + timedelta(days=1)
+        for i in range(n):
+            b = Booking(
+                user_id=1,
+                master_id=1,
+                status=BookingStatus.CONFIRMED,
+                starts_at=start + timedelta(days=i),
+                ends_at=start + timedelta(days=i, hours=1),
+            )
+            s.add(b)
+            await s.flush()
+            s.add(BookingItem(booking_id=b.id, service_id="cut", position=0))
+            s.add(BookingItem(booking_id=b.id, service_id="wash", position=1))
+        await s.commit()
+
+
+def test_budget_reports_repeated_statements(budget_db):
+    from bot.app.services.client_services import BookingRepo
+
+    @query_budget(max=1)
+    async def per_item_names(ids):
+        return [await BookingRepo.get_booking_service_names(i) for i in ids]
+
+    async def run():
+        await _seed(budget_db, 3)
+        await per_item_names([1, 2, 3])
+
+    with pytest.raises(QueryBudgetExceeded) as exc:
+        asyncio.run(run())
+    report = str(exc.value)
+    assert "6 statements > max 1" in report
+    assert "x3  SELECT booking_items.service_id, services.name" in report
+
+
+def test_api_bookings_queries_do_not_grow_with_bookings(budget_db):
+    from bot.api.app import list_bookings
+    from bot.api.auth import Principal
+
+    principal = Principal(user_id=1, telegram_id=111, language="uk")
+    seen: dict[int, list[str]] = {}
+
+    async def seed(n: int) -> None:
+        async with budget_db() as s:
+            await s.execute(BookingItem.__table__.delete())
+            await s.execute(Booking.__table__.delete())
+            await s.commit()
+        await _seed(budget_db, n)
+
+    async def call(n: int) -> None:
+        async with query_budget(max=8, label="GET /api/bookings") as budget:
+            items = await list_bookings(principal, "upcoming")
+        assert len(items) == n and items[0].service_names == "Cut, Wash"
+        assert items[0].master_name == "Anna"
+        seen[n] = budget.statements
+
+    assert asyncio.run(assert_constant_queries(call, sizes=(1, 6), seed=seed)) > 0
+    assert len(seen[1]) == len(seen[6])
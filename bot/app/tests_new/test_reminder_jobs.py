@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from bot.app.domain.models import BookingStatus
+from bot.app.services import reminder_jobs
+from bot.app.services.reminder_jobs import parse_reminder_leads, plan_reminder_jobs
+from bot.app.workers.reminders import _pick_templates
+
+NOW = datetime(2030, 1, 7, 9, 0, tzinfo=UTC)
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, select_rows=()):
+        self.select_rows = select_rows
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(self.select_rows if stmt.is_select else ())
+
+    async def commit(self):
+        self.committed = True
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_parse_and_plan_leads():
+    assert parse_reminder_leads("60, 1440;120,x,-5,60") == [1440, 120, 60]
+    assert parse_reminder_leads("[30, 1440]") == [1440, 30]
+    assert parse_reminder_leads(None) == []
+
+    leads = [("lead", 1440), ("lead", 120), ("same_day", 60)]
+    starts = NOW + timedelta(days=2)
+    assert [m for _k, m, _d in plan_reminder_jobs(starts, leads, NOW)] == [1440, 120, 60]
+    # confirmed 30 minutes before the visit: overdue leads collapse into one
+    soon = plan_reminder_jobs(NOW + timedelta(minutes=30), leads, NOW)
+    assert [(k, m) for k, m, _d in soon] == [("same_day", 60)]
+    assert plan_reminder_jobs(NOW - timedelta(minutes=1), leads, NOW) == []
+
+
+def test_sync_upserts_eligible_and_drops_cancelled():
+    starts = NOW + timedelta(days=1, hours=3)
+    session = _FakeSession(
+        [(1, BookingStatus.CONFIRMED, starts), (2, BookingStatus.CANCELLED, starts)]
+    )
+    ok = asyncio.run(
+        reminder_jobs.sync_reminder_jobs(
+            session, [2, 1], leads=[("lead", 1440), ("same_day", 60)], now=NOW
+        )
+    )
+    assert ok
+    select_stmt, delete_stmt, insert_stmt = session.statements
+    assert "DELETE FROM reminder_jobs" in _sql(delete_stmt)
+    assert "NOT IN" in _sql(delete_stmt)
+    params = insert_stmt.compile(dialect=postgresql.dialect()).params
+    assert {v for k, v in params.items() if k.startswith("booking_id")} == {1}
+    assert "ON CONFLICT (booking_id, lead_minutes) DO UPDATE" in _sql(insert_stmt)
+
+
+def test_claim_uses_skip_locked_on_pending_due_rows(monkeypatch):
+    session = _FakeSession()
+
+    @asynccontextmanager
+    async def fake_get_session():
+        yield session
+
+    monkeypatch.setattr(reminder_jobs, "get_session", fake_get_session)
+    assert asyncio.run(reminder_jobs.claim_due_reminders(NOW, limit=10)) == []
+    purge, claim = (_sql(s) for s in session.statements)
+    assert "reminder_jobs.sent_at IS NULL" in purge and "EXISTS" in purge
+    assert "FOR UPDATE SKIP LOCKED" in claim
+    assert "reminder_jobs.due_at <=" in claim and "RETURNING" in claim
+    assert session.committed
+
+
+def test_skip_retires_the_job_instead_of_retrying(monkeypatch):
+    session = _FakeSession()
+
+    @asynccontextmanager
+    async def fake_get_session():
+        yield session
+
+    monkeypatch.setattr(reminder_jobs, "get_session", fake_get_session)
+    job = reminder_jobs.ClaimedReminder(7, 3, "lead", 60, NOW)
+    asyncio.run(reminder_jobs.skip_reminder(job, "no_chat_id"))
+    (stmt,) = session.statements
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    assert params["attempts"] == reminder_jobs.REMINDER_MAX_ATTEMPTS
+    assert params["last_error"] == "skipped:no_chat_id"
+    assert params["claimed_until"] is None and session.committed
+
+
+def test_admin_reminder_leads_input_is_normalized():
+    from bot.app.telegram.admin.admin_handlers import (
+        EDITABLE_BUSINESS_SETTINGS,
+        validate_reminder_leads,
+    )
+
+    meta = EDITABLE_BUSINESS_SETTINGS[reminder_jobs.REMINDER_LEADS_SETTING]
+    assert meta.validator is validate_reminder_leads and meta.saver is not None
+    assert validate_reminder_leads(" 30, 1440;120 ,30") == ("1440,120,30", None)
+    assert validate_reminder_leads("0") == ("", None)
+    assert validate_reminder_leads("abc") == (None, "invalid_reminder_leads")
+    assert validate_reminder_leads("99999") == (None, "invalid_reminder_leads")
+
+
+def test_template_choice_by_kind_and_day():
+    today = NOW.date()
+    tomorrow = today + timedelta(days=1)
+    assert _pick_templates("same_day", 60, today, tomorrow, 0)[0] == "reminder_same_day_body"
+    assert _pick_templates("lead", 1440, tomorrow, tomorrow, 1)[0] == "reminder_24h_body"
+    assert _pick_templates("lead", 4320, today + timedelta(days=3), tomorrow, 3)[0] == (
+        "reminder_future_body"
+    )
+    assert _pick_templates("lead", 60, today, tomorrow, 0)[0] == "reminder_1h_body"
@@ -0,0 +1,66 @@
+from datetime import UTC, date, datetime, time, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from bot.app.domain.schedule_grid import MasterGrid
+from bot.app.services.master_services import find_schedule_conflicts, proposed_schedule_grid
+
+KYIV = ZoneInfo("Europe/Kyiv")
+
+
+def _booking(bid, local_start, minutes=60):
+    starts = local_start.replace(tzinfo=KYIV).astimezone(UTC)
+    return SimpleNamespace(
+        booking_id=bid,
+        starts_at=starts,
+        ends_at=starts + timedelta(minutes=minutes),
+        status="confirmed",
+        master_id=1,
+        user_id=10,
+        user_name="Olha",
+        username=None,
+    )
+
+
+def _current():
+    rows = [
+        (0, time(9), time(13), False),
+        (0, time(14), time(18), False),
+        (1, time(9), time(18), False),
+    ]
+    return MasterGrid.from_rows(rows)
+
+
+def test_window_removal_is_checked_in_local_time():
+    # 09:30 Kyiv is 07:30 UTC: a UTC date_part check would miss the 09:00-13:00 window
+    bookings = [
+        _booking(1, datetime(2030, 1, 7, 9, 30)),
+        _booking(2, datetime(2030, 1, 7, 15, 0)),
+        _booking(3, datetime(2030, 1, 8, 9, 30)),
+    ]
+    current = _current()
+    proposed = proposed_schedule_grid(current, weekly={"0": [["14:00", "18:00"]]})
+    found = find_schedule_conflicts(bookings, proposed, KYIV, baseline=current)
+    assert [c.booking_id for c in found] == [1]
+    assert found[0].local_start.hour == 9 and found[0].client_label() == "Olha"
+
+
+def test_partial_overlap_and_exceptions():
+    current = _current()
+    # 12:00-13:00 is only half inside the shrunk 09:00-12:30 window
+    straddling = _booking(4, datetime(2030, 1, 7, 12, 0), minutes=60)
+    shrunk = proposed_schedule_grid(current, weekly={0: ["09:00-12:30", "14:00-18:00"]})
+    assert [c.booking_id for c in find_schedule_conflicts([straddling], shrunk, KYIV)] == [4]
+
+    # a date exception in the proposal closes one Tuesday only
+    tue = [_booking(5, datetime(2030, 1, 8, 10, 0)), _booking(6, datetime(2030, 1, 15, 10, 0))]
+    closed = proposed_schedule_grid(current, exceptions={date(2030, 1, 8): []})
+    assert [c.booking_id for c in find_schedule_conflicts(tue, closed, KYIV)] == [5]
+
+
+def test_only_new_ignores_bookings_already_outside_schedule():
+    current = _current()
+    off_hours = _booking(7, datetime(2030, 1, 7, 19, 0))  # booked outside the template
+    cleared = proposed_schedule_grid(current, weekly={0: []})
+    assert find_schedule_conflicts([off_hours], cleared, KYIV, baseline=current) == []
+    assert len(find_schedule_conflicts([off_hours], cleared, KYIV)) == 1
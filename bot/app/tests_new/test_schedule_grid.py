@@ -0,0 +1,71 @@
+import random
+from datetime import UTC, date, datetime, time, timedelta
+
+from bot.app.domain.schedule_grid import (
+    MasterGrid,
+    busy_mask_for_day,
+    fit_starts,
+    iter_bits,
+    mask_runs,
+    mask_windows,
+    span_mask,
+    stride_mask,
+    windows_mask,
+)
+
+
+def test_mask_runs_and_windows_roundtrip():
+    mask = windows_mask([(time(9), time(13)), (time(14), time(18, 30)), (time(22), time(0))])
+    assert mask_runs(mask) == [(540, 780), (840, 1110), (1320, 1440)]
+    assert mask_windows(mask)[-1] == (time(22), time(0))
+    assert mask.bit_count() == 240 + 270 + 120
+
+
+def test_fit_starts_matches_brute_force():
+    rng = random.Random(7)
+    free = 0
+    for _ in range(12):
+        s = rng.randrange(0, 1400)
+        free |= span_mask(s, s + rng.randrange(5, 120))
+    for duration in (1, 15, 45, 60, 90, 200):
+        expected = {
+            m
+            for m in range(1440 - duration + 1)
+            if all(free >> k & 1 for k in range(m, m + duration))
+        }
+        assert set(iter_bits(fit_starts(free, duration))) == expected
+
+
+def test_grid_rules_for_day_off_and_exceptions():
+    rows = [
+        (0, time(9), time(13), False),
+        (0, time(14), time(18), False),
+        (1, time(9), time(18), True),
+    ]
+    monday = date(2030, 1, 7)
+    exceptions = [
+        (monday + timedelta(days=7), time(12), time(15), None),
+        (monday + timedelta(days=14), time(0), time(0), None),
+    ]
+    grid = MasterGrid.from_rows(rows, exceptions, fallback=span_mask(600, 660))
+
+    assert grid.windows_for(monday) == [(time(9), time(13)), (time(14), time(18))]
+    assert grid.work_mask(monday + timedelta(days=1)) == 0  # is_day_off
+    assert grid.windows_for(monday + timedelta(days=2)) == [(time(10), time(11))]  # fallback
+    assert grid.windows_for(monday + timedelta(days=7)) == [(time(12), time(15))]
+    assert grid.work_mask(monday + timedelta(days=14)) == 0  # sentinel exception
+
+
+def test_busy_painting_and_free_starts():
+    day = date(2030, 1, 7)
+    grid = MasterGrid.from_rows([(0, time(9), time(12), False)])
+    booking = (
+        datetime(2030, 1, 7, 10, 0, tzinfo=UTC),
+        datetime(2030, 1, 7, 10, 45, 30, tzinfo=UTC),
+    )
+    busy = busy_mask_for_day(day, [booking], UTC)
+    assert mask_runs(busy) == [(600, 646)]
+
+    free = grid.free_mask(day, busy, not_before=555)
+    starts = fit_starts(free, 60) & stride_mask(540, 720, 15)
+    assert list(iter_bits(starts)) == [660]
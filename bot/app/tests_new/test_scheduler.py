@@ -0,0 +1,53 @@
+import asyncio
+
+from bot.app.workers.scheduler import Scheduler
+
+
+def test_jobs_run_periodically_without_overlap():
+    async def scenario():
+        scheduler = Scheduler(leader_lock_key=None, leader_retry_seconds=1)
+        release = asyncio.Event()
+        calls: list[str] = []
+
+        async def slow() -> int:
+            calls.append("slow")
+            await release.wait()
+            return 1
+
+        async def fast() -> None:
+            calls.append("fast")
+
+        scheduler.register("slow", slow, interval=0.01, initial_delay=0)
+        scheduler.register("fast", fast, interval=0.01, jitter=0.5, initial_delay=0)
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+
+        assert scheduler.is_leader
+        # the slow job is still in flight: a manual trigger must not overlap it
+        assert await scheduler.run_job("slow") is False
+        release.set()
+        await scheduler.stop()
+        return scheduler.stats(), calls
+
+    stats, calls = asyncio.run(scenario())
+    jobs = stats["jobs"]
+    assert calls.count("slow") == 1
+    assert jobs["slow"]["skipped_overlaps"] == 1 and jobs["slow"]["last_result"] == 1
+    assert jobs["fast"]["runs"] >= 3 and jobs["fast"]["failures"] == 0
+    assert stats["leader"] is False
+
+
+def test_failing_job_is_counted_and_keeps_running():
+    async def scenario():
+        scheduler = Scheduler(leader_lock_key=None)
+
+        async def boom() -> None:
+            raise RuntimeError("boom")
+
+        scheduler.register("boom", boom, interval=60)
+        await scheduler.run_job("boom")
+        await scheduler.run_job("boom")
+        return scheduler.stats()["jobs"]["boom"]
+
+    stats = asyncio.run(scenario())
+    assert stats["runs"] == 2 and stats["failures"] == 2
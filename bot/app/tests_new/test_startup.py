@@ -0,0 +1,47 @@
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+from aiogram import Router
+from aiogram.types import Chat, Message, User
+
+from benchmarks.import_time import TARGETS, check, measure
+from bot.app.telegram.common.lazy_router import LazyRouter, preload_lazy_routers
+
+_lazy_target = Router(name="t_lazy_target")
+_seen: list[str] = []
+
+
+@_lazy_target.message()
+async def _on_message(message: Message) -> None:
+    _seen.append(message.text or "")
+
+
+def _message(text: str) -> Message:
+    return Message(
+        message_id=1,
+        date=datetime(2030, 1, 1, tzinfo=UTC),
+        chat=Chat(id=1, type="private"),
+        from_user=User(id=1, is_bot=False, first_name="u"),
+        text=text,
+    )
+
+
+def test_lazy_router_loads_on_first_update_and_keeps_order():
+    root, first = Router(name="t_lazy_root"), Router(name="t_lazy_first")
+    lazy = LazyRouter(__name__, "_lazy_target", name="t_lazy")
+    root.include_router(first)
+    root.include_router(lazy.slot)
+    assert lazy.router is None and "message" in root.resolve_used_update_types()
+
+    asyncio.run(root.propagate_event("message", _message("hi")))
+    assert lazy.router is _lazy_target and _seen == ["hi"]
+    assert _lazy_target.parent_router is lazy.slot
+    asyncio.run(preload_lazy_routers())  # already loaded: no-op
+    assert lazy.load() is _lazy_target
+
+
+@pytest.mark.parametrize("target", sorted(TARGETS))
+def test_cold_import_budget(target):
+    problems = check(target, measure(TARGETS[target].code))
+    assert problems == []
@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from bot.app.domain.models import Booking, BookingStatus
+from bot.app.services import reminder_jobs, transitions
+from bot.app.services.transitions import build_transition_statement, transition_bookings
+
+NOW = datetime(2030, 1, 7, 9, 0, tzinfo=UTC)
+
+
+def test_statement_updates_and_writes_history_in_one_cte():
+    stmt = build_transition_statement(
+        BookingStatus.NO_SHOW,
+        where=[Booking.starts_at < NOW],
+        from_statuses=[BookingStatus.CONFIRMED, BookingStatus.PAID],
+        now=NOW,
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH prev AS")
+    assert "FOR UPDATE" in sql
+    assert "UPDATE bookings SET status=" in sql and "FROM prev" in sql
+    assert "INSERT INTO booking_status_history" in sql and "FROM upd" in sql
+    assert "bookings.status != " in sql  # already-transitioned rows are not rewritten
+
+
+def test_transition_returns_rows_and_fires_hooks_once(monkeypatch):
+    returned = [
+        SimpleNamespace(
+            booking_id=i,
+            old_status=BookingStatus.CONFIRMED,
+            master_id=7,
+            user_id=100 + i,
+            starts_at=NOW,
+        )
+        for i in (1, 2, 3)
+    ]
+
+    class _Session:
+        executed = 0
+        committed = False
+
+        async def execute(self, stmt):
+            _Session.executed += 1
+            return SimpleNamespace(all=lambda: returned)
+
+        async def commit(self):
+            _Session.committed = True
+
+    @asynccontextmanager
+    async def fake_get_session():
+        yield _Session()
+
+    synced: list[list[int]] = []
+
+    async def fake_sync(session, ids, **kwargs):
+        synced.append(list(ids))
+        return True
+
+    batches: list[tuple[BookingStatus, int]] = []
+    monkeypatch.setattr(transitions, "get_session", fake_get_session)
+    monkeypatch.setattr(reminder_jobs, "sync_reminder_jobs", fake_sync)
+    monkeypatch.setattr(transitions, "_HOOKS", [])
+    transitions.register_transition_hook(lambda target, rows: batches.append((target, len(rows))))
+
+    rows = asyncio.run(transition_bookings(BookingStatus.CANCELLED, ids=[3, 1, 2], now=NOW))
+    assert [r.booking_id for r in rows] == [1, 2, 3]
+    assert rows[0].old_status is BookingStatus.CONFIRMED
+    assert _Session.executed == 1 and _Session.committed
+    assert synced == [[1, 2, 3]]
+    assert batches == [(BookingStatus.CANCELLED, 3)]
+
+
+def test_transition_requires_a_selector():
+    with pytest.raises(ValueError):
+        asyncio.run(transition_bookings(BookingStatus.CANCELLED))
+    assert asyncio.run(transition_bookings(BookingStatus.CANCELLED, ids=[])) == []
@@ -0,0 +1,33 @@
+from datetime import UTC, date, datetime, time
+
+from bot.app.domain.schedule_grid import MasterGrid
+from bot.app.services.admin_services import utilization_from_grids
+
+
+def _at(day: date, h: int, m: int = 0) -> datetime:
+    return datetime.combine(day, time(h, m)).replace(tzinfo=UTC)
+
+
+def test_utilization_merges_overlaps_and_reports_gaps():
+    monday = date(2030, 1, 7)
+    grids = {
+        1: MasterGrid.from_rows(
+            [(0, time(9), time(13), False), (0, time(14), time(18), False)],
+            [(date(2030, 1, 8), time(10), time(12), None)],
+        )
+    }
+    intervals = {
+        1: [
+            (_at(monday, 9), _at(monday, 10)),
+            (_at(monday, 9, 30), _at(monday, 11)),  # overlaps the first one
+            (_at(monday, 18), _at(monday, 19)),  # outside the schedule
+        ]
+    }
+    days = utilization_from_grids(grids, intervals, monday, date(2030, 1, 9), UTC)[1]
+
+    mon, tue, wed = days
+    assert (mon.scheduled_minutes, mon.booked_minutes, mon.occupied_minutes) == (480, 180, 120)
+    assert mon.occupancy_pct == 25.0
+    assert mon.idle_gaps == ((time(11), time(13)), (time(14), time(18)))
+    assert tue.scheduled_minutes == 120 and tue.booked_minutes == 0  # exception overlay
+    assert wed.scheduled_minutes == 0 and wed.occupancy_pct == 0.0
@@ -15,6 +15,7 @@ TRANSLATIONS = {
         "admin_dashboard_header": "Summary for today ({date})",
         "admin_dashboard_lost_revenue": "Lost revenue: {amount}",
         "admin_dashboard_master_load": "Master load:",
+        "admin_dashboard_master_load_line": "• {name}: {pct}% ({booked}/{scheduled} h)",
         "admin_dashboard_new_clients": "New clients: {count}",
         "admin_dashboard_no_bookings": "(No bookings: {names})",
         "admin_dashboard_no_shows": "No-show rate:",
@@ -108,6 +109,11 @@ TRANSLATIONS = {
         "choose_time_on_date_prefix": "Choose minutes on",
         "client_history_button": "Client history",
         "client_label": "Client",
+        "client_search_empty": "No clients match “{q}”.",
+        "client_search_results": "🔎 Clients matching “{q}”:",
+        "client_search_usage": "Usage: /find <name, @username or Telegram ID>",
+        "debuglog_usage": "Usage: /debuglog <Telegram ID> on|off",
+        "debuglog_state": "Debug logging for {user_id}: {state}. Active: {active}",
         "client_note_label": "Client note",
         "closed_label": "Closed",
         "compact_picker": "Compact picker",
@@ -161,6 +167,10 @@ TRANSLATIONS = {
         "enter_price": "Enter the price in UAH (numbers only), e.g., 350",
         "enter_online_discount": "Enter online payment discount percentage (0-100). This reduces the final amount clients pay when they choose online payment. Example: 20",
         "online_discount_updated": "Online discount saved.",
+        "reminder_leads_label": "⏰ Reminder schedule (min)",
+        "enter_reminder_leads": "Enter reminder lead times in minutes, comma-separated, e.g. 1440,120,30. Send 0 to go back to the two reminders above.",
+        "reminder_leads_updated": "Reminder schedule saved.",
+        "invalid_reminder_leads": "Invalid list. Use positive minutes up to 43200, e.g. 1440,120,30.",
         "online_discount_label_plain": "Online discount",
         "online_discount_label": "🎁 Online discount",
         "online_discount_hint": "Applied to price when client pays online (percent).",
@@ -581,6 +591,7 @@ TRANSLATIONS = {
         "admin_dashboard_header": "Сводка на сегодня ({date})",
         "admin_dashboard_lost_revenue": "Упущенная выгода: {amount}",
         "admin_dashboard_master_load": "Загрузка мастеров:",
+        "admin_dashboard_master_load_line": "• {name}: {pct}% ({booked}/{scheduled} ч)",
         "admin_dashboard_new_clients": "Новых клиентов: {count}",
         "admin_dashboard_no_bookings": "(Нет записей: {names})",
         "admin_dashboard_no_shows": "Уровень неявок:",
@@ -674,6 +685,11 @@ TRANSLATIONS = {
         "choose_time_on_date_prefix": "Выберите минуты на",
         "client_history_button": "История клиента",
         "client_label": "Клиент",
+        "client_search_empty": "Клиенты по запросу «{q}» не найдены.",
+        "client_search_results": "🔎 Клиенты по запросу «{q}»:",
+        "client_search_usage": "Использование: /find <имя, @username или Telegram ID>",
+        "debuglog_usage": "Использование: /debuglog <Telegram ID> on|off",
+        "debuglog_state": "Отладочные логи для {user_id}: {state}. Активны: {active}",
         "client_note_label": "Заметка клиента",
         "closed_label": "Выходной",
         "compact_picker": "Компактный выбор",
@@ -726,6 +742,10 @@ TRANSLATIONS = {
         "enter_price": "Введите цену в гривнах (только число), например: 350",
         "enter_online_discount": "Введите процент скидки для онлайн-оплаты (0-100). Скидка уменьшает итоговую сумму, которую платит клиент. Например: 20",
         "online_discount_updated": "Скидка для онлайн-оплаты сохранена.",
+        "reminder_leads_label": "⏰ График напоминаний (мин)",
+        "enter_reminder_leads": "Введите время напоминаний в минутах через запятую, например 1440,120,30. Отправьте 0, чтобы вернуться к двум напоминаниям выше.",
+        "reminder_leads_updated": "График напоминаний сохранён.",
+        "invalid_reminder_leads": "Неверный список. Укажите положительные минуты до 43200, например 1440,120,30.",
         "online_discount_label_plain": "Скидка онлайн",
         "online_discount_label": "🎁 Скидка онлайн",
         "online_discount_hint": "Применяется к цене при выборе онлайн-оплаты (в процентах).",
@@ -1147,6 +1167,7 @@ TRANSLATIONS = {
         "admin_dashboard_header": "Сводка на сьогодні ({date})",
         "admin_dashboard_lost_revenue": "Упущена вигода: {amount}",
         "admin_dashboard_master_load": "Завантаження майстрів:",
+        "admin_dashboard_master_load_line": "• {name}: {pct}% ({booked}/{scheduled} год)",
         "admin_dashboard_new_clients": "Нових клієнтів: {count}",
         "admin_dashboard_no_bookings": "(Немає записів: {names})",
         "admin_dashboard_no_shows": "Рівень неявок:",
@@ -1240,6 +1261,11 @@ TRANSLATIONS = {
         "choose_time_on_date_prefix": "Оберіть хвилини на",
         "client_history_button": "Історія клієнта",
         "client_label": "Клієнт",
+        "client_search_empty": "Клієнтів за запитом «{q}» не знайдено.",
+        "client_search_results": "🔎 Клієнти за запитом «{q}»:",
+        "client_search_usage": "Використання: /find <ім'я, @username або Telegram ID>",
+        "debuglog_usage": "Використання: /debuglog <Telegram ID> on|off",
+        "debuglog_state": "Налагоджувальні логи для {user_id}: {state}. Активні: {active}",
         "client_note_label": "Нотатка клієнта",
         "closed_label": "Вихідний",
         "compact_picker": "Компактний вибір",
@@ -1293,6 +1319,10 @@ TRANSLATIONS = {
         "enter_price": "Введіть ціну у гривнях (тільки число), наприклад: 350",
         "enter_online_discount": "Введіть відсоток знижки для онлайн-оплати (0-100). Знижка зменшує суму, яку сплачує клієнт. Приклад: 20",
         "online_discount_updated": "Знижку для онлайн-оплати збережено.",
+        "reminder_leads_label": "⏰ Графік нагадувань (хв)",
+        "enter_reminder_leads": "Введіть час нагадувань у хвилинах через кому, наприклад 1440,120,30. Надішліть 0, щоб повернутися до двох нагадувань вище.",
+        "reminder_leads_updated": "Графік нагадувань збережено.",
+        "invalid_reminder_leads": "Невірний список. Вкажіть додатні хвилини до 43200, наприклад 1440,120,30.",
         "online_discount_label_plain": "Онлайн знижка",
         "online_discount_label": "🎁 Онлайн знижка",
         "online_discount_hint": "Застосовується до ціни при виборі онлайн-оплати (у відсотках).",
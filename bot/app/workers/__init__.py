@@ -0,0 +1,4 @@
+"""Background workers (expiration, reminders, cleanup) and their scheduler.
+
+Run standalone with ``python -m bot.app.workers``.
+"""
@@ -0,0 +1,65 @@
+"""Standalone worker process: ``python -m bot.app.workers``.
+
+Runs the unified scheduler without Telegram polling. Several instances (and
+bot processes with ``RUN_WORKERS_IN_BOT=1``) may run side by side: the
+Postgres advisory lock elects one leader that executes the sweeps.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import signal
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+
+from bot.app.core.cache_bus import start_cache_bus, stop_cache_bus
+from bot.app.core.constants import BOT_TOKEN
+from bot.app.core.logger import configure_logging
+from bot.app.workers.scheduler import build_scheduler
+
+logger = logging.getLogger("bot.workers")
+
+
+async def main() -> None:
+    try:
+        from bot.app.services.admin_services import load_settings_from_db
+
+        await load_settings_from_db()
+    except Exception as e:
+        logger.warning("Could not load settings from DB: %s", e)
+
+    # Bot is only used to send reminders/notifications (no polling here)
+    bot: Bot | None = None
+    if BOT_TOKEN:
+        bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
+    else:
+        logger.warning("BOT_TOKEN is not set: reminders and notifications are disabled")
+
+    scheduler = build_scheduler(bot)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    await scheduler.start()
+    # sweeps expire holds / complete bookings: API processes must drop availability
+    await start_cache_bus()
+    try:
+        await stop.wait()
+    finally:
+        await stop_cache_bus()
+        await scheduler.stop()
+        if bot is not None:
+            with contextlib.suppress(Exception):
+                await bot.session.close()
+
+
+if __name__ == "__main__":
+    # Same queue-backed pipeline as the bot; stdout only (LOG_FILE is the bot's)
+    configure_logging("workers", log_file="")
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
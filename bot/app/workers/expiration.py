@@ -13,7 +13,8 @@ import contextlib
 import logging
 from datetime import datetime, timedelta
 
-from sqlalchemy import update, select
+from sqlalchemy import Integer, and_, bindparam, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from bot.app.core.db import get_session
 from bot.app.services.shared_services import get_env_int as _get_env_int, get_admin_ids, utc_now
@@ -26,105 +27,84 @@ logger = logging.getLogger(__name__)
 """Use get_env_int from shared_services; local implementation removed."""
 
 
+_HOLD_STATUSES = (BookingStatus.RESERVED, BookingStatus.PENDING_PAYMENT)
+
+
 async def _expire_once(now_utc: datetime) -> int:
     try:
+        from bot.app.services.transitions import fire_transition_hooks, transition_bookings
+
         async with get_session() as session:
             hold_minutes = _get_env_int("RESERVATION_HOLD_MINUTES", 5)
-            # Find candidate bookings that should expire and group them by
-            # (master_id, starts_at). For each group acquire an advisory lock
-            # on that pair and then perform the update. This prevents races
-            # where a concurrent creator inserts a RESERVED/PENDING_PAYMENT
-            # booking for the same slot while we're expiring another.
+            # Find (master_id, starts_at) slots with an overdue hold and take an
+            # advisory lock per slot (sorted, one statement) before expiring, so a
+            # concurrent creator cannot insert a hold for the same slot meanwhile.
             result = await session.execute(
-                select(Booking.id, Booking.master_id, Booking.starts_at).where(
-                    Booking.status.in_([BookingStatus.RESERVED, BookingStatus.PENDING_PAYMENT]),
+                select(Booking.master_id, Booking.starts_at)
+                .where(
+                    Booking.status.in_(_HOLD_STATUSES),
                     Booking.cash_hold_expires_at.is_not(None),
                     Booking.cash_hold_expires_at <= now_utc,
                 )
+                .distinct()
             )
-            rows_all = result.fetchall()
-            groups: dict[tuple[int, object], list[int]] = {}
-            for bid, mid, starts in rows_all:
-                key = (int(mid), starts)
-                groups.setdefault(key, []).append(int(bid))
-
-            count = 0
-            for (mid, starts), _ids in groups.items():
-                try:
-                    from sqlalchemy import text
-
-                    k1 = int(mid) % 2147483647
-                    k2 = int(starts.timestamp()) % 2147483647 if hasattr(starts, "timestamp") else 0
-                    await session.execute(
-                        text("SELECT pg_advisory_xact_lock(:k1, :k2)"), {"k1": k1, "k2": k2}
-                    )
-                except Exception:
-                    # best-effort advisory lock
-                    pass
-
-                stmt_upd = (
-                    update(Booking)
-                    .where(
-                        Booking.master_id == mid,
-                        Booking.starts_at == starts,
-                        Booking.status.in_([BookingStatus.RESERVED, BookingStatus.PENDING_PAYMENT]),
-                    )
-                    .values(status=BookingStatus.EXPIRED, cash_hold_expires_at=None)
-                    .returning(Booking.id)
+            slots = [(int(mid), starts) for mid, starts in result.fetchall() if mid is not None]
+            if slots:
+                keys = sorted(
+                    {
+                        (
+                            int(mid) % 2147483647,
+                            (
+                                int(starts.timestamp()) % 2147483647
+                                if hasattr(starts, "timestamp")
+                                else 0
+                            ),
+                        )
+                        for mid, starts in slots
+                    }
                 )
-                res = await session.execute(stmt_upd)
-                got = res.fetchall()
-                if got:
-                    logger.debug(
-                        "Expired bookings for master=%s starts_at=%s: %s",
-                        mid,
-                        starts,
-                        [r[0] for r in got],
+                # best-effort advisory lock
+                with contextlib.suppress(Exception):
+                    await session.execute(
+                        text(
+                            "SELECT pg_advisory_xact_lock(k.k1, k.k2) "
+                            "FROM unnest(:k1, :k2) AS k(k1, k2) ORDER BY k.k1, k.k2"
+                        ).bindparams(
+                            bindparam("k1", [k[0] for k in keys], type_=ARRAY(Integer)),
+                            bindparam("k2", [k[1] for k in keys], type_=ARRAY(Integer)),
+                        )
                     )
-                count += len(got)
 
-            stmt_no_hold = (
-                update(Booking)
-                .where(
-                    Booking.status.in_([BookingStatus.RESERVED, BookingStatus.PENDING_PAYMENT]),
-                    Booking.cash_hold_expires_at.is_(None),
+            # One set-based transition for all three cases:
+            # * every hold on a slot with an overdue hold;
+            # * holds without cash_hold_expires_at older than the hold window;
+            # * holds without cash_hold_expires_at and NULL created_at.
+            no_hold = and_(
+                Booking.cash_hold_expires_at.is_(None),
+                or_(
                     Booking.created_at <= now_utc - timedelta(minutes=max(1, hold_minutes)),
-                )
-                .values(status=BookingStatus.EXPIRED)
-                .returning(Booking.id)
+                    Booking.created_at.is_(None),
+                ),
             )
-            result2 = await session.execute(stmt_no_hold)
-            rows2 = result2.fetchall()
-            count += len(rows2)
-            logger.debug(
-                "Expired %d bookings without cash_hold_expires_at (based on created_at): %s",
-                len(rows2),
-                [row[0] for row in rows2],
+            predicate = (
+                or_(tuple_(Booking.master_id, Booking.starts_at).in_(slots), no_hold)
+                if slots
+                else no_hold
             )
-            # Дополнительно: если created_at отсутствует (NULL) и нет удержания — тоже считаем просроченным
-            stmt_no_hold_null_created = (
-                update(Booking)
-                .where(
-                    Booking.status.in_([BookingStatus.RESERVED, BookingStatus.PENDING_PAYMENT]),
-                    Booking.cash_hold_expires_at.is_(None),
-                    Booking.created_at.is_(None),
-                )
-                .values(status=BookingStatus.EXPIRED)
-                .returning(Booking.id)
+            rows = await transition_bookings(
+                BookingStatus.EXPIRED,
+                where=[predicate],
+                from_statuses=_HOLD_STATUSES,
+                values={"cash_hold_expires_at": None},
+                session=session,
+                now=now_utc,
             )
-            result3 = await session.execute(stmt_no_hold_null_created)
-            rows3 = result3.fetchall()
-            count += len(rows3)
-            if rows3:
-                logger.debug(
-                    "Expired %d bookings without cash_hold_expires_at and NULL created_at: %s",
-                    len(rows3),
-                    [row[0] for row in rows3],
-                )
             await session.commit()
-            if count:
-                logger.info("Expired %d overdue reservations/payments", count)
-            return count
+        await fire_transition_hooks(BookingStatus.EXPIRED, rows)
+        if rows:
+            logger.info("Expired %d overdue reservations/payments", len(rows))
+            logger.debug("Expired bookings: %s", [r.booking_id for r in rows])
+        return len(rows)
     except Exception as e:
         logger.error("Expiration sweep failed: %s", e)
         return 0
@@ -200,6 +180,73 @@ LIMBO_STATUSES = [
 NO_SHOW_GRACE_PERIOD_HOURS = 2
 
 
+async def _cleanup_once(bot: Bot | None = None, now_utc: datetime | None = None) -> int:
+    """Single cleanup sweep: mark long-past LIMBO bookings as NO_SHOW and notify.
+
+    Returns the number of bookings moved to NO_SHOW.
+    """
+    booking_ids_to_fail: list[int] = []
+    try:
+        from bot.app.services.transitions import transition_bookings
+
+        now = now_utc or utc_now()
+
+        # Записи, которые начались более N часов назад и все еще "активны",
+        # переводим в NO_SHOW одним запросом (с записью истории статусов)
+        cutoff_time = now - timedelta(hours=NO_SHOW_GRACE_PERIOD_HOURS)
+        rows = await transition_bookings(
+            BookingStatus.NO_SHOW,
+            where=[Booking.starts_at < cutoff_time],
+            from_statuses=LIMBO_STATUSES,
+            now=now,
+        )
+        booking_ids_to_fail = [r.booking_id for r in rows]
+
+        if booking_ids_to_fail:
+            logger.info(f"Обновлено {len(booking_ids_to_fail)} 'лимбо' записей на NO_SHOW.")
+
+            # Notify affected parties about NO_SHOW (if bot provided)
+            if bot is not None:
+                try:
+                    from bot.app.core.notifications import send_booking_notification
+                    from bot.app.services.master_services import MasterRepo
+
+                    admins = get_admin_ids() or []
+                    for bid in booking_ids_to_fail:
+                        try:
+                            bd = await MasterRepo.get_booking_display_data(int(bid))
+                            client_tid = bd.get("client_telegram_id") if bd else None
+                            master_tid = bd.get("master_telegram_id") if bd else None
+                            recipients: list[int] = []
+                            if client_tid:
+                                with contextlib.suppress(Exception):
+                                    recipients.append(int(client_tid))
+                            if master_tid:
+                                with contextlib.suppress(Exception):
+                                    recipients.append(int(master_tid))
+                            for a in admins:
+                                with contextlib.suppress(Exception):
+                                    recipients.append(int(a))
+                            recipients = list(dict.fromkeys(recipients))
+                            if recipients:
+                                try:
+                                    await send_booking_notification(
+                                        bot, int(bid), "no_show", recipients
+                                    )
+                                except Exception:
+                                    logger.exception(
+                                        "Failed to send no-show notification for booking %s",
+                                        bid,
+                                    )
+                        except Exception:
+                            logger.exception("Failed to prepare/notify for booking %s", bid)
+                except Exception:
+                    logger.exception("Failed to run NO_SHOW notifications loop")
+    except Exception as e:
+        logger.exception(f"Ошибка в cleanup loop: {e}")
+    return len(booking_ids_to_fail)
+
+
 async def _cleanup_loop(
     stop_event: asyncio.Event, interval_seconds: int | None = None, bot: Bot | None = None
 ) -> None:
@@ -216,75 +263,7 @@ async def _cleanup_loop(
 
     logger.info("Запуск воркера очистки 'лимбо' записей...")
     while not stop_event.is_set():
-        try:
-            now = utc_now()
-
-            # Ищем записи, которые начались более N часов назад и все еще "активны"
-            cutoff_time = now - timedelta(hours=NO_SHOW_GRACE_PERIOD_HOURS)
-
-            async with get_session() as session:
-                # 1. Находим кандидатов на авто-неявку
-                stmt = select(Booking.id).where(
-                    Booking.starts_at < cutoff_time, Booking.status.in_(LIMBO_STATUSES)
-                )
-                result = await session.execute(stmt)
-                booking_ids_to_fail = result.scalars().all()
-
-                if booking_ids_to_fail:
-                    logger.info(
-                        f"Найдено {len(booking_ids_to_fail)} 'лимбо' записей. Обновление статуса на NO_SHOW..."
-                    )
-
-                    # 2. Обновляем их статус на NO_SHOW
-                    update_stmt = (
-                        update(Booking)
-                        .where(Booking.id.in_(booking_ids_to_fail))
-                        .values(status=BookingStatus.NO_SHOW)
-                    )
-                    await session.execute(update_stmt)
-                    await session.commit()
-                    logger.info(f"Обновлено {len(booking_ids_to_fail)} записей.")
-
-                    # 3. Notify affected parties about NO_SHOW (if bot provided)
-                    if bot is not None:
-                        try:
-                            from bot.app.core.notifications import send_booking_notification
-                            from bot.app.services.master_services import MasterRepo
-
-                            admins = get_admin_ids() or []
-                            for bid in booking_ids_to_fail:
-                                try:
-                                    bd = await MasterRepo.get_booking_display_data(int(bid))
-                                    client_tid = bd.get("client_telegram_id") if bd else None
-                                    master_tid = bd.get("master_telegram_id") if bd else None
-                                    recipients: list[int] = []
-                                    if client_tid:
-                                        with contextlib.suppress(Exception):
-                                            recipients.append(int(client_tid))
-                                    if master_tid:
-                                        with contextlib.suppress(Exception):
-                                            recipients.append(int(master_tid))
-                                    for a in admins:
-                                        with contextlib.suppress(Exception):
-                                            recipients.append(int(a))
-                                    recipients = list(dict.fromkeys(recipients))
-                                    if recipients:
-                                        try:
-                                            await send_booking_notification(
-                                                bot, int(bid), "no_show", recipients
-                                            )
-                                        except Exception:
-                                            logger.exception(
-                                                "Failed to send no-show notification for booking %s",
-                                                bid,
-                                            )
-                                except Exception:
-                                    logger.exception("Failed to prepare/notify for booking %s", bid)
-                        except Exception:
-                            logger.exception("Failed to run NO_SHOW notifications loop")
-
-        except Exception as e:
-            logger.exception(f"Ошибка в cleanup loop: {e}")
+        await _cleanup_once(bot)
 
         try:
             await asyncio.wait_for(stop_event.wait(), timeout=check_interval_seconds)
@@ -1,19 +1,22 @@
-"""Background worker to send 24h visit reminders.
+"""Background worker to send visit reminders.
 
-Scans upcoming bookings and sends a reminder message about 24 hours before start.
-Marks a per-booking flag to avoid duplicate notifications.
+Claims due rows from the precomputed ``reminder_jobs`` table (see
+``bot.app.services.reminder_jobs``) and sends one message per job; a job is
+marked sent so a reminder goes out once per (booking, lead).
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
+from contextlib import suppress
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from collections.abc import Awaitable, Callable
+from typing import Any
 
 from aiogram import Bot
-from sqlalchemy import select, update
+from sqlalchemy import select
 
 from bot.app.core.db import get_session
 from bot.app.core.constants import REMINDERS_CHECK_SECONDS, REMINDERS_CHECK_SECONDS_INVALID
@@ -24,213 +27,193 @@ from bot.app.translations import t
 logger = logging.getLogger(__name__)
 
 
+# lead config the last full resync was done for (None = not yet in this process)
+_synced_leads: tuple[tuple[str, int], ...] | None = None
+
+REMINDERS_CLAIM_BATCH = 100
+
+
+def _pick_templates(
+    kind: str, minutes: int, starts_date: Any, tomorrow_date: Any, days_diff: int | None
+) -> tuple[str, str]:
+    """Return (body_key, title_key) for a reminder of ``kind`` sent ``minutes`` ahead."""
+    if kind == "same_day":
+        return "reminder_same_day_body", "reminder_same_day_title"
+    if days_diff is not None and days_diff >= 2:
+        return "reminder_future_body", "reminder_24h_title"
+    if starts_date is not None and starts_date == tomorrow_date:
+        return "reminder_24h_body", "reminder_24h_title"
+    if abs(int(minutes) - 60) <= 5:
+        return "reminder_1h_body", "reminder_1h_title"
+    return "reminder_same_day_body", "reminder_same_day_title"
+
+
+async def _ensure_jobs_synced(leads: list[tuple[str, int]]) -> None:
+    """Resync ``reminder_jobs`` once per process and whenever the lead config changes."""
+    global _synced_leads
+    key = tuple(leads)
+    if _synced_leads == key:
+        return
+    from bot.app.services.reminder_jobs import resync_all_reminder_jobs
+
+    try:
+        await resync_all_reminder_jobs(leads)
+        _synced_leads = key
+    except Exception:
+        logger.exception("Reminders worker: reminder_jobs resync failed")
+
+
 async def _remind_once(now_utc: datetime, bot: Bot) -> int:
-    """Scan upcoming bookings within the next 24 hours and send reminders.
+    """Claim due rows from ``reminder_jobs`` and send the reminders.
 
+    Only jobs whose ``due_at`` passed are touched (partial index on pending
+    rows); bookings are loaded by id for the claimed jobs only.
     Returns the number of reminders successfully sent.
     """
-    # Determine lead time from settings (minutes) and compute window
     from bot.app.services.client_services import UserRepo
-
-    # Use ServiceRepo + SettingsRepo directly
-    from bot.app.services.admin_services import ServiceRepo, SettingsRepo
+    from bot.app.services.admin_services import ServiceRepo
+    from bot.app.services.reminder_jobs import (
+        claim_due_reminders,
+        get_reminder_leads,
+        mark_reminder_sent,
+        release_reminder,
+        skip_reminder,
+    )
     from bot.app.services.shared_services import _safe_send
 
     local_tz = get_local_tz() or ZoneInfo("UTC")
     try:
-        lead_primary = int(await SettingsRepo.get_reminder_lead_minutes())
-    except Exception:
-        lead_primary = 60
-    try:
-        lead_same_day = int(await SettingsRepo.get_same_day_lead_minutes())
+        leads = await get_reminder_leads()
     except Exception:
-        lead_same_day = 0
-
-    configs: list[tuple[str, int, str]] = []
-    if lead_primary and lead_primary > 0:
-        configs.append(("lead", lead_primary, "remind_24h_sent"))
-    if lead_same_day and lead_same_day > 0:
-        configs.append(("same_day", lead_same_day, "remind_1h_sent"))
-
-    if not configs:
+        logger.exception("Reminders worker: failed to read reminder leads")
+        return 0
+    if not leads:
         logger.info("Reminders worker: all reminder lead times disabled; skipping sweep")
         return 0
 
-    total_sent = 0
+    await _ensure_jobs_synced(leads)
 
     try:
-        from bot.app.domain.models import Booking as BookingModel, REMINDER_ELIGIBLE_STATUSES
-
-        async def _process_config(kind: str, minutes: int, flag_attr: str) -> int:
-            window_utc = now_utc + timedelta(minutes=minutes)
-            flag_column = getattr(BookingModel, flag_attr)
-
-            async with get_session() as session:
-                stmt = (
-                    select(BookingModel)
-                    .where(
-                        BookingModel.starts_at >= now_utc,
-                        BookingModel.starts_at < window_utc,
-                        BookingModel.status.in_(tuple(REMINDER_ELIGIBLE_STATUSES)),
-                        flag_column.is_(False),
-                    )
-                    .order_by(BookingModel.starts_at)
-                )
-                res = await session.execute(stmt)
-                bookings = res.scalars().all()
+        jobs = await claim_due_reminders(now_utc, limit=REMINDERS_CLAIM_BATCH)
+    except Exception as e:
+        logger.error("Reminder sweep failed: %s", e)
+        return 0
+    if not jobs:
+        return 0
+
+    async with get_session() as session:
+        res = await session.execute(
+            select(Booking).where(Booking.id.in_({j.booking_id for j in jobs}))
+        )
+        bookings = {int(b.id): b for b in res.scalars().all()}
 
-            user_ids = {
-                int(getattr(b, "user_id", 0) or 0) for b in bookings if getattr(b, "user_id", None)
-            }
-            clients_map = await UserRepo.get_by_ids(user_ids) if user_ids else {}
+    user_ids = {int(getattr(b, "user_id", 0) or 0) for b in bookings.values() if b.user_id}
+    clients_map = await UserRepo.get_by_ids(user_ids) if user_ids else {}
 
-            sent_count = 0
-            for booking in bookings:
+    service_names: dict[str, str] = {}
+    master_names: dict[int, str] = {}
+    total_sent = 0
+    for job in jobs:
+        booking = bookings.get(job.booking_id)
+        try:
+            if booking is None:
+                await skip_reminder(job, "booking_not_found")
+                continue
+            uid = int(getattr(booking, "user_id", getattr(booking, "client_id", 0) or 0) or 0)
+            user = clients_map.get(uid)
+            chat_id = getattr(user, "telegram_id", None) if user else None
+            if not chat_id:
+                logger.debug(
+                    "Reminder: no chat_id resolved for booking %s (user_id=%s)", booking.id, uid
+                )
+                await skip_reminder(job, "no_chat_id")
+                continue
+
+            lang = await safe_get_locale(int(chat_id))
+
+            # Resolve service and master display names (cached per sweep)
+            svc_id = getattr(booking, "service_id", None)
+            if not svc_id:
+                service_name = t("service_label", lang)
+            elif str(svc_id) in service_names:
+                service_name = service_names[str(svc_id)]
+            else:
+                try:
+                    service_name = await ServiceRepo.get_service_name(str(svc_id))
+                except Exception:
+                    service_name = t("service_label", lang)
+                service_names[str(svc_id)] = service_name
+            mid = int(getattr(booking, "master_id", 0) or 0)
+            if mid in master_names:
+                master_name = master_names[mid]
+            else:
                 try:
-                    uid = int(
-                        getattr(booking, "user_id", getattr(booking, "client_id", 0) or 0) or 0
-                    )
-                    user = clients_map.get(uid)
-                    chat_id = getattr(user, "telegram_id", None) if user else None
-                    if not chat_id:
-                        logger.debug(
-                            "Reminder: no chat_id resolved for booking %s (user_id=%s)",
-                            getattr(booking, "id", "?"),
-                            uid,
-                        )
-                        continue
-
-                    lang = await safe_get_locale(int(chat_id))
-
-                    # Resolve service and master display names
-                    try:
-                        svc_id = getattr(booking, "service_id", None)
-                        if not svc_id:
-                            service_name = t("service_label", lang)
-                        else:
-                            service_name = await ServiceRepo.get_service_name(str(svc_id))
-                    except Exception:
-                        service_name = t("service_label", lang)
-                    try:
-                        from bot.app.services.master_services import MasterRepo
-
-                        master_name = await MasterRepo.get_master_name(
-                            int(getattr(booking, "master_id", 0) or 0)
-                        )
-                    except Exception:
-                        master_name = t("master_label", lang)
-                    dt_local = None
-                    date_txt = "—"
-                    try:
-                        starts_at = booking.starts_at
-                        dt_local = (
-                            starts_at.astimezone(local_tz) if (starts_at is not None) else starts_at
-                        )
-                        time_txt = f"{dt_local:%H:%M}"
-                        date_txt = f"{dt_local:%d.%m}"
-                    except Exception:
-                        time_txt = "--:--"
-
-                    try:
-                        now_local = local_now()
-                        starts_date = dt_local.date() if dt_local is not None else None
-                        now_date = now_local.date()
-                        days_diff = (starts_date - now_date).days if starts_date else None
-                        tomorrow_date = (now_local + timedelta(days=1)).date()
-                    except Exception:
-                        starts_date = None
-                        tomorrow_date = None
-                        days_diff = None
-
-                    # Pick body/title depending on kind and lead
-                    if kind == "same_day":
-                        use_key = "reminder_same_day_body"
-                        title_key = "reminder_same_day_title"
-                    else:
-                        if days_diff is not None and days_diff >= 2:
-                            use_key = "reminder_future_body"
-                            title_key = "reminder_24h_title"
-                        elif starts_date is not None and starts_date == tomorrow_date:
-                            use_key = "reminder_24h_body"
-                            title_key = "reminder_24h_title"
-                        elif abs(int(minutes) - 60) <= 5:
-                            use_key = "reminder_1h_body"
-                            title_key = "reminder_1h_title"
-                        else:
-                            use_key = "reminder_same_day_body"
-                            title_key = "reminder_same_day_title"
-
-                    title = t(title_key, lang)
-                    if title == title_key:
-                        title = {
-                            "uk": "Нагадування про запис",
-                            "ru": "Напоминание о записи",
-                            "en": "Appointment reminder",
-                        }.get(lang, "Appointment reminder")
-
-                    body_template = t(use_key, lang)
-                    if not isinstance(body_template, str) or body_template == use_key:
-                        if use_key == "reminder_24h_body":
-                            body_template = t("reminder_24h_body", lang)
-                        elif use_key == "reminder_1h_body":
-                            body_template = t("reminder_1h_body", lang)
-                        else:
-                            body_template = t("reminder_same_day_body", lang)
-
-                    body = body_template.format(
-                        time=time_txt, service=service_name, master=master_name, date=date_txt
-                    )
-                    text = f"<b>{title}</b>\n\n{body}"
-
-                    ok = await _safe_send(bot, chat_id, text)
-                    if not ok:
-                        logger.warning(
-                            "Failed to send reminder to %s for booking %s",
-                            chat_id,
-                            getattr(booking, "id", "?"),
-                        )
-                        continue
-
-                    try:
-                        async with get_session() as session:
-                            now_ts = utc_now()
-                            values = {
-                                "last_reminder_sent_at": now_ts,
-                                "last_reminder_lead_minutes": int(minutes),
-                                flag_attr: True,
-                            }
-                            await session.execute(
-                                update(Booking)
-                                .where(Booking.id == getattr(booking, "id", None))
-                                .values(**values)
-                            )
-                            await session.commit()
-                    except Exception:
-                        logger.exception(
-                            "Failed to mark reminder metadata for booking %s",
-                            getattr(booking, "id", "?"),
-                        )
-
-                    sent_count += 1
-                except Exception as ie:
-                    logger.exception(
-                        "Error processing reminder for booking %s: %s",
-                        getattr(booking, "id", "?"),
-                        ie,
-                    )
-
-            return sent_count
-
-        for cfg in configs:
+                    from bot.app.services.master_services import MasterRepo
+
+                    master_name = await MasterRepo.get_master_name(mid)
+                except Exception:
+                    master_name = t("master_label", lang)
+                master_names[mid] = master_name
+
+            dt_local = None
+            date_txt = "—"
+            try:
+                starts_at = booking.starts_at
+                dt_local = starts_at.astimezone(local_tz) if (starts_at is not None) else starts_at
+                time_txt = f"{dt_local:%H:%M}"
+                date_txt = f"{dt_local:%d.%m}"
+            except Exception:
+                time_txt = "--:--"
+
             try:
-                total_sent += await _process_config(*cfg)
-            except Exception as e:
-                logger.exception("Reminder sweep failed for %s: %s", cfg[0], e)
+                now_local = local_now()
+                starts_date = dt_local.date() if dt_local is not None else None
+                days_diff = (starts_date - now_local.date()).days if starts_date else None
+                tomorrow_date = (now_local + timedelta(days=1)).date()
+            except Exception:
+                starts_date = None
+                tomorrow_date = None
+                days_diff = None
+
+            use_key, title_key = _pick_templates(
+                job.kind, job.lead_minutes, starts_date, tomorrow_date, days_diff
+            )
+
+            title = t(title_key, lang)
+            if title == title_key:
+                title = {
+                    "uk": "Нагадування про запис",
+                    "ru": "Напоминание о записи",
+                    "en": "Appointment reminder",
+                }.get(lang, "Appointment reminder")
+
+            body_template = t(use_key, lang)
+            if not isinstance(body_template, str) or body_template == use_key:
+                body_template = t("reminder_same_day_body", lang)
+
+            body = body_template.format(
+                time=time_txt, service=service_name, master=master_name, date=date_txt
+            )
+            text = f"<b>{title}</b>\n\n{body}"
+
+            ok = await _safe_send(bot, chat_id, text)
+            if not ok:
+                logger.warning("Failed to send reminder to %s for booking %s", chat_id, booking.id)
+                await release_reminder(job, "send_failed")
+                continue
 
-        return total_sent
-    except Exception as e:
-        logger.error("Reminder sweep failed: %s", e)
-        return 0
+            try:
+                await mark_reminder_sent(job, utc_now())
+            except Exception:
+                logger.exception("Failed to mark reminder job %s as sent", job.job_id)
+
+            total_sent += 1
+        except Exception as ie:
+            logger.exception("Error processing reminder for booking %s: %s", job.booking_id, ie)
+            with suppress(Exception):
+                await release_reminder(job, type(ie).__name__)
+
+    return total_sent
 
 
 async def _run_loop(stop_event: asyncio.Event, bot: Bot, interval_seconds: int) -> None:
@@ -0,0 +1,327 @@
+"""Unified background scheduler for periodic sweeps.
+
+One component drives every periodic job (hold expiration, reminders, no-show
+cleanup) instead of a hand-written loop per worker:
+
+* jobs are registered with an interval (int or callable re-read every run)
+  and a jitter fraction so replicas do not sweep in lock-step;
+* a job never overlaps itself: a run that is still in progress when the
+  next one is due (or when ``run_job`` is called manually) is skipped;
+* per-job timing metrics (runs, failures, skips, last/max/total duration);
+* leader election through a session-level Postgres advisory lock held on a
+  dedicated connection, so with several bot/worker replicas exactly one of
+  them runs the sweeps. Losing the connection drops leadership and stops the
+  jobs until the lock is re-acquired.
+
+On non-Postgres databases (local SQLite) election is skipped and the process
+acts as leader.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from sqlalchemy import text
+
+from bot.app.core.constants import (
+    REMINDERS_CHECK_SECONDS,
+    WORKERS_LEADER_LOCK_KEY,
+    WORKERS_LEADER_RETRY_SECONDS,
+)
+from bot.app.core.db import get_engine
+from bot.app.services.shared_services import get_env_int as _get_env_int, utc_now
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Job", "JobStats", "Scheduler", "build_scheduler"]
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    skipped_overlaps: int = 0
+    last_started_at: float | None = None
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_result: Any = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_overlaps": self.skipped_overlaps,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": round(self.last_duration * 1000, 1),
+            "max_duration_ms": round(self.max_duration * 1000, 1),
+            "avg_duration_ms": (
+                round(self.total_duration / self.runs * 1000, 1) if self.runs else 0.0
+            ),
+            "last_result": self.last_result,
+        }
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: int | float | Callable[[], int | float]
+    jitter: float = 0.1
+    initial_delay: float = 2.0
+    timeout: float | None = None
+    stats: JobStats = field(default_factory=JobStats)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def next_delay(self) -> float:
+        """Interval for the next run (re-read if callable) with +/- jitter."""
+        try:
+            base = float(self.interval() if callable(self.interval) else self.interval)
+        except Exception:
+            logger.exception("scheduler: interval for %s failed; using 60s", self.name)
+            base = 60.0
+        base = max(0.0, base)
+        if self.jitter > 0 and base > 0:
+            base *= 1 + random.uniform(-self.jitter, self.jitter)
+        return base
+
+
+class _LeaderLock:
+    """Session-level ``pg_try_advisory_lock`` held on a dedicated connection."""
+
+    def __init__(self, key: int) -> None:
+        self.key = int(key)
+        self._conn: Any = None
+
+    async def try_acquire(self) -> bool:
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            return True
+        conn = await engine.connect()
+        try:
+            got = (
+                await conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self.key})
+            ).scalar()
+            # Do not sit idle-in-transaction; the session lock survives the commit.
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+        if got:
+            self._conn = conn
+            return True
+        await conn.close()
+        return False
+
+    async def alive(self) -> bool:
+        if self._conn is None:
+            return get_engine().dialect.name != "postgresql"
+        try:
+            await self._conn.execute(text("SELECT 1"))
+            await self._conn.commit()
+            return True
+        except Exception:
+            logger.warning("scheduler: leader connection lost")
+            with contextlib.suppress(Exception):
+                await self._conn.close()
+            self._conn = None
+            return False
+
+    async def release(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        with contextlib.suppress(Exception):
+            await conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self.key})
+            await conn.commit()
+        with contextlib.suppress(Exception):
+            await conn.close()
+
+
+class Scheduler:
+    """Run registered jobs periodically while this process holds leadership.
+
+    ``leader_lock_key=None`` disables election (the process always leads).
+    """
+
+    def __init__(
+        self,
+        *,
+        leader_lock_key: int | None = WORKERS_LEADER_LOCK_KEY,
+        leader_retry_seconds: float = WORKERS_LEADER_RETRY_SECONDS,
+    ) -> None:
+        self.jobs: dict[str, Job] = {}
+        self.leader_retry_seconds = max(1.0, float(leader_retry_seconds))
+        self._lock = _LeaderLock(leader_lock_key) if leader_lock_key is not None else None
+        self._stop = asyncio.Event()
+        self._runner: asyncio.Task[None] | None = None
+        self._job_tasks: list[asyncio.Task[None]] = []
+        self.is_leader = False
+
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        *,
+        interval: int | float | Callable[[], int | float],
+        jitter: float = 0.1,
+        initial_delay: float = 2.0,
+        timeout: float | None = None,
+    ) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"job already registered: {name}")
+        job = Job(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            initial_delay=initial_delay,
+            timeout=timeout,
+        )
+        self.jobs[name] = job
+        return job
+
+    async def run_job(self, name: str) -> bool:
+        """Run one job now. Returns False if it was already running (skipped)."""
+        job = self.jobs[name]
+        if job._lock.locked():
+            job.stats.skipped_overlaps += 1
+            logger.debug("scheduler: %s still running; skipped", name)
+            return False
+        async with job._lock:
+            stats = job.stats
+            stats.last_started_at = time.time()
+            started = time.perf_counter()
+            try:
+                if job.timeout:
+                    stats.last_result = await asyncio.wait_for(job.func(), timeout=job.timeout)
+                else:
+                    stats.last_result = await job.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                stats.failures += 1
+                logger.exception("scheduler: job %s failed", name)
+            finally:
+                elapsed = time.perf_counter() - started
+                stats.runs += 1
+                stats.last_duration = elapsed
+                stats.total_duration += elapsed
+                stats.max_duration = max(stats.max_duration, elapsed)
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "leader": self.is_leader,
+            "jobs": {name: job.stats.snapshot() for name, job in self.jobs.items()},
+        }
+
+    async def _job_loop(self, job: Job) -> None:
+        if await self._wait(job.initial_delay):
+            return
+        while not self._stop.is_set():
+            await self.run_job(job.name)
+            if await self._wait(job.next_delay()):
+                return
+
+    async def _wait(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``; True when the scheduler is stopping."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=max(0.0, seconds))
+            return True
+        except TimeoutError:
+            return False
+
+    def _start_jobs(self) -> None:
+        self._job_tasks = [
+            asyncio.create_task(self._job_loop(job), name=f"job-{job.name}")
+            for job in self.jobs.values()
+        ]
+        logger.info("scheduler: leader; running jobs %s", sorted(self.jobs))
+
+    async def _stop_jobs(self) -> None:
+        tasks, self._job_tasks = self._job_tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(BaseException):
+                await task
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.is_leader:
+                try:
+                    acquired = self._lock is None or await self._lock.try_acquire()
+                except Exception:
+                    logger.exception("scheduler: leader election failed")
+                    acquired = False
+                if acquired:
+                    self.is_leader = True
+                    self._start_jobs()
+                else:
+                    logger.debug("scheduler: another replica is leader")
+            elif self._lock is not None and not await self._lock.alive():
+                self.is_leader = False
+                await self._stop_jobs()
+            if await self._wait(self.leader_retry_seconds):
+                break
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+        self._stop.clear()
+        self._runner = asyncio.create_task(self._run(), name="scheduler")
+        logger.info("Scheduler started (%d jobs)", len(self.jobs))
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        runner, self._runner = self._runner, None
+        if runner is not None:
+            try:
+                await asyncio.wait_for(runner, timeout=timeout)
+            except Exception:
+                runner.cancel()
+        # let in-flight runs finish (bounded), then cancel the loops
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(
+                asyncio.gather(*self._job_tasks, return_exceptions=True), timeout=timeout
+            )
+        await self._stop_jobs()
+        if self._lock is not None:
+            await self._lock.release()
+        self.is_leader = False
+        logger.info("Scheduler stopped: %s", self.stats()["jobs"])
+
+
+def build_scheduler(bot: Bot | None = None, **kwargs: Any) -> Scheduler:
+    """Scheduler with the standard sweeps registered (expiration, reminders, cleanup)."""
+    from bot.app.workers.expiration import _cleanup_once, _expire_once
+    from bot.app.workers.reminders import _remind_once
+
+    scheduler = Scheduler(**kwargs)
+    scheduler.register(
+        "expire_holds",
+        lambda: _expire_once(utc_now()),
+        interval=lambda: _get_env_int("RESERVATION_EXPIRE_CHECK_SECONDS", 30),
+    )
+    if bot is not None:
+        scheduler.register(
+            "reminders",
+            lambda: _remind_once(utc_now(), bot),
+            interval=REMINDERS_CHECK_SECONDS,
+        )
+    scheduler.register(
+        "cleanup_no_show",
+        lambda: _cleanup_once(bot),
+        interval=lambda: _get_env_int("CLEANUP_CHECK_SECONDS", 900),
+        initial_delay=10.0,
+    )
+    return scheduler
@@ -0,0 +1,87 @@
+"""Booking overlap exclusion constraints
+
+Revision ID: b7e2c4d91f30
+Revises: a91fe2a082a6
+Create Date: 2026-10-18 10:12:41.118204
+
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# revision identifiers, used by Alembic.
+revision = "b7e2c4d91f30"
+down_revision = "a91fe2a082a6"
+branch_labels = None
+depends_on = None
+
+_ACTIVE = "('reserved', 'pending_payment', 'confirmed', 'paid')"
+
+# (constraint name, owner column) - one per side of the overlap check
+_CONSTRAINTS = (
+    ("bookings_master_no_overlap", "master_id"),
+    ("bookings_client_no_overlap", "user_id"),
+)
+
+
+def _exclusion_exists(bind: sa.engine.Connection, name: str) -> bool:
+    # Inspector does not report EXCLUDE constraints; ask the catalog directly.
+    row = bind.execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name AND contype = 'x'"),
+        {"name": name},
+    ).first()
+    return row is not None
+
+
+def _overlapping_pairs(bind: sa.engine.Connection, column: str) -> list[tuple[int, int]]:
+    rows = bind.execute(sa.text(f"""
+            SELECT a.id, b.id FROM bookings a
+            JOIN bookings b
+              ON a.{column} = b.{column} AND a.id < b.id
+             AND tstzrange(a.starts_at, a.ends_at) && tstzrange(b.starts_at, b.ends_at)
+            WHERE a.ends_at IS NOT NULL AND b.ends_at IS NOT NULL
+              AND a.status IN {_ACTIVE} AND b.status IN {_ACTIVE}
+            ORDER BY a.id, b.id
+            LIMIT 50
+            """)).all()
+    return [(int(a), int(b)) for a, b in rows]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for name, column in _CONSTRAINTS:
+        if _exclusion_exists(bind, name):
+            continue
+        pairs = _overlapping_pairs(bind, column)
+        if pairs:
+            # The single-statement booking writer relies on these constraints;
+            # do not leave the schema without them. Resolve the listed bookings
+            # (cancel / move one of each pair) and re-run the upgrade.
+            logger.error(
+                "%s: overlapping active bookings on %s (booking id pairs, first %d): %s",
+                name,
+                column,
+                len(pairs),
+                pairs,
+            )
+            raise RuntimeError(
+                f"cannot add {name}: overlapping active bookings exist, e.g. {pairs[:5]}"
+            )
+        op.execute(f"""
+            ALTER TABLE bookings ADD CONSTRAINT {name}
+            EXCLUDE USING gist (
+                {column} WITH =,
+                tstzrange(starts_at, ends_at, '[)') WITH &&
+            )
+            WHERE (ends_at IS NOT NULL AND status IN {_ACTIVE})
+            """)
+
+
+def downgrade() -> None:
+    for name, _column in _CONSTRAINTS:
+        op.execute(f"ALTER TABLE bookings DROP CONSTRAINT IF EXISTS {name}")
@@ -0,0 +1,58 @@
+"""Precomputed reminder jobs
+
+Revision ID: c3d8a5e7f412
+Revises: b7e2c4d91f30
+Create Date: 2026-10-18 14:05:09.402117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c3d8a5e7f412"
+down_revision = "b7e2c4d91f30"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reminder_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "booking_id",
+            sa.Integer(),
+            sa.ForeignKey("bookings.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("lead_minutes", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False, server_default="lead"),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("claimed_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(length=200), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.UniqueConstraint("booking_id", "lead_minutes", name="uq_reminder_jobs_booking_lead"),
+    )
+    # The sweep only ever looks at pending rows ordered by due time.
+    op.create_index(
+        "ix_reminder_jobs_pending_due_at",
+        "reminder_jobs",
+        ["due_at"],
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+    # Existing confirmed/paid bookings are backfilled by the first reminders
+    # sweep after deploy (it resyncs all future bookings when the lead config
+    # it last saw changes), so no data step is needed here.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminder_jobs_pending_due_at", table_name="reminder_jobs")
+    op.drop_table("reminder_jobs")
@@ -0,0 +1,70 @@
+"""Incrementally maintained master reputation counters
+
+Revision ID: d5a1f7c3e920
+Revises: c3d8a5e7f412
+Create Date: 2026-10-18 21:40:12.518304
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d5a1f7c3e920"
+down_revision = "c3d8a5e7f412"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "master_stats",
+        sa.Column(
+            "master_id",
+            sa.BigInteger(),
+            sa.ForeignKey("masters.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("rating_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed_orders", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("no_shows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_visit_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_no_show_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Backfill from history; later changes are applied incrementally.
+    op.execute("""
+        INSERT INTO master_stats (
+            master_id, rating_sum, rating_count, completed_orders, no_shows,
+            last_visit_at, last_no_show_at, updated_at
+        )
+        SELECT m.id,
+               COALESCE(r.rating_sum, 0),
+               COALESCE(r.rating_count, 0),
+               COALESCE(v.completed_orders, 0),
+               COALESCE(v.no_shows, 0),
+               v.last_visit_at,
+               v.last_no_show_at,
+               now()
+        FROM masters m
+        LEFT JOIN (
+            SELECT b.master_id, SUM(br.rating) AS rating_sum, COUNT(br.rating) AS rating_count
+            FROM booking_ratings br JOIN bookings b ON b.id = br.booking_id
+            GROUP BY b.master_id
+        ) r ON r.master_id = m.id
+        LEFT JOIN (
+            SELECT master_id,
+                   COUNT(*) FILTER (WHERE status = 'done') AS completed_orders,
+                   COUNT(*) FILTER (WHERE status = 'no_show') AS no_shows,
+                   MAX(starts_at) FILTER (WHERE status = 'done') AS last_visit_at,
+                   MAX(starts_at) FILTER (WHERE status = 'no_show') AS last_no_show_at
+            FROM bookings
+            WHERE status IN ('done', 'no_show')
+            GROUP BY master_id
+        ) v ON v.master_id = m.id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("master_stats")
@@ -0,0 +1,88 @@
+"""Per master/client CRM summary for the master client lists
+
+Revision ID: e8b4c2f6a713
+Revises: d5a1f7c3e920
+Create Date: 2026-10-18 23:05:41.902117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e8b4c2f6a713"
+down_revision = "d5a1f7c3e920"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "master_client_summary",
+        sa.Column(
+            "master_id",
+            sa.BigInteger(),
+            sa.ForeignKey("masters.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("visits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("spend_cents", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("no_shows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_visit_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("next_visit_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "note_id",
+            sa.Integer(),
+            sa.ForeignKey("master_client_notes.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_master_client_summary_last_visit",
+        "master_client_summary",
+        ["master_id", "last_visit_at"],
+    )
+    op.create_index(
+        "ix_master_client_summary_spend", "master_client_summary", ["master_id", "spend_cents"]
+    )
+    op.create_index(
+        "ix_master_client_summary_no_shows", "master_client_summary", ["master_id", "no_shows"]
+    )
+    # Backfill from history; later changes are recomputed per pair.
+    op.execute("""
+        INSERT INTO master_client_summary (
+            master_id, user_id, visits, spend_cents, no_shows,
+            last_visit_at, next_visit_at, note_id, updated_at
+        )
+        SELECT b.master_id,
+               b.user_id,
+               COUNT(*) FILTER (WHERE b.status = 'done'),
+               COALESCE(SUM(COALESCE(b.final_price_cents, b.original_price_cents, 0))
+                        FILTER (WHERE b.status IN ('paid', 'confirmed', 'done')), 0),
+               COUNT(*) FILTER (WHERE b.status = 'no_show'),
+               MAX(b.starts_at) FILTER (WHERE b.status = 'done'),
+               MIN(b.starts_at) FILTER (
+                   WHERE b.status IN ('reserved', 'pending_payment', 'confirmed', 'paid')
+                     AND b.starts_at >= now()
+               ),
+               (SELECT MAX(n.id) FROM master_client_notes n
+                 WHERE n.master_id = b.master_id AND n.user_id = b.user_id),
+               now()
+        FROM bookings b
+        WHERE b.master_id IS NOT NULL
+        GROUP BY b.master_id, b.user_id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_master_client_summary_no_shows", table_name="master_client_summary")
+    op.drop_index("ix_master_client_summary_spend", table_name="master_client_summary")
+    op.drop_index("ix_master_client_summary_last_visit", table_name="master_client_summary")
+    op.drop_table("master_client_summary")
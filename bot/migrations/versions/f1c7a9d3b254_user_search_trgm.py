@@ -0,0 +1,41 @@
+"""Trigram-indexed client search text on users
+
+Revision ID: f1c7a9d3b254
+Revises: e8b4c2f6a713
+Create Date: 2026-10-19 00:12:09.331870
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f1c7a9d3b254"
+down_revision = "e8b4c2f6a713"
+branch_labels = None
+depends_on = None
+
+SEARCH_TEXT_SQL = (
+    "lower(coalesce(name, '') || ' ' || coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || coalesce(username, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "users",
+        sa.Column("search_text", sa.Text(), sa.Computed(SEARCH_TEXT_SQL, persisted=True)),
+    )
+    op.create_index(
+        "ix_users_search_text_trgm",
+        "users",
+        ["search_text"],
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_search_text_trgm", table_name="users")
+    op.drop_column("users", "search_text")
@@ -0,0 +1,5 @@
+#!/bin/bash
+# Runs once on a fresh primary volume (docker-entrypoint-initdb.d): lets the
+# `db-replica` service (docker compose --profile replica) stream WAL from it.
+set -e
+echo "host replication ${POSTGRES_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
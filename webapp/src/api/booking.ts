@@ -1,5 +1,5 @@
 // src/api/booking.ts
-import api from "./client";
+import api, { idempotencyHeaders, resetIdempotencyKeys } from "./client";
 
 // --- Types matching your Python Pydantic Models ---
 
@@ -242,12 +242,16 @@ export async function checkSlot(params: { master_id?: number | null; slot: strin
 }
 
 export async function createHold(payload: BookingRequest): Promise<BookingResponse> {
-  const { data } = await api.post<BookingResponse>("/api/hold", payload);
+  const { data } = await api.post<BookingResponse>("/api/hold", payload, {
+    headers: idempotencyHeaders("hold", payload),
+  });
   return data;
 }
 
 export async function finalizeBooking(params: { booking_id: number; payment_method: "cash" | "online" }): Promise<BookingResponse> {
-  const { data } = await api.post<BookingResponse>("/api/finalize", params);
+  const { data } = await api.post<BookingResponse>("/api/finalize", params, {
+    headers: idempotencyHeaders("finalize", params),
+  });
   return data;
 }
 
@@ -257,15 +261,21 @@ export async function fetchBookings(mode: "upcoming" | "history" = "upcoming"):
 }
 
 export async function cancelBooking(booking_id: number): Promise<BookingResponse> {
-  const { data } = await api.post<BookingResponse>("/api/cancel", { booking_id });
+  const { data } = await api.post<BookingResponse>(
+    "/api/cancel",
+    { booking_id },
+    { headers: idempotencyHeaders("cancel", { booking_id }) },
+  );
+  if (data.ok) resetIdempotencyKeys("cancel");
   return data;
 }
 
 export async function rescheduleBooking(params: { booking_id: number; new_slot: string }): Promise<BookingResponse> {
-  const { data } = await api.post<BookingResponse>("/api/reschedule", {
-    booking_id: params.booking_id,
-    new_slot: params.new_slot,
+  const body = { booking_id: params.booking_id, new_slot: params.new_slot };
+  const { data } = await api.post<BookingResponse>("/api/reschedule", body, {
+    headers: idempotencyHeaders("reschedule", body),
   });
+  if (data.ok) resetIdempotencyKeys("reschedule");
   return data;
 }
 
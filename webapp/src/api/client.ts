@@ -23,4 +23,38 @@ export function setLang(lang: string | null) {
   api.defaults.headers.common["Accept-Language"] = lang;
 }
 
+// Idempotency-Key for booking writes: the same request body sent again within
+// KEY_REUSE_MS (double tap, retry) reuses the key, so the API replays the first
+// response instead of running the write twice.
+const KEY_REUSE_MS = 15000;
+const recentKeys = new Map<string, { key: string; at: number }>();
+
+function newIdempotencyKey(): string {
+  const c = globalThis.crypto;
+  if (c && typeof c.randomUUID === "function") return c.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+export function idempotencyHeaders(scope: string, body: unknown): Record<string, string> {
+  const now = Date.now();
+  for (const [id, entry] of recentKeys) {
+    if (now - entry.at > KEY_REUSE_MS) recentKeys.delete(id);
+  }
+  const id = `${scope}:${JSON.stringify(body)}`;
+  let entry = recentKeys.get(id);
+  if (!entry) {
+    entry = { key: newIdempotencyKey(), at: now };
+    recentKeys.set(id, entry);
+  }
+  return { "Idempotency-Key": entry.key };
+}
+
+// After a state change (cancel, reschedule) an identical earlier request of
+// another kind is a new intent; keys of `keepScope` stay to absorb its own repeats.
+export function resetIdempotencyKeys(keepScope?: string) {
+  for (const id of [...recentKeys.keys()]) {
+    if (!keepScope || !id.startsWith(`${keepScope}:`)) recentKeys.delete(id);
+  }
+}
+
 export default api;